@@ -1,11 +1,11 @@
 """Manages the v6 batch configuration schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from batch.configuration.configuration import BatchConfiguration
 from batch.configuration.exceptions import InvalidConfiguration
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -69,7 +69,7 @@ class BatchConfigurationV6(object):
 
         try:
             if do_validate:
-                validate(self._configuration, BATCH_CONFIGURATION_SCHEMA)
+                validate_json(self._configuration, BATCH_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidConfiguration('INVALID_BATCH_CONFIGURATION', 'Invalid batch configuration: %s' % unicode(ex))
 
@@ -1,11 +1,11 @@
 """Manages the v6 batch definition schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from batch.definition.definition import BatchDefinition
 from batch.definition.exceptions import InvalidDefinition
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -94,7 +94,7 @@ class BatchDefinitionV6(object):
 
         try:
             if do_validate:
-                validate(self._definition, BATCH_DEFINITION_SCHEMA)
+                validate_json(self._definition, BATCH_DEFINITION_SCHEMA)
         except ValidationError as ex:
             raise InvalidDefinition('INVALID_BATCH_DEFINITION', 'Invalid batch definition: %s' % unicode(ex))
 
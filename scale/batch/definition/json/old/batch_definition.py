@@ -1,7 +1,6 @@
 """Defines the class for managing a batch definition"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 import util.parse as parse
@@ -9,6 +8,7 @@ from batch.definition.exceptions import InvalidDefinition
 from storage.models import Workspace
 from trigger.configuration.exceptions import InvalidTriggerRule
 from trigger.configuration.trigger_rule import TriggerRuleConfiguration
+from util.validation import validate_json
 
 
 DEFAULT_VERSION = '1.0'
@@ -144,7 +144,7 @@ class BatchDefinition(object):
         self._definition = definition
 
         try:
-            validate(definition, BATCH_DEFINITION_SCHEMA)
+            validate_json(definition, BATCH_DEFINITION_SCHEMA)
         except ValidationError as ex:
             raise InvalidDefinition('', 'Invalid batch definition: %s' % unicode(ex))
 
@@ -69,6 +69,12 @@ class UpdateBatchMetrics(CommandMessage):
 
         return len(self._batch_ids) < MAX_NUM
 
+    def merge(self, message, size_factor=1):
+        """See :meth:`messaging.messages.message.CommandMessage.merge`
+        """
+
+        return self._merge_ids(message, '_batch_ids', MAX_NUM, size_factor, self.add_batch)
+
     def to_json(self):
         """See :meth:`messaging.messages.message.CommandMessage.to_json`
         """
@@ -6,7 +6,7 @@ import django
 from django.test import TestCase
 from django.utils.timezone import now
 
-from batch.messages.update_batch_metrics import UpdateBatchMetrics
+from batch.messages.update_batch_metrics import MAX_NUM, UpdateBatchMetrics
 from batch.models import Batch, BatchMetrics
 from batch.test import utils as batch_test_utils
 from job.execution.tasks.json.results.task_results import TaskResults
@@ -22,6 +22,26 @@ class TestUpdateBatchMetrics(TestCase):
     def setUp(self):
         django.setup()
 
+    def test_merge(self):
+        """Tests merging UpdateBatchMetrics messages together"""
+
+        message_1 = UpdateBatchMetrics()
+        message_1.add_batch(1)
+        message_2 = UpdateBatchMetrics()
+        message_2.add_batch(2)
+        message_2.add_batch(1)
+
+        self.assertTrue(message_1.merge(message_2))
+        self.assertListEqual(message_1._batch_ids, [1, 2])
+
+        # Merged message must not exceed the maximum size
+        message_3 = UpdateBatchMetrics()
+        for batch_id in range(3, MAX_NUM + 2):
+            message_3.add_batch(batch_id)
+        self.assertFalse(message_1.merge(message_3))
+        self.assertTrue(message_1.merge(message_3, size_factor=2))
+        self.assertEqual(len(message_1._batch_ids), MAX_NUM + 1)
+
     def test_json(self):
         """Tests coverting an UpdateBatchMetrics message to and from JSON"""
 
@@ -1,12 +1,12 @@
 """Manages the v6 interface schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from data.interface.exceptions import InvalidInterface
 from data.interface.interface import Interface
 from data.interface.parameter import FileParameter, JsonParameter
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -137,7 +137,7 @@ class InterfaceV6(object):
 
         try:
             if do_validate:
-                validate(self._interface, INTERFACE_SCHEMA)
+                validate_json(self._interface, INTERFACE_SCHEMA)
         except ValidationError as ex:
             raise InvalidInterface('INVALID_INTERFACE', 'Invalid interface: %s' % unicode(ex))
 
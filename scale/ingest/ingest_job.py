@@ -4,11 +4,13 @@ from __future__ import unicode_literals
 import logging
 import os
 
+from django.conf import settings
 from django.db import transaction
 from django.utils.timezone import now
 
 from ingest.models import Ingest
 from ingest.triggers.ingest_trigger_handler import IngestTriggerHandler
+from metrics.models import MetricsIngestRollup
 from source.models import SourceFile
 from storage.brokers.broker import FileDownload, FileMove, FileUpload
 from storage.models import ScaleFile
@@ -17,99 +19,160 @@ from util.retry import retry_database_query
 logger = logging.getLogger(__name__)
 
 
-def perform_ingest(ingest_id):
-    """Performs the ingest for the given ingest ID
+def perform_ingests(ingest_ids):
+    """Performs the ingests for the given ingest IDs together in a single job, which may be a single ingest. The source
+    files are registered, moved, and copied with bulk operations, while the status of each ingest is still tracked
+    separately. If the transfer of a group of files fails, only the ingests of that group are marked ERRORED and the
+    others are completed before the error is raised. When duplicate content is skipped, copied files with the same
+    content as an ingested file are deleted again and their ingests are marked DUPLICATE.
 
-    :param ingest_id: The ID of the ingest to perform
-    :type ingest_id: int
+    :param ingest_ids: The IDs of the ingests to perform
+    :type ingest_ids: [int]
     """
 
-    ingest = _get_ingest(ingest_id)
-    file_name = ingest.file_name
-
-    if ingest.status in ['INGESTED', 'DUPLICATE']:
-        logger.warning('%s already marked %s, nothing to do', file_name, ingest.status)
-        return
-
-    _start_ingest(ingest)
-    if ingest.status != 'INGESTING':
-        return
-
-    try:
-        source_file = ingest.source_file
-        if source_file.is_deleted:
-            # Source file still marked as deleted, so we must copy/move/register the file
-            source_file.set_basic_fields(file_name, ingest.file_size, ingest.media_type, ingest.get_data_type_tags())
-            source_file.update_uuid(file_name)  # Add a stable identifier based on the file name
-            source_file.workspace = ingest.workspace
-            source_file.file_path = ingest.file_path
-            source_file.is_deleted = False
-            source_file.is_parsed = False
-            source_file.deleted = None
-            source_file.parsed = None
-
-            if ingest.new_workspace:
-                # We need a local path to copy the file, try to get a direct path from the broker, if that fails we must
-                # download the file and copy from there
-                # TODO: a future refactor should make the brokers work off of file objects instead of paths so the extra
-                # download is not necessary
-                paths = ingest.workspace.get_file_system_paths([source_file])
-                if paths:
-                    local_path = paths[0]
-                else:
-                    local_path = os.path.join('/tmp', file_name)
-                    file_download = FileDownload(source_file, local_path, False)
-                    ScaleFile.objects.download_files([file_download])
-                source_file.file_path = ingest.new_file_path if ingest.new_file_path else ingest.file_path
-                logger.info('Copying %s in workspace %s to %s in workspace %s', ingest.file_path, ingest.workspace.name,
-                            source_file.file_path, ingest.new_workspace.name)
-                file_upload = FileUpload(source_file, local_path)
-                ScaleFile.objects.upload_files(ingest.new_workspace, [file_upload])
-            elif ingest.new_file_path:
-                logger.info('Moving %s to %s in workspace %s', ingest.file_path, ingest.new_file_path,
-                            ingest.workspace.name)
-                file_move = FileMove(source_file, ingest.new_file_path)
-                ScaleFile.objects.move_files([file_move])
-            else:
-                logger.info('Registering %s in workspace %s', ingest.file_path, ingest.workspace.name)
-                _save_source_file(source_file)
-
+    ingests = []
+    for ingest in _get_ingests(ingest_ids):
+        if ingest.status in ['INGESTED', 'DUPLICATE']:
+            logger.warning('%s already marked %s, nothing to do', ingest.file_name, ingest.status)
+        else:
+            ingests.append(ingest)
+
+    _start_ingests(ingests)
+    ingests = [ingest for ingest in ingests if ingest.status == 'INGESTING']
+
+    # Group the ingests whose source files still need to be copied, moved, or registered
+    copies = {}  # {(Workspace ID, New workspace ID): [ingest]}
+    moves = []
+    registers = []
+    for ingest in ingests:
+        if not ingest.source_file.is_deleted:
+            continue
+        _reset_source_file(ingest)
         if ingest.new_workspace:
-            # Copied file to new workspace, so delete file in old workspace (if workspace provides local path to do so)
-            file_with_old_path = SourceFile.create()
-            file_with_old_path.file_name = file_name
-            file_with_old_path.file_path = ingest.file_path
-            paths = ingest.workspace.get_file_system_paths([file_with_old_path])
-            if paths:
-                _delete_file(paths[0])
-
-    except Exception:
-        _complete_ingest(ingest, 'ERRORED')
-        raise
-
-    _complete_ingest(ingest, 'INGESTED')
-    logger.info('Ingest successful for %s', file_name)
+            copies.setdefault((ingest.workspace_id, ingest.new_workspace_id), []).append(ingest)
+        elif ingest.new_file_path:
+            moves.append(ingest)
+        else:
+            registers.append(ingest)
+
+    groups = [(_copy_source_files, copy_ingests) for copy_ingests in copies.values()]
+    if moves:
+        groups.append((_move_source_files, moves))
+    if registers:
+        groups.append((_register_source_files, registers))
+
+    errored_ids = set()
+    exception = None
+    for transfer_func, group_ingests in groups:
+        try:
+            transfer_func(group_ingests)
+        except Exception as ex:
+            logger.exception('Failed to ingest %d file(s)', len(group_ingests))
+            errored_ids.update(ingest.id for ingest in group_ingests)
+            exception = ex
+
+    # Copied files to new workspace, so delete files in old workspace (if workspace provides local path to do so)
+    old_workspace_ingests = {}  # {Workspace ID: [ingest]}
+    for ingest in ingests:
+        if ingest.new_workspace and ingest.id not in errored_ids:
+            old_workspace_ingests.setdefault(ingest.workspace_id, []).append(ingest)
+    for workspace_ingests in old_workspace_ingests.values():
+        try:
+            _delete_old_files(workspace_ingests[0].workspace, workspace_ingests)
+        except Exception as ex:
+            logger.exception('Failed to delete %d ingested file(s)', len(workspace_ingests))
+            errored_ids.update(ingest.id for ingest in workspace_ingests)
+            exception = ex
+
+    duplicates = []
+    if settings.INGEST_SKIP_DUPLICATE_CONTENT:
+        # Copied files have checksums, so the ones with the same content as an ingested file are duplicates
+        duplicates = _get_duplicate_content_ingests([ingest for ingest in ingests
+                                                     if ingest.new_workspace and ingest.id not in errored_ids])
+        for ingest in duplicates:
+            logger.warning('File %s has the same content as an ingested file, marking as DUPLICATE', ingest.file_name)
+        if duplicates:
+            # Remove the duplicate copies so that only the ingested file with this content remains
+            try:
+                _delete_duplicate_files(duplicates)
+            except Exception as ex:
+                logger.exception('Failed to delete %d duplicate file(s)', len(duplicates))
+                errored_ids.update(ingest.id for ingest in duplicates)
+                duplicates = []
+                exception = ex
+    duplicate_ids = {ingest.id for ingest in duplicates}
+    errored_ingests = [ingest for ingest in ingests if ingest.id in errored_ids]
+    ingested = [ingest for ingest in ingests if ingest.id not in errored_ids and ingest.id not in duplicate_ids]
+    if errored_ingests:
+        _complete_ingests(errored_ingests, 'ERRORED')
+    if duplicates:
+        _complete_ingests(duplicates, 'DUPLICATE')
+    if ingested:
+        _complete_ingests(ingested, 'INGESTED')
+    logger.info('Ingest successful for %d of %d file(s)', len(ingested), len(ingest_ids))
+
+    if exception:
+        raise exception
 
 
 @retry_database_query
-def _complete_ingest(ingest, status):
-    """Completes the given ingest in an atomic transaction
+def _complete_ingests(ingests, status):
+    """Completes the given ingests in an atomic transaction, updating all of the ingest models with a single query
 
-    :param ingest: The ingest model
-    :type ingest: :class:`ingest.models.Ingest`
-    :param status: The final status of the ingest
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    :param status: The final status of the ingests
     :type status: string
     """
 
-    # Atomically mark ingest status and run ingest trigger rules
+    when = now()
+    fields = {'status': status, 'last_modified': when}
+    if status == 'INGESTED':
+        fields['ingest_ended'] = when
+
+    # Atomically mark ingest statuses, run ingest trigger rules, and record them in the intra-day metrics
     with transaction.atomic():
-        logger.info('Marking ingest for %s as %s', ingest.file_name, status)
-        ingest.status = status
-        if status == 'INGESTED':
-            ingest.ingest_ended = now()
-        ingest.save()
+        logger.info('Marking ingests for %d file(s) as %s', len(ingests), status)
+        Ingest.objects.filter(id__in=[ingest.id for ingest in ingests]).update(**fields)
+        for ingest in ingests:
+            ingest.status = status
+            if status == 'INGESTED':
+                ingest.ingest_ended = when
         if status == 'INGESTED':
-            IngestTriggerHandler().process_ingested_source_file(ingest.source_file, ingest.ingest_ended)
+            for ingest in ingests:
+                IngestTriggerHandler().process_ingested_source_file(ingest.source_file, ingest.ingest_ended)
+        # Update the rollups last so that their row locks are held for as little of the transaction as possible
+        MetricsIngestRollup.objects.update_rollups(ingests, when)
+
+
+def _copy_source_files(ingests):
+    """Copies the source files of the given ingests into their new workspace. All of the ingests must have the same
+    workspace and new workspace.
+
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    """
+
+    workspace = ingests[0].workspace
+    new_workspace = ingests[0].new_workspace
+    source_files = [ingest.source_file for ingest in ingests]
+
+    # We need local paths to copy the files, try to get direct paths from the broker, if that fails we must download
+    # the files and copy from there
+    local_paths = workspace.get_file_system_paths(source_files)
+    if not local_paths:
+        local_paths = [os.path.join('/tmp', source_file.file_name) for source_file in source_files]
+        file_downloads = [FileDownload(source_file, local_path, False)
+                          for source_file, local_path in zip(source_files, local_paths)]
+        ScaleFile.objects.download_files(file_downloads)
+
+    file_uploads = []
+    for ingest, local_path in zip(ingests, local_paths):
+        ingest.source_file.file_path = ingest.new_file_path if ingest.new_file_path else ingest.file_path
+        file_uploads.append(FileUpload(ingest.source_file, local_path))
+    logger.info('Copying %d file(s) in workspace %s to workspace %s', len(file_uploads), workspace.name,
+                new_workspace.name)
+    ScaleFile.objects.upload_files(new_workspace, file_uploads)
 
 
 def _delete_file(file_path):
@@ -124,80 +187,206 @@ def _delete_file(file_path):
         os.remove(file_path)
 
 
-@retry_database_query
-def _get_ingest(ingest_id):
-    """Returns the ingest for the given ID
+def _delete_old_files(workspace, ingests):
+    """Deletes the original files of the given ingests from the given workspace, if the workspace provides local paths
+    to do so
 
-    :param ingest_id: The ingest ID
-    :type ingest_id: int
-    :returns: The ingest model
-    :rtype: :class:`ingest.models.Ingest`
+    :param workspace: The workspace that the files were ingested from
+    :type workspace: :class:`storage.models.Workspace`
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
     """
 
-    return Ingest.objects.select_related().get(id=ingest_id)
+    files_with_old_paths = []
+    for ingest in ingests:
+        file_with_old_path = SourceFile.create()
+        file_with_old_path.file_name = ingest.file_name
+        file_with_old_path.file_path = ingest.file_path
+        files_with_old_paths.append(file_with_old_path)
+
+    paths = workspace.get_file_system_paths(files_with_old_paths)
+    if paths:
+        for path in paths:
+            _delete_file(path)
 
 
-def _get_source_file(file_name):
-    """Returns an existing or new (un-saved) source file model for the given file name
+def _delete_duplicate_files(ingests):
+    """Deletes the copied source files of the given duplicate ingests from their new workspaces and marks the source
+    files as deleted
 
-    :param file_name: The name of the source file
-    :type file_name: string
-    :returns: The source file model
-    :rtype: :class:`source.models.SourceFile`
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
     """
 
-    try:
-        src_file = SourceFile.objects.get_source_file_by_name(file_name)
-    except ScaleFile.DoesNotExist:
-        src_file = SourceFile.create()  # New file
-        src_file.file_name = file_name
-        src_file.is_deleted = True
-    return src_file
+    logger.info('Deleting %d duplicate file(s)', len(ingests))
+    ScaleFile.objects.delete_files([ingest.source_file for ingest in ingests])
 
 
 @retry_database_query
-def _save_source_file(source_file):
-    """Saves the given source file model in the database
+def _get_duplicate_content_ingests(ingests):
+    """Returns the given ingests whose source files have the same content as a (not deleted) source file whose ingest
+    has already completed, which is found by looking up the checksums of the source files. Source files that are still
+    being ingested by other jobs are not counted, so that concurrent ingests of the same content cannot mark each other
+    as duplicates. Within the given ingests, the first ingest of each checksum is kept and the rest are duplicates.
+
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    :returns: The list of ingests with duplicate content
+    :rtype: [:class:`ingest.models.Ingest`]
+    """
+
+    checksums = {ingest.source_file.checksum for ingest in ingests if ingest.source_file.checksum}
+    if not checksums:
+        return []
+
+    source_file_ids = [ingest.source_file.id for ingest in ingests]
+    qry = Ingest.objects.filter(status='INGESTED', source_file__is_deleted=False, source_file__checksum__in=checksums)
+    qry = qry.exclude(source_file_id__in=source_file_ids)
+    existing_checksums = set(qry.values_list('source_file__checksum', flat=True))
+
+    duplicates = []
+    for ingest in ingests:
+        checksum = ingest.source_file.checksum
+        if not checksum:
+            continue
+        if checksum in existing_checksums:
+            duplicates.append(ingest)
+        else:
+            existing_checksums.add(checksum)
+    return duplicates
+
+
+@retry_database_query
+def _get_ingests(ingest_ids):
+    """Returns the ingests for the given IDs
+
+    :param ingest_ids: The ingest IDs
+    :type ingest_ids: [int]
+    :returns: The list of ingest models
+    :rtype: [:class:`ingest.models.Ingest`]
+    """
+
+    return list(Ingest.objects.select_related().filter(id__in=ingest_ids).order_by('id'))
+
+
+def _move_source_files(ingests):
+    """Moves the source files of the given ingests to their new file paths
 
-    :param source_file: The source file model
-    :type source_file: :class:`source.models.SourceFile`
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
     """
 
-    source_file.save()
+    logger.info('Moving %d file(s) to new paths', len(ingests))
+    ScaleFile.objects.move_files([FileMove(ingest.source_file, ingest.new_file_path) for ingest in ingests])
+    # The move only saves the new file paths, so save the rest of the reset source files
+    _register_source_files(ingests)
 
 
 @retry_database_query
-def _start_ingest(ingest):
-    """Starts the given ingest and links it to the source file that is being ingested
+def _register_source_files(ingests):
+    """Registers the source files of the given ingests in their workspaces, saving all of the source files in batches
+    in an atomic transaction
+
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    """
+
+    logger.info('Registering %d file(s)', len(ingests))
+    with transaction.atomic():
+        ScaleFile.objects.save_registered_files([ingest.source_file for ingest in ingests])
+
+
+def _reset_source_file(ingest):
+    """Resets the deleted source file of the given ingest so that it can be copied, moved, or registered
 
     :param ingest: The ingest model
     :type ingest: :class:`ingest.models.Ingest`
     """
 
-    file_name = ingest.file_name
-    if not ingest.source_file:
-        # This ingest job is running for the first time (source_file not yet set)
-        source_file = _get_source_file(file_name)
-        if source_file.id:  # If source file already exists...
-            if source_file.is_deleted:
-                logger.info('Re-ingesting deleted file %s', file_name)
-            else:
-                logger.warning('File %s was already ingested and is not deleted, marking as DUPLICATE', file_name)
+    source_file = ingest.source_file
+    source_file.set_basic_fields(ingest.file_name, ingest.file_size, ingest.media_type, ingest.get_data_type_tags())
+    source_file.update_uuid(ingest.file_name)  # Add a stable identifier based on the file name
+    source_file.workspace = ingest.workspace
+    source_file.file_path = ingest.file_path
+    source_file.is_deleted = False
+    source_file.is_parsed = False
+    source_file.deleted = None
+    source_file.parsed = None
+    source_file.checksum = None  # Only set again if the file content is copied
+
+
+def _start_ingests(ingests):
+    """Starts the given ingests and links each one to the source file that is being ingested, looking up the existing
+    source files with a single query
+
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    """
+
+    duplicates = _start_ingests_in_transaction(ingests)
+    if duplicates:
+        _complete_ingests(duplicates, 'DUPLICATE')
+
+
+@retry_database_query
+def _start_ingests_in_transaction(ingests):
+    """Starts the given ingests in an atomic transaction, returning the ingests that are duplicates
+
+    :param ingests: The ingest models
+    :type ingests: [:class:`ingest.models.Ingest`]
+    :returns: The list of duplicate ingests
+    :rtype: [:class:`ingest.models.Ingest`]
+    """
+
+    file_names = [ingest.file_name for ingest in ingests if not ingest.source_file]
+    source_files = {}  # {File name: source file}
+    if file_names:
+        for source_file in ScaleFile.objects.filter(file_type='SOURCE', file_name__in=file_names):
+            source_files[source_file.file_name] = source_file
+
+    duplicates = []
+    started_file_names = set()
+    when = now()
+    with transaction.atomic():
+        for ingest in ingests:
+            file_name = ingest.file_name
+            if not ingest.source_file:
+                # This ingest job is running for the first time (source_file not yet set)
+                source_file = source_files.get(file_name)
+                if file_name in started_file_names:
+                    logger.warning('File %s is already being ingested by this job, marking as DUPLICATE', file_name)
+                    ingest.source_file = source_file
+                    duplicates.append(ingest)
+                    continue
+                elif source_file:  # If source file already exists...
+                    if source_file.is_deleted:
+                        logger.info('Re-ingesting deleted file %s', file_name)
+                    else:
+                        logger.warning('File %s was already ingested and is not deleted, marking as DUPLICATE',
+                                       file_name)
+                        ingest.source_file = source_file
+                        duplicates.append(ingest)
+                        continue
+                else:
+                    logger.info('Ingesting %s for the first time', file_name)
+                    # Set required attributes to save the model for the first time
+                    source_file = SourceFile.create()
+                    source_file.file_name = file_name
+                    source_file.is_deleted = True
+                    source_file.set_basic_fields(file_name, ingest.file_size, ingest.media_type,
+                                                 ingest.get_data_type_tags())
+                    source_file.update_uuid(file_name)  # Add a stable identifier based on the file name
+                    source_file.workspace = ingest.workspace
+                    source_file.file_path = ingest.file_path
+                    source_file.save()
+                    source_files[file_name] = source_file
                 ingest.source_file = source_file
-                _complete_ingest(ingest, 'DUPLICATE')
-                return
-        else:
-            logger.info('Ingesting %s for the first time', file_name)
-            # Set required attributes to save the model for the first time
-            source_file.set_basic_fields(file_name, ingest.file_size, ingest.media_type, ingest.get_data_type_tags())
-            source_file.update_uuid(file_name)  # Add a stable identifier based on the file name
-            source_file.workspace = ingest.workspace
-            source_file.file_path = ingest.file_path
-            source_file.save()
-        ingest.source_file = source_file
-    else:
-        # This ingest job must have failed previously
-        logger.info('This ingest job has previously failed, ingesting %s from where it left off', file_name)
-    ingest.status = 'INGESTING'
-    ingest.ingest_started = now()
-    ingest.save()
+            else:
+                # This ingest job must have failed previously
+                logger.info('This ingest job has previously failed, ingesting %s from where it left off', file_name)
+            started_file_names.add(file_name)
+            ingest.status = 'INGESTING'
+            ingest.ingest_started = when
+            ingest.save()
+
+    return duplicates
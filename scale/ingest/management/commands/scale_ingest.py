@@ -14,14 +14,14 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    """Command that executes the ingest process for a given ingest model
+    """Command that executes the ingest process for one or more given ingest models
     """
 
-    help = 'Perform the ingest process on an ingest model'
+    help = 'Perform the ingest process on one or more ingest models'
     
     def add_arguments(self, parser):
-        parser.add_argument('-i', '--ingest-id', action='store', type=int,
-                            help='ID of the ingest model')
+        parser.add_argument('-i', '--ingest-id', action='store', type=str,
+                            help='ID of the ingest model, or a comma-separated list of IDs to ingest together')
 
     def handle(self, *args, **options):
         """See :meth:`django.core.management.base.BaseCommand.handle`.
@@ -32,12 +32,12 @@ class Command(BaseCommand):
         # Register a listener to handle clean shutdowns
         signal.signal(signal.SIGTERM, self._onsigterm)
 
-        ingest_id = options.get('ingest_id')
+        ingest_ids = [int(ingest_id) for ingest_id in options.get('ingest_id').split(',')]
 
         logger.info('Command starting: scale_ingest')
-        logger.info('Ingest ID: %i', ingest_id)
+        logger.info('Ingest ID(s): %s', ', '.join(str(ingest_id) for ingest_id in ingest_ids))
         try:
-            ingest_job.perform_ingest(ingest_id)
+            ingest_job.perform_ingests(ingest_ids)
         except:
             logger.exception('Ingest caught unexpected error, exit code 1 returning')
             sys.exit(1)
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0014_auto_20170412_1225'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='resume_key',
+            field=models.CharField(max_length=1000, null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
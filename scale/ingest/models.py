@@ -9,7 +9,8 @@ from collections import namedtuple
 
 import django.utils.timezone as timezone
 import django.contrib.postgres.fields
-from django.db import models, transaction
+from django.conf import settings
+from django.db import connection, models, transaction
 from django.utils.timezone import now
 
 from ingest.scan.configuration.scan_configuration import ScanConfiguration
@@ -29,6 +30,9 @@ from util import rest as rest_utils
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of ingest tasks started in each database transaction
+INGEST_TASK_BATCH_SIZE = 500
+
 
 class IngestCounts(object):
     """Represents ingest status values for a specific time slot.
@@ -270,9 +274,9 @@ class IngestManager(models.Manager):
         groups = self._group_by_time(ingests, use_ingest_time)
         return [self._fill_status(status, time_slots, started, ended) for status, time_slots in groups.iteritems()]
 
-    @transaction.atomic
     def start_ingest_tasks(self, ingests, scan_id=None, strike_id=None):
-        """Starts a batch of tasks for the given scan in an atomic transaction.
+        """Starts tasks for the given ingests, creating the ingest jobs in bulk with an atomic transaction for each
+        batch. The ingest models must already be saved in the database.
 
         One of scan_id or strike_id must be set.
 
@@ -284,44 +288,12 @@ class IngestManager(models.Manager):
         :type strike_id: int
         """
 
-        # Create new ingest job and mark ingest as QUEUED
-        ingest_job_type = Ingest.objects.get_ingest_job_type()
-
-        for ingest in ingests:
-            logger.debug('Creating ingest task for %s', ingest.file_name)
-
-            when = ingest.transfer_ended if ingest.transfer_ended else now()
-            desc = {'file_name': ingest.file_name}
-
-            if scan_id:
-                # Use result from query to get ingest ID
-                # We need to find the id of each ingest that was created.
-                # Using scan_id and file_name together as a unique composite key
-                ingest_id = Ingest.objects.get(scan_id=ingest.scan_id, file_name=ingest.file_name).id
-
-                desc['scan_id'] = scan_id
-                event = TriggerEvent.objects.create_trigger_event('SCAN_TRANSFER', None, desc, when)
-            elif strike_id:
-                ingest_id = ingest.id
-                desc['strike_id'] = strike_id
-                event = TriggerEvent.objects.create_trigger_event('STRIKE_TRANSFER', None, desc, when)
-            else:
-                raise Exception('One of scan_id or strike_id must be set')
-
-            # TODO: What is our way forward with ingest jobs? Move to system task or Seed Job Type?
-            data = JobData()
-            data.add_property_input('ingest_id', str(ingest_id))
-            data.add_property_input('workspace', ingest.workspace.name)
-            if ingest.new_workspace:
-                data.add_property_input('new_workspace', ingest.new_workspace.name)
-
-            ingest_job = Queue.objects.queue_new_job(ingest_job_type, data, event)
-
-            ingest.job = ingest_job
-            ingest.status = 'QUEUED'
-            ingest.save()
+        if not scan_id and not strike_id:
+            raise Exception('One of scan_id or strike_id must be set')
 
-            logger.debug('Successfully created ingest task for %s', ingest.file_name)
+        ingest_job_type = Ingest.objects.get_ingest_job_type()
+        for i in range(0, len(ingests), INGEST_TASK_BATCH_SIZE):
+            self._start_ingest_task_batch(ingest_job_type, ingests[i:i + INGEST_TASK_BATCH_SIZE], scan_id, strike_id)
 
     def _group_by_time(self, ingests, use_ingest_time):
         """Groups the given ingests by hourly time slots.
@@ -421,6 +393,88 @@ class IngestManager(models.Manager):
 
         return ingest_status
 
+    @transaction.atomic
+    def _start_ingest_task_batch(self, ingest_job_type, ingests, scan_id, strike_id):
+        """Starts tasks for a batch of ingests in an atomic transaction, creating the trigger events, jobs, and queue
+        models in bulk and updating all of the ingest models with a single query
+
+        :param ingest_job_type: The Scale Ingest job type
+        :type ingest_job_type: :class:`job.models.JobType`
+        :param ingests: The ingest models
+        :type ingests: list[:class:`ingest.models.Ingest`]
+        :param scan_id: ID of Scan that generated ingest
+        :type scan_id: int
+        :param strike_id: ID of Strike that generated ingest
+        :type strike_id: int
+        """
+
+        if scan_id:
+            # Find the ID of each ingest that was created, scan_id and file_name together are a unique composite key
+            file_names = [ingest.file_name for ingest in ingests]
+            ingest_ids = dict(self.filter(scan_id=scan_id, file_name__in=file_names).values_list('file_name', 'id'))
+            for ingest in ingests:
+                ingest.id = ingest_ids[ingest.file_name]
+
+        # Ingests with the same workspaces are grouped together so that each job ingests up to the ingest job batch
+        # size of files
+        batch_size = max(getattr(settings, 'INGEST_JOB_BATCH_SIZE', 1), 1)
+        job_groups = []  # [[ingest]]
+        open_groups = {}  # {(Workspace ID, New workspace ID): [ingest]}
+        for ingest in ingests:
+            key = (ingest.workspace_id, ingest.new_workspace_id)
+            group = open_groups.get(key)
+            if group is None or len(group) >= batch_size:
+                group = []
+                open_groups[key] = group
+                job_groups.append(group)
+            group.append(ingest)
+
+        data_list = []
+        events = []
+        for group in job_groups:
+            logger.debug('Creating ingest task for %s', ', '.join(ingest.file_name for ingest in group))
+
+            transfers_ended = [ingest.transfer_ended for ingest in group if ingest.transfer_ended]
+            when = max(transfers_ended) if len(transfers_ended) == len(group) else now()
+            if len(group) == 1:
+                desc = {'file_name': group[0].file_name}
+            else:
+                desc = {'file_names': [ingest.file_name for ingest in group]}
+
+            if scan_id:
+                desc['scan_id'] = scan_id
+                event_type = 'SCAN_TRANSFER'
+            else:
+                desc['strike_id'] = strike_id
+                event_type = 'STRIKE_TRANSFER'
+            events.append(TriggerEvent(type=event_type, rule=None, description=desc, occurred=when))
+
+            # TODO: What is our way forward with ingest jobs? Move to system task or Seed Job Type?
+            data = JobData()
+            data.add_property_input('ingest_id', ','.join(str(ingest.id) for ingest in group))
+            data.add_property_input('workspace', group[0].workspace.name)
+            if group[0].new_workspace:
+                data.add_property_input('new_workspace', group[0].new_workspace.name)
+            data_list.append(data)
+
+        events = TriggerEvent.objects.bulk_create(events)
+        ingest_jobs = Queue.objects.queue_new_jobs(ingest_job_type, data_list, events)
+
+        # Mark the ingests as QUEUED with their new jobs in a single query
+        values = []
+        for group, ingest_job in zip(job_groups, ingest_jobs):
+            for ingest in group:
+                ingest.job = ingest_job
+                ingest.status = 'QUEUED'
+                values.extend([ingest.id, ingest_job.id])
+        qry = 'UPDATE ingest i SET job_id = v.job_id, status = %s, last_modified = %s FROM (VALUES '
+        qry += ', '.join(['(%s, %s)'] * len(ingests))
+        qry += ') AS v(id, job_id) WHERE i.id = v.id'
+        with connection.cursor() as cursor:
+            cursor.execute(qry, ['QUEUED', now()] + values)
+
+        logger.debug('Successfully created %d ingest task(s) for %d file(s)', len(job_groups), len(ingests))
+
 
 class Ingest(models.Model):
     """Represents an instance of a file being ingested into a workspace
@@ -826,6 +880,8 @@ class Scan(models.Model):
 
     :keyword file_count: Number of files identified by last execution of Scan
     :type file_count: :class:`django.db.models.BigIntegerField`
+    :keyword resume_key: The path of the last file whose ingest was committed by an unfinished execution of Scan
+    :type resume_key: :class:`django.db.models.CharField`
     :keyword created: When the Scan process was created
     :type created: :class:`django.db.models.DateTimeField`
     :keyword last_modified: When the Scan process was last modified
@@ -842,6 +898,7 @@ class Scan(models.Model):
     job = models.ForeignKey('job.Job', blank=True, null=True, on_delete=models.PROTECT, related_name='+')
 
     file_count = models.BigIntegerField(blank=True, null=True)
+    resume_key = models.CharField(max_length=1000, blank=True, null=True)
 
     created = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
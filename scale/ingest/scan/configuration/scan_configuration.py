@@ -5,7 +5,6 @@ import logging
 import os
 import re
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from ingest.handlers.file_handler import FileHandler
@@ -13,6 +12,7 @@ from ingest.handlers.file_rule import FileRule
 from ingest.scan.configuration.exceptions import InvalidScanConfiguration
 from ingest.scan.scanners import factory
 from storage.models import Workspace
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -112,7 +112,7 @@ class ScanConfiguration(object):
         self._configuration = configuration
 
         try:
-            validate(configuration, SCAN_CONFIGURATION_SCHEMA)
+            validate_json(configuration, SCAN_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidScanConfiguration('Invalid Scan configuration: %s' % unicode(ex))
 
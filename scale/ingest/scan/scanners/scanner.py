@@ -4,8 +4,9 @@ from __future__ import unicode_literals
 import logging
 import os
 from abc import ABCMeta, abstractmethod
+from multiprocessing.pool import ThreadPool
 
-from django.db import transaction
+from django.db import close_old_connections, transaction
 
 from ingest.models import Ingest, Scan
 from ingest.scan.scanners.exceptions import ScannerInterruptRequested
@@ -33,9 +34,11 @@ class Scanner(object):
 
         self.scan_id = None
         self._batch_size = 1000  # Use a batch size of 1000 for scan
+        self._commit_pool = None  # Commits batches of ingests while the next batch is listed
         self._count = 0
         self._dry_run = False  # Used to only scan and skip ingest process
         self._file_handler = None  # The file handler configured for this scanner
+        self._pending_commit = None  # The result of the batch commit that is in progress
         self._recursive = True
         self._scanned_workspace = None  # The workspace model that is being scanned
         self._scanner_type = scanner_type
@@ -92,21 +95,45 @@ class Scanner(object):
         logger.info('Running %s scanner %s...' % (self.scanner_type, 'in dry run mode ' if dry_run else ''))
         self._dry_run = dry_run
 
-        # Initialize workspace scan via storage broker. Configuration determines if recursive workspace walk.
-        files = self._scanned_workspace.list_files(recursive=self._recursive)
-
-        batched_files = []
-        for file in files:
-            batched_files.append(file)
-
-            # Process files every time a batch size is reached
-            if len(batched_files) >= self._batch_size:
+        # Resume after the last file committed by a previous execution of this scan
+        start_after = None
+        if not self._dry_run:
+            scan = Scan.objects.get(pk=self.scan_id)
+            if scan.resume_key:
+                start_after = scan.resume_key
+                self._count = scan.file_count or 0
+                logger.info('Resuming scan after %s', start_after)
+
+        # Each batch of ingests is committed by the pool while the following batch is listed and matched
+        self._commit_pool = ThreadPool(1) if not self._dry_run else None
+        try:
+            # Initialize workspace scan via storage broker. Configuration determines if recursive workspace walk.
+            files = self._scanned_workspace.list_files(recursive=self._recursive, start_after=start_after)
+
+            batched_files = []
+            for file in files:
+                batched_files.append(file)
+
+                # Process files every time a batch size is reached
+                if len(batched_files) >= self._batch_size:
+                    self._process_scanned(batched_files)
+                    batched_files = []
+
+            # If any remaining files, process
+            if len(batched_files):
                 self._process_scanned(batched_files)
-                batched_files = []
-
-        # If any remaining files, process
-        if len(batched_files):
-            self._process_scanned(batched_files)
+            self._wait_for_commit()
+        finally:
+            if self._commit_pool:
+                # Let any commit in progress finish before stopping
+                self._commit_pool.close()
+                self._commit_pool.join()
+                self._commit_pool = None
+                self._pending_commit = None
+
+        # The scan is complete, so a later execution starts from the beginning
+        if not self._dry_run:
+            Scan.objects.filter(pk=self.scan_id).update(resume_key=None)
 
         logger.info('%s %i files during scan.' % ('Detected' if self._dry_run else 'Processed', self._count))
 
@@ -182,15 +209,39 @@ class Scanner(object):
             logger.debug('No ingests for batch, this will always be the case during a dry-run.')
             return
 
+        last_key = file_list[-1].file
+        if self._commit_pool:
+            # Batches are committed in order so that the resume key never passes a file that is not committed
+            self._wait_for_commit()
+            self._pending_commit = self._commit_pool.apply_async(self._commit_scanned,
+                                                                 (ingests, self._count, last_key))
+        else:
+            self._commit_scanned(ingests, self._count, last_key)
+
+    def _commit_scanned(self, ingests, file_count, last_key):
+        """De-duplicates the given ingests and commits them to the database, starting their ingest tasks
+
+        :param ingests: The ingest models that matched a rule
+        :type ingests: [:class:`ingest.models.Ingest`]
+        :param file_count: The number of files detected by the scan so far
+        :type file_count: int
+        :param last_key: The path of the last file in the batch, where the scan resumes after a restart
+        :type last_key: string
+        """
+
+        # The commit may run in a worker thread that holds its own database connection
+        close_old_connections()
+
         # Once all ingest rules have been applied, de-duplicate and then bulk insert
         ingests = self._deduplicate_ingest_list(self.scan_id, ingests)
 
         # bulk insert remaining as queued and note detected files in Scan mode
         with transaction.atomic():
             Ingest.objects.bulk_create(ingests)
-            Scan.objects.filter(pk=self.scan_id).update(file_count=self._count)
+            Scan.objects.filter(pk=self.scan_id).update(file_count=file_count)
 
         Ingest.objects.start_ingest_tasks(ingests, scan_id=self.scan_id)
+        Scan.objects.filter(pk=self.scan_id).update(resume_key=last_key)
 
     @staticmethod
     def _deduplicate_ingest_list(scan_id, new_ingests):
@@ -209,7 +260,7 @@ class Scanner(object):
         ingest_file_names = [ingest.file_name for ingest in new_ingests]
 
         existing_ingests = Ingest.objects.get_ingests_by_scan(scan_id, ingest_file_names)
-        existing_ingest_file_names = [ingest.file_name for ingest in existing_ingests]
+        existing_ingest_file_names = {ingest.file_name for ingest in existing_ingests}
 
         deduplicated_ingests = []
         for ingest in new_ingests:
@@ -242,6 +293,11 @@ class Scanner(object):
 
         file_name = os.path.basename(file_path)
 
+        # Skip the ingest model entirely for the files that will not match a rule
+        if not self._file_handler.match_file_name(file_name):
+            logger.debug('No rule match for %s, file is being skipped', file_name)
+            return None
+
         ingest = Ingest.objects.create_ingest(file_name, self._scanned_workspace, scan_id=self.scan_id)
         ingest.file_path = file_path
         ingest.file_size = file_size
@@ -251,3 +307,12 @@ class Scanner(object):
             return ingest
 
         # If is_there_rule_match matches a rule, ingest will be returned above, otherwise None is default
+
+    def _wait_for_commit(self):
+        """Waits for the batch commit that is in progress, raising any error from it
+        """
+
+        if self._pending_commit:
+            pending_commit = self._pending_commit
+            self._pending_commit = None
+            pending_commit.get()
@@ -5,7 +5,6 @@ import logging
 import os
 import re
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from ingest.handlers.file_handler import FileHandler
@@ -15,6 +14,7 @@ from ingest.strike.configuration.strike_configuration_1_0 import StrikeConfigura
 from ingest.strike.configuration.exceptions import InvalidStrikeConfiguration
 from ingest.strike.monitors import factory
 from storage.models import Workspace
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -103,7 +103,7 @@ class StrikeConfigurationV6(object):
             self._configuration['version'] = '6'
 
         try:
-            validate(configuration, STRIKE_CONFIGURATION_SCHEMA)
+            validate_json(configuration, STRIKE_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidStrikeConfiguration('Invalid Strike configuration: %s' % unicode(ex))
 
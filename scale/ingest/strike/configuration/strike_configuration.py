@@ -5,7 +5,6 @@ import logging
 import os
 import re
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from ingest.handlers.file_handler import FileHandler
@@ -14,6 +13,7 @@ from ingest.strike.configuration.exceptions import InvalidStrikeConfiguration
 from ingest.strike.configuration.strike_configuration_1_0 import StrikeConfiguration as StrikeConfiguration_1_0
 from ingest.strike.monitors import factory
 from storage.models import Workspace
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +99,7 @@ class StrikeConfiguration(object):
             self._configuration = self._convert_schema(configuration)
 
         try:
-            validate(configuration, STRIKE_CONFIGURATION_SCHEMA)
+            validate_json(configuration, STRIKE_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidStrikeConfiguration('Invalid Strike configuration: %s' % unicode(ex))
 
@@ -4,11 +4,11 @@ from __future__ import unicode_literals
 import os
 import re
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from ingest.strike.configuration.exceptions import InvalidStrikeConfiguration
 from storage.models import Workspace
+from util.validation import validate_json
 
 DEFAULT_VERSION = '1.0'
 
@@ -80,7 +80,7 @@ class StrikeConfiguration(object):
         self._configuration = configuration
 
         try:
-            validate(configuration, STRIKE_CONFIGURATION_SCHEMA)
+            validate_json(configuration, STRIKE_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidStrikeConfiguration('Invalid Strike configuration: %s' % unicode(ex))
 
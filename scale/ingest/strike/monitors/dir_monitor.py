@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 import logging
 import math
 import os
+import stat
 import time
 from datetime import datetime
 
@@ -12,9 +13,24 @@ from django.utils.timezone import now
 from ingest.models import Ingest
 from ingest.strike.monitors.exceptions import InvalidMonitorConfiguration
 from ingest.strike.monitors.monitor import Monitor
+from util.inotify import INotify, IN_CLOSE_WRITE, IN_ISDIR, IN_MOVED_TO, IN_Q_OVERFLOW
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
 
 logger = logging.getLogger(__name__)
 
+# Number of seconds between full scans of the Strike directory. Without inotify the directory is only processed by
+# these scans, otherwise they reconcile any files whose events were missed.
+RECONCILE_SECS = 60
+# Files are processed once they are closed after writing or moved into the Strike directory
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+
 
 class DirWatcherMonitor(Monitor):
     """A monitor that watches a file system directory for incoming files
@@ -30,6 +46,8 @@ class DirWatcherMonitor(Monitor):
         self._deferred_dir = None
         self._ingest_dir = None
         self._transfer_suffix = None
+        self._watched_dir = None
+        self._watcher = None
 
     def load_configuration(self, configuration):
         """See :meth:`ingest.strike.monitors.monitor.Monitor.load_configuration`
@@ -44,29 +62,28 @@ class DirWatcherMonitor(Monitor):
         """See :meth:`ingest.strike.monitors.monitor.Monitor.run`
         """
 
-        throttle = 60
-
-        while self._running:
-            secs_passed = 0
-            try:
-                self.reload_configuration()
-
-                # Process the directory and record number of seconds used
-                started = now()
-                self._mount_and_process_dir()
-                ended = now()
-
-                secs_passed = (ended - started).total_seconds()
-            except:
-                logger.exception('Strike encountered error')
-            finally:
-                if self._running:
-                    # If process time takes less than throttle, delay
-                    if secs_passed < throttle:
+        reconciled = None  # When the Strike directory was last fully processed
+        try:
+            while self._running:
+                secs_passed = (now() - reconciled).total_seconds() if reconciled else RECONCILE_SECS
+                try:
+                    if secs_passed >= RECONCILE_SECS:
+                        reconciled = now()
+                        self.reload_configuration()
+                        self._watch_dir()
+                        self._mount_and_process_dir()
+                    elif self._watcher:
+                        if not self._process_events(RECONCILE_SECS - secs_passed):
+                            reconciled = None  # Events were lost, so reconcile now
+                    else:
                         # Delay until full throttle time reached
-                        delay = math.ceil(throttle - secs_passed)
+                        delay = math.ceil(RECONCILE_SECS - secs_passed)
                         logger.debug('Pausing for %i seconds', delay)
                         time.sleep(delay)
+                except:
+                    logger.exception('Strike encountered error')
+        finally:
+            self._close_watcher()
 
     def stop(self):
         """See :meth:`ingest.strike.monitors.monitor.Monitor.stop`
@@ -85,6 +102,15 @@ class DirWatcherMonitor(Monitor):
         if not configuration['transfer_suffix']:
             raise InvalidMonitorConfiguration('transfer_suffix must be a non-empty string')
 
+    def _close_watcher(self):
+        """Closes the inotify watcher of the Strike directory, if there is one
+        """
+
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+            self._watched_dir = None
+
     def _final_filename(self, file_name):
         """Returns the final name (after transferring is done) for the given file. If the file is already done
         transferring the name given is simply returned.
@@ -123,6 +149,35 @@ class DirWatcherMonitor(Monitor):
             return True
         return False
 
+    def _list_files(self):
+        """Returns the names of the files in the Strike directory ordered ascending by modification time. Each file is
+        only stat'ed once.
+
+        :returns: The list of file names
+        :rtype: [string]
+        """
+
+        entries = []  # [(modification time, file name)]
+        if scandir:
+            for entry in scandir(self._strike_dir):
+                try:
+                    if entry.is_file():
+                        entries.append((entry.stat().st_mtime, entry.name))
+                except OSError:
+                    logger.debug('%s was removed while listing %s', entry.name, self._strike_dir)
+        else:
+            for file_name in os.listdir(self._strike_dir):
+                try:
+                    file_stat = os.stat(os.path.join(self._strike_dir, file_name))
+                except OSError:
+                    logger.debug('%s was removed while listing %s', file_name, self._strike_dir)
+                    continue
+                if stat.S_ISREG(file_stat.st_mode):
+                    entries.append((file_stat.st_mtime, file_name))
+
+        entries.sort()
+        return [file_name for _mtime, file_name in entries]
+
     def _mount_and_process_dir(self):
         """Mounts NFS and processes the current files in the directory
         """
@@ -162,11 +217,7 @@ class DirWatcherMonitor(Monitor):
         logger.debug('Processing %s', self._strike_dir)
 
         # Get current files ordered ascending by modification time
-        file_list = []
-        for entry in os.listdir(self._strike_dir):
-            if os.path.isfile(os.path.join(self._strike_dir, entry)):
-                file_list.append(entry)
-        file_list.sort(key=lambda x: os.path.getmtime(os.path.join(self._strike_dir, x)))
+        file_list = self._list_files()
         logger.debug('%i file(s) in %s', len(file_list), self._strike_dir)
 
         # Compile a dict of current ingests that need to be processed
@@ -204,6 +255,30 @@ class DirWatcherMonitor(Monitor):
                 msg = 'Error processing ingest for missing file %s'
                 logger.exception(msg, file_name)
 
+    def _process_events(self, timeout):
+        """Waits up to the given timeout for inotify events in the Strike directory and processes the files that have
+        arrived
+
+        :param timeout: The maximum number of seconds to wait for events
+        :type timeout: float
+        :returns: False if the event queue overflowed and events were lost, True otherwise
+        :rtype: bool
+        """
+
+        file_names = []
+        for event in self._watcher.read_events(timeout):
+            if event.mask & IN_Q_OVERFLOW:
+                logger.warning('Strike missed file events in %s, reconciling the directory', self._strike_dir)
+                return False
+            if event.mask & IN_ISDIR or not event.name:
+                continue
+            if event.name not in file_names:
+                file_names.append(event.name)
+
+        if file_names:
+            self._process_files(file_names)
+        return True
+
     def _process_file(self, file_name, ingest):
         """Processes the given file in the Strike directory. The file_name argument represents a file in the Strike
         directory to process. If file_name is None, then the ingest argument represents an ongoing transfer where the
@@ -284,3 +359,57 @@ class DirWatcherMonitor(Monitor):
 
         if ingest.status == 'DEFERRED':
             self._move_deferred_file(ingest)
+
+    def _process_files(self, file_names):
+        """Processes the given files in the Strike directory, querying for their ongoing ingests together
+
+        :param file_names: The names of the files to process
+        :type file_names: [string]
+        """
+
+        logger.debug('Processing %i arrived file(s) in %s', len(file_names), self._strike_dir)
+
+        ingests = {}
+        final_names = [self._final_filename(file_name) for file_name in file_names]
+        statuses = ['TRANSFERRING', 'TRANSFERRED']
+        ingests_qry = Ingest.objects.filter(status__in=statuses, strike_id=self.strike_id, file_name__in=final_names)
+        for ingest in ingests_qry.iterator():
+            ingests[ingest.file_name] = ingest
+
+        for file_name, final_file_name in zip(file_names, final_names):
+            file_path = os.path.join(self._strike_dir, file_name)
+            if not os.path.isfile(file_path):
+                # Already processed or renamed before its event was read
+                continue
+            logger.info('Processing %s', file_path)
+            try:
+                self._process_file(file_name, ingests.pop(final_file_name, None))
+            except Exception:
+                logger.exception('Error processing %s', file_path)
+
+    def _watch_dir(self):
+        """Starts watching the Strike directory with inotify if it is not already watched. If inotify is not available
+        the directory is only processed by the periodic full scans.
+        """
+
+        if self._watcher and self._watched_dir == self._strike_dir:
+            return
+        self._close_watcher()
+
+        try:
+            watcher = INotify()
+        except OSError:
+            logger.warning('inotify is not available, Strike will scan %s every %i seconds', self._strike_dir,
+                           RECONCILE_SECS)
+            return
+        try:
+            watcher.add_watch(self._strike_dir, WATCH_MASK)
+        except OSError:
+            logger.exception('Unable to watch %s, Strike will scan it every %i seconds', self._strike_dir,
+                             RECONCILE_SECS)
+            watcher.close()
+            return
+
+        logger.info('Watching %s for arriving files', self._strike_dir)
+        self._watcher = watcher
+        self._watched_dir = self._strike_dir
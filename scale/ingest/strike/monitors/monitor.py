@@ -179,14 +179,38 @@ class Monitor(object):
 
         # Rule match case
         if ingest.is_there_rule_match(self._file_handler, self._workspaces):
-            if not ingest.id:
-                ingest.save()
+            ingest.save()
             Ingest.objects.start_ingest_tasks([ingest], strike_id=self.strike_id)
         # No rule match
         else:
             ingest.status = 'DEFERRED'
             ingest.save()
 
+    def _process_ingests(self, ingests):
+        """Processes a batch of new ingest files by applying the Strike configuration rules. The file_path and file_size
+        of each ingest must already be set. The ingests are inserted in bulk and the ingest tasks are created for those
+        with a rule match in a single atomic transaction. This method should be called immediately after
+        Ingest.objects.create_ingest() for each ingest.
+
+        :param ingests: The new ingest models
+        :type ingests: [:class:`ingest.models.Ingest`]
+        """
+
+        matched_ingests = []
+        for ingest in ingests:
+            if ingest.status not in ['TRANSFERRING', 'TRANSFERRED']:
+                raise Exception('Invalid ingest status: %s' % ingest.status)
+
+            if ingest.is_there_rule_match(self._file_handler, self._workspaces):
+                matched_ingests.append(ingest)
+            else:
+                ingest.status = 'DEFERRED'
+
+        with transaction.atomic():
+            Ingest.objects.bulk_create(ingests)
+            if matched_ingests:
+                Ingest.objects.start_ingest_tasks(matched_ingests, strike_id=self.strike_id)
+
     def _start_transfer(self, ingest, when):
         """Starts recording the transfer of the given ingest into a workspace. The database save is the caller's
         responsibility. This method should only be used immediately after Ingest.objects.create_ingest().
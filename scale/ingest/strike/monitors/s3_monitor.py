@@ -4,8 +4,12 @@ from __future__ import unicode_literals
 import json
 import logging
 import os
+import time
+from collections import deque
+from multiprocessing.pool import ThreadPool
 
 from botocore.exceptions import ClientError
+from django.db import close_old_connections
 
 from ingest.models import Ingest
 from ingest.strike.monitors.exceptions import (InvalidMonitorConfiguration, S3NoDataNotificationError,
@@ -14,6 +18,9 @@ from ingest.strike.monitors.monitor import Monitor
 from util.aws import AWSClient, SQSClient
 from util.validation import ValidationWarning
 
+# The configuration is reloaded from the database once every this many seconds
+CONFIG_RELOAD_SECS = 60
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,6 +58,13 @@ class S3Monitor(Monitor):
         # This may be set to False if message visibility timeout hides them for long enough to process
         # other messages in the queue without backing up behind bad messages.
         self.sqs_discard_unrecognized = False
+        # Maximum number of messages received from the queue in a single poll
+        self.messages_per_poll = 100
+        # Number of messages handed to a worker at a time, the ingests of these messages are committed together
+        self.messages_per_task = 10
+        # Number of workers processing notifications concurrently, which also bounds the number of message batches
+        # that are received from the queue but not yet processed
+        self.worker_count = 4
         ###################################################
 
     def load_configuration(self, configuration):
@@ -68,37 +82,26 @@ class S3Monitor(Monitor):
 
         logger.info('Running experimental S3 Strike processor')
 
-        # Loop endlessly polling SQS queue
-        while self._running:
-            # Between each pass over the SQS, refresh configuration from database in case of credential changes.
-            # This eliminates the need to stop and restart a Strike job to pick up configuration updates.
-            self.reload_configuration()
-
-            with SQSClient(self._credentials, self._region_name) as client:
-                # For each new file we receive a notification about:
-                logger.debug('Beginning long-poll against queue with wait time of %s seconds.' % self.wait_time)
-                messages = client.receive_messages(self._sqs_name,
-                                                   batch_size=10,
-                                                   wait_time_seconds=self.wait_time,
-                                                   visibility_timeout_seconds=self.visibility_timeout)
-
-                for message in messages:
-                    try:
-                        # Perform message extraction and then callback to ingest
-                        self._process_s3_notification(message)
-
-                        # Remove message from queue now that the message is processed
-                        message.delete()
-                    except SQSNotificationError:
-                        logger.exception('Unable to process message. Invalid SQS S3 notification.')
-
-                        if self.sqs_discard_unrecognized:
-                            # Remove message from queue when unrecognized
-                            logger.warning('Removing message that cannot be processed.')
-                            message.delete()
-                    except S3NoDataNotificationError:
-                        logger.exception('Unable to process message. File size of 0')
-                        message.delete()
+        worker_pool = ThreadPool(self.worker_count)
+        try:
+            # Loop endlessly polling SQS queue
+            while self._running:
+                # Periodically refresh configuration from database in case of credential changes. This eliminates the
+                # need to stop and restart a Strike job to pick up configuration updates.
+                self.reload_configuration()
+                reload_time = time.time() + CONFIG_RELOAD_SECS
+
+                # The same client is used for every poll until the configuration is reloaded
+                with SQSClient(self._credentials, self._region_name) as client:
+                    pending = deque()
+                    while self._running and time.time() < reload_time:
+                        self._poll_queue(client, worker_pool, pending)
+
+                    # Finish processing the received messages before the configuration changes
+                    self._delete_processed_messages(client, pending, True)
+        finally:
+            worker_pool.close()
+            worker_pool.join()
 
     def stop(self):
         """See :meth:`ingest.strike.monitors.monitor.Monitor.stop`
@@ -133,17 +136,109 @@ class S3Monitor(Monitor):
 
         return warnings
 
+    def _delete_processed_messages(self, client, pending, wait):
+        """Collects the messages from finished worker pool tasks, oldest first, and deletes them from the queue in
+        batches. Messages of a failed task are not deleted, so they will reappear on the queue after their visibility
+        timeout.
+
+        :param client: The SQS client
+        :type client: :class:`util.aws.SQSClient`
+        :param pending: The pending worker pool tasks
+        :type pending: :class:`collections.deque`
+        :param wait: Whether to wait for every pending task to finish
+        :type wait: bool
+        """
+
+        messages = []
+        while pending and (wait or pending[0].ready()):
+            task = pending.popleft()
+            try:
+                messages.extend(task.get())
+            except Exception:
+                logger.exception('Unable to process messages. They will be retried after their visibility timeout.')
+
+        if messages:
+            entries = [{'Id': str(i), 'ReceiptHandle': message.receipt_handle} for i, message in enumerate(messages)]
+            for failure in client.delete_messages(self._sqs_name, entries):
+                logger.error('Unable to delete message from queue: %s', failure.get('Message'))
+
+    def _poll_queue(self, client, worker_pool, pending):
+        """Performs a long-poll against the queue and hands the received messages to the worker pool, then deletes the
+        messages of any finished tasks. If the maximum number of tasks are already pending, this waits for the oldest
+        to finish before handing off more messages.
+
+        :param client: The SQS client
+        :type client: :class:`util.aws.SQSClient`
+        :param worker_pool: The worker pool that processes the messages
+        :type worker_pool: :class:`multiprocessing.pool.ThreadPool`
+        :param pending: The pending worker pool tasks
+        :type pending: :class:`collections.deque`
+        """
+
+        logger.debug('Beginning long-poll against queue with wait time of %s seconds.' % self.wait_time)
+        messages = list(client.receive_messages(self._sqs_name,
+                                                batch_size=self.messages_per_poll,
+                                                wait_time_seconds=self.wait_time,
+                                                visibility_timeout_seconds=self.visibility_timeout))
+
+        for i in xrange(0, len(messages), self.messages_per_task):
+            if len(pending) >= self.worker_count:
+                pending[0].wait()
+                self._delete_processed_messages(client, pending, False)
+            pending.append(worker_pool.apply_async(self._process_messages, (messages[i:i + self.messages_per_task],)))
+
+        self._delete_processed_messages(client, pending, False)
+
+    def _process_messages(self, messages):
+        """Extracts the S3 notifications from the given SQS messages and commits the resulting ingests together. This
+        method is run by the worker pool.
+
+        :param messages: SQS messages containing S3 notification objects
+        :type messages: [object]
+        :returns: The messages that are done and should be removed from the queue
+        :rtype: [object]
+        """
+
+        # Each worker thread holds its own database connection
+        close_old_connections()
+
+        ingests = []
+        processed_messages = []
+        for message in messages:
+            try:
+                # Perform message extraction, the ingests of a message are only kept if all of its records are valid
+                ingests.extend(self._process_s3_notification(message))
+                processed_messages.append(message)
+            except SQSNotificationError:
+                logger.exception('Unable to process message. Invalid SQS S3 notification.')
+
+                if self.sqs_discard_unrecognized:
+                    # Remove message from queue when unrecognized
+                    logger.warning('Removing message that cannot be processed.')
+                    processed_messages.append(message)
+
+        if ingests:
+            self._process_ingests(ingests)
+            for ingest in ingests:
+                logger.info("Strike ingested '%s'", ingest.file_path)
+
+        return processed_messages
+
     def _process_s3_notification(self, message):
-        """Extracts an S3 notification object from SQS message body and calls on to ingest.
+        """Extracts an S3 notification object from SQS message body and creates the ingests for it.
         We want to ensure we have the following minimal values before passing S3 object on:
         - body.Records[x].eventName starts with 'ObjectCreated'
         - body.Records[x].eventVersion == '2.0'
         Once the above have been validated we will pass the S3 record on to ingest, otherwise
-        exception will be raised
+        exception will be raised. Records of 0 byte objects are skipped without affecting the other records.
         :param message: SQS message containing S3 notification object
         :type message: object
+        :returns: The new ingest models, which are not yet saved
+        :rtype: [:class:`ingest.models.Ingest`]
         """
 
+        ingests = []
+
         try:
             body = json.loads(message.body)
 
@@ -157,7 +252,10 @@ class S3Monitor(Monitor):
                 for record in message['Records']:
                     if 'eventName' in record and record['eventName'].startswith('ObjectCreated') and \
                                     'eventVersion' in record and record['eventVersion'] == self.event_version_supported:
-                        self._ingest_s3_notification_object(record['s3'])
+                        try:
+                            ingests.append(self._ingest_s3_notification_object(record['s3']))
+                        except S3NoDataNotificationError as ex:
+                            logger.warning('Unable to process record. %s', ex)
                     else:
                         # Log message that didn't match with valid EventName and EventVersion
                         raise SQSNotificationError('Unable to process message as it does not match '
@@ -172,12 +270,16 @@ class S3Monitor(Monitor):
                 'Exception: {}\nUnable to process message not recognized as valid JSON: {}.'.format(ex.message,
                                                                                                     message))
 
+        return ingests
+
     def _ingest_s3_notification_object(self, s3_notification):
-        """Extracts S3 specific object metadata and call the final ingest
-        We are going to additionally ignore any object of size 0 as these are generally
+        """Extracts S3 specific object metadata and creates the ingest for it. The database save is the caller's
+        responsibility. We are going to additionally ignore any object of size 0 as these are generally
         folder create operations.
         :param s3_notification: S3 bucket and object metadata associated with notification
         :type s3_notification: dict
+        :returns: The new ingest model
+        :rtype: :class:`ingest.models.Ingest`
         """
 
         try:
@@ -192,6 +294,7 @@ class S3Monitor(Monitor):
 
         object_name = os.path.basename(object_key)
         ingest = Ingest.objects.create_ingest(object_name, self._monitored_workspace, strike_id=self.strike_id)
-        logger.info('New ingest in %s: %s', ingest.workspace.name, ingest.file_name)
-        self._process_ingest(ingest, object_key, object_size)
-        logger.info("Strike ingested '%s' from bucket '%s'..." % (object_key, bucket_name))
+        ingest.file_path = object_key
+        ingest.file_size = object_size
+        logger.info('New ingest in %s from bucket %s: %s', ingest.workspace.name, bucket_name, ingest.file_name)
+        return ingest
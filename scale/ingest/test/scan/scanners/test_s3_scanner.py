@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+from multiprocessing.pool import ThreadPool
+
 import django
 from django.test import TestCase
 from mock import patch
@@ -133,6 +135,48 @@ class TestScanner(TestCase):
         self.assertTrue(dedup.called)
         self.assertTrue(start_ingests.called)
 
+    @patch('ingest.scan.scanners.s3_scanner.S3Scanner._commit_scanned')
+    @patch('ingest.scan.scanners.s3_scanner.S3Scanner._ingest_file')
+    def test_process_scanned_commit_pool(self, ingest_file, commit_scanned):
+        """Tests calling S3Scanner._process_scanned() with batches committed by a worker thread"""
+
+        ingest_file.side_effect = lambda file_name, file_size: Ingest(file_name=file_name)
+        scanner = S3Scanner()
+        scanner._commit_pool = ThreadPool(1)
+        try:
+            scanner._process_scanned([FileDetails('test1', 0), FileDetails('test2', 0)])
+            scanner._process_scanned([FileDetails('test3', 0)])
+            scanner._wait_for_commit()
+        finally:
+            scanner._commit_pool.close()
+            scanner._commit_pool.join()
+
+        self.assertEqual(commit_scanned.call_count, 2)
+        ingests, file_count, last_key = commit_scanned.call_args_list[0][0]
+        self.assertListEqual([ingest.file_name for ingest in ingests], ['test1', 'test2'])
+        self.assertEqual(file_count, 2)
+        self.assertEqual(last_key, 'test2')
+        ingests, file_count, last_key = commit_scanned.call_args_list[1][0]
+        self.assertEqual(file_count, 3)
+        self.assertEqual(last_key, 'test3')
+
+    @patch('ingest.scan.scanners.s3_scanner.S3Scanner._commit_scanned')
+    @patch('ingest.scan.scanners.s3_scanner.S3Scanner._ingest_file')
+    def test_process_scanned_commit_error(self, ingest_file, commit_scanned):
+        """Tests that an error committing a batch in a worker thread is raised by S3Scanner._wait_for_commit()"""
+
+        ingest_file.side_effect = lambda file_name, file_size: Ingest(file_name=file_name)
+        commit_scanned.side_effect = ValueError('Commit failed')
+        scanner = S3Scanner()
+        scanner._commit_pool = ThreadPool(1)
+        try:
+            scanner._process_scanned([FileDetails('test1', 0)])
+            with self.assertRaises(ValueError):
+                scanner._wait_for_commit()
+        finally:
+            scanner._commit_pool.close()
+            scanner._commit_pool.join()
+
     @patch('ingest.models.Ingest.objects.get_ingests_by_scan')
     def test_deduplicate_ingest_list_no_existing(self, ingests_by_scan):
         """Tests calling S3Scanner._deduplicate_ingest_list() without existing"""
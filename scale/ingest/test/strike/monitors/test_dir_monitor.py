@@ -1,11 +1,16 @@
 from __future__ import unicode_literals
 
+import os
+import shutil
+import tempfile
+
 import django
 from django.test import TestCase
-from mock import Mock
+from mock import MagicMock, Mock
 
 from ingest.strike.monitors.dir_monitor import DirWatcherMonitor
 from ingest.strike.monitors.exceptions import InvalidMonitorConfiguration
+from util.inotify import INotifyEvent, IN_CLOSE_WRITE, IN_ISDIR, IN_MOVED_TO, IN_Q_OVERFLOW
 
 
 class TestDirWatcherMonitor(TestCase):
@@ -63,3 +68,47 @@ class TestDirWatcherMonitor(TestCase):
         self.assertEqual(ingest_file.status, 'DEFERRED')
         self.assertEqual(ingest_file.file_size, file_size)
         self.assertEqual(ingest_file.file_path, file_path)
+
+    def test_list_files(self):
+        """Tests calling DirWatcherMonitor._list_files() to list files ordered by modification time"""
+
+        strike_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(strike_dir, 'ingesting'))
+            for file_name, mtime in [('file_1.txt', 300), ('file_2.txt', 100), ('file_3.txt', 200)]:
+                file_path = os.path.join(strike_dir, file_name)
+                open(file_path, 'w').close()
+                os.utime(file_path, (mtime, mtime))
+
+            monitor = DirWatcherMonitor()
+            monitor._strike_dir = strike_dir
+
+            self.assertListEqual(monitor._list_files(), ['file_2.txt', 'file_3.txt', 'file_1.txt'])
+        finally:
+            shutil.rmtree(strike_dir)
+
+    def test_process_events(self):
+        """Tests calling DirWatcherMonitor._process_events() with new files"""
+
+        monitor = DirWatcherMonitor()
+        monitor._watcher = MagicMock()
+        monitor._watcher.read_events.return_value = [INotifyEvent(1, IN_CLOSE_WRITE, 0, 'file_1.txt_tmp'),
+                                                     INotifyEvent(1, IN_MOVED_TO | IN_ISDIR, 0, 'dir'),
+                                                     INotifyEvent(1, IN_MOVED_TO, 0, 'file_1.txt'),
+                                                     INotifyEvent(1, IN_CLOSE_WRITE, 0, 'file_1.txt')]
+        monitor._process_files = MagicMock()
+
+        self.assertTrue(monitor._process_events(1.0))
+        monitor._process_files.assert_called_once_with(['file_1.txt_tmp', 'file_1.txt'])
+
+    def test_process_events_overflow(self):
+        """Tests calling DirWatcherMonitor._process_events() when events were lost"""
+
+        monitor = DirWatcherMonitor()
+        monitor._watcher = MagicMock()
+        monitor._watcher.read_events.return_value = [INotifyEvent(1, IN_CLOSE_WRITE, 0, 'file_1.txt'),
+                                                     INotifyEvent(-1, IN_Q_OVERFLOW, 0, '')]
+        monitor._process_files = MagicMock()
+
+        self.assertFalse(monitor._process_events(1.0))
+        self.assertFalse(monitor._process_files.called)
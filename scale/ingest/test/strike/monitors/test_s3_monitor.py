@@ -2,13 +2,21 @@ from __future__ import unicode_literals
 
 import collections
 import json
+import re
 
 import django
 from django.test import TestCase
-from mock import patch
+from mock import MagicMock, patch
 
-from ingest.strike.monitors.exceptions import (InvalidMonitorConfiguration, SQSNotificationError)
+import ingest.test.utils as ingest_test_utils
+import storage.test.utils as storage_test_utils
+from ingest.handlers.file_handler import FileHandler
+from ingest.handlers.file_rule import FileRule
+from ingest.models import Ingest
+from ingest.strike.monitors.exceptions import (InvalidMonitorConfiguration, S3NoDataNotificationError,
+                                               SQSNotificationError)
 from ingest.strike.monitors.s3_monitor import S3Monitor
+from queue.models import Queue
 
 SQSMessage = collections.namedtuple('SQSMessage', ['body'])
 
@@ -96,6 +104,25 @@ class TestS3Monitor(TestCase):
         monitor._process_s3_notification(sqs_message)
         self.assertEqual(ingest_mock.call_count, 1)
 
+    @patch('ingest.strike.monitors.s3_monitor.S3Monitor._ingest_s3_notification_object')
+    def test_process_s3_notification_zero_size_record(self, ingest_mock):
+        """Tests calling S3Monitor._process_s3_notification() with a 0 byte record among valid records"""
+
+        def record(key, size):
+            return {'eventVersion': '2.0', 'eventName': 'ObjectCreated:Put',
+                    's3': {'bucket': {'name': 'mybucket'}, 'object': {'key': key, 'size': size}}}
+        message = {'Records': [record('file_1.txt', 1024), record('folder/', 0), record('file_2.txt', 2048)]}
+        sqs_message = SQSMessage(json.dumps({'Message': json.dumps(message)}))
+        ingest_1 = MagicMock()
+        ingest_2 = MagicMock()
+        ingest_mock.side_effect = [ingest_1, S3NoDataNotificationError(), ingest_2]
+
+        monitor = S3Monitor()
+        ingests = monitor._process_s3_notification(sqs_message)
+
+        self.assertListEqual(ingests, [ingest_1, ingest_2])
+        self.assertEqual(ingest_mock.call_count, 3)
+
     def test_process_s3_notification_invalid_json(self):
         """Tests calling S3Monitor._process_s3_notification() with invalid JSON"""
 
@@ -113,3 +140,124 @@ class TestS3Monitor(TestCase):
         monitor = S3Monitor()
         with self.assertRaises(SQSNotificationError):
             monitor._process_s3_notification(message)
+
+    @patch('ingest.strike.monitors.s3_monitor.S3Monitor._process_ingests')
+    @patch('ingest.strike.monitors.s3_monitor.S3Monitor._process_s3_notification')
+    def test_process_messages(self, mock_process_notification, mock_process_ingests):
+        """Tests calling S3Monitor._process_messages() commits the ingests of all messages together"""
+
+        ingest_1 = MagicMock()
+        ingest_2 = MagicMock()
+        messages = [MagicMock(), MagicMock(), MagicMock(), MagicMock()]
+        mock_process_notification.side_effect = [[ingest_1], SQSNotificationError(), [], [ingest_2]]
+
+        monitor = S3Monitor()
+        processed_messages = monitor._process_messages(messages)
+
+        # The unrecognized message is left on the queue
+        self.assertListEqual(processed_messages, [messages[0], messages[2], messages[3]])
+        mock_process_ingests.assert_called_once_with([ingest_1, ingest_2])
+
+    @patch('ingest.strike.monitors.s3_monitor.S3Monitor._process_messages')
+    @patch('ingest.strike.monitors.s3_monitor.S3Monitor.reload_configuration')
+    @patch('ingest.strike.monitors.s3_monitor.SQSClient')
+    def test_run(self, mock_client_class, mock_reload, mock_process_messages):
+        """Tests calling S3Monitor.run() processes the received messages and deletes them in batches"""
+
+        monitor = S3Monitor()
+        monitor._sqs_name = 'my-sqs'
+        monitor.messages_per_task = 2
+        monitor.worker_count = 2
+        messages = [MagicMock(receipt_handle='handle-%d' % i) for i in range(5)]
+        mock_process_messages.side_effect = lambda task_messages: task_messages
+
+        def receive_messages(*args, **kwargs):
+            monitor.stop()
+            return iter(messages)
+        client = mock_client_class.return_value.__enter__.return_value
+        client.receive_messages.side_effect = receive_messages
+        client.delete_messages.return_value = []
+
+        monitor.run()
+
+        self.assertEqual(mock_reload.call_count, 1)
+        self.assertEqual(mock_process_messages.call_count, 3)
+        deleted_handles = []
+        for call in client.delete_messages.call_args_list:
+            self.assertEqual(call[0][0], 'my-sqs')
+            deleted_handles.extend(entry['ReceiptHandle'] for entry in call[0][1])
+        self.assertListEqual(deleted_handles, ['handle-%d' % i for i in range(5)])
+
+
+class TestS3MonitorProcessIngests(TestCase):
+    fixtures = ['ingest_job_types.json']
+
+    def setUp(self):
+        django.setup()
+
+        self.workspace = storage_test_utils.create_workspace()
+        self.strike = ingest_test_utils.create_strike()
+        file_handler = FileHandler()
+        file_handler.add_rule(FileRule(re.compile(r'.*\.txt'), ['type_a'], None, None))
+        self.monitor = S3Monitor()
+        self.monitor.strike_id = self.strike.id
+        self.monitor.setup_workspaces(self.workspace.name, file_handler)
+
+    def _create_ingest(self, file_name):
+        """Creates a new unsaved ingest the same way the monitor does for an S3 notification"""
+
+        ingest = Ingest.objects.create_ingest(file_name, self.workspace, strike_id=self.strike.id)
+        ingest.file_path = 'path/%s' % file_name
+        ingest.file_size = 1024
+        return ingest
+
+    def test_matched(self):
+        """Tests calling Monitor._process_ingests() with ingests that all match a rule"""
+
+        ingests = [self._create_ingest('file_1.txt'), self._create_ingest('file_2.txt')]
+
+        self.monitor._process_ingests(ingests)
+
+        ingests = list(Ingest.objects.filter(strike_id=self.strike.id).select_related('job'))
+        self.assertEqual(len(ingests), 2)
+        for ingest in ingests:
+            self.assertEqual(ingest.status, 'QUEUED')
+            self.assertEqual(ingest.job.event.type, 'STRIKE_TRANSFER')
+            self.assertSetEqual(ingest.get_data_type_tags(), {'type_a'})
+        self.assertEqual(Queue.objects.filter(job_id__in=[ingest.job_id for ingest in ingests]).count(), 2)
+
+    def test_deferred(self):
+        """Tests calling Monitor._process_ingests() with ingests that do not match any rule"""
+
+        ingests = [self._create_ingest('file_1.dat'), self._create_ingest('file_2.dat')]
+
+        self.monitor._process_ingests(ingests)
+
+        ingests = list(Ingest.objects.filter(strike_id=self.strike.id))
+        self.assertEqual(len(ingests), 2)
+        for ingest in ingests:
+            self.assertEqual(ingest.status, 'DEFERRED')
+            self.assertIsNone(ingest.job_id)
+
+    def test_mixed(self):
+        """Tests calling Monitor._process_ingests() with matched and deferred ingests, which are saved together"""
+
+        ingests = [self._create_ingest('file_1.txt'), self._create_ingest('file_2.dat')]
+
+        self.monitor._process_ingests(ingests)
+
+        matched_ingest = Ingest.objects.get(strike_id=self.strike.id, file_name='file_1.txt')
+        deferred_ingest = Ingest.objects.get(strike_id=self.strike.id, file_name='file_2.dat')
+        self.assertEqual(matched_ingest.status, 'QUEUED')
+        self.assertIsNotNone(matched_ingest.job_id)
+        self.assertEqual(deferred_ingest.status, 'DEFERRED')
+        self.assertIsNone(deferred_ingest.job_id)
+
+    def test_invalid_status(self):
+        """Tests calling Monitor._process_ingests() with an invalid ingest status, so nothing is saved"""
+
+        ingest = self._create_ingest('file_1.txt')
+        ingest.status = 'INGESTED'
+
+        self.assertRaises(Exception, self.monitor._process_ingests, [self._create_ingest('file_2.txt'), ingest])
+        self.assertEqual(Ingest.objects.filter(strike_id=self.strike.id).count(), 0)
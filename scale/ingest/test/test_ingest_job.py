@@ -1,22 +1,194 @@
 from __future__ import unicode_literals
 
+import os
+
 import django
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
+from mock import patch
 
 import ingest.test.utils as ingest_test_utils
 import source.test.utils as source_test_utils
+import storage.test.utils as storage_test_utils
+from ingest.ingest_job import _get_duplicate_content_ingests, perform_ingests
+from ingest.models import Ingest
+from storage.models import ScaleFile
 
 
-class TestPerformIngest(TransactionTestCase):
+class TestPerformIngests(TransactionTestCase):
     fixtures = ['ingest_job_types.json']
 
     def setUp(self):
         django.setup()
 
-        self.ingest = ingest_test_utils.create_ingest(status='QUEUED')
-        self.source_file = source_test_utils.create_source(workspace=self.ingest.workspace)
+        self.workspace = storage_test_utils.create_workspace()
+        self.new_workspace = storage_test_utils.create_workspace()
+
+    def _create_ingest(self, file_name, new_workspace=None, new_file_path=None, source_file_exists=False):
+        """Creates a queued ingest whose source file has not been ingested yet"""
+
+        ingest = ingest_test_utils.create_ingest(file_name=file_name, status='QUEUED', workspace=self.workspace,
+                                                 new_workspace=new_workspace)
+        if not source_file_exists:
+            ingest.source_file.is_deleted = True
+            ingest.source_file.save()
+        if new_file_path:
+            ingest.new_file_path = new_file_path
+        ingest.source_file = None
+        ingest.save()
+        return ingest
+
+    @patch('ingest.ingest_job.os.path.exists')
+    @patch('storage.models.Workspace.get_file_system_paths')
+    @patch('storage.models.ScaleFileManager.upload_files')
+    @patch('storage.models.ScaleFileManager.move_files')
+    def test_mixed_batch(self, mock_move_files, mock_upload_files, mock_get_paths, mock_exists):
+        """Tests performing a batch of ingests that copy, move, and register their source files"""
+
+        mock_get_paths.side_effect = lambda files: [os.path.join('/tmp', f.file_name) for f in files]
+        mock_exists.return_value = False
+        copy_ingest = self._create_ingest('copy.txt', new_workspace=self.new_workspace)
+        move_ingest = self._create_ingest('move.txt', new_file_path='new/path/move.txt')
+        register_ingest = self._create_ingest('register.txt')
+        ingest_ids = [copy_ingest.id, move_ingest.id, register_ingest.id]
+
+        perform_ingests(ingest_ids)
+
+        ingests = {ingest.id: ingest for ingest in Ingest.objects.filter(id__in=ingest_ids)}
+        for ingest_id in ingest_ids:
+            self.assertEqual(ingests[ingest_id].status, 'INGESTED')
+            self.assertIsNotNone(ingests[ingest_id].ingest_ended)
+            self.assertFalse(ingests[ingest_id].source_file.is_deleted)
+        file_uploads = mock_upload_files.call_args[0][1]
+        self.assertEqual(mock_upload_files.call_args[0][0].id, self.new_workspace.id)
+        self.assertListEqual([upload.file.file_name for upload in file_uploads], ['copy.txt'])
+        self.assertEqual(file_uploads[0].local_path, '/tmp/copy.txt')
+        file_moves = mock_move_files.call_args[0][0]
+        self.assertListEqual([move.file.file_name for move in file_moves], ['move.txt'])
+        self.assertEqual(file_moves[0].new_path, 'new/path/move.txt')
+        self.assertEqual(ingests[register_ingest.id].source_file.workspace_id, self.workspace.id)
+
+    @patch('storage.models.ScaleFileManager.move_files')
+    def test_partial_failure(self, mock_move_files):
+        """Tests that only the ingests whose files failed to transfer are marked ERRORED"""
+
+        mock_move_files.side_effect = Exception('Move failed')
+        move_ingest = self._create_ingest('move.txt', new_file_path='new/path/move.txt')
+        register_ingest = self._create_ingest('register.txt')
+
+        self.assertRaises(Exception, perform_ingests, [move_ingest.id, register_ingest.id])
+
+        self.assertEqual(Ingest.objects.get(id=move_ingest.id).status, 'ERRORED')
+        self.assertEqual(Ingest.objects.get(id=register_ingest.id).status, 'INGESTED')
+
+    def test_duplicates(self):
+        """Tests that ingests of already ingested files and repeated files within the batch are marked DUPLICATE"""
+
+        existing_ingest = self._create_ingest('existing.txt', source_file_exists=True)
+        ingest_1 = self._create_ingest('same.txt')
+        ingest_2 = ingest_test_utils.create_ingest(file_name='same.txt', status='QUEUED', workspace=self.workspace,
+                                                   source_file=Ingest.objects.get(id=ingest_1.id).source_file)
+        ingest_2.source_file = None
+        ingest_2.save()
+
+        perform_ingests([existing_ingest.id, ingest_1.id, ingest_2.id])
+
+        self.assertEqual(Ingest.objects.get(id=existing_ingest.id).status, 'DUPLICATE')
+        self.assertEqual(Ingest.objects.get(id=ingest_1.id).status, 'INGESTED')
+        self.assertEqual(Ingest.objects.get(id=ingest_2.id).status, 'DUPLICATE')
+
+    @override_settings(INGEST_SKIP_DUPLICATE_CONTENT=True)
+    @patch('storage.models.Workspace.delete_files')
+    @patch('storage.models.Workspace.get_file_system_paths')
+    @patch('storage.models.ScaleFileManager.download_files')
+    @patch('storage.models.ScaleFileManager.upload_files')
+    def test_duplicate_content(self, mock_upload_files, mock_download_files, mock_get_paths, mock_delete_files):
+        """Tests that a copied file with the same content as an ingested file is deleted and marked DUPLICATE"""
+
+        def upload_files(workspace, file_uploads):
+            for file_upload in file_uploads:
+                file_upload.file.workspace = workspace
+                file_upload.file.checksum = 'abc'
+                file_upload.file.save()
+        mock_upload_files.side_effect = upload_files
+        mock_get_paths.return_value = None
+        mock_delete_files.side_effect = ScaleFile.objects.save_deleted_files
+        existing_file = source_test_utils.create_source(file_name='existing.txt', workspace=self.new_workspace,
+                                                        checksum='abc')
+        ingest_test_utils.create_ingest(file_name='existing.txt', status='INGESTED', source_file=existing_file)
+        ingest = self._create_ingest('copy.txt', new_workspace=self.new_workspace)
+
+        perform_ingests([ingest.id])
+
+        ingest = Ingest.objects.get(id=ingest.id)
+        self.assertEqual(ingest.status, 'DUPLICATE')
+        self.assertTrue(ingest.source_file.is_deleted)
+        self.assertListEqual(list(ScaleFile.objects.filter(checksum='abc', is_deleted=False)), [existing_file])
+
+    def test_already_ingested(self):
+        """Tests that an ingest that is already INGESTED is skipped"""
+
+        ingest = ingest_test_utils.create_ingest(status='INGESTED', workspace=self.workspace)
+        ingest_ended = ingest.ingest_ended
+
+        perform_ingests([ingest.id])
+
+        ingest = Ingest.objects.get(id=ingest.id)
+        self.assertEqual(ingest.status, 'INGESTED')
+        self.assertEqual(ingest.ingest_ended, ingest_ended)
+
+
+class TestGetDuplicateContentIngests(TransactionTestCase):
+    fixtures = ['ingest_job_types.json']
+
+    def setUp(self):
+        django.setup()
 
     def test_successful(self):
-        """Tests processing a new ingest successfully."""
+        """Tests finding the ingests whose source files have the same content as an ingested source file."""
+
+        workspace = storage_test_utils.create_workspace()
+        existing_file = source_test_utils.create_source(file_name='existing.txt', workspace=workspace, checksum='abc')
+        ingest_test_utils.create_ingest(file_name='existing.txt', status='INGESTED', source_file=existing_file)
+        deleted_file = source_test_utils.create_source(file_name='deleted.txt', workspace=workspace, checksum='def')
+        deleted_file.is_deleted = True
+        deleted_file.save()
+        ingest_test_utils.create_ingest(file_name='deleted.txt', status='INGESTED', source_file=deleted_file)
+        source_file_1 = source_test_utils.create_source(file_name='file_1.txt', workspace=workspace, checksum='abc')
+        source_file_2 = source_test_utils.create_source(file_name='file_2.txt', workspace=workspace, checksum='def')
+        source_file_3 = source_test_utils.create_source(file_name='file_3.txt', workspace=workspace)
+        ingest_1 = ingest_test_utils.create_ingest(file_name='file_1.txt', source_file=source_file_1)
+        ingest_2 = ingest_test_utils.create_ingest(file_name='file_2.txt', source_file=source_file_2)
+        ingest_3 = ingest_test_utils.create_ingest(file_name='file_3.txt', source_file=source_file_3)
+
+        duplicates = _get_duplicate_content_ingests([ingest_1, ingest_2, ingest_3])
+
+        self.assertListEqual(duplicates, [ingest_1])
+
+    def test_concurrent_ingest(self):
+        """Tests that a source file with the same content that is still being ingested by another job does not make
+        an ingest a duplicate."""
+
+        workspace = storage_test_utils.create_workspace()
+        other_file = source_test_utils.create_source(file_name='other.txt', workspace=workspace, checksum='abc')
+        ingest_test_utils.create_ingest(file_name='other.txt', status='INGESTING', source_file=other_file)
+        source_file = source_test_utils.create_source(file_name='file.txt', workspace=workspace, checksum='abc')
+        ingest = ingest_test_utils.create_ingest(file_name='file.txt', status='INGESTING', source_file=source_file)
+
+        duplicates = _get_duplicate_content_ingests([ingest])
+
+        self.assertListEqual(duplicates, [])
+
+    def test_same_content_in_batch(self):
+        """Tests that only the first of the given ingests with the same content is kept."""
+
+        workspace = storage_test_utils.create_workspace()
+        source_file_1 = source_test_utils.create_source(file_name='file_1.txt', workspace=workspace, checksum='abc')
+        source_file_2 = source_test_utils.create_source(file_name='file_2.txt', workspace=workspace, checksum='abc')
+        source_file_3 = source_test_utils.create_source(file_name='file_3.txt', workspace=workspace, checksum='abc')
+        ingest_1 = ingest_test_utils.create_ingest(file_name='file_1.txt', source_file=source_file_1)
+        ingest_2 = ingest_test_utils.create_ingest(file_name='file_2.txt', source_file=source_file_2)
+        ingest_3 = ingest_test_utils.create_ingest(file_name='file_3.txt', source_file=source_file_3)
+
+        duplicates = _get_duplicate_content_ingests([ingest_1, ingest_2, ingest_3])
 
-        pass
+        self.assertListEqual(duplicates, [ingest_2, ingest_3])
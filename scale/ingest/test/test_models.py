@@ -1,10 +1,13 @@
 from __future__ import unicode_literals
 
 import django
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from mock import patch
 
+import ingest.test.utils as ingest_test_utils
 import storage.test.utils as storage_test_utils
 from ingest.models import Ingest, Strike
+from queue.models import Queue
 from storage.exceptions import InvalidDataTypeTag
 
 
@@ -61,6 +64,77 @@ class TestIngestGetDataTypeTags(TestCase):
         self.assertSetEqual(tags, set())
 
 
+class TestIngestManagerStartIngestTasks(TestCase):
+    fixtures = ['ingest_job_types.json']
+
+    def setUp(self):
+        django.setup()
+
+        self.workspace = storage_test_utils.create_workspace()
+
+    @patch('ingest.models.INGEST_TASK_BATCH_SIZE', 2)
+    def test_scan_ingests(self):
+        """Tests calling IngestManager.start_ingest_tasks() for a scan with more ingests than fit in one batch"""
+
+        scan = ingest_test_utils.create_scan()
+        ingests = [ingest_test_utils.create_ingest(file_name='file_%d.txt' % i, status='TRANSFERRED', scan=scan,
+                                                   workspace=self.workspace) for i in range(5)]
+
+        Ingest.objects.start_ingest_tasks(ingests, scan_id=scan.id)
+
+        job_ids = set()
+        for ingest in Ingest.objects.filter(scan_id=scan.id).select_related('job'):
+            self.assertEqual(ingest.status, 'QUEUED')
+            self.assertEqual(ingest.job.status, 'QUEUED')
+            self.assertEqual(ingest.job.event.type, 'SCAN_TRANSFER')
+            self.assertEqual(ingest.job.event.description['file_name'], ingest.file_name)
+            input_values = {value['name']: value['value'] for value in ingest.job.input['input_data']}
+            self.assertEqual(input_values['ingest_id'], str(ingest.id))
+            self.assertEqual(input_values['workspace'], self.workspace.name)
+            job_ids.add(ingest.job_id)
+        self.assertEqual(len(job_ids), 5)
+        self.assertEqual(Queue.objects.filter(job_id__in=job_ids).count(), 5)
+
+    @override_settings(INGEST_JOB_BATCH_SIZE=2)
+    def test_multi_file_jobs(self):
+        """Tests calling IngestManager.start_ingest_tasks() with ingest jobs that ingest multiple files"""
+
+        scan = ingest_test_utils.create_scan()
+        new_workspace = storage_test_utils.create_workspace()
+        ingests = [ingest_test_utils.create_ingest(file_name='file_%d.txt' % i, status='TRANSFERRED', scan=scan,
+                                                   workspace=self.workspace) for i in range(3)]
+        ingests.append(ingest_test_utils.create_ingest(file_name='file_3.txt', status='TRANSFERRED', scan=scan,
+                                                       workspace=self.workspace, new_workspace=new_workspace))
+
+        Ingest.objects.start_ingest_tasks(ingests, scan_id=scan.id)
+
+        ingests = list(Ingest.objects.filter(scan_id=scan.id).select_related('job').order_by('file_name'))
+        self.assertEqual(ingests[0].job_id, ingests[1].job_id)
+        self.assertNotEqual(ingests[1].job_id, ingests[2].job_id)
+        self.assertNotEqual(ingests[2].job_id, ingests[3].job_id)
+        self.assertListEqual(ingests[0].job.event.description['file_names'], ['file_0.txt', 'file_1.txt'])
+        self.assertEqual(ingests[2].job.event.description['file_name'], 'file_2.txt')
+        input_values = {value['name']: value['value'] for value in ingests[0].job.input['input_data']}
+        self.assertEqual(input_values['ingest_id'], '%d,%d' % (ingests[0].id, ingests[1].id))
+        input_values = {value['name']: value['value'] for value in ingests[3].job.input['input_data']}
+        self.assertEqual(input_values['new_workspace'], new_workspace.name)
+        self.assertEqual(Queue.objects.filter(job_id__in={ingest.job_id for ingest in ingests}).count(), 3)
+
+    def test_strike_ingest(self):
+        """Tests calling IngestManager.start_ingest_tasks() for a Strike ingest"""
+
+        strike = ingest_test_utils.create_strike()
+        ingest = ingest_test_utils.create_ingest(status='TRANSFERRED', strike=strike, workspace=self.workspace)
+
+        Ingest.objects.start_ingest_tasks([ingest], strike_id=strike.id)
+
+        ingest = Ingest.objects.select_related('job').get(id=ingest.id)
+        self.assertEqual(ingest.status, 'QUEUED')
+        self.assertEqual(ingest.job.event.type, 'STRIKE_TRANSFER')
+        self.assertEqual(ingest.job.event.description['strike_id'], strike.id)
+        self.assertTrue(Queue.objects.filter(job_id=ingest.job_id).exists())
+
+
 class TestStrikeManagerCreateStrikeProcess(TransactionTestCase):
     fixtures = ['ingest_job_types.json']
 
@@ -9,12 +9,12 @@ from job.configuration.data.job_connection import JobConnection
 from job.data.job_connection import SeedJobConnection
 from job.deprecation import JobConnectionSunset
 from job.seed.manifest import SeedManifest
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 from recipe.configuration.data.recipe_connection import LegacyRecipeConnection
 from recipe.triggers.configuration.trigger_rule import RecipeTriggerRuleConfiguration
 from storage.models import Workspace
 from trigger.configuration.exceptions import InvalidTriggerRule
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -101,7 +101,7 @@ class IngestTriggerRuleConfiguration(RecipeTriggerRuleConfiguration):
         super(IngestTriggerRuleConfiguration, self).__init__(trigger_rule_type, configuration)
 
         try:
-            validate(configuration, INGEST_TRIGGER_SCHEMA)
+            validate_json(configuration, INGEST_TRIGGER_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidTriggerRule(validation_error)
 
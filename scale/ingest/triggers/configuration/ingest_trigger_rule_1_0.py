@@ -3,7 +3,6 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from ingest.triggers.ingest_trigger_condition import IngestTriggerCondition
@@ -12,6 +11,7 @@ from recipe.configuration.data.recipe_connection import LegacyRecipeConnection
 from recipe.triggers.configuration.trigger_rule import RecipeTriggerRuleConfiguration
 from storage.models import Workspace
 from trigger.configuration.exceptions import InvalidTriggerRule
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -84,7 +84,7 @@ class IngestTriggerRuleConfiguration(RecipeTriggerRuleConfiguration):
         super(IngestTriggerRuleConfiguration, self).__init__(trigger_rule_type, configuration)
 
         try:
-            validate(configuration, INGEST_TRIGGER_SCHEMA)
+            validate_json(configuration, INGEST_TRIGGER_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidTriggerRule(validation_error)
 
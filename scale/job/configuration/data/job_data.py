@@ -11,6 +11,7 @@ from job.configuration.results.job_results import JobResults
 from job.execution.container import SCALE_JOB_EXE_INPUT_PATH
 
 from storage.brokers.broker import FileDownload
+from storage.cache import input_file_cache
 from storage.models import ScaleFile
 from util.environment import normalize_env_var_name
 
@@ -705,7 +706,7 @@ class JobData(object):
             file_downloads.append(FileDownload(scale_file, local_path, partial))
             results[scale_file.id] = local_path
 
-        ScaleFile.objects.download_files(file_downloads)
+        input_file_cache.download_files(file_downloads)
 
         return results
 
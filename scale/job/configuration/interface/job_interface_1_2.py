@@ -4,12 +4,12 @@ from __future__ import unicode_literals
 import logging
 import re
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.configuration.interface import job_interface_1_1 as previous_interface
 from job.configuration.interface.exceptions import InvalidInterfaceDefinition
 from job.execution.configuration.exceptions import MissingSetting
+from util.validation import validate_json
 
 
 logger = logging.getLogger(__name__)
@@ -187,7 +187,7 @@ class JobInterface(previous_interface.JobInterface):
             self.convert_interface(definition)
 
         try:
-            validate(definition, JOB_INTERFACE_SCHEMA)
+            validate_json(definition, JOB_INTERFACE_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidInterfaceDefinition(validation_error)
 
@@ -3,10 +3,10 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.configuration.exceptions import InvalidJobConfiguration
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +49,7 @@ class JobConfigurationV1(object):
         self._default_setting_names = set()
 
         try:
-            validate(definition, JOB_CONFIG_SCHEMA)
+            validate_json(definition, JOB_CONFIG_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidJobConfiguration('INVALID_CONFIGURATION', validation_error)
 
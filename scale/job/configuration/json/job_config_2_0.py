@@ -5,12 +5,12 @@ import logging
 import os
 from job.deprecation import JobInterfaceSunset
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.configuration.exceptions import InvalidJobConfiguration
 from job.configuration.json import job_config_1_0 as previous_interface
 from job.execution.configuration.volume import Volume, HOST_TYPE, VOLUME_TYPE
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -133,7 +133,7 @@ class JobConfigurationV2(object):
 
         try:
             if do_validate:
-                validate(configuration, JOB_CONFIG_SCHEMA)
+                validate_json(configuration, JOB_CONFIG_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidJobConfiguration('INVALID_CONFIGURATION', validation_error)
 
@@ -1,7 +1,6 @@
 """Manages the v6 job configuration schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.configuration.configuration import DEFAULT_PRIORITY, JobConfiguration
@@ -9,6 +8,7 @@ from job.configuration.exceptions import InvalidJobConfiguration
 from job.configuration.json.job_config_2_0 import JobConfigurationV2
 from job.configuration.mount import HostMountConfig, VolumeMountConfig
 from job.execution.configuration.volume import HOST_TYPE, VOLUME_TYPE
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -159,7 +159,7 @@ class JobConfigurationV6(object):
 
         try:
             if do_validate:
-                validate(self._config, JOB_CONFIG_SCHEMA)
+                validate_json(self._config, JOB_CONFIG_SCHEMA)
         except ValidationError as ex:
             raise InvalidJobConfiguration('INVALID_CONFIGURATION', 'Invalid configuration: %s' % unicode(ex))
 
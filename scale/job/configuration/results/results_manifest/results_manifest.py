@@ -7,11 +7,11 @@ from __future__ import unicode_literals
 import copy
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 import job.configuration.results.results_manifest.results_manifest_1_0 as previous_manifest
 from job.configuration.results.exceptions import InvalidResultsManifest, MissingRequiredOutput
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -168,7 +168,7 @@ class ResultsManifest(object):
         self._json_manifest = json_manifest
 
         try:
-            validate(json_manifest, RESULTS_MANIFEST_SCHEMA)
+            validate_json(json_manifest, RESULTS_MANIFEST_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidResultsManifest(str(validation_error))
 
@@ -7,9 +7,9 @@ from __future__ import unicode_literals
 import copy
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 from job.configuration.results.exceptions import InvalidResultsManifest, MissingRequiredOutput
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -107,7 +107,7 @@ class ResultsManifest(object):
         self._json_manifest = json_manifest
 
         try:
-            validate(json_manifest, RESULTS_MANIFEST_SCHEMA)
+            validate_json(json_manifest, RESULTS_MANIFEST_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidResultsManifest(str(validation_error))
 
@@ -14,6 +14,7 @@ from job.configuration.interface.scale_file import ScaleFileDescription
 from job.execution.container import SCALE_JOB_EXE_INPUT_PATH
 from job.seed.types import SeedInputFiles
 from storage.brokers.broker import FileDownload
+from storage.cache import input_file_cache
 from storage.models import ScaleFile
 from util.environment import normalize_env_var_name
 
@@ -508,7 +509,7 @@ class JobData(object):
             file_downloads.append(FileDownload(scale_file, local_path, partial))
             results[scale_file.id] = local_path
 
-        ScaleFile.objects.download_files(file_downloads)
+        input_file_cache.download_files(file_downloads)
 
         return results
 
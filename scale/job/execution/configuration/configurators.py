@@ -13,8 +13,9 @@ from job.execution.configuration.json.exe_config import ExecutionConfiguration
 from job.execution.configuration.volume import Volume, MODE_RO, MODE_RW
 from job.execution.configuration.workspace import TaskWorkspace
 from job.deprecation import JobInterfaceSunset
-from job.execution.container import get_job_exe_input_vol_name, get_job_exe_output_vol_name, get_mount_volume_name, \
-    get_workspace_volume_name, SCALE_JOB_EXE_INPUT_PATH, SCALE_JOB_EXE_OUTPUT_PATH
+from job.execution.container import get_input_file_cache_vol_name, get_job_exe_input_vol_name, \
+    get_job_exe_output_vol_name, get_mount_volume_name, get_workspace_volume_name, SCALE_JOB_EXE_INPUT_PATH, \
+    SCALE_JOB_EXE_OUTPUT_PATH
 from job.execution.tasks.post_task import POST_TASK_COMMAND_ARGS
 from job.execution.tasks.pre_task import PRE_TASK_COMMAND_ARGS
 from job.tasks.pull_task import create_pull_command
@@ -217,6 +218,20 @@ class ScheduledExecutionConfigurator(object):
                                  'SCALE_DB_HOST': db['HOST'], 'SCALE_DB_PORT': db['PORT']}
         if settings.QUEUE_NAME:
             self._system_settings['SCALE_QUEUE_NAME'] = settings.QUEUE_NAME
+        # Strike and Scan create the ingest jobs, so they need the ingest job batch size
+        if settings.INGEST_JOB_BATCH_SIZE > 1:
+            self._system_settings['SCALE_INGEST_JOB_BATCH_SIZE'] = str(settings.INGEST_JOB_BATCH_SIZE)
+        # Ingest jobs skip the trigger rules of files with duplicate content
+        if settings.INGEST_SKIP_DUPLICATE_CONTENT:
+            self._system_settings['SCALE_INGEST_SKIP_DUPLICATE_CONTENT'] = 'true'
+        # Pre tasks download input files through the input file cache, so they need its location and limits
+        if settings.INPUT_FILE_CACHE_DIR:
+            self._system_settings['SCALE_INPUT_FILE_CACHE_DIR'] = settings.INPUT_FILE_CACHE_DIR
+            self._system_settings['SCALE_INPUT_FILE_CACHE_MAX_SIZE'] = str(settings.INPUT_FILE_CACHE_MAX_SIZE)
+            self._system_settings['SCALE_INPUT_FILE_CACHE_MIN_FREE'] = str(settings.INPUT_FILE_CACHE_MIN_FREE)
+        # Pre tasks and ingest jobs download files, so they need to know whether to verify their checksums
+        if settings.VERIFY_FILE_CHECKSUMS:
+            self._system_settings['SCALE_VERIFY_FILE_CHECKSUMS'] = 'true'
         self._system_settings_hidden = {key: '*****' for key in self._system_settings.keys()}
 
     def configure_scheduled_job(self, job_exe, job_type, interface, system_logging_level):
@@ -420,6 +435,16 @@ class ScheduledExecutionConfigurator(object):
         config.add_to_task('main', mount_volumes={input_mnt_name: input_vol_ro, output_mnt_name: output_vol_rw})
         config.add_to_task('post', mount_volumes={output_mnt_name: output_vol_ro})
 
+        # Configure input file cache mount, input files may be links into the cache so it is mounted at the same path
+        if settings.INPUT_FILE_CACHE_DIR:
+            cache_mnt_name = 'scale_input_file_cache_mount'
+            cache_path = settings.INPUT_FILE_CACHE_DIR
+            cache_vol_name = get_input_file_cache_vol_name(job_exe)
+            cache_vol_ro = Volume(cache_vol_name, cache_path, MODE_RO, is_host=True, host_path=cache_path)
+            cache_vol_rw = Volume(cache_vol_name, cache_path, MODE_RW, is_host=True, host_path=cache_path)
+            config.add_to_task('pre', mount_volumes={cache_mnt_name: cache_vol_rw})
+            config.add_to_task('main', mount_volumes={cache_mnt_name: cache_vol_ro})
+
         # Configure output directory
         # TODO: original output dir and command arg replacement can be removed when Scale no longer supports old-style
         # job types
@@ -3,10 +3,10 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.execution.configuration.exceptions import InvalidExecutionConfiguration
+from util.validation import validate_json
 
 
 logger = logging.getLogger(__name__)
@@ -117,7 +117,7 @@ class ExecutionConfiguration(object):
         self._post_task_workspace_names = set()
 
         try:
-            validate(configuration, EXE_CONFIG_SCHEMA)
+            validate_json(configuration, EXE_CONFIG_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidExecutionConfiguration(validation_error)
 
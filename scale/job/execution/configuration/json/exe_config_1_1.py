@@ -3,12 +3,12 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.execution.configuration.exceptions import InvalidExecutionConfiguration
 from job.execution.configuration.json import exe_config_1_0 as previous_version
 from job.execution.configuration.volume import MODE_RO, MODE_RW
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -129,7 +129,7 @@ class ExecutionConfiguration(previous_version.ExecutionConfiguration):
             self.convert_configuration(configuration)
 
         try:
-            validate(configuration, EXE_CONFIG_SCHEMA)
+            validate_json(configuration, EXE_CONFIG_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidExecutionConfiguration(validation_error)
 
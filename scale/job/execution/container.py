@@ -10,6 +10,20 @@ SCALE_JOB_EXE_INPUT_PATH = os.path.join(SCALE_ROOT_PATH, 'input_data')
 SCALE_JOB_EXE_OUTPUT_PATH = os.path.join(SCALE_ROOT_PATH, 'output_data')
 
 
+def get_input_file_cache_vol_name(job_exe):
+    """Returns the input file cache volume name for the given job execution
+
+    :param job_exe: The job execution model (must not be queued) with related job and job_type fields
+    :type job_exe: :class:`job.models.JobExecution`
+    :returns: The input file cache volume name
+    :rtype: string
+
+    :raises Exception: If the job execution is still queued
+    """
+
+    return '%s_input_file_cache' % job_exe.get_cluster_id()
+
+
 def get_job_exe_input_vol_name(job_exe):
     """Returns the container input volume name for the given job execution
 
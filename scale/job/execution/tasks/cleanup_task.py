@@ -2,11 +2,15 @@
 from __future__ import unicode_literals
 
 import datetime
+import os
+
+from django.conf import settings
 
 from job.tasks.base_task import AtomicCounter
 from job.tasks.node_task import NodeTask
 from node.resources.node_resources import NodeResources
 from node.resources.resource import Cpus, Mem
+from storage.cache import get_lease_name, LEASES_DIR, TEMP_DIR
 
 
 CLEANUP_TASK_ID_PREFIX = 'scale_cleanup'
@@ -88,6 +92,15 @@ class CleanupTask(NodeTask):
         # Create overall command that deletes containers and volumes for the job executions
         self._command = '%s; %s; %s' % (delete_containers_cmd, delete_stuck_container_cmd, delete_volumes_cmd)
 
+        # Release the input file cache leases of the job executions so that their cached files can be evicted
+        if settings.INPUT_FILE_CACHE_DIR and not self._is_initial_cleanup:
+            paths = []
+            for job_exe in self._job_exes:
+                lease_name = get_lease_name(job_exe.job_id, job_exe.exe_num)
+                paths.append(os.path.join(settings.INPUT_FILE_CACHE_DIR, LEASES_DIR, lease_name))
+                paths.append(os.path.join(settings.INPUT_FILE_CACHE_DIR, TEMP_DIR, '%s_*' % lease_name))
+            self._command = '%s; rm -f %s' % (self._command, ' '.join(paths))
+
         # Node task properties
         self.task_type = 'cleanup'
         self.title = 'Node Cleanup'
@@ -2,11 +2,11 @@
 from __future__ import unicode_literals
 
 from django.utils import dateparse
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.execution.exceptions import InvalidTaskResults
 from util.parse import datetime_to_string
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '1.0'
@@ -76,6 +76,10 @@ TASK_RESULTS_SCHEMA = {
                     'description': 'The exit code of the task',
                     'type': 'integer',
                 },
+                'storage': {
+                    'description': 'The broker transfer metrics recorded by the task, by broker type and operation',
+                    'type': 'object',
+                },
             },
         },
     },
@@ -110,7 +114,7 @@ class TaskResults(object):
 
         try:
             if do_validate:
-                validate(task_results, TASK_RESULTS_SCHEMA)
+                validate_json(task_results, TASK_RESULTS_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidTaskResults(validation_error)
 
@@ -133,6 +137,17 @@ class TaskResults(object):
                         task_dict.update(exit_code=task.exit_code)
             task_list.append(task_dict)
 
+    def add_storage_metrics(self, storage_metrics):
+        """Adds the given broker transfer metrics to the results of the tasks that recorded them
+
+        :param storage_metrics: The transfer metrics of each task, stored by task type
+        :type storage_metrics: dict
+        """
+
+        for task_dict in self._task_results['tasks']:
+            if task_dict['type'] in storage_metrics:
+                task_dict['storage'] = storage_metrics[task_dict['type']]
+
     def get_dict(self):
         """Returns the internal dictionary that represents the task results
 
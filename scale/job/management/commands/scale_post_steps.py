@@ -12,6 +12,7 @@ from error.exceptions import ScaleError, get_error_by_exception
 from job.deprecation import JobInterfaceSunset
 from job.models import JobExecution, JobExecutionOutput
 from job.seed.results.job_results import JobResults
+from storage.brokers.metrics import transfer_metrics
 from util.retry import retry_database_query
 
 
@@ -27,6 +28,9 @@ class Command(BaseCommand):
 
     help = 'Performs the post-job steps for a job execution'
 
+    # Skip the system checks, which import every URL configuration and view, to keep the task's startup time short
+    requires_system_checks = False
+
     def handle(self, *args, **options):
         """See :meth:`django.core.management.base.BaseCommand.handle`.
 
@@ -42,6 +46,7 @@ class Command(BaseCommand):
             job_exe = self._get_job_exe(job_id, exe_num)
 
             self._perform_post_steps(job_exe)
+            self._update_storage_metrics(job_exe.id)
         except ScaleError as err:
             err.log()
             sys.exit(err.exit_code)
@@ -102,3 +107,15 @@ class Command(BaseCommand):
             job_exe_output.exe_num = job_exe.exe_num
             job_exe_output.output = job_results.get_dict()
             job_exe_output.save()
+
+    @retry_database_query
+    def _update_storage_metrics(self, job_exe_id):
+        """Records the broker transfer metrics of this task against the given job execution
+
+        :param job_exe_id: The job execution ID
+        :type job_exe_id: int
+        """
+
+        storage_metrics = transfer_metrics.get_summary()
+        if storage_metrics:
+            JobExecution.objects.update_storage_metrics(job_exe_id, 'post', storage_metrics)
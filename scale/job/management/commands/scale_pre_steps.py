@@ -10,6 +10,9 @@ from django.core.management.base import BaseCommand
 from error.exceptions import ScaleError, get_error_by_exception
 from job.deprecation import JobDataSunset
 from job.models import JobExecution
+from node.models import Node
+from storage.brokers.metrics import transfer_metrics
+from storage.cache import get_lease_name, input_file_cache
 from util.retry import retry_database_query
 
 
@@ -25,6 +28,9 @@ class Command(BaseCommand):
 
     help = 'Performs the pre-job steps for a job execution'
 
+    # Skip the system checks, which import every URL configuration and view, to keep the task's startup time short
+    requires_system_checks = False
+
     def handle(self, *args, **options):
         """See :meth:`django.core.management.base.BaseCommand.handle`.
 
@@ -47,7 +53,11 @@ class Command(BaseCommand):
             job_data = job_exe.job.get_job_data()
             job_data = JobDataSunset.create(job_interface, job_data.get_dict())
             logger.info('Setting up input files...')
+            input_file_cache.start_lease(get_lease_name(job_id, exe_num))
             job_interface.perform_pre_steps(job_data)
+            if input_file_cache.is_enabled and job_exe.node_id:
+                self._update_input_file_cache_counts(job_exe.node_id)
+            self._update_storage_metrics(job_exe.id)
 
             logger.info('Ready to execute job: %s', exe_config.get_args('main'))
         except ScaleError as err:
@@ -78,3 +88,25 @@ class Command(BaseCommand):
         """
 
         return JobExecution.objects.get_job_exe_with_job_and_job_type(job_id, exe_num)
+
+    @retry_database_query
+    def _update_input_file_cache_counts(self, node_id):
+        """Adds the hit and miss counts of the input file cache to the totals of the given node
+
+        :param node_id: The node ID
+        :type node_id: int
+        """
+
+        Node.objects.update_input_file_cache_counts(node_id, input_file_cache.get_counts())
+
+    @retry_database_query
+    def _update_storage_metrics(self, job_exe_id):
+        """Records the broker transfer metrics of this task against the given job execution
+
+        :param job_exe_id: The job execution ID
+        :type job_exe_id: int
+        """
+
+        storage_metrics = transfer_metrics.get_summary()
+        if storage_metrics:
+            JobExecution.objects.update_storage_metrics(job_exe_id, 'pre', storage_metrics)
@@ -0,0 +1,123 @@
+"""Defines the command line method for benchmarking the startup time of the pre and post task commands"""
+from __future__ import unicode_literals
+
+import json
+import logging
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jsonschema.validators import validator_for
+
+from data.data.json.data_v6 import DATA_SCHEMA
+from job.execution.configuration.json.exe_config import EXE_CONFIG_SCHEMA
+from job.execution.tasks.json.results.task_results import TASK_RESULTS_SCHEMA
+from job.seed.manifest import SEED_MANIFEST_SCHEMA
+from util.histogram import Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+# The startup stages that are timed in a new Python process, each the name of the stage and the code it runs
+STAGES = [('interpreter', 'pass'),
+          ('django_setup', 'import django; django.setup()'),
+          ('system_checks', 'import django; django.setup(); from django.core import checks; checks.run_checks()'),
+          ('pre_steps_command', 'import django; django.setup(); '
+                                'from job.management.commands.scale_pre_steps import Command'),
+          ('post_steps_command', 'import django; django.setup(); '
+                                 'from job.management.commands.scale_post_steps import Command')]
+
+# The schemas validated by the pre and post tasks, each the name of the schema and the schema
+SCHEMAS = [('seed_manifest', SEED_MANIFEST_SCHEMA), ('exe_config', EXE_CONFIG_SCHEMA), ('data', DATA_SCHEMA),
+           ('task_results', TASK_RESULTS_SCHEMA)]
+
+
+class Command(BaseCommand):
+    """Command that benchmarks the startup time of the pre and post task commands, timing each stage of startup in new
+    Python processes and the cost of checking the JSON schemas that the commands validate against
+    """
+
+    help = 'Benchmarks the startup time of the pre and post task commands'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', action='store', type=int, default=5,
+                            help='The number of new processes to time for each startup stage')
+        parser.add_argument('--json', action='store_true', default=False,
+                            help='Write the results as JSON')
+
+    def handle(self, *args, **options):
+        """See :meth:`django.core.management.base.BaseCommand.handle`.
+
+        This method runs the benchmark.
+        """
+
+        logger.info('Command starting: scale_startup_benchmark')
+
+        results = {'stages': {}, 'schema_checks': {}}
+        for name, code in STAGES:
+            results['stages'][name] = self._time_stage(code, options['runs'])
+        for name, schema in SCHEMAS:
+            results['schema_checks'][name] = self._time_schema_check(schema, options['runs'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, sort_keys=True))
+        else:
+            self.stdout.write('Startup stage ms (new process):')
+            for name, _code in STAGES:
+                self._write_summary(name, results['stages'][name])
+            self.stdout.write('Schema check ms (skipped once a compiled validator is reused):')
+            for name, _schema in SCHEMAS:
+                self._write_summary(name, results['schema_checks'][name])
+
+        logger.info('Command completed: scale_startup_benchmark')
+
+    def _time_schema_check(self, schema, runs):
+        """Times checking the given JSON schema, which is the cost of compiling a validator for it
+
+        :param schema: The JSON schema
+        :type schema: dict
+        :param runs: The number of times to check the schema
+        :type runs: int
+        :returns: The summary of the times in milliseconds
+        :rtype: dict
+        """
+
+        histogram = Histogram()
+        cls = validator_for(schema)
+        for _ in range(runs):
+            started = time.time()
+            cls.check_schema(schema)
+            histogram.record(time.time() - started)
+        return histogram.get_summary(scale=1000.0)
+
+    def _time_stage(self, code, runs):
+        """Times running the given code in new Python processes, including starting the interpreter
+
+        :param code: The Python code to run
+        :type code: string
+        :param runs: The number of processes to time
+        :type runs: int
+        :returns: The summary of the times in milliseconds
+        :rtype: dict
+        """
+
+        histogram = Histogram()
+        for _ in range(runs):
+            started = time.time()
+            subprocess.check_call([sys.executable, '-c', code], cwd=settings.BASE_DIR)
+            histogram.record(time.time() - started)
+        return histogram.get_summary(scale=1000.0)
+
+    def _write_summary(self, name, summary):
+        """Writes a readable line for the given summary of times
+
+        :param name: The name of the timed item
+        :type name: string
+        :param summary: The summary of the times
+        :type summary: dict
+        """
+
+        self.stdout.write('  %s: p50 %s, p90 %s, max %s' % (name, summary['p50'], summary['p90'], summary['max']))
@@ -79,6 +79,16 @@ class BlockedJobs(CommandMessage):
 
         return self._count < MAX_NUM
 
+    def merge(self, message, size_factor=1):
+        """See :meth:`messaging.messages.message.CommandMessage.merge`
+        """
+
+        # Only status changes made at the same time are equivalent
+        if self.status_change != message.status_change:
+            return False
+
+        return self._merge_ids(message, '_blocked_job_ids', MAX_NUM, size_factor, self.add_job)
+
     def to_json(self):
         """See :meth:`messaging.messages.message.CommandMessage.to_json`
         """
@@ -3,9 +3,12 @@ from __future__ import unicode_literals
 
 import logging
 
+from django.db import transaction
+
 from job.execution.tasks.json.results.task_results import TaskResults
-from job.models import JobExecutionEnd
+from job.models import JobExecution, JobExecutionEnd
 from messaging.messages.message import CommandMessage
+from metrics.models import MetricsJobTypeRollup
 from util.parse import datetime_to_string, parse_datetime
 
 # This is the maximum number of job_exe_end models that can fit in one message. This maximum ensures that every message
@@ -119,7 +122,7 @@ class CreateJobExecutionEnd(CommandMessage):
             if 'node_id' in job_exe_end_dict:
                 job_exe_end.node_id = job_exe_end_dict['node_id']
             if 'started' in job_exe_end_dict:
-                job_exe_end.started = job_exe_end_dict['started']
+                job_exe_end.started = parse_datetime(job_exe_end_dict['started'])
             message.add_job_exe_end(job_exe_end)
 
         return message
@@ -140,9 +143,23 @@ class CreateJobExecutionEnd(CommandMessage):
                 models_to_create.append(job_exe_end)
                 existing_ids.add(job_exe_end.job_exe_id)  # Handles duplicate models in the message
 
-        # Bulk create new job_exe_end models
+        # Add the broker transfer metrics recorded by the tasks to the task results
+        if models_to_create:
+            create_ids = [job_exe_end.job_exe_id for job_exe_end in models_to_create]
+            metrics_qry = JobExecution.objects.filter(id__in=create_ids, storage_metrics__isnull=False)
+            storage_metrics = dict(metrics_qry.values_list('id', 'storage_metrics'))
+            for job_exe_end in models_to_create:
+                if job_exe_end.job_exe_id in storage_metrics:
+                    task_results = TaskResults(job_exe_end.task_results, do_validate=False)
+                    task_results.add_storage_metrics(storage_metrics[job_exe_end.job_exe_id])
+                    job_exe_end.task_results = task_results.get_dict()
+
+        # Bulk create new job_exe_end models and record them in the intra-day metrics in the same transaction
         if models_to_create:
             logger.info('Creating %d job_exe_end model(s)', len(models_to_create))
-            JobExecutionEnd.objects.bulk_create(models_to_create)
+            with transaction.atomic():
+                JobExecutionEnd.objects.bulk_create(models_to_create)
+                # Update the rollups last so that their row locks are held for as little of the transaction as possible
+                MetricsJobTypeRollup.objects.update_rollups(models_to_create)
 
         return True
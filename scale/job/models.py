@@ -74,7 +74,7 @@ class JobManager(models.Manager):
     """
 
     def create_job(self, job_type, event_id, root_recipe_id=None, recipe_id=None, batch_id=None, superseded_job=None,
-                   delete_superseded=True):
+                   delete_superseded=True, job_type_rev=None):
         """Creates a new job for the given type and returns the job model. Optionally a job can be provided that the new
         job is superseding. The returned job model will have not yet been saved in the database.
 
@@ -92,6 +92,8 @@ class JobManager(models.Manager):
         :type superseded_job: :class:`job.models.Job`
         :param delete_superseded: Whether the created job should delete products from the superseded job
         :type delete_superseded: :class:`job.models.Job`
+        :param job_type_rev: The current revision of the job type, retrieved from the database if not provided
+        :type job_type_rev: :class:`job.models.JobTypeRevision`
         :returns: The new job
         :rtype: :class:`job.models.Job`
         """
@@ -101,7 +103,9 @@ class JobManager(models.Manager):
 
         job = Job()
         job.job_type = job_type
-        job.job_type_rev = JobTypeRevision.objects.get_revision(job_type.id, job_type.revision_num)
+        if not job_type_rev:
+            job_type_rev = JobTypeRevision.objects.get_revision(job_type.id, job_type.revision_num)
+        job.job_type_rev = job_type_rev
         job.event_id = event_id
         job.root_recipe_id = root_recipe_id if root_recipe_id else recipe_id
         job.recipe_id = recipe_id
@@ -124,6 +128,44 @@ class JobManager(models.Manager):
 
         return job
 
+    def create_jobs(self, job_type, event_ids, data_list):
+        """Creates and saves a new job of the given type for each of the given events and job data, in bulk. The input
+        of each new job is validated and populated as in :meth:`populate_job_data`. The caller must be in an atomic
+        transaction.
+
+        :param job_type: The type of the jobs to create
+        :type job_type: :class:`job.models.JobType`
+        :param event_ids: The IDs of the events that triggered the creation of each job
+        :type event_ids: list
+        :param data_list: The job data for each job, in the same order as the event IDs
+        :type data_list: [:class:`job.configuration.data.job_data.JobData`]
+        :returns: The new job models
+        :rtype: [:class:`job.models.Job`]
+
+        :raises job.configuration.data.exceptions.InvalidData: If any of the job data is invalid
+        """
+
+        job_type_rev = JobTypeRevision.objects.get_revision(job_type.id, job_type.revision_num)
+
+        jobs = []
+        for event_id, data in zip(event_ids, data_list):
+            job = self.create_job(job_type, event_id, job_type_rev=job_type_rev)
+            interface = job.get_job_interface()
+            data = JobDataSunset.create(interface, data=data.get_dict())
+            interface.validate_data(data)
+            job.input = data.get_dict()
+            if not data.get_input_file_ids():
+                job.input_file_size = 0.0  # No input files to process
+            jobs.append(job)
+        self.bulk_create(jobs)
+
+        # Jobs without input files already have an input file size, so only jobs with input files are processed here
+        for job in jobs:
+            if job.input_file_size is None:
+                self.process_job_input(job)
+
+        return jobs
+
     def filter_jobs(self, started=None, ended=None, statuses=None, job_ids=None, job_type_ids=None, job_type_names=None,
                     job_type_categories=None, batch_ids=None, error_categories=None, error_ids=None,
                     include_superseded=False, order=None):
@@ -1650,7 +1692,7 @@ class JobExecutionManager(models.Manager):
             pass
 
         logger.warning('Job execution with number %d not found, querying for last job execution', exe_num)
-        job_exe = self.select_related('job__job_type', 'job__job_type_rev').filter(job_id=job_id).order('-id')[0]
+        job_exe = self.select_related('job__job_type', 'job__job_type_rev').filter(job_id=job_id).order_by('-id')[0]
         logger.info('Found job execution with ID %d', job_exe.id)
         return job_exe
 
@@ -1707,9 +1749,27 @@ class JobExecutionManager(models.Manager):
         """
 
         qry = self.filter(job__status__in=['QUEUED', 'RUNNING'], exe_num=F('job__num_exes'))
-        qry = qry.defer('resources', 'configuration').iterator()
+        qry = qry.defer('resources', 'configuration', 'storage_metrics').iterator()
         return qry
 
+    @transaction.atomic
+    def update_storage_metrics(self, job_exe_id, task_type, metrics):
+        """Records the given broker transfer metrics for a task of the given job execution. These metrics are added to
+        the task results when the job execution ends.
+
+        :param job_exe_id: The ID of the job execution
+        :type job_exe_id: int
+        :param task_type: The type of the task that performed the transfers
+        :type task_type: string
+        :param metrics: The summary of the transfer metrics, stored by broker type and then by operation
+        :type metrics: dict
+        """
+
+        job_exe = self.select_for_update().only('storage_metrics').get(id=job_exe_id)
+        storage_metrics = job_exe.storage_metrics or {}
+        storage_metrics[task_type] = metrics
+        self.filter(id=job_exe_id).update(storage_metrics=storage_metrics)
+
 
 class JobExecution(models.Model):
     """Represents a job execution that has been scheduled to run on a node
@@ -1738,6 +1798,9 @@ class JobExecution(models.Model):
     :type resources: :class:`django.contrib.postgres.fields.JSONField`
     :keyword configuration: JSON description describing the configuration for how the job execution should be run
     :type configuration: :class:`django.contrib.postgres.fields.JSONField`
+    :keyword storage_metrics: JSON description of the broker transfer metrics recorded by each task of this job
+        execution, stored by task type
+    :type storage_metrics: :class:`django.contrib.postgres.fields.JSONField`
 
     :keyword queued: When the job execution was added to the queue
     :type queued: :class:`django.db.models.DateTimeField`
@@ -1759,6 +1822,7 @@ class JobExecution(models.Model):
     input_file_size = models.FloatField(blank=True, null=True)
     resources = django.contrib.postgres.fields.JSONField(default=dict)
     configuration = django.contrib.postgres.fields.JSONField(default=dict)
+    storage_metrics = django.contrib.postgres.fields.JSONField(blank=True, null=True)
 
     queued = models.DateTimeField()
     started = models.DateTimeField(blank=True, null=True)
@@ -6,7 +6,6 @@ import json
 import logging
 import os
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from data.interface.json.interface_v6 import InterfaceV6
@@ -19,6 +18,7 @@ from job.seed.types import SeedInputFiles, SeedInputJson, SeedOutputJson, SeedOu
 from scheduler.vault.manager import secrets_mgr
 from storage.media_type import UNKNOWN_MEDIA_TYPE
 from util.environment import normalize_env_var_name
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +47,7 @@ class SeedManifest(object):
 
         try:
             if do_validate:
-                validate(definition, SEED_MANIFEST_SCHEMA)
+                validate_json(definition, SEED_MANIFEST_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidSeedManifestDefinition(validation_error)
 
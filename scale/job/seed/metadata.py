@@ -5,10 +5,10 @@ import json
 import logging
 import os
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.seed.exceptions import InvalidSeedMetadataDefinition
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -35,12 +35,10 @@ class SeedMetadata(object):
 
         try:
             if do_validate:
-                validate(definition, METADATA_SCHEMA)
+                validate_json(definition, METADATA_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidSeedMetadataDefinition(validation_error)
 
-        self._populate_default_values()
-
     def get_geometry(self):
         """Retrieves GeoJSON geometry if it is available in metadata object
 
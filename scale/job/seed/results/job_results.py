@@ -4,8 +4,10 @@ from __future__ import unicode_literals
 import json
 import logging
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
 
 import os
+from django.conf import settings
 
 from data.data.value import FileValue, JsonValue
 from data.data.json.data_v6 import convert_data_to_v6_json, DataV6
@@ -168,7 +170,8 @@ class JobResults(object):
         self._store_output_data_files(output_files, job_data, job_exe)
 
     def _capture_output_files(self, seed_output_files):
-        """Evaluate files patterns and capture any available side-car metadata associated with matched files
+        """Evaluate files patterns and capture any available side-car metadata associated with matched files. The
+        side-car metadata of the matched files is read by a pool of threads.
 
         :param seed_output_files: interface definition of Seed output files that should be captured
         :type seed_output_files: [`job.seed.types.SeedOutputFiles`]
@@ -179,43 +182,66 @@ class JobResults(object):
         # Dict of detected files and associated metadata
         captured_files = {}
 
-        # Iterate over each files object
+        # Evaluate each files object pattern, files that are detected are handled below (may be multiple)
+        matched_files = []  # [(SeedOutputFiles, matched file path)]
         for output_file in seed_output_files:
-            # For files obj that are detected, handle results (may be multiple)
-            product_files = []
+            captured_files[output_file.name] = []
             for matched_file in output_file.get_files():
+                matched_files.append((output_file, matched_file))
 
-                product_file_meta = ProductFileMetadata(output_file.name, matched_file, output_file.media_type)
+        if len(matched_files) > 1 and settings.POST_STEPS_THREADS > 1:
+            pool = ThreadPool(min(settings.POST_STEPS_THREADS, len(matched_files)))
+            try:
+                product_files = pool.map(JobResults._capture_output_file, matched_files)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            product_files = [JobResults._capture_output_file(matched) for matched in matched_files]
+
+        for product_file_meta in product_files:
+            captured_files[product_file_meta.output_name].append(product_file_meta)
+
+        return captured_files
+
+    @staticmethod
+    def _capture_output_file(matched):
+        """Captures the given matched output file along with any side-car metadata associated with it
 
-                # check to see if there is side-car metadata files
-                metadata_file = os.path.join(matched_file, METADATA_SUFFIX)
+        :param matched: The Seed output files interface and the path of the file that matched its pattern
+        :type matched: tuple
+        :return: The metadata of the captured file
+        :rtype: :class:`product.types.ProductFileMetadata`
+        """
 
-                # If metadata is found, attempt to grab any Scale relevant data and place in ProductFileMetadata tuple
-                if os.path.isfile(metadata_file):
-                    with open(metadata_file) as metadata_file_handle:
-                        metadata = SeedMetadata(json.load(metadata_file_handle))
+        output_file, matched_file = matched
+        product_file_meta = ProductFileMetadata(output_file.name, matched_file, output_file.media_type)
 
-                        # Create a GeoJSON object, as the present Seed Metadata schema only uses the Geometry fragment
-                        # TODO: Update if Seed schema updates.  Ref: https://github.com/ngageoint/seed/issues/95
-                        product_file_meta.geojson = \
-                            {
-                                'type': 'Feature',
-                                'geometry': metadata.get_geometry()
-                            }
+        # check to see if there is side-car metadata files
+        metadata_file = matched_file + METADATA_SUFFIX
 
-                        timestamp = metadata.get_time()
+        # If metadata is found, attempt to grab any Scale relevant data and place in ProductFileMetadata tuple
+        if os.path.isfile(metadata_file):
+            with open(metadata_file) as metadata_file_handle:
+                metadata = SeedMetadata(json.load(metadata_file_handle))
 
-                        # Seed Metadata Schema defines start / end as required
-                        # so we do not need to check here.
-                        if timestamp:
-                            product_file_meta.data_start = timestamp['start']
-                            product_file_meta.data_end = timestamp['end']
+                # Create a GeoJSON object, as the present Seed Metadata schema only uses the Geometry fragment
+                # TODO: Update if Seed schema updates.  Ref: https://github.com/ngageoint/seed/issues/95
+                product_file_meta.geojson = \
+                    {
+                        'type': 'Feature',
+                        'geometry': metadata.get_geometry()
+                    }
 
-                product_files.append(product_file_meta)
+                timestamp = metadata.get_time()
 
-            captured_files[output_file.name] = product_files
+                # Seed Metadata Schema defines start / end as required
+                # so we do not need to check here.
+                if timestamp:
+                    product_file_meta.data_start = timestamp['start']
+                    product_file_meta.data_end = timestamp['end']
 
-        return captured_files
+        return product_file_meta
 
     def _capture_output_json(self, output_json_interface):
         """Captures any JSON property output from a job execution
@@ -268,6 +268,10 @@ class TestScheduledExecutionConfigurator(TestCase):
                                                    'PORT': 'TEST_PORT'}}
             mock_settings.BROKER_URL = 'mock://broker-url'
             mock_settings.QUEUE_NAME = ''
+            mock_settings.INGEST_JOB_BATCH_SIZE = 1
+            mock_settings.INPUT_FILE_CACHE_DIR = None
+            mock_settings.INGEST_SKIP_DUPLICATE_CONTENT = False
+            mock_settings.VERIFY_FILE_CHECKSUMS = False
             configurator = ScheduledExecutionConfigurator(workspaces)
             exe_config_with_secrets = configurator.configure_scheduled_job(job_exe_model, ingest_job_type,
                                                                            queue.get_job_interface(), 'INFO')
@@ -367,6 +371,10 @@ class TestScheduledExecutionConfigurator(TestCase):
                                                        'PORT': 'TEST_PORT'}}
                 mock_settings.BROKER_URL = 'mock://broker-url'
                 mock_settings.QUEUE_NAME = ''
+                mock_settings.INGEST_JOB_BATCH_SIZE = 1
+                mock_settings.INPUT_FILE_CACHE_DIR = None
+                mock_settings.INGEST_SKIP_DUPLICATE_CONTENT = False
+                mock_settings.VERIFY_FILE_CHECKSUMS = False
                 mock_secrets_mgr.retrieve_job_type_secrets = MagicMock()
                 mock_secrets_mgr.retrieve_job_type_secrets.return_value = {}
                 configurator = ScheduledExecutionConfigurator({})
@@ -468,6 +476,10 @@ class TestScheduledExecutionConfigurator(TestCase):
                                                        'PORT': 'TEST_PORT'}}
                 mock_settings.BROKER_URL = 'mock://broker-url'
                 mock_settings.QUEUE_NAME = ''
+                mock_settings.INGEST_JOB_BATCH_SIZE = 1
+                mock_settings.INPUT_FILE_CACHE_DIR = None
+                mock_settings.INGEST_SKIP_DUPLICATE_CONTENT = False
+                mock_settings.VERIFY_FILE_CHECKSUMS = False
                 mock_secrets_mgr.retrieve_job_type_secrets = MagicMock()
                 mock_secrets_mgr.retrieve_job_type_secrets.return_value = {'s_2': 's_2_secret'}
                 configurator = ScheduledExecutionConfigurator(workspaces)
@@ -705,6 +717,10 @@ class TestScheduledExecutionConfigurator(TestCase):
                                                        'PORT': 'TEST_PORT'}}
                 mock_settings.BROKER_URL = 'mock://broker-url'
                 mock_settings.QUEUE_NAME = ''
+                mock_settings.INGEST_JOB_BATCH_SIZE = 1
+                mock_settings.INPUT_FILE_CACHE_DIR = None
+                mock_settings.INGEST_SKIP_DUPLICATE_CONTENT = False
+                mock_settings.VERIFY_FILE_CHECKSUMS = False
                 mock_secrets_mgr.retrieve_job_type_secrets = MagicMock()
                 mock_secrets_mgr.retrieve_job_type_secrets.return_value = {'s_1': 's_1_secret', 's_2': 's_2_secret'}
                 configurator = ScheduledExecutionConfigurator({})
@@ -834,6 +850,10 @@ class TestScheduledExecutionConfigurator(TestCase):
                                                        'SCALE_DB_PORT': 'TEST_PORT'}}
                 mock_settings.BROKER_URL = 'mock://broker-url'
                 mock_settings.QUEUE_NAME = ''
+                mock_settings.INGEST_JOB_BATCH_SIZE = 1
+                mock_settings.INPUT_FILE_CACHE_DIR = None
+                mock_settings.INGEST_SKIP_DUPLICATE_CONTENT = False
+                mock_settings.VERIFY_FILE_CHECKSUMS = False
                 mock_secrets_mgr.retrieve_job_type_secrets = MagicMock()
                 mock_secrets_mgr.retrieve_job_type_secrets.return_value = {}
             configurator = ScheduledExecutionConfigurator({})
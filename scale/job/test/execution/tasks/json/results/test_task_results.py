@@ -21,3 +21,17 @@ class TestTaskResults(TestCase):
         # Invalid version
         config = {'version': 'BAD'}
         self.assertRaises(InvalidTaskResults, TaskResults, config)
+
+    def test_add_storage_metrics(self):
+        """Tests calling add_storage_metrics() successfully"""
+
+        task_results = TaskResults({'tasks': [{'task_id': 'pre_id', 'type': 'pre', 'was_launched': True},
+                                              {'task_id': 'main_id', 'type': 'main', 'was_launched': True}]})
+        metrics = {'s3': {'download': {'calls': 1, 'files': 2, 'bytes': 100}}}
+
+        task_results.add_storage_metrics({'pre': metrics})
+
+        tasks = task_results.get_dict()['tasks']
+        self.assertDictEqual(tasks[0]['storage'], metrics)
+        self.assertFalse('storage' in tasks[1])
+        TaskResults(task_results.get_dict())  # Storage metrics pass validation
@@ -16,6 +16,28 @@ class TestBlockedJobs(TransactionTestCase):
     def setUp(self):
         django.setup()
 
+    def test_merge(self):
+        """Tests merging BlockedJobs messages together"""
+
+        when = now()
+        message_1 = BlockedJobs()
+        message_1.status_change = when
+        message_1.add_job(1)
+        message_2 = BlockedJobs()
+        message_2.status_change = when
+        message_2.add_job(1)
+        message_2.add_job(2)
+
+        self.assertTrue(message_1.merge(message_2))
+        self.assertListEqual(message_1._blocked_job_ids, [1, 2])
+
+        # Messages with different status change times cannot be merged
+        message_3 = BlockedJobs()
+        message_3.status_change = when + datetime.timedelta(seconds=1)
+        message_3.add_job(3)
+        self.assertFalse(message_1.merge(message_3))
+        self.assertListEqual(message_1._blocked_job_ids, [1, 2])
+
     def test_json(self):
         """Tests coverting a BlockedJobs message to and from JSON"""
 
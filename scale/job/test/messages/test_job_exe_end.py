@@ -9,6 +9,7 @@ from error.models import reset_error_cache
 from job.messages.job_exe_end import CreateJobExecutionEnd
 from job.models import JobExecutionEnd
 from job.tasks.update import TaskStatusUpdate
+from metrics.models import MetricsJobTypeRollup
 
 
 class TestCreateJobExecutionEnd(TransactionTestCase):
@@ -155,3 +156,7 @@ class TestCreateJobExecutionEnd(TransactionTestCase):
         # Old models should not cause an error and no new ones should get created
         message_3.execute()
         self.assertEqual(JobExecutionEnd.objects.filter(job_exe_id__in=job_exe_ids).count(), len(job_exe_ids))
+
+        # Each job execution should be recorded in the intra-day metrics exactly once
+        completed_count = sum(rollup.completed_count for rollup in MetricsJobTypeRollup.objects.all())
+        self.assertEqual(completed_count, len(job_exe_ids))
@@ -1,5 +1,10 @@
 from __future__ import unicode_literals
 
+import json
+import os
+import shutil
+import tempfile
+
 import django
 from django.test import TransactionTestCase
 from job.seed.results.job_results import JobResults
@@ -80,6 +85,28 @@ class TestJobData(TransactionTestCase):
         self.assertEqual(files[0].__dict__, ProductFileMetadata(name, 'outfile0.tif', media_type='image/tiff').__dict__)
         self.assertEqual(files[1].__dict__, ProductFileMetadata(name, 'outfile1.tif', media_type='image/tiff').__dict__)
 
+    @patch('job.seed.types.SeedOutputFiles.get_files')
+    def test_capture_output_files_metadata(self, get_files):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        paths = [os.path.join(output_dir, 'outfile%i.tif' % i) for i in range(3)]
+        metadata = {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [0, 1]}, 'properties': None,
+                    'time': {'start': '2015-05-15T10:34:12Z', 'end': '2015-05-15T10:36:12Z'}}
+        with open(paths[1] + '.metadata.json', 'w') as metadata_file:
+            json.dump(metadata, metadata_file)
+        output_files = [SeedOutputFiles(self.test_output_snippet)]
+        get_files.return_value = paths
+
+        outputs = JobResults()._capture_output_files(output_files)
+
+        files = outputs['OUTPUT_TIFFS']
+        self.assertListEqual([f.local_path for f in files], paths)
+        self.assertIsNone(files[0].geojson)
+        self.assertDictEqual(files[1].geojson, {'type': 'Feature', 'geometry': metadata['geometry']})
+        self.assertEqual(files[1].data_start, '2015-05-15T10:34:12Z')
+        self.assertEqual(files[1].data_end, '2015-05-15T10:36:12Z')
+        self.assertIsNone(files[2].data_start)
+
     @patch('os.path.isfile', return_value=True)
     @patch('job.seed.results.job_results.DATA_FILE_STORE',
            new_callable=lambda: {'DATA_FILE_STORE': DummyDataFileStore()})
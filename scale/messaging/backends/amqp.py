@@ -6,7 +6,7 @@ from __future__ import unicode_literals
 
 import Queue
 import logging
-from contextlib import closing
+import threading
 
 from kombu import Connection
 
@@ -24,26 +24,221 @@ class AMQPMessagingBackend(MessagingBackend):
         # Message retrieval timeout
         self._timeout = 1
 
+        # Once a batch has started, shorter timeout used to collect the rest of it from already prefetched messages
+        self._batch_timeout = 0.1
+
+        # Number of attempts made to (re)establish the broker connection before giving up
+        self._max_retries = 3
+
+        # Persistent connection and queue, lazily created and shared by send and receive. AMQP channels must not be
+        # shared between threads, so each thread holds its own. Every thread's connection is also tracked so that they
+        # can all be released when the backend is closed.
+        self._local = threading.local()
+        self._reset_local()
+        self._connections = {}  # {Thread ID: (connection, simple queue)}
+        self._connections_lock = threading.Lock()
+
+    def close(self):
+        """See :meth:`messaging.backends.backend.MessagingBackend.close`
+
+        The connections held by every thread are released, so the other threads must no longer be using the backend.
+        A thread that uses the backend again afterwards opens a new connection.
+        """
+
+        with self._connections_lock:
+            connections = self._connections.values()
+            self._connections = {}
+        self._reset_local()
+
+        for connection, simple_queue in connections:
+            self._release_connection(connection, simple_queue)
+
+    def acknowledge_messages(self, receipts):
+        """See :meth:`messaging.backends.backend.MessagingBackend.acknowledge_messages`
+
+        When the messages include the oldest outstanding deliveries on the channel, all of those are acknowledged with
+        a single multiple-ack of the last one's delivery tag. Any other messages are acknowledged individually.
+        """
+
+        unacked = self._get_unacked()
+        messages = sorted(receipts, key=lambda message: message.delivery_tag)
+        outstanding = sorted(unacked)
+
+        # A multiple-ack covers every outstanding delivery up to its tag, so only use it for the run of messages that
+        # matches the oldest outstanding deliveries exactly
+        run = 0
+        while run < len(messages) and run < len(outstanding) and messages[run].delivery_tag == outstanding[run]:
+            run += 1
+
+        connection_errors = self._get_connection_errors()
+        try:
+            if run:
+                messages[run - 1].ack(multiple=True)
+            for message in messages[run:]:
+                message.ack()
+            unacked.difference_update(message.delivery_tag for message in messages)
+        except connection_errors:
+            # Delivery tags are bound to the lost channel, so the broker will redeliver the remaining messages
+            logger.exception('AMQP connection lost while acknowledging messages')
+            self._handle_connection_failure()
+
+    def fetch_messages(self, batch_size):
+        """See :meth:`messaging.backends.backend.MessagingBackend.fetch_messages`"""
+
+        simple_queue = self._get_simple_queue()
+        connection_errors = self._get_connection_errors()
+        messages = []
+        try:
+            # Have the broker push up to the following batch while this one is processed
+            prefetch_count = batch_size * 2
+            if getattr(self._local, 'prefetch_count', 0) != prefetch_count:
+                simple_queue.consumer.qos(prefetch_count=prefetch_count)
+                self._local.prefetch_count = prefetch_count
+
+            for _ in range(batch_size):
+                timeout = self._batch_timeout if messages else self._timeout
+                message = simple_queue.get(timeout=timeout)
+                messages.append((message.payload, message))
+                self._get_unacked().add(message.delivery_tag)
+        except Queue.Empty:
+            # We've reached the end of the queue
+            pass
+        except connection_errors:
+            # Fetched messages can no longer be acknowledged and will be redelivered, reconnect on the next call
+            logger.exception('AMQP connection lost while receiving messages')
+            self._handle_connection_failure()
+            return []
+        return messages
+
+    def release_messages(self, receipts):
+        """See :meth:`messaging.backends.backend.MessagingBackend.release_messages`"""
+
+        connection_errors = self._get_connection_errors()
+        try:
+            for message in receipts:
+                message.requeue()
+                self._get_unacked().discard(message.delivery_tag)
+        except connection_errors:
+            # The broker will redeliver the remaining messages once it notices the lost channel
+            logger.exception('AMQP connection lost while releasing messages')
+            self._handle_connection_failure()
+
     def send_messages(self, messages):
         """See :meth:`messaging.backends.backend.MessagingBackend.send_messages`"""
-        with Connection(self._broker_url) as connection:
-            with closing(connection.SimpleQueue(self._queue_name)) as simple_queue:
+
+        # Retry once on a fresh connection if the persistent one turns out to be dead
+        for attempt in range(2):
+            simple_queue = self._get_simple_queue()
+            try:
                 for message in messages:
                     logger.debug('Sending message of type: %s', message['type'])
                     simple_queue.put(message)
+                return
+            except self._get_connection_errors():
+                self._handle_connection_failure()
+                if attempt:
+                    raise
+                # Messages may be re-sent on retry, which command messages are designed to tolerate
+                logger.warning('AMQP connection lost while sending messages, reconnecting...')
+
+    def _get_connection_errors(self):
+        """Returns the exception types that indicate the current connection or channel is no longer usable
+
+        :return: The connection and channel exception types of the underlying transport
+        :rtype: tuple
+        """
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return ()
+        return tuple(connection.connection_errors) + tuple(connection.channel_errors)
+
+    def _get_unacked(self):
+        """Returns the delivery tags of messages fetched on the calling thread's channel that have been neither
+        acknowledged nor released
+
+        :return: The outstanding delivery tags
+        :rtype: set
+        """
+
+        if not hasattr(self._local, 'unacked'):
+            self._local.unacked = set()
+        return self._local.unacked
+
+    def _get_simple_queue(self):
+        """Returns the persistent queue, health-checking the broker connection and reconnecting if needed
+
+        :return: The queue bound to the persistent connection
+        :rtype: :class:`kombu.simple.SimpleQueue`
+        """
+
+        thread_id = threading.current_thread().ident
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and thread_id not in self._connections:
+            # The connection was released when the backend was closed
+            self._reset_local()
+            connection = None
+
+        if connection is not None and connection.connected:
+            self._connection_stats['reused'] += 1
+            return self._local.simple_queue
+
+        if connection is not None:
+            logger.warning('AMQP connection is no longer healthy, reconnecting...')
+            self._close_local_connection()
+
+        connection = Connection(self._broker_url)
+        connection.ensure_connection(max_retries=self._max_retries)
+        self._local.connection = connection
+        self._local.simple_queue = connection.SimpleQueue(self._queue_name)
+        with self._connections_lock:
+            # A connection left behind by a finished thread with the same ID is released
+            stale_connection = self._connections.get(thread_id)
+            self._connections[thread_id] = (connection, self._local.simple_queue)
+        if stale_connection:
+            self._release_connection(*stale_connection)
+        self._connection_stats['opened'] += 1
+        logger.info('Opened AMQP connection to %s', self._broker.get_address())
+        return self._local.simple_queue
+
+    def _close_local_connection(self):
+        """Releases the connection held by the calling thread"""
+
+        with self._connections_lock:
+            local_connection = self._connections.pop(threading.current_thread().ident, None)
+        self._reset_local()
+
+        if local_connection:
+            self._release_connection(*local_connection)
+
+    def _handle_connection_failure(self):
+        """Records a connection failure and drops the calling thread's persistent connection"""
+
+        self._connection_stats['failures'] += 1
+        self._close_local_connection()
+
+    def _release_connection(self, connection, simple_queue):
+        """Closes the given queue and releases its connection
+
+        :param connection: The connection to release
+        :type connection: :class:`kombu.Connection`
+        :param simple_queue: The queue bound to the connection
+        :type simple_queue: :class:`kombu.simple.SimpleQueue`
+        """
+
+        try:
+            simple_queue.close()
+        except Exception:
+            logger.exception('Error closing AMQP queue')
+        try:
+            connection.release()
+        except Exception:
+            logger.exception('Error releasing AMQP connection')
+
+    def _reset_local(self):
+        """Clears the connection state of the calling thread"""
 
-    def receive_messages(self, batch_size):
-        """See :meth:`messaging.backends.backend.MessagingBackend.receive_messages`"""
-        with Connection(self._broker_url) as connection:
-            with closing(connection.SimpleQueue(self._queue_name)) as simple_queue:
-                for _ in range(batch_size):
-                    try:
-                        message = simple_queue.get(timeout=self._timeout)
-
-                        # Accept success back via generator send
-                        success = yield message.payload
-                        if success:
-                            message.ack()
-                    except Queue.Empty:
-                        # We've reached the end of the queue... exit loop
-                        break
+        self._local.connection = None
+        self._local.simple_queue = None
+        self._local.prefetch_count = 0
+        self._local.unacked = set()
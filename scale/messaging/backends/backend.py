@@ -22,30 +22,64 @@ class MessagingBackend(object):
         # TODO: Transition to more advanced message routing per command message type
         self._queue_name = settings.QUEUE_NAME
 
-    @abstractmethod
-    def send_messages(self, messages):
-        """Send a collection of messages to the backend
-        
-        Connections are not persisted across send_messages calls. It is recommended that if a large
-        number of messages are to be sent it be done directly in a single function call.
+        # Counters tracking how often the persistent broker connection is opened versus reused
+        self._connection_stats = {'opened': 0, 'reused': 0, 'failures': 0}
 
-        :param messages: JSON payload of messages
-        :type messages: [dict]
+    def close(self):
+        """Releases any persistent connection held to the broker. The next send or receive will reconnect.
+        """
+
+        pass
+
+    def get_connection_stats(self):
+        """Returns counters describing broker connection usage for this backend
+
+        :return: The number of connections opened, calls that reused an existing connection and connection failures
+        :rtype: dict
         """
 
+        return dict(self._connection_stats)
+
     @abstractmethod
-    def receive_messages(self, batch_size):
-        """Receive a batch of messages from the backend
+    def acknowledge_messages(self, receipts):
+        """Acknowledge / delete messages previously returned by fetch_messages so they are not delivered again
 
-        Connections are not persisted across receive_messages calls. It is recommended that if a large
-        number of messages are to be retrieved it be done directly in a single function call.
+        :param receipts: Receipts of the successfully processed messages
+        :type receipts: list
+        """
+
+    @abstractmethod
+    def fetch_messages(self, batch_size):
+        """Receive a batch of messages from the backend without acknowledging them
 
-        Implementing function must yield messages from backend. Messages must be
-        in dict form. It is also the responsibility of the function to handle a boolean response
-        and appropriately acknowledge / delete message on True
+        Each message is returned alongside an opaque receipt. Messages remain unacknowledged until their receipts are
+        passed to acknowledge_messages or release_messages, which must be called from the same thread that fetched
+        them. Backends may retrieve the following batch in the background and keep fetched messages from being
+        redelivered to other consumers while they are in progress.
 
-        :param batch_size: Number of messages to be processed
+        :param batch_size: Maximum number of messages to be retrieved
         :type batch_size: int
-        :return: Yielded list of messages
-        :rtype: Generator[dict]
+        :return: List of tuples of message dict and receipt
+        :rtype: [(dict, object)]
+        """
+
+    def release_messages(self, receipts):
+        """Gives up on messages previously returned by fetch_messages that could not be processed, so they will be
+        delivered again. Must be called from the same thread that fetched them.
+
+        :param receipts: Receipts of the messages that failed to be processed
+        :type receipts: list
+        """
+
+        pass
+
+    @abstractmethod
+    def send_messages(self, messages):
+        """Send a collection of messages to the backend
+        
+        A single broker connection is persisted and shared across send_messages and fetch_messages calls. It is
+        re-established automatically if the broker drops it.
+
+        :param messages: JSON payload of messages
+        :type messages: [dict]
         """
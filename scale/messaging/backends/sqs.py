@@ -6,7 +6,11 @@ from __future__ import unicode_literals
 
 import json
 import logging
+import threading
 import uuid
+from multiprocessing.pool import ThreadPool
+
+from botocore.exceptions import BotoCoreError, ClientError
 
 from messaging.backends.backend import MessagingBackend
 from util.aws import AWSCredentials, SQSClient
@@ -25,22 +29,205 @@ class SQSMessagingBackend(MessagingBackend):
         self._credentials = AWSCredentials(self._broker.get_user_name(),
                                            self._broker.get_password())
 
+        # Persistent client, lazily created and shared by send and receive. The underlying boto3 client keeps a
+        # pool of HTTPS connections alive, so reusing it avoids a TLS handshake per call. boto3 clients are
+        # thread-safe, so a single client is shared by all threads.
+        self._client = None
+        self._client_lock = threading.Lock()
+
+        # Duration fetched messages are hidden from other consumers, extended for as long as they are in progress
+        self._visibility_timeout = 30
+
+        # Fetched messages that have not yet been acknowledged or released, keyed by receipt handle
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+        # Background retrieval of the following batch and extension of in-flight message visibility
+        self._prefetch_pool = None
+        self._prefetch_result = None
+        self._visibility_thread = None
+        self._stopping = None
+
+    def close(self):
+        """See :meth:`messaging.backends.backend.MessagingBackend.close`
+
+        Any prefetched messages are made visible again immediately and in-flight messages are no longer extended.
+        """
+
+        if self._prefetch_result is not None:
+            prefetched = [message for _, message in self._prefetch_result.get()]
+            self._prefetch_result = None
+            self.release_messages(prefetched)
+            self._change_visibility(prefetched, 0)
+        if self._prefetch_pool is not None:
+            self._prefetch_pool.close()
+            self._prefetch_pool = None
+
+        if self._visibility_thread is not None:
+            self._stopping.set()
+            self._visibility_thread.join()
+            self._visibility_thread = None
+        with self._in_flight_lock:
+            self._in_flight = {}
+
+        self._client = None
+
+    def acknowledge_messages(self, receipts):
+        """See :meth:`messaging.backends.backend.MessagingBackend.acknowledge_messages`
+
+        Messages are deleted with DeleteMessageBatch requests of up to 10 messages each.
+        """
+
+        entries = []
+        for i, message in enumerate(receipts):
+            entries.append({'Id': str(i), 'ReceiptHandle': message.receipt_handle})
+        try:
+            failed = self._get_client().delete_messages(self._queue_name, entries) if entries else []
+            for failure in failed:
+                # Undeleted messages become visible again after their timeout
+                logger.warning('Failed to delete SQS message: %s %s', failure.get('Code'), failure.get('Message'))
+        except (BotoCoreError, ClientError):
+            # Undeleted messages become visible again after their timeout
+            logger.exception('SQS request failed while deleting messages')
+            self._handle_connection_failure()
+        self.release_messages(receipts)
+
+    def fetch_messages(self, batch_size):
+        """See :meth:`messaging.backends.backend.MessagingBackend.fetch_messages`
+
+        The following batch is retrieved in the background while this batch is processed. The visibility timeout of
+        every message that has been fetched, but not yet acknowledged or released, is automatically extended.
+        """
+
+        if self._visibility_thread is None:
+            self._stopping = threading.Event()
+            self._visibility_thread = threading.Thread(target=self._extend_visibility, name='SQS visibility')
+            self._visibility_thread.daemon = True
+            self._visibility_thread.start()
+
+        if self._prefetch_result is not None:
+            messages = self._prefetch_result.get()
+        else:
+            messages = self._receive(batch_size)
+
+        if self._prefetch_pool is None:
+            self._prefetch_pool = ThreadPool(1)
+        self._prefetch_result = self._prefetch_pool.apply_async(self._receive, (batch_size,))
+
+        return messages
+
+    def release_messages(self, receipts):
+        """See :meth:`messaging.backends.backend.MessagingBackend.release_messages`
+
+        Released messages are no longer extended and become visible again once their current timeout expires.
+        """
+
+        with self._in_flight_lock:
+            for message in receipts:
+                self._in_flight.pop(message.receipt_handle, None)
+
     def send_messages(self, messages):
         """See:meth:`messaging.backends.backend.MessagingBackend.send_messages`"""
-        with SQSClient(self._credentials, self._region_name) as client:
-            encoded_messages = []
-            for message in messages:
-                encoded_messages.append({'Id': str(uuid.uuid4()), 'MessageBody': json.dumps(message)})
 
-            client.send_messages(self._queue_name, encoded_messages)
+        encoded_messages = []
+        for message in messages:
+            encoded_messages.append({'Id': str(uuid.uuid4()), 'MessageBody': json.dumps(message)})
+
+        # Retry once on a fresh client if the persistent one fails
+        for attempt in range(2):
+            client = self._get_client()
+            try:
+                client.send_messages(self._queue_name, encoded_messages)
+                return
+            except (BotoCoreError, ClientError):
+                self._handle_connection_failure()
+                if attempt:
+                    raise
+                logger.warning('SQS request failed while sending messages, reconnecting...')
+
+    def _change_visibility(self, messages, visibility_timeout):
+        """Changes the visibility timeout of the given messages
+
+        :param messages: The messages to change
+        :type messages: [`boto3.sqs.Message`]
+        :param visibility_timeout: The new visibility timeout in seconds, counted from now
+        :type visibility_timeout: int
+        """
+
+        if not messages:
+            return
+
+        entries = []
+        for i, message in enumerate(messages):
+            entries.append({'Id': str(i), 'ReceiptHandle': message.receipt_handle,
+                            'VisibilityTimeout': visibility_timeout})
+        try:
+            failed = self._get_client().change_message_visibility_batch(self._queue_name, entries)
+            if failed:
+                # Typically messages that were deleted in the meantime
+                logger.debug('Failed to change visibility of %d SQS message(s)', len(failed))
+        except (BotoCoreError, ClientError):
+            logger.exception('SQS request failed while changing message visibility')
+            self._handle_connection_failure()
+
+    def _extend_visibility(self):
+        """Runs on a background thread, periodically extending the visibility timeout of all in-flight messages
+        until the backend is closed
+        """
+
+        stopping = self._stopping
+        while not stopping.wait(self._visibility_timeout / 3.0):
+            with self._in_flight_lock:
+                messages = self._in_flight.values()
+            try:
+                self._change_visibility(messages, self._visibility_timeout)
+            except Exception:
+                logger.exception('Unexpected error extending SQS message visibility')
+
+    def _receive(self, batch_size):
+        """Receives a batch of messages and tracks them as in-flight
+
+        :param batch_size: Maximum number of messages to be retrieved
+        :type batch_size: int
+        :return: List of tuples of message dict and SQS message
+        :rtype: [(dict, `boto3.sqs.Message`)]
+        """
+
+        client = self._get_client()
+        messages = []
+        try:
+            for message in client.receive_messages(self._queue_name, batch_size=batch_size,
+                                                   visibility_timeout_seconds=self._visibility_timeout):
+                with self._in_flight_lock:
+                    self._in_flight[message.receipt_handle] = message
+                messages.append((json.loads(message.body), message))
+        except (BotoCoreError, ClientError):
+            # Messages already received become visible again after their timeout, reconnect on the next call
+            logger.exception('SQS request failed while receiving messages')
+            self._handle_connection_failure()
+        return messages
+
+    def _get_client(self):
+        """Returns the persistent SQS client, creating it if needed
+
+        :return: The SQS client
+        :rtype: :class:`util.aws.SQSClient`
+        """
+
+        with self._client_lock:
+            if self._client is not None:
+                self._connection_stats['reused'] += 1
+                return self._client
 
-    def receive_messages(self, batch_size):
-        """See :meth:`messaging.backends.backend.MessagingBackend.receive_messages`"""
+            # The client is intentionally never exited, its session lives as long as this backend
+            self._client = SQSClient(self._credentials, self._region_name).__enter__()
+            self._connection_stats['opened'] += 1
+            logger.info('Opened SQS client for region %s', self._region_name)
+            return self._client
 
-        with SQSClient(self._credentials, self._region_name) as client:
-            for message in client.receive_messages(self._queue_name, batch_size=batch_size):
-                # Accept success back via generator send
-                success = yield json.loads(message.body)
-                if success:
-                    message.delete()
+    def _handle_connection_failure(self):
+        """Records a connection failure and drops the persistent client along with its cached queue URLs"""
 
+        self._connection_stats['failures'] += 1
+        with self._client_lock:
+            self._client = None
@@ -7,10 +7,12 @@ from __future__ import unicode_literals
 import logging
 import signal
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from error.models import Error
 from messaging.manager import CommandMessageManager
+from messaging.worker_pool import MessageWorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -42,8 +44,25 @@ class Command(BaseCommand):
 
         manager = CommandMessageManager()
 
+        # Execute messages concurrently if more than a single worker is configured
+        worker_counts = getattr(settings, 'MESSAGE_HANDLER_WORKERS', {})
+        worker_pool = None
+        if sum(worker_counts.values()) > 1:
+            logger.info('Processing messages concurrently with workers: %s', worker_counts)
+            worker_pool = MessageWorkerPool(worker_counts)
+
+        batch_size = getattr(settings, 'MESSAGE_HANDLER_BATCH_SIZE', 10)
+        coalesce_factor = getattr(settings, 'MESSAGE_HANDLER_COALESCE_FACTOR', 0)
+
         while self.running:
-            manager.receive_messages()
+            manager.receive_messages(worker_pool, batch_size, coalesce_factor)
+
+        # The last batch has already completed, so this only stops the idle worker threads
+        if worker_pool:
+            worker_pool.shutdown()
+
+        logger.info('Message backend connection stats: %s', manager.get_connection_stats())
+        manager.close()
 
         logger.info('Command completed: scale_message_handler')
 
@@ -32,6 +32,20 @@ class CommandMessageManager(object):
 
         self._backend = get_message_backend(broker_type)
 
+    def close(self):
+        """Releases the persistent connection held by the configured message backend"""
+
+        self._backend.close()
+
+    def get_connection_stats(self):
+        """Returns counters describing connection reuse by the configured message backend
+
+        :return: The number of connections opened, calls that reused an existing connection and connection failures
+        :rtype: dict
+        """
+
+        return self._backend.get_connection_stats()
+
     def send_messages(self, commands):
         """Serialize CommandMessages and send via configured message broker
 
@@ -45,39 +59,33 @@ class CommandMessageManager(object):
         messages = [{"type": x.type, "body": x.to_json()} for x in commands]
         self._backend.send_messages(messages)
 
-    def receive_messages(self):
+    def receive_messages(self, worker_pool=None, batch_size=10, coalesce_factor=0):
         """Main entry point to message processing.
 
-        This will process up to a batch of 10 messages at a time. Behavior may
+        This will process up to a batch of messages (10 by default) at a time. Behavior may
         differ slightly based on message backend. RabbitMQ will immediately
-        iterate over up to 10 messages, process and return. SQS will long-poll
-        up to 20 seconds or until 10 messages have been processed, process and
+        iterate over up to a batch of messages, process and return. SQS will long-poll
+        up to 20 seconds or until a batch of messages have been processed, process and
         then return.
 
         New messages will potentially be sent within this method, if CommandMessage populates
         the new_messages list.
+
+        The whole batch is fetched before any message is executed. Compatible messages of the same type within the
+        batch are merged if coalescing is enabled so each merged message is executed once, and the remaining messages
+        are executed concurrently if a worker pool is provided. Messages are only acknowledged once they have executed
+        successfully, and the batch's successful messages are acknowledged together.
+
+        :param worker_pool: The pool used to execute messages concurrently, None to process messages serially
+        :type worker_pool: :class:`messaging.worker_pool.MessageWorkerPool`
+        :param batch_size: The maximum number of messages to retrieve at a time
+        :type batch_size: int
+        :param coalesce_factor: Merged messages may hold up to this many times the normal maximum for their type, 0
+            disables merging
+        :type coalesce_factor: int
         """
 
-        message_generator = self._backend.receive_messages(10)
-
-        # Manually control iteration, so we can pass back success/failure to co-routine
-        try:
-            # Seed message to start processing
-            message = message_generator.next()
-            while True:
-                success = False
-                try:
-                    self._process_message(message)
-                    success = True
-                except InvalidCommandMessage:
-                    logger.exception('Exception encountered processing message payload. Message remains on queue.')
-                except CommandMessageExecuteFailure:
-                    logger.exception('CommandMessage failure during execute call. Message remains on queue.')
-
-                # Feed boolean to backend generator and grab next message
-                message = message_generator.send(success)
-        except StopIteration:
-            pass
+        self._receive_message_batch(batch_size, worker_pool, coalesce_factor)
 
     @staticmethod
     def _extract_command(message):
@@ -102,20 +110,46 @@ class CommandMessageManager(object):
         except KeyError as ex:
             raise_from(InvalidCommandMessage('No message type handler available.'), ex)
 
-    def _process_message(self, message):
-        """Inspects message for type and then attempts to launch execution
+    @staticmethod
+    def _coalesce_commands(commands, coalesce_factor):
+        """Merges compatible commands of the same type together
+
+        :param commands: The commands to merge, each paired with the receipts of the messages it was created from
+        :type commands: [(`messaging.messages.message.CommandMessage`, list)]
+        :param coalesce_factor: Merged messages may hold up to this many times the normal maximum for their type
+        :type coalesce_factor: int
+        :return: The merged commands, each paired with the receipts of all of the messages it represents
+        :rtype: [(`messaging.messages.message.CommandMessage`, list)]
+        """
 
-        This function will potentially fire off new messages as required by
-        execution logic within CommandMessage extending class. These messages
-        will only be sent if command execution is successful.
+        merged_commands = []
+        commands_by_type = {}
+        for command, receipts in commands:
+            merged = False
+            for existing_command, existing_receipts in commands_by_type.get(command.type, []):
+                if existing_command.merge(command, coalesce_factor):
+                    existing_receipts.extend(receipts)
+                    merged = True
+                    break
+            if not merged:
+                merged_commands.append((command, list(receipts)))
+                commands_by_type.setdefault(command.type, []).append(merged_commands[-1])
+
+        if len(merged_commands) < len(commands):
+            logger.info('Coalesced %d message(s) into %d', len(commands), len(merged_commands))
+        return merged_commands
 
-        :param message: message payload
-        :type message: dict
-        :raises InvalidCommandMessage:
+    @staticmethod
+    def _execute_command(command):
+        """Executes the given CommandMessage
+
+        :param command: The command to execute
+        :type command: `messaging.messages.message.CommandMessage`
+        :return: The successfully executed CommandMessage
+        :rtype: `messaging.messages.message.CommandMessage`
         :raises CommandMessageExecuteFailure: Failure during CommandMessage.execute
         """
 
-        command = self._extract_command(message)
         logger.info('Processing message of type %s', command.type)
         try:
             success = command.execute()
@@ -126,10 +160,68 @@ class CommandMessageManager(object):
         if not success:
             raise CommandMessageExecuteFailure
 
-        # If execute is successful, we need to fire off any downstream messages
-        self._send_downstream(command.new_messages)
+        return command
+
+    def _receive_message_batch(self, batch_size, worker_pool, coalesce_factor):
+        """Fetches a batch of messages, merges compatible messages and executes them, concurrently if a worker pool is
+        provided
+
+        Messages are fetched, acknowledged and have their downstream messages sent from the calling thread, only
+        execution happens on the worker threads. This method returns once every message in the batch has completed,
+        so stopping between calls drains all in-flight work.
+
+        :param batch_size: The maximum number of messages to retrieve
+        :type batch_size: int
+        :param worker_pool: The pool used to execute messages concurrently, possibly None
+        :type worker_pool: :class:`messaging.worker_pool.MessageWorkerPool`
+        :param coalesce_factor: Merged messages may hold up to this many times the normal maximum for their type, 0
+            disables merging
+        :type coalesce_factor: int
+        """
 
-        logger.info('Successfully completed message of type %s', command.type)
+        if worker_pool:
+            batch_size = max(batch_size, worker_pool.size)
+        messages = self._backend.fetch_messages(batch_size)
+
+        commands = []
+        released_receipts = []
+        for message, receipt in messages:
+            try:
+                commands.append((self._extract_command(message), [receipt]))
+            except InvalidCommandMessage:
+                logger.exception('Exception encountered processing message payload. Message remains on queue.')
+                released_receipts.append(receipt)
+
+        if coalesce_factor:
+            commands = self._coalesce_commands(commands, coalesce_factor)
+
+        results = []
+        for command, receipts in commands:
+            result = worker_pool.submit(command.type, self._execute_command, command) if worker_pool else None
+            results.append((command, receipts, result))
+
+        acknowledged_receipts = []
+        for command, receipts, result in results:
+            try:
+                if result:
+                    result.get()
+                else:
+                    self._execute_command(command)
+                self._send_downstream(command.new_messages)
+                logger.info('Successfully completed message of type %s', command.type)
+                acknowledged_receipts.extend(receipts)
+            except CommandMessageExecuteFailure:
+                logger.exception('CommandMessage failure during execute call. Message remains on queue.')
+                released_receipts.extend(receipts)
+            except Exception:
+                logger.exception('Failure sending downstream messages. Message remains on queue.')
+                released_receipts.extend(receipts)
+
+        # Release first so that the acknowledged messages are all that is outstanding and can be acknowledged together
+        if released_receipts:
+            self._backend.release_messages(released_receipts)
+        if acknowledged_receipts:
+            self._backend.acknowledge_messages(acknowledged_receipts)
 
     def _send_downstream(self, messages):
         """Send any required downstream messages following a CommandMessage.execute
@@ -17,6 +17,53 @@ class CommandMessage(object):
         # Unique type of CommandMessage, each type must be registered in apps.py
         self.type = message_type
 
+    def merge(self, message, size_factor=1):
+        """Attempts to merge the given message of the same type into this message so that a single execution does the
+        work of both. Executing the merged message must have the same effect as executing both messages. Message types
+        that cannot be merged should not override this method.
+
+        :param message: The message to merge into this one, it is of the same type
+        :type message: :class:`messaging.messages.message.CommandMessage`
+        :param size_factor: The merged message may hold up to this many times the normal maximum for its type
+        :type size_factor: int
+        :return: True if the message was merged, False otherwise
+        :rtype: bool
+        """
+
+        return False
+
+    def _merge_ids(self, message, ids_attr, max_num, size_factor, add_id):
+        """Merges the IDs of the given message into this message for message types that hold a list of IDs to process,
+        as long as the merged list holds no more than the maximum number of IDs times the size factor. IDs that this
+        message already holds are not added again.
+
+        :param message: The message to merge into this one, it is of the same type
+        :type message: :class:`messaging.messages.message.CommandMessage`
+        :param ids_attr: The name of the attribute holding the list of IDs
+        :type ids_attr: string
+        :param max_num: The normal maximum number of IDs for the message type
+        :type max_num: int
+        :param size_factor: The merged message may hold up to this many times the normal maximum for its type
+        :type size_factor: int
+        :param add_id: The function that adds an ID to this message
+        :type add_id: function
+        :return: True if the message was merged, False otherwise
+        :rtype: bool
+        """
+
+        ids = set(getattr(self, ids_attr))
+        new_ids = []
+        for an_id in getattr(message, ids_attr):
+            if an_id not in ids:
+                ids.add(an_id)
+                new_ids.append(an_id)
+
+        if len(ids) > max_num * size_factor:
+            return False
+        for an_id in new_ids:
+            add_id(an_id)
+        return True
+
     @abstractmethod
     def to_json(self):
         """JSON Serializer for CommandMessage subclasses. Must be implemented in all subclasses.
@@ -5,8 +5,11 @@ from __future__ import unicode_literals
 
 import Queue
 import json
+import threading
+import time
 
 import django
+from botocore.exceptions import ClientError
 from django.conf import settings
 from django.test import TestCase
 from mock import MagicMock
@@ -23,10 +26,13 @@ class DummyBackend(MessagingBackend):
     def __init__(self):
         super(DummyBackend, self).__init__('dummy')
 
-    def send_messages(self, message):  # pragma: no cover
+    def acknowledge_messages(self, receipts):  # pragma: no cover
         pass
 
-    def receive_messages(self, batch_size):  # pragma: no cover
+    def fetch_messages(self, batch_size):  # pragma: no cover
+        pass
+
+    def send_messages(self, message):  # pragma: no cover
         pass
 
 
@@ -49,8 +55,8 @@ class TestAMQPBackend(TestCase):
         backend = AMQPMessagingBackend()
         backend.send_messages(messages)
 
-        # Deep diving through context managers to assert put call
-        put = connection.return_value.__enter__.return_value.SimpleQueue.return_value.put
+        # Deep diving through persistent connection to assert put call
+        put = connection.return_value.SimpleQueue.return_value.put
         put.assert_called_with(messages[0])
         self.assertEquals(put.call_count, 1)
 
@@ -66,85 +72,160 @@ class TestAMQPBackend(TestCase):
         backend = AMQPMessagingBackend()
         backend.send_messages(messages)
 
-        # Deep diving through context managers to assert put call
-        put = connection.return_value.__enter__.return_value.SimpleQueue.return_value.put
+        # Deep diving through persistent connection to assert put call
+        put = connection.return_value.SimpleQueue.return_value.put
         put.assert_has_calls([call(x) for x in messages])
         self.assertEquals(put.call_count, 2)
 
     @patch('messaging.backends.amqp.Connection')
-    def test_valid_receive_messages(self, connection):
-        """Validate successful message retrieval via AMQP backend"""
+    def test_fetch_and_acknowledge_messages(self, connection):
+        """Validate messages are fetched without ack and acknowledged separately via AMQP backend"""
 
-        message1 = MagicMock(payload={'type': 'echo', 'body': '1'})
-        message2 = MagicMock(payload={'type': 'echo', 'body': '2'})
+        message1 = MagicMock(payload={'type': 'echo', 'body': '1'}, delivery_tag=1)
+        message2 = MagicMock(payload={'type': 'echo', 'body': '2'}, delivery_tag=2)
         get_func = MagicMock(side_effect=[message1, message2, Queue.Empty])
+        connection.return_value.SimpleQueue.return_value.get = get_func
+
+        backend = AMQPMessagingBackend()
+        results = backend.fetch_messages(5)
+
+        self.assertEqual(results, [(message1.payload, message1), (message2.payload, message2)])
+        message1.ack.assert_not_called()
+
+        # Message 1 is still outstanding, so message 2 must be acknowledged on its own
+        backend.acknowledge_messages([message2])
+        message1.ack.assert_not_called()
+        message2.ack.assert_called_once_with()
+
+    @patch('messaging.backends.amqp.Connection')
+    def test_fetch_messages_batch_size(self, connection):
+        """Validate no more than a batch of messages is fetched via AMQP backend"""
 
-        # Deep diving through context managers to patch get call
-        connection.return_value.__enter__.return_value.SimpleQueue.return_value.get = get_func
+        messages = [MagicMock(payload={'type': 'echo', 'body': str(x)}, delivery_tag=x) for x in range(1, 4)]
+        get_func = MagicMock(side_effect=messages + [Queue.Empty])
+        connection.return_value.SimpleQueue.return_value.get = get_func
 
         backend = AMQPMessagingBackend()
-        generator = backend.receive_messages(5)
-        results = []
-        try:
-            results = [generator.next()]
-            while True:
-                results.append(generator.send(True))
-        except StopIteration:
-            pass
-
-        self.assertEqual(len(results), 2)
-        message1.ack.assert_called()
-        message2.ack.assert_called()
+        results = backend.fetch_messages(2)
+
+        self.assertEqual(results, [(messages[0].payload, messages[0]), (messages[1].payload, messages[1])])
+        self.assertEqual(get_func.call_count, 2)
+        self.assertEqual(backend._get_unacked(), {1, 2})
 
     @patch('messaging.backends.amqp.Connection')
-    def test_valid_single_batch_receive_message(self, connection):
-        """Validate successful message retrieval via AMQP backend of first 2 messages"""
+    def test_acknowledge_messages_multiple(self, connection):
+        """Validate the oldest outstanding messages are acknowledged together via AMQP backend"""
 
-        message1 = MagicMock(payload={'type': 'echo', 'body': '1'})
-        message2 = MagicMock(payload={'type': 'echo', 'body': '2'})
-        message3 = MagicMock(payload={'type': 'echo', 'body': '3'})
-        get_func = MagicMock(side_effect=[message1, message2, Queue.Empty])
+        messages = [MagicMock(payload={'type': 'echo', 'body': str(x)}, delivery_tag=x) for x in range(1, 6)]
+        get_func = MagicMock(side_effect=messages + [Queue.Empty])
+        connection.return_value.SimpleQueue.return_value.get = get_func
+
+        backend = AMQPMessagingBackend()
+        backend.fetch_messages(10)
+
+        # Message 3 failed and message 5 is still in progress
+        backend.release_messages([messages[2]])
+        backend.acknowledge_messages([messages[3], messages[1], messages[0]])
+
+        messages[0].ack.assert_not_called()
+        messages[1].ack.assert_not_called()
+        messages[2].requeue.assert_called_once()
+        messages[3].ack.assert_called_once_with(multiple=True)
+        messages[4].ack.assert_not_called()
+        self.assertEqual(backend._get_unacked(), {5})
+
+    @patch('messaging.backends.amqp.Connection')
+    def test_fetch_messages_prefetch(self, connection):
+        """Validate the AMQP prefetch window covers the following batch and is only set when it changes"""
 
-        # Deep diving through context managers to patch get call
-        connection.return_value.__enter__.return_value.SimpleQueue.return_value.get = get_func
+        simple_queue = connection.return_value.SimpleQueue.return_value
+        simple_queue.get = MagicMock(side_effect=Queue.Empty)
 
         backend = AMQPMessagingBackend()
-        generator = backend.receive_messages(2)
-        result = []
-        try:
-            results = [generator.next()]
-            while True:
-                results.append(generator.send(True))
-        except StopIteration:
-            pass
-
-        # wrap result in list to force generator iteration
-        self.assertEqual(len(results), 2)
-        message1.ack.assert_called()
-        message2.ack.assert_called()
-        message3.ack.assert_not_called()
+        backend.fetch_messages(10)
+        backend.fetch_messages(10)
+        simple_queue.consumer.qos.assert_called_once_with(prefetch_count=20)
+        backend.fetch_messages(50)
+        simple_queue.consumer.qos.assert_called_with(prefetch_count=100)
 
     @patch('messaging.backends.amqp.Connection')
-    def test_false_result_during_receive_message_yield(self, connection):
-        """Validate message ack is not done with yield returns False in AMQP backend"""
+    def test_release_messages(self, connection):
+        """Validate released messages are requeued for redelivery via AMQP backend"""
 
         message = MagicMock()
-        message.payload = 'test'
-        get_func = MagicMock(return_value=message)
 
-        # Deep diving through context managers to patch get call
-        connection.return_value.__enter__.return_value.SimpleQueue.return_value.get = get_func
+        backend = AMQPMessagingBackend()
+        backend.release_messages([message])
+
+        message.requeue.assert_called_once()
+        message.ack.assert_not_called()
+
+    @patch('messaging.backends.amqp.Connection')
+    def test_connection_reused(self, connection):
+        """Validate a single AMQP connection is shared across send and receive calls"""
+
+        connection.return_value.SimpleQueue.return_value.get = MagicMock(side_effect=Queue.Empty)
 
         backend = AMQPMessagingBackend()
+        backend.send_messages([{'type': 'echo', 'body': '1'}])
+        backend.fetch_messages(5)
+        backend.send_messages([{'type': 'echo', 'body': '2'}])
 
-        generator = backend.receive_messages(10)
-        try:
-            for _ in generator:
-                generator.send(False)
-        except StopIteration:  # pragma: no cover
-            pass
+        self.assertEqual(connection.call_count, 1)
+        self.assertEqual(backend.get_connection_stats(), {'opened': 1, 'reused': 2, 'failures': 0})
 
-        message.ack.assert_not_called()
+    @patch('messaging.backends.amqp.Connection')
+    def test_close_releases_all_threads(self, connection):
+        """Validate closing the AMQP backend releases the connections opened by every thread"""
+
+        connections = [MagicMock(), MagicMock(), MagicMock()]
+        connection.side_effect = connections
+
+        backend = AMQPMessagingBackend()
+        backend.send_messages([{'type': 'echo', 'body': '1'}])
+        thread = threading.Thread(target=backend.send_messages, args=([{'type': 'echo', 'body': '2'}],))
+        thread.start()
+        thread.join()
+
+        backend.close()
+
+        for closed_connection in connections[:2]:
+            closed_connection.release.assert_called_once_with()
+            closed_connection.SimpleQueue.return_value.close.assert_called_once_with()
+
+        # The backend reconnects when it is used again
+        backend.send_messages([{'type': 'echo', 'body': '3'}])
+        connections[2].SimpleQueue.return_value.put.assert_called_once_with({'type': 'echo', 'body': '3'})
+        connections[0].release.assert_called_once_with()
+
+    @patch('messaging.backends.amqp.Connection')
+    def test_reconnect_unhealthy_connection(self, connection):
+        """Validate a new AMQP connection is opened when the existing one fails its health check"""
+
+        backend = AMQPMessagingBackend()
+        backend.send_messages([{'type': 'echo', 'body': '1'}])
+        connection.return_value.connected = False
+        backend.send_messages([{'type': 'echo', 'body': '2'}])
+
+        self.assertEqual(connection.call_count, 2)
+        connection.return_value.release.assert_called_once()
+        self.assertEqual(backend.get_connection_stats()['opened'], 2)
+
+    @patch('messaging.backends.amqp.Connection')
+    def test_send_messages_retry_on_connection_error(self, connection):
+        """Validate sending is retried on a new AMQP connection after a connection error"""
+
+        connection.return_value.connection_errors = (IOError,)
+        connection.return_value.channel_errors = ()
+        put = connection.return_value.SimpleQueue.return_value.put
+        put.side_effect = [IOError, None]
+
+        backend = AMQPMessagingBackend()
+        backend.send_messages([{'type': 'echo', 'body': '1'}])
+
+        self.assertEqual(put.call_count, 2)
+        self.assertEqual(connection.call_count, 2)
+        self.assertEqual(backend.get_connection_stats()['failures'], 1)
 
 
 class TestBackendsFactory(TestCase):
@@ -252,51 +333,115 @@ class TestSQSBackend(TestCase):
         self.assertEquals(put.call_count, 1)
 
     @patch('messaging.backends.sqs.SQSClient')
-    def test_valid_receive_messages(self, client):
-        """Validate successful message retrieval via SQS backend"""
+    def test_client_reused(self, client):
+        """Validate a single SQS client is shared across send and receive calls"""
+
+        client.return_value.__enter__.return_value.receive_messages = MagicMock(return_value=[])
+
+        backend = SQSMessagingBackend()
+        backend.send_messages([{'type': 'echo', 'body': '1'}])
+        backend.fetch_messages(10)
+        backend.close()
+
+        # The client is reused both to fetch the batch and to prefetch the following one
+        self.assertEqual(client.call_count, 1)
+        self.assertEqual(backend.get_connection_stats(), {'opened': 1, 'reused': 2, 'failures': 0})
+
+    @patch('messaging.backends.sqs.SQSClient')
+    def test_fetch_messages_client_error(self, client):
+        """Validate a failing SQS client is dropped and recreated on the next call"""
+
+        error = ClientError({'Error': {'Code': 'InternalError'}}, 'ReceiveMessage')
+        client.return_value.__enter__.return_value.receive_messages = MagicMock(side_effect=error)
+
+        backend = SQSMessagingBackend()
+        self.assertEqual(backend.fetch_messages(10), [])
+        backend.close()
+
+        self.assertEqual(client.call_count, 2)
+        self.assertEqual(backend.get_connection_stats()['failures'], 2)
+
+    @patch('messaging.backends.sqs.SQSClient')
+    def test_fetch_and_acknowledge_messages(self, client):
+        """Validate messages are fetched without delete and deleted separately via SQS backend"""
 
         message1 = MagicMock(body=json.dumps({'type': 'echo', 'body': '1'}))
         message2 = MagicMock(body=json.dumps({'type': 'echo', 'body': '2'}))
-        get_func = MagicMock(return_value=[message1, message2])
+        client.return_value.__enter__.return_value.receive_messages = MagicMock(side_effect=[[message1, message2],
+                                                                                             []])
+
+        backend = SQSMessagingBackend()
+        results = backend.fetch_messages(5)
+
+        self.assertEqual(results, [({'type': 'echo', 'body': '1'}, message1),
+                                   ({'type': 'echo', 'body': '2'}, message2)])
+        message1.delete.assert_not_called()
+
+        backend.acknowledge_messages([message1])
+        client.return_value.__enter__.return_value.delete_messages.assert_called_once_with(
+            backend._queue_name, [{'Id': '0', 'ReceiptHandle': message1.receipt_handle}])
+        self.assertEqual(backend._in_flight.values(), [message2])
 
-        client.return_value.__enter__.return_value.receive_messages = get_func
+        backend.release_messages([message2])
+        self.assertEqual(backend._in_flight, {})
+        backend.close()
+
+    @patch('messaging.backends.sqs.SQSClient')
+    def test_acknowledge_messages_partial_failure(self, client):
+        """Validate messages are deleted in a batch and failed deletes are no longer tracked via SQS backend"""
+
+        messages = [MagicMock(body=json.dumps({'type': 'echo', 'body': str(x)})) for x in range(3)]
+        sqs_client = client.return_value.__enter__.return_value
+        sqs_client.receive_messages = MagicMock(side_effect=[messages, []])
+        sqs_client.delete_messages.return_value = [{'Id': '1', 'Code': 'ReceiptHandleIsInvalid', 'SenderFault': True}]
 
         backend = SQSMessagingBackend()
-        generator = backend.receive_messages(5)
-        results = []
-        try:
-            results = [generator.next()]
-            while True:
-                results.append(generator.send(True))
-        except StopIteration:
-            pass
-
-        # wrap result in list to force generator iteration
-        self.assertEqual(len(results), 2)
-        message1.delete.assert_called()
-        message2.delete.assert_called()
+        backend.fetch_messages(10)
+        backend.acknowledge_messages(messages[:2])
+
+        sqs_client.delete_messages.assert_called_once_with(
+            backend._queue_name, [{'Id': '0', 'ReceiptHandle': messages[0].receipt_handle},
+                                  {'Id': '1', 'ReceiptHandle': messages[1].receipt_handle}])
+        for message in messages:
+            message.delete.assert_not_called()
+        self.assertEqual(backend._in_flight.values(), [messages[2]])
+        backend.close()
 
     @patch('messaging.backends.sqs.SQSClient')
-    def test_exception_during_receive_messages(self, client):
-        """Validate exception handling during message consumption from SQS backend"""
+    def test_fetch_messages_prefetch(self, client):
+        """Validate the following batch is prefetched and handed back to the queue when the SQS backend closes"""
 
-        message = MagicMock()
-        value = {'test': 'thing'}
-        message.body = json.dumps(value)
-        get_func = MagicMock(return_value=[message])
+        message1 = MagicMock(body=json.dumps({'type': 'echo', 'body': '1'}))
+        message2 = MagicMock(body=json.dumps({'type': 'echo', 'body': '2'}))
+        message3 = MagicMock(body=json.dumps({'type': 'echo', 'body': '3'}))
+        sqs_client = client.return_value.__enter__.return_value
+        sqs_client.receive_messages = MagicMock(side_effect=[[message1], [message2], [message3]])
+        sqs_client.change_message_visibility_batch.return_value = []
+
+        backend = SQSMessagingBackend()
+        self.assertEqual(backend.fetch_messages(10), [({'type': 'echo', 'body': '1'}, message1)])
+        self.assertEqual(backend.fetch_messages(10), [({'type': 'echo', 'body': '2'}, message2)])
+        backend.close()
+        self.assertEqual(sqs_client.receive_messages.call_count, 3)
+
+        sqs_client.change_message_visibility_batch.assert_called_once_with(
+            backend._queue_name, [{'Id': '0', 'ReceiptHandle': message3.receipt_handle, 'VisibilityTimeout': 0}])
+        self.assertEqual(backend._in_flight, {})
+
+    @patch('messaging.backends.sqs.SQSClient')
+    def test_extend_visibility(self, client):
+        """Validate the visibility timeout of in-flight messages is extended until the SQS backend closes"""
 
-        client.return_value.__enter__.return_value.receive_messages = get_func
+        message = MagicMock(body=json.dumps({'type': 'echo', 'body': '1'}))
+        sqs_client = client.return_value.__enter__.return_value
+        sqs_client.receive_messages = MagicMock(side_effect=[[message], []])
+        sqs_client.change_message_visibility_batch.return_value = []
 
         backend = SQSMessagingBackend()
+        backend._visibility_timeout = 0.03
+        backend.fetch_messages(10)
+        time.sleep(0.1)
+        backend.close()
 
-        generator = backend.receive_messages(10)
-        results = []
-        try:
-            results = [generator.next()]
-            while True:
-                results.append(generator.send(False))
-        except StopIteration:
-            pass
-
-        self.assertEquals(results, [value])
-        message.delete.assert_not_called()
+        sqs_client.change_message_visibility_batch.assert_called_with(
+            backend._queue_name, [{'Id': '0', 'ReceiptHandle': message.receipt_handle, 'VisibilityTimeout': 0.03}])
@@ -11,6 +11,7 @@ from mock import call, patch
 from messaging.exceptions import CommandMessageExecuteFailure, InvalidCommandMessage
 from messaging.manager import CommandMessageManager
 from messaging.messages.message import CommandMessage
+from messaging.worker_pool import MessageWorkerPool
 
 
 class TestCommandMessageManager(TestCase):
@@ -76,76 +77,130 @@ class TestCommandMessageManager(TestCase):
         with self.assertRaises(AttributeError):
             manager.send_messages([message])
 
-    def test_receive_message(self):
-        """Validate the receive_message calls _process_message with each result"""
-
-        mocks = [MagicMock() for _ in range(10)]
+    @patch('messaging.manager.CommandMessageManager._send_downstream')
+    def test_receive_message(self, send_downstream):
+        """Validate that receive_messages executes each fetched message serially without a worker pool"""
 
-        def gen():
-            for mock in mocks:
-                yield mock
+        messages = [({'type': 'echo', 'body': str(x)}, 'receipt_%d' % x) for x in range(10)]
+        commands = [MagicMock(type='echo', new_messages=[]) for _ in range(10)]
 
         manager = CommandMessageManager()
         manager._backend = MagicMock()
-        process_message = manager._process_message = MagicMock()
-        manager._backend.receive_messages = MagicMock(return_value=gen())
+        manager._backend.fetch_messages.return_value = messages
+        manager._extract_command = MagicMock(side_effect=commands)
+        manager._execute_command = MagicMock(side_effect=lambda command: command)
         manager.receive_messages()
 
-        calls = [call(x) for x in mocks]
-        process_message.assert_has_calls(calls)
-        self.assertEquals(process_message.call_count, 10)
+        manager._backend.fetch_messages.assert_called_once_with(10)
+        manager._extract_command.assert_has_calls([call(message) for message, _ in messages])
+        manager._execute_command.assert_has_calls([call(command) for command in commands])
+        self.assertEquals(manager._execute_command.call_count, 10)
 
-    @patch('messaging.manager.CommandMessageManager._extract_command')
     @patch('messaging.manager.CommandMessageManager._send_downstream')
-    def test_successful_process_message(self, send_downstream, extract_command):
-        """Validate logic for a successful command process """
+    def test_receive_messages_serial_acknowledged_together(self, send_downstream):
+        """Validate that without a worker pool or coalescing each batch is acknowledged with a single call"""
 
-        message = {'type': 'test', 'body': 'payload'}
+        batches = [[({'type': 'echo', 'body': str(x)}, 'receipt_%d' % x) for x in range(3)],
+                   [({'type': 'echo', 'body': str(x)}, 'receipt_%d' % x) for x in range(3, 5)]]
 
         manager = CommandMessageManager()
-        command = MagicMock(execute=MagicMock(return_value=True))
-        command.execute.return_value = True
-        command.new_messages = []
-        extract_command.return_value = command
+        manager._backend = MagicMock()
+        manager._backend.fetch_messages.side_effect = batches
+        manager._extract_command = lambda message: MagicMock(type='echo', new_messages=[])
+        manager._execute_command = MagicMock(side_effect=lambda command: command)
 
-        manager._process_message(message)
+        manager.receive_messages()
+        manager.receive_messages()
 
-        send_downstream.assert_called_with([])
+        self.assertEqual(manager._execute_command.call_count, 5)
+        self.assertEqual(manager._backend.acknowledge_messages.call_args_list,
+                         [call(['receipt_0', 'receipt_1', 'receipt_2']), call(['receipt_3', 'receipt_4'])])
+        manager._backend.release_messages.assert_not_called()
+        self.assertEqual([name for name, _, _ in manager._backend.mock_calls],
+                         ['fetch_messages', 'acknowledge_messages', 'fetch_messages', 'acknowledge_messages'])
 
-    @patch('messaging.manager.CommandMessageManager._extract_command')
     @patch('messaging.manager.CommandMessageManager._send_downstream')
-    def test_failing_process_message(self, send_downstream, extract_command):
-        """Validate logic for a process message failing in process execution"""
+    def test_receive_messages_concurrently(self, send_downstream):
+        """Validate that concurrent receive only acknowledges successfully executed messages"""
 
-        message = {'type': 'test', 'body': 'payload'}
+        messages = [({'type': 'echo', 'body': str(x)}, 'receipt_%d' % x) for x in range(4)]
+
+        def extract_command(message):
+            return MagicMock(type='echo', body=message['body'], new_messages=[message['body']])
+
+        def execute_command(command):
+            if command.body == '2':
+                raise CommandMessageExecuteFailure
+            return command
 
         manager = CommandMessageManager()
-        command = MagicMock()
-        command.execute = MagicMock(return_value=False)
-        extract_command.return_value = command
+        manager._backend = MagicMock()
+        manager._backend.fetch_messages.return_value = messages
+        manager._extract_command = extract_command
+        manager._execute_command = execute_command
+
+        worker_pool = MessageWorkerPool({'default': 2, 'echo': 3})
+        manager.receive_messages(worker_pool)
+        worker_pool.shutdown()
+
+        manager._backend.fetch_messages.assert_called_with(10)
+        manager._backend.acknowledge_messages.assert_called_once_with(['receipt_0', 'receipt_1', 'receipt_3'])
+        manager._backend.release_messages.assert_called_once_with(['receipt_2'])
+        # Failures are released first so the successful messages can be acknowledged together
+        self.assertEqual([name for name, _, _ in manager._backend.mock_calls],
+                         ['fetch_messages', 'release_messages', 'acknowledge_messages'])
+        send_downstream.assert_has_calls([call(['0']), call(['1']), call(['3'])])
+
+    @patch('messaging.manager.CommandMessageManager._send_downstream')
+    def test_receive_messages_coalesced(self, send_downstream):
+        """Validate that merged messages are executed once and all of their messages acknowledged"""
+
+        messages = [({'type': 'update_recipes', 'body': {'recipe_ids': [1, 2]}}, 'receipt_1'),
+                    ({'type': 'update_recipes', 'body': {'recipe_ids': [2, 3]}}, 'receipt_2'),
+                    ({'type': 'echo', 'body': {'message': 'hi'}}, 'receipt_3'),
+                    ({'type': 'update_recipes', 'body': {'recipe_ids': [4]}}, 'receipt_4')]
+        merged_command = MagicMock(type='update_recipes', new_messages=[])
+        merged_command.merge.return_value = True
+        echo_command = MagicMock(type='echo', new_messages=[])
+        commands = [merged_command, MagicMock(type='update_recipes'), echo_command, MagicMock(type='update_recipes')]
+
+        manager = CommandMessageManager()
+        manager._backend = MagicMock()
+        manager._backend.fetch_messages.return_value = messages
+        manager._extract_command = MagicMock(side_effect=commands)
+        manager._execute_command = MagicMock(side_effect=lambda command: command)
 
-        with self.assertRaises(CommandMessageExecuteFailure):
-            manager._process_message(message)
+        manager.receive_messages(batch_size=50, coalesce_factor=2)
 
-        self.assertFalse(send_downstream.called)
+        manager._backend.fetch_messages.assert_called_with(50)
+        merged_command.merge.assert_has_calls([call(commands[1], 2), call(commands[3], 2)])
+        echo_command.merge.assert_not_called()
+        manager._execute_command.assert_has_calls([call(merged_command), call(echo_command)])
+        self.assertEqual(manager._execute_command.call_count, 2)
+        manager._backend.acknowledge_messages.assert_called_once_with(['receipt_1', 'receipt_2', 'receipt_4',
+                                                                      'receipt_3'])
 
-    @patch('messaging.manager.CommandMessageManager._extract_command')
     @patch('messaging.manager.CommandMessageManager._send_downstream')
-    def test_process_message_exception(self, send_downstream, extract_command):
-        """Validate logic for a process message throwing an exception in process execution"""
+    def test_receive_messages_coalesced_failure(self, send_downstream):
+        """Validate that none of the messages merged into a failing message are acknowledged"""
 
-        message = {'type': 'test', 'body': 'payload'}
+        messages = [({'type': 'update_recipes', 'body': {'recipe_ids': [1]}}, 'receipt_1'),
+                    ({'type': 'update_recipes', 'body': {'recipe_ids': [2]}}, 'receipt_2')]
+        merged_command = MagicMock(type='update_recipes')
+        merged_command.merge.return_value = True
 
         manager = CommandMessageManager()
-        command = MagicMock()
-        command.execute = MagicMock()
-        command.execute.side_effect = Exception
-        extract_command.return_value = command
+        manager._backend = MagicMock()
+        manager._backend.fetch_messages.return_value = messages
+        manager._extract_command = MagicMock(side_effect=[merged_command, MagicMock(type='update_recipes')])
+        manager._execute_command = MagicMock(side_effect=CommandMessageExecuteFailure)
 
-        with self.assertRaises(CommandMessageExecuteFailure):
-            manager._process_message(message)
+        manager.receive_messages(coalesce_factor=1)
 
-        self.assertFalse(send_downstream.called)
+        manager._execute_command.assert_called_once_with(merged_command)
+        manager._backend.acknowledge_messages.assert_not_called()
+        manager._backend.release_messages.assert_called_once_with(['receipt_1', 'receipt_2'])
+        send_downstream.assert_not_called()
 
     @patch('messaging.manager.CommandMessageManager.send_messages')
     def test_successful_send_downstream(self, send_messages):
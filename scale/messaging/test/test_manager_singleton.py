@@ -30,32 +30,33 @@ class TestSingletonCommandMessageManager(TestCase):
 
     @patch('messaging.manager.get_message_backend')
     @patch('messaging.manager.BrokerDetails')
-    @patch('messaging.manager.CommandMessageManager._process_message')
-    def test_receive_message_invalid_message(self, process, broker_details, get_message_backend):
+    @patch('messaging.manager.CommandMessageManager._extract_command')
+    def test_receive_message_invalid_message(self, extract, broker_details, get_message_backend):
         """Exercise all exception code paths within receive_message"""
 
-        def gen():
-            yield MagicMock()
-
-        process.side_effect = InvalidCommandMessage
+        extract.side_effect = InvalidCommandMessage
         manager = CommandMessageManager()
         manager._backend = MagicMock()
-        manager._backend.receive_messages.return_value = gen()
+        manager._backend.fetch_messages.return_value = [(MagicMock(), 'receipt')]
 
         manager.receive_messages()
 
+        manager._backend.release_messages.assert_called_once_with(['receipt'])
+        manager._backend.acknowledge_messages.assert_not_called()
+
     @patch('messaging.manager.get_message_backend')
     @patch('messaging.manager.BrokerDetails')
-    @patch('messaging.manager.CommandMessageManager._process_message')
-    def test_receive_message_execute_failure(self, process, broker_details, get_message_backend):
+    @patch('messaging.manager.CommandMessageManager._extract_command')
+    @patch('messaging.manager.CommandMessageManager._execute_command')
+    def test_receive_message_execute_failure(self, execute, extract, broker_details, get_message_backend):
         """Exercise all exception code paths within receive_message"""
 
-        def gen():
-            yield MagicMock()
-
-        process.side_effect = CommandMessageExecuteFailure
+        execute.side_effect = CommandMessageExecuteFailure
         manager = CommandMessageManager()
         manager._backend = MagicMock()
-        manager._backend.receive_messages.return_value = gen()
+        manager._backend.fetch_messages.return_value = [(MagicMock(), 'receipt')]
+
+        manager.receive_messages()
 
-        manager.receive_messages()
\ No newline at end of file
+        manager._backend.release_messages.assert_called_once_with(['receipt'])
+        manager._backend.acknowledge_messages.assert_not_called()
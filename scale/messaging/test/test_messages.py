@@ -41,6 +41,19 @@ class TestCommandMessage(TestCase):
         self.assertEquals(message.type, 'dummy')
         self.assertEqual(message.new_messages, [])
 
+    def test_merge_ids(self):
+        """Validate merging the IDs of another message up to the maximum times the size factor"""
+
+        message = DummyMessage()
+        message.ids = [1, 2]
+        other_message = DummyMessage()
+        other_message.ids = [2, 3]
+
+        self.assertFalse(message._merge_ids(other_message, 'ids', 2, 1, message.ids.append))
+        self.assertListEqual(message.ids, [1, 2])
+        self.assertTrue(message._merge_ids(other_message, 'ids', 2, 2, message.ids.append))
+        self.assertListEqual(message.ids, [1, 2, 3])
+
 
 class TestChainedCommandMessage(TestCase):
     def setUp(self):
@@ -0,0 +1,52 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import django
+from django.test import TestCase
+
+from messaging.worker_pool import MessageWorkerPool
+
+
+class TestMessageWorkerPool(TestCase):
+    def setUp(self):
+        django.setup()
+
+    def test_size(self):
+        """Validate the pool size includes an implicit default worker"""
+
+        self.assertEqual(MessageWorkerPool({'update_recipes': 4}).size, 5)
+        self.assertEqual(MessageWorkerPool({'default': 2, 'update_recipes': 4}).size, 6)
+
+    def test_invalid_worker_count(self):
+        """Validate a message type must have at least one worker"""
+
+        with self.assertRaises(ValueError):
+            MessageWorkerPool({'default': 0})
+
+    def test_submit_by_type(self):
+        """Validate work is executed by the worker threads of its message type"""
+
+        worker_pool = MessageWorkerPool({'default': 1, 'update_recipes': 2})
+
+        def thread_name():
+            return threading.current_thread().name
+
+        typed = set(worker_pool.submit('update_recipes', thread_name).get() for _ in range(10))
+        default = set(worker_pool.submit('echo', thread_name).get() for _ in range(10))
+        default.add(worker_pool.submit(None, thread_name).get())
+        worker_pool.shutdown()
+
+        self.assertEqual(len(default), 1)
+        self.assertTrue(typed.isdisjoint(default))
+
+    def test_submit_result(self):
+        """Validate arguments are passed and results returned from worker threads"""
+
+        worker_pool = MessageWorkerPool({'default': 2})
+        result = worker_pool.submit('echo', lambda x, y: x + y, 1, 2)
+        self.assertEqual(result.get(), 3)
+        worker_pool.shutdown()
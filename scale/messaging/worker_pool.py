@@ -0,0 +1,70 @@
+"""Defines the class that executes command messages concurrently"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+from multiprocessing.pool import ThreadPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKER_KEY = 'default'
+
+
+class MessageWorkerPool(object):
+    """Executes command messages concurrently using a bounded pool of worker threads per message type. Each worker
+    thread holds its own database connection.
+    """
+
+    def __init__(self, worker_counts):
+        """Constructor
+
+        :param worker_counts: The number of worker threads for each message type, the 'default' entry applies to all
+            message types that are not listed
+        :type worker_counts: dict
+        """
+
+        self._worker_counts = dict(worker_counts)
+        if DEFAULT_WORKER_KEY not in self._worker_counts:
+            self._worker_counts[DEFAULT_WORKER_KEY] = 1
+
+        self._pools = {}
+        for message_type, count in self._worker_counts.items():
+            if count < 1:
+                raise ValueError('Message type %s must have at least one worker' % message_type)
+            self._pools[message_type] = ThreadPool(count)
+
+    @property
+    def size(self):
+        """The total number of worker threads across all message types
+
+        :returns: The total number of worker threads
+        :rtype: int
+        """
+
+        return sum(self._worker_counts.values())
+
+    def shutdown(self):
+        """Waits for all submitted work to complete and then stops all worker threads
+        """
+
+        for message_type, pool in self._pools.items():
+            logger.info('Draining %s message workers', message_type)
+            pool.close()
+        for pool in self._pools.values():
+            pool.join()
+
+    def submit(self, message_type, func, *args):
+        """Submits work for the given message type to be executed by that type's worker threads
+
+        :param message_type: The message type, may be None if unknown
+        :type message_type: string
+        :param func: The function to execute
+        :type func: function
+        :returns: The result handle of the asynchronous execution
+        :rtype: :class:`multiprocessing.pool.AsyncResult`
+        """
+
+        pool = self._pools.get(message_type, self._pools[DEFAULT_WORKER_KEY])
+        return pool.apply_async(func, args)
@@ -14,7 +14,8 @@ class MetricsConfig(AppConfig):
         import job.clock as clock
         import metrics.registry as registry
         from metrics.daily_metrics import DailyMetricsProcessor
-        from metrics.models import MetricsError, MetricsIngest, MetricsJobType
+        from metrics.models import (MetricsError, MetricsIngest, MetricsIngestRollup, MetricsJobType,
+                                    MetricsJobTypeRollup)
         from metrics.serializers import (MetricsErrorDetailsSerializer, MetricsIngestDetailsSerializer,
                                          MetricsJobTypeDetailsSerializer)
 
@@ -27,3 +28,5 @@ class MetricsConfig(AppConfig):
         registry.register_provider(MetricsError.objects, MetricsErrorDetailsSerializer)
         registry.register_provider(MetricsIngest.objects, MetricsIngestDetailsSerializer)
         registry.register_provider(MetricsJobType.objects, MetricsJobTypeDetailsSerializer)
+        registry.register_provider(MetricsIngestRollup.objects, MetricsIngestDetailsSerializer)
+        registry.register_provider(MetricsJobTypeRollup.objects, MetricsJobTypeDetailsSerializer)
@@ -0,0 +1,445 @@
+"""Defines the command line method for benchmarking the calculation of the daily metrics"""
+from __future__ import unicode_literals
+
+import datetime
+import json
+import logging
+import random
+import sys
+import time
+
+import django.utils.timezone as timezone
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from error.models import Error
+from ingest.models import Ingest, Strike
+from job.models import Job, JobExecution, JobExecutionEnd, JobType, JobTypeRevision
+from metrics.models import MetricsError, MetricsIngest, MetricsJobType, PLOT_FIELD_TYPES
+from trigger.models import TriggerEvent
+from util.histogram import Histogram
+from util.parse import datetime_to_string
+
+
+logger = logging.getLogger(__name__)
+
+
+# Number of synthetic models created in each database transaction
+BATCH_SIZE = 1000
+
+# The final job statuses of the synthetic jobs, each the status and its relative weight
+JOB_STATUSES = [('COMPLETED', 16), ('FAILED', 3), ('CANCELED', 1)]
+
+# The statuses of the synthetic ingests that are relevant for metrics
+INGEST_STATUSES = ['DEFERRED', 'INGESTED', 'ERRORED', 'DUPLICATE']
+
+# The tasks of each synthetic job execution, in the order they run
+TASK_TYPES = ['pull', 'pre', 'main', 'post']
+
+
+class Command(BaseCommand):
+    """Command that benchmarks the calculation of the daily metrics by creating a synthetic day of jobs and ingests in a
+    throwaway database and timing the row by row calculation that the metrics providers used to perform against the
+    database aggregation that they perform now
+    """
+
+    help = 'Benchmarks the calculation of the daily metrics against a synthetic day in a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-types', action='store', type=int, default=10,
+                            help='The number of job types')
+        parser.add_argument('--jobs', action='store', type=int, default=10000,
+                            help='The number of jobs that ended during the day')
+        parser.add_argument('--strikes', action='store', type=int, default=5,
+                            help='The number of Strike processes')
+        parser.add_argument('--ingests', action='store', type=int, default=10000,
+                            help='The number of ingests that ended during the day')
+        parser.add_argument('--runs', action='store', type=int, default=3,
+                            help='The number of times each calculation is timed')
+        parser.add_argument('--seed', action='store', type=int, default=1,
+                            help='The random seed for the synthetic day')
+        parser.add_argument('--keepdb', action='store_true', default=False,
+                            help='Keep the throwaway database between runs of this command')
+        parser.add_argument('--json', action='store_true', default=False,
+                            help='Write the results as JSON')
+
+    def handle(self, *args, **options):
+        """See :meth:`django.core.management.base.BaseCommand.handle`.
+
+        This method runs the benchmark.
+        """
+
+        keepdb = options['keepdb']
+        date = timezone.now().date() - datetime.timedelta(days=1)
+        providers = [('error', MetricsError, 'error_id', _calculate_legacy_errors),
+                     ('ingest', MetricsIngest, 'strike_id', _calculate_legacy_ingests),
+                     ('job_type', MetricsJobType, 'job_type_id', _calculate_legacy_job_types)]
+
+        logger.info('Command starting: scale_metrics_benchmark')
+
+        # The benchmark creates a synthetic day of jobs and ingests, so never run it against the configured database
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            call_command('flush', interactive=False, verbosity=0)
+            self._create_day(date, options)
+            results = {}
+            for name, model, key_name, legacy_calculate in providers:
+                results[name] = self._time_provider(date, model, key_name, legacy_calculate, options['runs'])
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=keepdb)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, sort_keys=True))
+        else:
+            for name, _model, _key_name, _legacy_calculate in providers:
+                self._write_results(name, results[name])
+
+        logger.info('Command completed: scale_metrics_benchmark')
+
+    def _create_day(self, date, options):
+        """Creates the synthetic jobs, job executions, and ingests that ended during the given day
+
+        :param date: The day
+        :type date: :class:`datetime.date`
+        :param options: The command options
+        :type options: dict
+        """
+
+        rand = random.Random(options['seed'])
+        day_started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
+
+        errors = []
+        for category, _display in Error.CATEGORIES:
+            for i in range(2):
+                errors.append(Error.objects.create(name='benchmark-%s-%d' % (category.lower(), i + 1),
+                                                   title='Benchmark Error', category=category, is_builtin=True))
+
+        interface = {'version': '1.4', 'command': 'benchmark_cmd', 'command_arguments': '', 'env_vars': [],
+                     'mounts': [], 'settings': [], 'input_data': [], 'output_data': [], 'shared_resources': []}
+        job_types = []
+        for i in range(options['job_types']):
+            job_type = JobType.objects.create(name='benchmark-job-type-%d' % (i + 1), version='1.0.0',
+                                              title='Benchmark Job Type %d' % (i + 1), docker_image='scale-benchmark',
+                                              manifest=interface, error_mapping={'version': '1.0', 'exit_codes': {}},
+                                              configuration={'version': '1.0', 'default_settings': {}})
+            JobTypeRevision.objects.create_job_type_revision(job_type)
+            job_types.append(job_type)
+
+        event = TriggerEvent.objects.create_trigger_event('BENCHMARK', None, {}, timezone.now())
+        job_input = {'version': '1.0', 'input_data': [], 'output_data': []}
+        statuses = [status for status, weight in JOB_STATUSES for _ in range(weight)]
+
+        created_count = 0
+        while created_count < options['jobs']:
+            batch_size = min(BATCH_SIZE, options['jobs'] - created_count)
+            with transaction.atomic():
+                jobs = []
+                for _ in range(batch_size):
+                    job = Job.objects.create_job(rand.choice(job_types), event.id)
+                    job.input = job_input
+                    job.input_file_size = 0.0
+                    job.status = rand.choice(statuses)
+                    job.num_exes = 0 if job.status == 'CANCELED' else 1
+                    job.error = rand.choice(errors) if job.status == 'FAILED' else None
+                    job.ended = day_started + datetime.timedelta(seconds=rand.randint(0, 86399))
+                    jobs.append(job)
+                Job.objects.bulk_create(jobs)
+                self._create_job_exes([job for job in jobs if job.num_exes], rand)
+            created_count += batch_size
+
+        strikes = []
+        for i in range(options['strikes']):
+            strikes.append(Strike.objects.create(name='benchmark-strike-%d' % (i + 1), title='Benchmark Strike',
+                                                 configuration={}))
+
+        created_count = 0
+        while created_count < options['ingests']:
+            batch_size = min(BATCH_SIZE, options['ingests'] - created_count)
+            ingests = []
+            for i in range(batch_size):
+                ingest_ended = day_started + datetime.timedelta(seconds=rand.randint(0, 86399))
+                ingest_started = ingest_ended - datetime.timedelta(seconds=rand.randint(1, 60))
+                transfer_ended = ingest_started - datetime.timedelta(seconds=rand.randint(1, 60))
+                transfer_started = transfer_ended - datetime.timedelta(seconds=rand.randint(1, 600))
+                ingests.append(Ingest(file_name='benchmark-%d.txt' % (created_count + i + 1),
+                                      strike=rand.choice(strikes), status=rand.choice(INGEST_STATUSES),
+                                      file_size=rand.randint(1, 1024 * 1024 * 1024), media_type='text/plain',
+                                      transfer_started=transfer_started, transfer_ended=transfer_ended,
+                                      ingest_started=ingest_started, ingest_ended=ingest_ended))
+            Ingest.objects.bulk_create(ingests)
+            created_count += batch_size
+
+    def _create_job_exes(self, jobs, rand):
+        """Creates a job execution and its job execution end for each of the given jobs, ending when the job ended
+
+        :param jobs: The list of job models, which must have been saved
+        :type jobs: list
+        :param rand: The random number generator
+        :type rand: :class:`random.Random`
+        """
+
+        job_exes = []
+        task_results = []
+        for job in jobs:
+            tasks = []
+            started = job.ended
+            for task_type in reversed(TASK_TYPES):
+                ended = started - datetime.timedelta(seconds=rand.randint(0, 10))  # Time between the tasks
+                started = ended - datetime.timedelta(seconds=rand.randint(1, 600))
+                tasks.insert(0, {'task_id': '%d_%s' % (job.id, task_type), 'type': task_type, 'was_launched': True,
+                                 'started': datetime_to_string(started), 'ended': datetime_to_string(ended)})
+            task_results.append({'version': '1.0', 'tasks': tasks})
+            exe_started = started - datetime.timedelta(seconds=rand.randint(1, 10))
+            queued = exe_started - datetime.timedelta(seconds=rand.randint(1, 3600))
+            job_exes.append(JobExecution(job=job, job_type_id=job.job_type_id, exe_num=1, timeout=3600,
+                                         queued=queued, started=exe_started))
+        JobExecution.objects.bulk_create(job_exes)
+
+        job_exe_ends = []
+        for job, job_exe, results in zip(jobs, job_exes, task_results):
+            job_exe_ends.append(JobExecutionEnd(job_exe_id=job_exe.id, job=job, job_type_id=job.job_type_id,
+                                                exe_num=1, task_results=results, status=job.status, error=job.error,
+                                                queued=job_exe.queued, started=job_exe.started, ended=job.ended))
+        JobExecutionEnd.objects.bulk_create(job_exe_ends)
+
+    def _get_saved_values(self, date, model, key_name):
+        """Returns the plot values of the metrics saved for the given day
+
+        :param date: The day
+        :type date: :class:`datetime.date`
+        :param model: The metrics model class
+        :type model: class
+        :param key_name: The name of the column that the metrics are grouped by
+        :type key_name: string
+        :returns: The plot values stored by group ID
+        :rtype: dict
+        """
+
+        field_names = [field.name for field in model._meta.get_fields() if type(field) in PLOT_FIELD_TYPES]
+        saved_values = {}
+        for values in model.objects.filter(occurred=date).values(key_name, *field_names):
+            saved_values[values.pop(key_name)] = values
+        return saved_values
+
+    def _time_provider(self, date, model, key_name, legacy_calculate, runs):
+        """Times calculating the metrics of a provider for the given day, both the legacy way and by the provider, and
+        compares the metrics they save
+
+        :param date: The day
+        :type date: :class:`datetime.date`
+        :param model: The metrics model class of the provider
+        :type model: class
+        :param key_name: The name of the column that the metrics are grouped by
+        :type key_name: string
+        :param legacy_calculate: The function that calculates the metrics models the legacy way
+        :type legacy_calculate: function
+        :param runs: The number of times to time each calculation
+        :type runs: int
+        :returns: The results
+        :rtype: dict
+        """
+
+        legacy_histogram = Histogram()
+        database_histogram = Histogram()
+        for _ in range(runs):
+            started = time.time()
+            model.objects._replace_entries(date, legacy_calculate(date))
+            legacy_histogram.record(time.time() - started)
+        legacy_values = self._get_saved_values(date, model, key_name)
+
+        for _ in range(runs):
+            started = time.time()
+            model.objects.calculate(date)
+            database_histogram.record(time.time() - started)
+        database_values = self._get_saved_values(date, model, key_name)
+
+        mismatch_count = 0
+        for group_id in set(legacy_values.keys()) | set(database_values.keys()):
+            legacy_group = legacy_values.get(group_id, {})
+            database_group = database_values.get(group_id, {})
+            for name in set(legacy_group.keys()) | set(database_group.keys()):
+                if legacy_group.get(name) != database_group.get(name):
+                    mismatch_count += 1
+
+        legacy_ms = legacy_histogram.get_summary(scale=1000.0)
+        database_ms = database_histogram.get_summary(scale=1000.0)
+        speedup = round(legacy_ms['p50'] / database_ms['p50'], 2) if database_ms['p50'] else None
+        return {'groups': len(database_values), 'legacy_ms': legacy_ms, 'database_ms': database_ms,
+                'speedup': speedup, 'mismatched_values': mismatch_count}
+
+    def _write_results(self, name, results):
+        """Writes a readable summary of the given results for a provider
+
+        :param name: The name of the provider
+        :type name: string
+        :param results: The results
+        :type results: dict
+        """
+
+        legacy_ms = results['legacy_ms']
+        database_ms = results['database_ms']
+        self.stdout.write('%s metrics: %i groups, %i mismatched values' % (name, results['groups'],
+                                                                         results['mismatched_values']))
+        self.stdout.write('  legacy ms: p50 %s, max %s' % (legacy_ms['p50'], legacy_ms['max']))
+        self.stdout.write('  database ms: p50 %s, max %s, speedup %s' % (database_ms['p50'], database_ms['max'],
+                                                                        results['speedup']))
+
+
+def _calculate_legacy_errors(date):
+    """Calculates the error metrics for the given day by iterating over each job execution, which is how they were
+    calculated before the calculation was moved to the database
+
+    :param date: The day
+    :type date: :class:`datetime.date`
+    :returns: The list of metrics models
+    :rtype: list
+    """
+
+    started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
+    ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
+
+    job_exe_ends = JobExecutionEnd.objects.filter(error__is_builtin=True, ended__gte=started, ended__lte=ended)
+    job_exe_ends = job_exe_ends.select_related('error')
+    entry_map = {}
+    for job_exe_end in job_exe_ends.iterator():
+        if job_exe_end.error not in entry_map:
+            entry = MetricsError(error=job_exe_end.error, occurred=date, created=timezone.now())
+            entry.total_count = 0
+            entry_map[job_exe_end.error] = entry
+        entry = entry_map[job_exe_end.error]
+        entry.total_count += 1
+    return entry_map.values()
+
+
+def _calculate_legacy_ingests(date):
+    """Calculates the ingest metrics for the given day by iterating over each ingest, which is how they were
+    calculated before the calculation was moved to the database
+
+    :param date: The day
+    :type date: :class:`datetime.date`
+    :returns: The list of metrics models
+    :rtype: list
+    """
+
+    started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
+    ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
+
+    ingests = Ingest.objects.filter(status__in=INGEST_STATUSES, ingest_ended__gte=started, ingest_ended__lte=ended,
+                                    strike__isnull=False)
+    ingests = ingests.select_related('strike').defer('strike__configuration')
+    entry_map = {}
+    for ingest in ingests.iterator():
+        if ingest.strike not in entry_map:
+            entry = MetricsIngest(strike=ingest.strike, occurred=date, created=timezone.now())
+            entry.deferred_count = 0
+            entry.ingested_count = 0
+            entry.errored_count = 0
+            entry.duplicate_count = 0
+            entry.total_count = 0
+            entry_map[ingest.strike] = entry
+        entry = entry_map[ingest.strike]
+        setattr(entry, ingest.status.lower() + '_count', getattr(entry, ingest.status.lower() + '_count') + 1)
+        entry.total_count += 1
+
+        if ingest.file_size:
+            entry._file_count = (entry._file_count if hasattr(entry, '_file_count') else 0) + 1
+            entry.file_size_sum = (entry.file_size_sum or 0) + ingest.file_size
+            entry.file_size_min = min(entry.file_size_min or sys.maxint, ingest.file_size)
+            entry.file_size_max = max(entry.file_size_max or 0, ingest.file_size)
+            entry.file_size_avg = entry.file_size_sum / entry._file_count
+
+        if ingest.transfer_started and ingest.transfer_ended:
+            transfer_secs = max((ingest.transfer_ended - ingest.transfer_started).total_seconds(), 0)
+            entry._transfer_count = (entry._transfer_count if hasattr(entry, '_transfer_count') else 0) + 1
+            entry.transfer_time_sum = (entry.transfer_time_sum or 0) + transfer_secs
+            entry.transfer_time_min = min(entry.transfer_time_min or sys.maxint, transfer_secs)
+            entry.transfer_time_max = max(entry.transfer_time_max or 0, transfer_secs)
+            entry.transfer_time_avg = entry.transfer_time_sum / entry._transfer_count
+
+        if ingest.status == 'INGESTED' and ingest.ingest_started and ingest.ingest_ended:
+            ingest_secs = max((ingest.ingest_ended - ingest.ingest_started).total_seconds(), 0)
+            entry._ingest_count = (entry._ingest_count if hasattr(entry, '_ingest_count') else 0) + 1
+            entry.ingest_time_sum = (entry.ingest_time_sum or 0) + ingest_secs
+            entry.ingest_time_min = min(entry.ingest_time_min or sys.maxint, ingest_secs)
+            entry.ingest_time_max = max(entry.ingest_time_max or 0, ingest_secs)
+            entry.ingest_time_avg = entry.ingest_time_sum / entry._ingest_count
+    return entry_map.values()
+
+
+def _calculate_legacy_job_types(date):
+    """Calculates the job type metrics for the given day by iterating over each job and job execution and parsing the
+    task results of each job execution, which is how they were calculated before the calculation was moved to the
+    database
+
+    :param date: The day
+    :type date: :class:`datetime.date`
+    :returns: The list of metrics models
+    :rtype: list
+    """
+
+    started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
+    ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
+
+    jobs = Job.objects.filter(status__in=['CANCELED', 'COMPLETED', 'FAILED'], ended__gte=started, ended__lte=ended)
+    jobs = jobs.select_related('job_type', 'error').defer('input', 'output')
+    entry_map = {}
+    for job in jobs.iterator():
+        if job.job_type not in entry_map:
+            entry = MetricsJobType(job_type=job.job_type, occurred=date, created=timezone.now())
+            entry.completed_count = 0
+            entry.failed_count = 0
+            entry.canceled_count = 0
+            entry.total_count = 0
+            entry.error_system_count = 0
+            entry.error_data_count = 0
+            entry.error_algorithm_count = 0
+            entry_map[job.job_type] = entry
+        entry = entry_map[job.job_type]
+        setattr(entry, job.status.lower() + '_count', getattr(entry, job.status.lower() + '_count') + 1)
+        entry.total_count += 1
+        if job.error:
+            setattr(entry, 'error_%s_count' % job.error.category.lower(),
+                    getattr(entry, 'error_%s_count' % job.error.category.lower()) + 1)
+
+    job_exe_ends = JobExecutionEnd.objects.filter(status__in=['COMPLETED'], ended__gte=started, ended__lte=ended)
+    job_exe_ends = job_exe_ends.select_related('job_type')
+    for job_exe_end in job_exe_ends.iterator():
+        entry = entry_map[job_exe_end.job_type]
+        if job_exe_end.queued and job_exe_end.started:
+            _update_legacy_times(entry, 'queue_time',
+                                 max((job_exe_end.started - job_exe_end.queued).total_seconds(), 0))
+
+        task_results = job_exe_end.get_task_results()
+        task_secs = {}
+        for task_type, name in [('pull', None), ('pre', 'pre_time'), ('main', 'job_time'), ('post', 'post_time')]:
+            task_length = task_results.get_task_run_length(task_type)
+            if task_length:
+                task_secs[task_type] = max(task_length.total_seconds(), 0)
+                if name:
+                    _update_legacy_times(entry, name, task_secs[task_type])
+
+        if job_exe_end.started and job_exe_end.ended:
+            run_secs = max((job_exe_end.ended - job_exe_end.started).total_seconds(), 0)
+            _update_legacy_times(entry, 'run_time', run_secs)
+            _update_legacy_times(entry, 'stage_time', max(run_secs - sum(task_secs.values()), 0))
+    return entry_map.values()
+
+
+def _update_legacy_times(entry, name, secs):
+    """Updates the sum, min, max, and avg time fields with the given base name on the given job type metrics model
+    for a single job execution, the way they were updated before the calculation was moved to the database
+
+    :param entry: The metrics model
+    :type entry: :class:`metrics.models.MetricsJobType`
+    :param name: The base name of the fields, such as queue_time
+    :type name: string
+    :param secs: The time of the job execution in seconds
+    :type secs: float
+    """
+
+    value_sum = (getattr(entry, name + '_sum') or 0) + secs
+    setattr(entry, name + '_sum', value_sum)
+    setattr(entry, name + '_min', min(getattr(entry, name + '_min') or sys.maxint, secs))
+    setattr(entry, name + '_max', max(getattr(entry, name + '_max') or 0, secs))
+    setattr(entry, name + '_avg', value_sum / entry.completed_count)
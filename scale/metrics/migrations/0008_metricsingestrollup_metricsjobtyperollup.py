@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import metrics.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0015_scan_resume_key'),
+        ('job', '0042_jobexecution_storage_metrics'),
+        ('metrics', '0007_auto_20161013_2333'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricsIngestRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(db_index=True)),
+                ('ingested_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of successfully ingested files.', verbose_name='Ingested Count')),
+                ('errored_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of files that failed to ingest.', verbose_name='Errored Count')),
+                ('duplicate_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of files that were duplicates of previous ingests.', verbose_name='Duplicate Count')),
+                ('total_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of ingested, errored, and duplicate ingests.', verbose_name='Total Count')),
+                ('transfer_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('ingest_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('strike', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='ingest.Strike')),
+            ],
+            options={
+                'db_table': 'metrics_ingest_rollup',
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricsJobTypeRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(db_index=True)),
+                ('completed_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of completed job executions.', verbose_name='Completed Count')),
+                ('failed_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of failed job executions.', verbose_name='Failed Count')),
+                ('canceled_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of canceled job executions.', verbose_name='Canceled Count')),
+                ('total_count', metrics.models.PlotBigIntegerField(default=0, help_text='Number of completed, failed, and canceled job executions.', verbose_name='Total Count')),
+                ('queue_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('pre_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('job_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('post_time', django.contrib.postgres.fields.jsonb.JSONField(default=dict)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('job_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='job.JobType')),
+            ],
+            options={
+                'db_table': 'metrics_job_type_rollup',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='metricsjobtyperollup',
+            unique_together=set([('job_type', 'started')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='metricsingestrollup',
+            unique_together=set([('strike', 'started')]),
+        ),
+    ]
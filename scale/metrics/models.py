@@ -3,16 +3,20 @@ from __future__ import unicode_literals
 
 import datetime
 import logging
-import sys
+from collections import OrderedDict
 
 import django.contrib.gis.db.models as models
+import django.contrib.postgres.fields
 import django.utils.timezone as timezone
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, IntegrityError, transaction
 
 from error.models import Error
-from job.models import Job, JobExecutionEnd, JobType
-from ingest.models import Ingest, Strike
-from metrics.registry import MetricsPlotData, MetricsType, MetricsTypeGroup, MetricsTypeFilter
+from job.models import JobType
+from ingest.models import Strike
+from metrics.registry import (MetricsPlotData, MetricsPlotValue, MetricsType, MetricsTypeColumn, MetricsTypeGroup,
+                              MetricsTypeFilter)
+from util.histogram import Histogram
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +70,214 @@ class PlotIntegerField(models.IntegerField):
 
 PLOT_FIELD_TYPES = [PlotBigIntegerField, PlotIntegerField]
 
+# The number of hours of job executions and ingests that are aggregated by each metrics query, so that the work of each
+# query is bounded on a busy day
+AGGREGATE_CHUNK_HOURS = 4
+
+# The percentiles of the times recorded by the metrics rollups that can be plotted
+ROLLUP_PERCENTILES = [50, 95, 99]
+
+# Selects the run time in seconds of the first task of a type from the task results of a job execution end, or null if
+# the task did not run or has a zero run time. The task type is populated with format().
+TASK_SECS_SQL = ("(SELECT NULLIF(GREATEST(EXTRACT(EPOCH FROM (t.task->>'ended')::timestamptz - "
+                 "(t.task->>'started')::timestamptz), 0), 0) "
+                 "FROM jsonb_array_elements(jee.task_results->'tasks') WITH ORDINALITY t(task, i) "
+                 "WHERE t.task->>'type' = '{0}' AND t.task ? 'started' AND t.task ? 'ended' ORDER BY t.i LIMIT 1)")
+
+
+def _aggregate_rows(qry, windows):
+    """Runs the given aggregation query over each of the given time windows and merges the resulting rows by their
+    first column, which must be the ID that the query groups by. Columns with names ending in _min or _max are merged by
+    taking the minimum or maximum value and all other columns are summed. Null values are ignored.
+
+    :param qry: The SQL query, which takes the start (inclusive) and end (exclusive) of a time window as parameters
+    :type qry: string
+    :param windows: The list of time windows, each a tuple of start and end times
+    :type windows: list
+    :returns: The merged column values of each row, stored by ID and then by column name
+    :rtype: dict
+    """
+
+    results = {}
+    with connection.cursor() as cursor:
+        for window_started, window_ended in windows:
+            cursor.execute(qry, [window_started, window_ended])
+            column_names = [column[0] for column in cursor.description[1:]]
+            for row in cursor.fetchall():
+                values = dict(zip(column_names, row[1:]))
+                if row[0] not in results:
+                    results[row[0]] = values
+                    continue
+                merged = results[row[0]]
+                for name, value in values.items():
+                    if value is None:
+                        continue
+                    elif merged[name] is None:
+                        merged[name] = value
+                    elif name.endswith('_min'):
+                        merged[name] = min(merged[name], value)
+                    elif name.endswith('_max'):
+                        merged[name] = max(merged[name], value)
+                    else:
+                        merged[name] += value
+    return results
+
+
+def _get_day_windows(date, hours=24):
+    """Returns the time windows that divide the given day (UTC) into chunks of the given number of hours
+
+    :param date: The day
+    :type date: :class:`datetime.date`
+    :param hours: The number of hours in each time window
+    :type hours: int
+    :returns: The list of time windows, each a tuple of start (inclusive) and end (exclusive) times
+    :rtype: list
+    """
+
+    started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
+    day_ended = started + datetime.timedelta(days=1)
+    windows = []
+    while started < day_ended:
+        ended = min(started + datetime.timedelta(hours=hours), day_ended)
+        windows.append((started, ended))
+        started = ended
+    return windows
+
+
+def _set_stats(entry, name, values, count):
+    """Sets the sum, min, max, and avg fields with the given base name on the given metrics model from the given
+    aggregated values. The average is the sum divided by the given count.
+
+    :param entry: The metrics model
+    :type entry: :class:`django.db.models.Model`
+    :param name: The base name of the fields, such as queue_time
+    :type name: string
+    :param values: The aggregated values stored by column name, which must include the sum, min, and max columns
+    :type values: dict
+    :param count: The number of values to average over
+    :type count: int
+    """
+
+    value_sum = values[name + '_sum']
+    setattr(entry, name + '_sum', value_sum)
+    setattr(entry, name + '_min', values[name + '_min'])
+    setattr(entry, name + '_max', values[name + '_max'])
+    setattr(entry, name + '_avg', value_sum / count if value_sum is not None and count else None)
+
+
+def _create_rollup_plot_data(query_set, choice_field, choice_ids, columns):
+    """Creates plot data from a query set of metrics rollup models, with a plot value for each bucket. Unless choice
+    filters are used, the counts and histograms of the rollups of all the choices within each bucket are merged, so each
+    plotted percentile is the percentile of all the times recorded within the bucket.
+
+    :param query_set: The metrics rollup models, ordered by when their buckets started
+    :type query_set: :class:`django.db.models.QuerySet`
+    :param choice_field: The name of the field within each model that contains the choice model ID
+    :type choice_field: string
+    :param choice_ids: A list of related model identifiers to query
+    :type choice_ids: list[string]
+    :param columns: A list of metrics type column definitions that should be included
+    :type columns: list[:class:`metrics.registry.MetricsTypeColumn`]
+    :returns: The plot data models that were created
+    :rtype: list[:class:`metrics.registry.MetricsPlotData`]
+    """
+
+    count_names = [column.name for column in columns if column.aggregate == 'sum']
+    histogram_names = set(column.group for column in columns if column.aggregate != 'sum')
+
+    # Merge the rollups that contribute to the same plot values
+    merged_map = OrderedDict()  # {(Choice ID, bucket started): (counts, histograms)}
+    for rollup in query_set.iterator():
+        key = (getattr(rollup, choice_field) if choice_ids else None, rollup.started)
+        if key not in merged_map:
+            merged_map[key] = ({name: 0 for name in count_names}, {name: Histogram() for name in histogram_names})
+        counts, histograms = merged_map[key]
+        for name in count_names:
+            counts[name] += getattr(rollup, name)
+        for name in histogram_names:
+            histograms[name].add(Histogram.from_dict(getattr(rollup, name)))
+
+    results = {column.name: MetricsPlotData(column=column, values=[]) for column in columns}
+    for (choice_id, started), (counts, histograms) in merged_map.items():
+        for column in columns:
+            if column.aggregate == 'sum':
+                value = counts[column.name]
+            else:
+                # The aggregate of a percentile column is the percentile, such as p95
+                value = histograms[column.group].get_percentile(float(column.aggregate[1:]))
+                if value is None:
+                    continue
+                value = int(round(value))
+
+            plot_data = results[column.name]
+            plot_data.min_x = started if plot_data.min_x is None else min(plot_data.min_x, started)
+            plot_data.max_x = started if plot_data.max_x is None else max(plot_data.max_x, started)
+            plot_data.min_y = value if plot_data.min_y is None else min(plot_data.min_y, value)
+            plot_data.max_y = value if plot_data.max_y is None else max(plot_data.max_y, value)
+            plot_data.values.append(MetricsPlotValue(choice_id=choice_id, date=started, value=value))
+    return results.values()
+
+
+def _get_rollup_started(when):
+    """Returns when the bucket of the metrics rollups that contains the given time started. The buckets are
+    METRICS_ROLLUP_MINUTES long, starting at midnight UTC.
+
+    :param when: The time
+    :type when: :class:`datetime.datetime`
+    :returns: When the bucket started
+    :rtype: :class:`datetime.datetime`
+    """
+
+    when = when.astimezone(timezone.utc)
+    day_started = datetime.datetime.combine(when.date(), datetime.time.min).replace(tzinfo=timezone.utc)
+    bucket_secs = settings.METRICS_ROLLUP_MINUTES * 60
+    secs = int((when - day_started).total_seconds())
+    return day_started + datetime.timedelta(seconds=secs - secs % bucket_secs)
+
+
+def _lock_rollup(model_class, started, **kwargs):
+    """Returns the metrics rollup model for the given bucket and choice, creating it if it does not exist yet. The
+    model is locked with select_for_update(), so this must be called within an atomic transaction.
+
+    :param model_class: The class of the metrics rollup model
+    :type model_class: class
+    :param started: When the bucket started
+    :type started: :class:`datetime.datetime`
+    :param kwargs: The choice model ID of the rollup, such as job_type_id
+    :type kwargs: dict
+    :returns: The locked metrics rollup model
+    :rtype: :class:`django.db.models.Model`
+    """
+
+    rollup = model_class.objects.select_for_update().filter(started=started, **kwargs).first()
+    if not rollup:
+        try:
+            # The savepoint lets the transaction continue if another transaction created the rollup first
+            with transaction.atomic():
+                rollup = model_class.objects.create(started=started, **kwargs)
+        except IntegrityError:
+            rollup = model_class.objects.select_for_update().get(started=started, **kwargs)
+    return rollup
+
+
+def _set_rollup_columns(metrics_type, model_class):
+    """Sets the columns of the given metrics type for the given metrics rollup model class, which are the plot fields
+    of the model and the percentiles of each of its histograms
+
+    :param metrics_type: The metrics type
+    :type metrics_type: :class:`metrics.registry.MetricsType`
+    :param model_class: The class of the metrics rollup model
+    :type model_class: class
+    """
+
+    metrics_type.set_columns(model_class, PLOT_FIELD_TYPES)
+    for name, title, description in model_class.HISTOGRAMS:
+        for percentile in ROLLUP_PERCENTILES:
+            column = MetricsTypeColumn('%s_p%d' % (name, percentile), '%s (P%d)' % (title, percentile),
+                                       '%dth percentile of the %s.' % (percentile, description), 'seconds', name,
+                                       'p%d' % percentile)
+            metrics_type.columns.append(column)
+
 
 class MetricsErrorManager(models.Manager):
     """Provides additional methods for computing daily error metrics."""
@@ -73,25 +285,19 @@ class MetricsErrorManager(models.Manager):
     def calculate(self, date):
         """See :meth:`metrics.registry.MetricsTypeProvider.calculate`."""
 
-        started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
-        ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
+        # Count the job executions with a builtin error for the requested day, grouped by error
+        qry = 'SELECT jee.error_id, COUNT(*) AS total_count FROM job_exe_end jee JOIN error e ON jee.error_id = e.id '
+        qry += 'WHERE e.is_builtin AND jee.ended >= %s AND jee.ended < %s GROUP BY jee.error_id'
+        results = _aggregate_rows(qry, _get_day_windows(date, AGGREGATE_CHUNK_HOURS))
 
-        # Fetch all the job executions with an error for the requested day
-        job_exe_ends = JobExecutionEnd.objects.filter(error__is_builtin=True, ended__gte=started, ended__lte=ended)
-        job_exe_ends = job_exe_ends.select_related('error')
-
-        # Calculate the overall counts based on job status
-        entry_map = {}
-        for job_exe_end in job_exe_ends.iterator():
-            if job_exe_end.error not in entry_map:
-                entry = MetricsError(error=job_exe_end.error, occurred=date, created=timezone.now())
-                entry.total_count = 0
-                entry_map[job_exe_end.error] = entry
-            entry = entry_map[job_exe_end.error]
-            entry.total_count += 1
+        entries = []
+        for error_id, values in results.items():
+            entry = MetricsError(error_id=error_id, occurred=date, created=timezone.now())
+            entry.total_count = values['total_count']
+            entries.append(entry)
 
         # Save the new metrics to the database
-        self._replace_entries(date, entry_map.values())
+        self._replace_entries(date, entries)
 
     def get_metrics_type(self, include_choices=False):
         """See :meth:`metrics.registry.MetricsTypeProvider.get_metrics_type`."""
@@ -184,30 +390,42 @@ class MetricsIngestManager(models.Manager):
     def calculate(self, date):
         """See :meth:`metrics.registry.MetricsTypeProvider.calculate`."""
 
-        started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
-        ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
-
-        # Fetch all the ingests relevant for metrics
-        ingests = Ingest.objects.filter(status__in=['DEFERRED', 'INGESTED', 'ERRORED', 'DUPLICATE'],
-                                        ingest_ended__gte=started, ingest_ended__lte=ended, strike__isnull=False)
-        ingests = ingests.select_related('strike').defer('strike__configuration')
-
-        # Calculate the overall counts based on ingest status
-        entry_map = {}
-        for ingest in ingests.iterator():
-            if ingest.strike not in entry_map:
-                entry = MetricsIngest(strike=ingest.strike, occurred=date, created=timezone.now())
-                entry.deferred_count = 0
-                entry.ingested_count = 0
-                entry.errored_count = 0
-                entry.duplicate_count = 0
-                entry.total_count = 0
-                entry_map[ingest.strike] = entry
-            entry = entry_map[ingest.strike]
-            self._update_metrics(date, ingest, entry)
+        # Aggregate the ingests relevant for metrics for the requested day, grouped by strike process
+        qry = 'SELECT s.strike_id, COUNT(*) FILTER(WHERE s.status = \'DEFERRED\') AS deferred_count, '
+        qry += 'COUNT(*) FILTER(WHERE s.status = \'INGESTED\') AS ingested_count, '
+        qry += 'COUNT(*) FILTER(WHERE s.status = \'ERRORED\') AS errored_count, '
+        qry += 'COUNT(*) FILTER(WHERE s.status = \'DUPLICATE\') AS duplicate_count, COUNT(*) AS total_count, '
+        qry += 'COUNT(s.file_size) AS file_count, SUM(s.file_size) AS file_size_sum, '
+        qry += 'MIN(s.file_size) AS file_size_min, MAX(s.file_size) AS file_size_max, '
+        qry += 'COUNT(s.transfer_secs) AS transfer_count, SUM(s.transfer_secs) AS transfer_time_sum, '
+        qry += 'MIN(s.transfer_secs) AS transfer_time_min, MAX(s.transfer_secs) AS transfer_time_max, '
+        qry += 'COUNT(s.ingest_secs) AS ingest_count, SUM(s.ingest_secs) AS ingest_time_sum, '
+        qry += 'MIN(s.ingest_secs) AS ingest_time_min, MAX(s.ingest_secs) AS ingest_time_max '
+        qry += 'FROM (SELECT i.strike_id, i.status, NULLIF(i.file_size, 0) AS file_size, '
+        qry += 'CASE WHEN i.transfer_started IS NOT NULL AND i.transfer_ended IS NOT NULL '
+        qry += 'THEN GREATEST(EXTRACT(EPOCH FROM i.transfer_ended - i.transfer_started), 0) END AS transfer_secs, '
+        qry += 'CASE WHEN i.status = \'INGESTED\' AND i.ingest_started IS NOT NULL '
+        qry += 'THEN GREATEST(EXTRACT(EPOCH FROM i.ingest_ended - i.ingest_started), 0) END AS ingest_secs '
+        qry += 'FROM ingest i WHERE i.status IN (\'DEFERRED\', \'INGESTED\', \'ERRORED\', \'DUPLICATE\') '
+        qry += 'AND i.strike_id IS NOT NULL AND i.ingest_ended >= %s AND i.ingest_ended < %s) s '
+        qry += 'GROUP BY s.strike_id'
+        results = _aggregate_rows(qry, _get_day_windows(date, AGGREGATE_CHUNK_HOURS))
+
+        entries = []
+        for strike_id, values in results.items():
+            entry = MetricsIngest(strike_id=strike_id, occurred=date, created=timezone.now())
+            entry.deferred_count = values['deferred_count']
+            entry.ingested_count = values['ingested_count']
+            entry.errored_count = values['errored_count']
+            entry.duplicate_count = values['duplicate_count']
+            entry.total_count = values['total_count']
+            _set_stats(entry, 'file_size', values, values['file_count'])
+            _set_stats(entry, 'transfer_time', values, values['transfer_count'])
+            _set_stats(entry, 'ingest_time', values, values['ingest_count'])
+            entries.append(entry)
 
         # Save the new metrics to the database
-        self._replace_entries(date, entry_map.values())
+        self._replace_entries(date, entries)
 
     def get_metrics_type(self, include_choices=False):
         """See :meth:`metrics.registry.MetricsTypeProvider.get_metrics_type`."""
@@ -243,57 +461,6 @@ class MetricsIngestManager(models.Manager):
         # Convert the database models to plot models
         return MetricsPlotData.create(entries, 'occurred', 'strike_id', choice_ids, columns)
 
-    def _update_metrics(self, date, ingest, entry):
-        """Updates the metrics model attributes for a single ingest.
-
-        :param date: The date when ingests associated with the metrics ended.
-        :type date: datetime.date
-        :param ingest: The ingest from which to derive statistics.
-        :type ingest: :class:`ingest.models.Ingest`
-        :param entry: The metrics model to update.
-        :type entry: :class:`metrics.models.MetricsIngest`
-        """
-        if ingest.status == 'DEFERRED':
-            entry.deferred_count += 1
-            entry.total_count += 1
-        elif ingest.status == 'INGESTED':
-            entry.ingested_count += 1
-            entry.total_count += 1
-        elif ingest.status == 'ERRORED':
-            entry.errored_count += 1
-            entry.total_count += 1
-        elif ingest.status == 'DUPLICATE':
-            entry.duplicate_count += 1
-            entry.total_count += 1
-
-        # Update file size metrics
-        if ingest.file_size:
-            entry._file_count = (entry._file_count if hasattr(entry, '_file_count') else 0) + 1
-            entry.file_size_sum = (entry.file_size_sum or 0) + ingest.file_size
-            entry.file_size_min = min(entry.file_size_min or sys.maxint, ingest.file_size)
-            entry.file_size_max = max(entry.file_size_max or 0, ingest.file_size)
-            entry.file_size_avg = entry.file_size_sum / entry._file_count
-
-        # Update elapsed transfer time metrics
-        if ingest.transfer_started and ingest.transfer_ended:
-            transfer_secs = max((ingest.transfer_ended - ingest.transfer_started).total_seconds(), 0)
-            entry._transfer_count = (entry._transfer_count if hasattr(entry, '_transfer_count') else 0) + 1
-            entry.transfer_time_sum = (entry.transfer_time_sum or 0) + transfer_secs
-            entry.transfer_time_min = min(entry.transfer_time_min or sys.maxint, transfer_secs)
-            entry.transfer_time_max = max(entry.transfer_time_max or 0, transfer_secs)
-            entry.transfer_time_avg = entry.transfer_time_sum / entry._transfer_count
-
-        # Update elapsed ingest time metrics
-        if ingest.status == 'INGESTED' and ingest.ingest_started and ingest.ingest_ended:
-            ingest_secs = max((ingest.ingest_ended - ingest.ingest_started).total_seconds(), 0)
-            entry._ingest_count = (entry._ingest_count if hasattr(entry, '_ingest_count') else 0) + 1
-            entry.ingest_time_sum = (entry.ingest_time_sum or 0) + ingest_secs
-            entry.ingest_time_min = min(entry.ingest_time_min or sys.maxint, ingest_secs)
-            entry.ingest_time_max = max(entry.ingest_time_max or 0, ingest_secs)
-            entry.ingest_time_avg = entry.ingest_time_sum / entry._ingest_count
-
-        return entry
-
     @transaction.atomic
     def _replace_entries(self, date, entries):
         """Replaces all the existing metric entries for the given date with new ones.
@@ -432,46 +599,210 @@ class MetricsIngest(models.Model):
         db_table = 'metrics_ingest'
 
 
+class MetricsIngestRollupManager(models.Manager):
+    """Provides additional methods for computing intra-day ingest metrics."""
+
+    def get_metrics_type(self, include_choices=False):
+        """See :meth:`metrics.registry.MetricsTypeProvider.get_metrics_type`."""
+
+        # Create the metrics type definition
+        metrics_type = MetricsType('ingests-rollup', 'Ingests (Intra-day)',
+                                   'Metrics for completed ingests grouped by strike process within each part of a day.')
+        metrics_type.filters = [MetricsTypeFilter('name', 'string')]
+        metrics_type.groups = MetricsIngestRollup.GROUPS
+        _set_rollup_columns(metrics_type, MetricsIngestRollup)
+
+        # Optionally include all the possible strike choices
+        if include_choices:
+            metrics_type.choices = Strike.objects.all()
+
+        return metrics_type
+
+    def get_plot_data(self, started=None, ended=None, choice_ids=None, columns=None):
+        """See :meth:`metrics.registry.MetricsTypeProvider.get_plot_data`."""
+
+        # Fetch all the matching ingest rollups based on query filters
+        rollups = MetricsIngestRollup.objects.all().order_by('started')
+        if started:
+            rollups = rollups.filter(started__gte=started)
+        if ended:
+            rollups = rollups.filter(started__lte=ended)
+        if choice_ids:
+            rollups = rollups.filter(strike_id__in=choice_ids)
+        if not columns:
+            columns = self.get_metrics_type().columns
+
+        # Convert the database models to plot models
+        return _create_rollup_plot_data(rollups, 'strike_id', choice_ids, columns)
+
+    def update_rollups(self, ingests, when):
+        """Records the given ingests, which were just completed at the given time, in the rollups of their strike
+        processes. This must be called in the same atomic transaction that completes the ingests, so that each
+        completion is recorded exactly once.
+
+        :param ingests: The completed ingest models
+        :type ingests: list[:class:`ingest.models.Ingest`]
+        :param when: When the ingests were completed
+        :type when: :class:`datetime.datetime`
+        """
+
+        started = _get_rollup_started(when)
+        ingest_map = {}  # {Strike ID: [Ingest]}
+        for ingest in ingests:
+            if ingest.strike_id:
+                ingest_map.setdefault(ingest.strike_id, []).append(ingest)
+
+        # Lock the rollups in a consistent order to prevent deadlocks
+        for strike_id in sorted(ingest_map.keys()):
+            rollup = _lock_rollup(MetricsIngestRollup, started, strike_id=strike_id)
+            transfer_time = Histogram.from_dict(rollup.transfer_time)
+            ingest_time = Histogram.from_dict(rollup.ingest_time)
+            for ingest in ingest_map[strike_id]:
+                if ingest.status == 'INGESTED':
+                    rollup.ingested_count += 1
+                elif ingest.status == 'ERRORED':
+                    rollup.errored_count += 1
+                elif ingest.status == 'DUPLICATE':
+                    rollup.duplicate_count += 1
+                rollup.total_count += 1
+
+                if ingest.transfer_started and ingest.transfer_ended:
+                    transfer_time.record((ingest.transfer_ended - ingest.transfer_started).total_seconds())
+                if ingest.status == 'INGESTED' and ingest.ingest_started and ingest.ingest_ended:
+                    ingest_time.record((ingest.ingest_ended - ingest.ingest_started).total_seconds())
+            rollup.transfer_time = transfer_time.get_dict()
+            rollup.ingest_time = ingest_time.get_dict()
+            rollup.save()
+
+
+class MetricsIngestRollup(models.Model):
+    """Tracks the metrics of the ingests of a strike process that were completed within a bucket of time shorter than a
+    day. The rollups are updated incrementally as ingest jobs complete ingests, with the transfer and ingest times
+    recorded in histograms that can be merged to plot their percentiles.
+
+    :keyword strike: The strike process associated with these metrics.
+    :type strike: :class:`django.db.models.ForeignKey`
+    :keyword started: When the bucket of the ingests included in this model started.
+    :type started: :class:`django.db.models.DateTimeField`
+
+    :keyword ingested_count: The number of successfully ingested files.
+    :type ingested_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword errored_count: The number of files that failed to ingest.
+    :type errored_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword duplicate_count: The number of files that were duplicates of previous ingests.
+    :type duplicate_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword total_count: The number of ingested, errored, and duplicate ingests.
+    :type total_count: :class:`metrics.models.PlotBigIntegerField`
+
+    :keyword transfer_time: The histogram of the times spent transferring files in seconds.
+    :type transfer_time: :class:`django.contrib.postgres.fields.JSONField`
+    :keyword ingest_time: The histogram of the times spent ingesting files in seconds.
+    :type ingest_time: :class:`django.contrib.postgres.fields.JSONField`
+
+    :keyword created: When the model was first created.
+    :type created: :class:`django.db.models.DateTimeField`
+    :keyword last_modified: When the model was last modified.
+    :type last_modified: :class:`django.db.models.DateTimeField`
+    """
+    GROUPS = [
+        MetricsTypeGroup('overview', 'Overview', 'Overall counts based on ingest status.'),
+        MetricsTypeGroup('transfer_time', 'Transfer Time', 'When files were being transferred before ingest.'),
+        MetricsTypeGroup('ingest_time', 'Ingest Time', 'When files were processed during ingest.'),
+    ]
+
+    # The histogram fields, each the name, title, and description of the recorded times
+    HISTOGRAMS = [
+        ('transfer_time', 'Transfer Time', 'time spent transferring files'),
+        ('ingest_time', 'Ingest Time', 'time spent ingesting files'),
+    ]
+
+    strike = models.ForeignKey('ingest.Strike', on_delete=models.PROTECT)
+    started = models.DateTimeField(db_index=True)
+
+    ingested_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                         help_text='Number of successfully ingested files.', units='count',
+                                         verbose_name='Ingested Count')
+    errored_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                        help_text='Number of files that failed to ingest.', units='count',
+                                        verbose_name='Errored Count')
+    duplicate_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                          help_text='Number of files that were duplicates of previous ingests.',
+                                          units='count', verbose_name='Duplicate Count')
+    total_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                      help_text='Number of ingested, errored, and duplicate ingests.', units='count',
+                                      verbose_name='Total Count')
+
+    transfer_time = django.contrib.postgres.fields.JSONField(default=dict)
+    ingest_time = django.contrib.postgres.fields.JSONField(default=dict)
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    objects = MetricsIngestRollupManager()
+
+    class Meta(object):
+        """meta information for the db"""
+        db_table = 'metrics_ingest_rollup'
+        unique_together = ('strike', 'started')
+
+
 class MetricsJobTypeManager(models.Manager):
     """Provides additional methods for computing daily job type metrics."""
 
     def calculate(self, date):
         """See :meth:`metrics.registry.MetricsTypeProvider.calculate`."""
 
-        started = datetime.datetime.combine(date, datetime.time.min).replace(tzinfo=timezone.utc)
-        ended = datetime.datetime.combine(date, datetime.time.max).replace(tzinfo=timezone.utc)
-
-        # Fetch all the jobs relevant for metrics
-        jobs = Job.objects.filter(status__in=['CANCELED', 'COMPLETED', 'FAILED'], ended__gte=started, ended__lte=ended)
-        jobs = jobs.select_related('job_type', 'error').defer('input', 'output')
-
-        # Calculate the overall counts based on job status
-        entry_map = {}
-        for job in jobs.iterator():
-            if job.job_type not in entry_map:
-                entry = MetricsJobType(job_type=job.job_type, occurred=date, created=timezone.now())
-                entry.completed_count = 0
-                entry.failed_count = 0
-                entry.canceled_count = 0
-                entry.total_count = 0
-                entry.error_system_count = 0
-                entry.error_data_count = 0
-                entry.error_algorithm_count = 0
-                entry_map[job.job_type] = entry
-            entry = entry_map[job.job_type]
-            self._update_counts(date, job, entry)
-
-        # Fetch all the completed job executions for the requested day
-        job_exe_ends = JobExecutionEnd.objects.filter(status__in=['COMPLETED'], ended__gte=started, ended__lte=ended)
-        job_exe_ends = job_exe_ends.select_related('job_type')
-
-        # Calculate the metrics per job execution grouped by job type
-        for job_exe_end in job_exe_ends.iterator():
-            entry = entry_map[job_exe_end.job_type]
-            self._update_times(date, job_exe_end, entry)
+        # Count the jobs relevant for metrics for the requested day, grouped by job type. The job ended column is not
+        # indexed, so the day is counted with a single query.
+        qry = 'SELECT j.job_type_id, COUNT(*) FILTER(WHERE j.status = \'COMPLETED\') AS completed_count, '
+        qry += 'COUNT(*) FILTER(WHERE j.status = \'FAILED\') AS failed_count, '
+        qry += 'COUNT(*) FILTER(WHERE j.status = \'CANCELED\') AS canceled_count, COUNT(*) AS total_count, '
+        qry += 'COUNT(*) FILTER(WHERE e.category = \'SYSTEM\') AS error_system_count, '
+        qry += 'COUNT(*) FILTER(WHERE e.category = \'DATA\') AS error_data_count, '
+        qry += 'COUNT(*) FILTER(WHERE e.category = \'ALGORITHM\') AS error_algorithm_count '
+        qry += 'FROM job j LEFT OUTER JOIN error e ON j.error_id = e.id '
+        qry += 'WHERE j.status IN (\'CANCELED\', \'COMPLETED\', \'FAILED\') AND j.ended >= %s AND j.ended < %s '
+        qry += 'GROUP BY j.job_type_id'
+        count_results = _aggregate_rows(qry, _get_day_windows(date))
+
+        # Aggregate the times of the completed job executions for the requested day, grouped by job type. The run time
+        # of each task is extracted from the task results JSON.
+        qry = 'SELECT s.job_type_id, '
+        for name in ['queue', 'pre', 'job', 'post', 'run', 'stage']:
+            qry += 'SUM(s.{0}_secs) AS {0}_time_sum, MIN(s.{0}_secs) AS {0}_time_min, '.format(name)
+            qry += 'MAX(s.{0}_secs) AS {0}_time_max, '.format(name)
+        qry = qry[:-2] + ' FROM (SELECT x.*, CASE WHEN x.run_secs IS NOT NULL THEN GREATEST(x.run_secs - '
+        qry += '(COALESCE(x.pull_secs, 0) + COALESCE(x.pre_secs, 0) + COALESCE(x.job_secs, 0) + '
+        qry += 'COALESCE(x.post_secs, 0)), 0) END AS stage_secs '
+        qry += 'FROM (SELECT jee.job_type_id, CASE WHEN jee.started IS NOT NULL '
+        qry += 'THEN GREATEST(EXTRACT(EPOCH FROM jee.started - jee.queued), 0) END AS queue_secs, '
+        qry += 'CASE WHEN jee.started IS NOT NULL '
+        qry += 'THEN GREATEST(EXTRACT(EPOCH FROM jee.ended - jee.started), 0) END AS run_secs, '
+        qry += TASK_SECS_SQL.format('pull') + ' AS pull_secs, ' + TASK_SECS_SQL.format('pre') + ' AS pre_secs, '
+        qry += TASK_SECS_SQL.format('main') + ' AS job_secs, ' + TASK_SECS_SQL.format('post') + ' AS post_secs '
+        qry += 'FROM job_exe_end jee WHERE jee.status = \'COMPLETED\' AND jee.ended >= %s AND jee.ended < %s) x) s '
+        qry += 'GROUP BY s.job_type_id'
+        time_results = _aggregate_rows(qry, _get_day_windows(date, AGGREGATE_CHUNK_HOURS))
+
+        entries = []
+        for job_type_id, values in count_results.items():
+            entry = MetricsJobType(job_type_id=job_type_id, occurred=date, created=timezone.now())
+            entry.completed_count = values['completed_count']
+            entry.failed_count = values['failed_count']
+            entry.canceled_count = values['canceled_count']
+            entry.total_count = values['total_count']
+            entry.error_system_count = values['error_system_count']
+            entry.error_data_count = values['error_data_count']
+            entry.error_algorithm_count = values['error_algorithm_count']
+
+            # The times are averaged over the jobs that completed on the requested day
+            if job_type_id in time_results:
+                for name in ['queue_time', 'pre_time', 'job_time', 'post_time', 'run_time', 'stage_time']:
+                    _set_stats(entry, name, time_results[job_type_id], entry.completed_count)
+            entries.append(entry)
 
         # Save the new metrics to the database
-        self._replace_entries(date, entry_map.values())
+        self._replace_entries(date, entries)
 
     def get_metrics_type(self, include_choices=False):
         """See :meth:`metrics.registry.MetricsTypeProvider.get_metrics_type`."""
@@ -507,106 +838,6 @@ class MetricsJobTypeManager(models.Manager):
         # Convert the database models to plot models
         return MetricsPlotData.create(entries, 'occurred', 'job_type_id', choice_ids, columns)
 
-    def _update_counts(self, date, job, entry):
-        """Updates the metrics model attributes for a single job.
-
-        :param date: The date when jobs associated with the metrics ended.
-        :type date: datetime.date
-        :param job: The job from which to derive statistics.
-        :type job: :class:`job.models.Job`
-        :param entry: The metrics model to update.
-        :type entry: :class:`metrics.models.MetricsJobType`
-        """
-        if job.status == 'COMPLETED':
-            entry.completed_count += 1
-            entry.total_count += 1
-        elif job.status == 'FAILED':
-            entry.failed_count += 1
-            entry.total_count += 1
-        elif job.status == 'CANCELED':
-            entry.canceled_count += 1
-            entry.total_count += 1
-
-        if job.error:
-            if job.error.category == 'SYSTEM':
-                entry.error_system_count += 1
-            elif job.error.category == 'DATA':
-                entry.error_data_count += 1
-            elif job.error.category == 'ALGORITHM':
-                entry.error_algorithm_count += 1
-
-    def _update_times(self, date, job_exe_end, entry):
-        """Updates the metrics model attributes for a single job execution.
-
-        :param date: The date when job executions associated with the metrics ended.
-        :type date: datetime.date
-        :param job_exe_end: The job execution from which to derive statistics.
-        :type job_exe_end: :class:`job.models.JobExecutionEnd`
-        :param entry: The metrics model to update.
-        :type entry: :class:`metrics.models.MetricsJobType`
-        """
-
-        # Update elapsed queue time metrics
-        queue_secs = None
-        if job_exe_end.queued and job_exe_end.started:
-            queue_secs = max((job_exe_end.started - job_exe_end.queued).total_seconds(), 0)
-            entry.queue_time_sum = (entry.queue_time_sum or 0) + queue_secs
-            entry.queue_time_min = min(entry.queue_time_min or sys.maxint, queue_secs)
-            entry.queue_time_max = max(entry.queue_time_max or 0, queue_secs)
-            entry.queue_time_avg = entry.queue_time_sum / entry.completed_count
-
-        task_results = job_exe_end.get_task_results()
-
-        pull_secs = None
-        pull_task_length = task_results.get_task_run_length('pull')
-        if pull_task_length:
-            pull_secs = max(pull_task_length.total_seconds(), 0)
-
-        # Update elapsed pre-task time metrics
-        pre_secs = None
-        pre_task_length = task_results.get_task_run_length('pre')
-        if pre_task_length:
-            pre_secs = max(pre_task_length.total_seconds(), 0)
-            entry.pre_time_sum = (entry.pre_time_sum or 0) + pre_secs
-            entry.pre_time_min = min(entry.pre_time_min or sys.maxint, pre_secs)
-            entry.pre_time_max = max(entry.pre_time_max or 0, pre_secs)
-            entry.pre_time_avg = entry.pre_time_sum / entry.completed_count
-
-        # Update elapsed actual job time metrics
-        job_secs = None
-        job_task_length = task_results.get_task_run_length('main')
-        if job_task_length:
-            job_secs = max(job_task_length.total_seconds(), 0)
-            entry.job_time_sum = (entry.job_time_sum or 0) + job_secs
-            entry.job_time_min = min(entry.job_time_min or sys.maxint, job_secs)
-            entry.job_time_max = max(entry.job_time_max or 0, job_secs)
-            entry.job_time_avg = entry.job_time_sum / entry.completed_count
-
-        # Update elapsed post-task time metrics
-        post_secs = None
-        post_task_length = task_results.get_task_run_length('post')
-        if post_task_length:
-            post_secs = max(post_task_length.total_seconds(), 0)
-            entry.post_time_sum = (entry.post_time_sum or 0) + post_secs
-            entry.post_time_min = min(entry.post_time_min or sys.maxint, post_secs)
-            entry.post_time_max = max(entry.post_time_max or 0, post_secs)
-            entry.post_time_avg = entry.post_time_sum / entry.completed_count
-
-        # Update elapsed overall run and stage time metrics
-        if job_exe_end.started and job_exe_end.ended:
-            run_secs = max((job_exe_end.ended - job_exe_end.started).total_seconds(), 0)
-            entry.run_time_sum = (entry.run_time_sum or 0) + run_secs
-            entry.run_time_min = min(entry.run_time_min or sys.maxint, run_secs)
-            entry.run_time_max = max(entry.run_time_max or 0, run_secs)
-            entry.run_time_avg = entry.run_time_sum / entry.completed_count
-
-            stage_secs = max(run_secs - ((pull_secs or 0) + (pre_secs or 0) + (job_secs or 0) + (post_secs or 0)), 0)
-            entry.stage_time_sum = (entry.stage_time_sum or 0) + stage_secs
-            entry.stage_time_min = min(entry.stage_time_min or sys.maxint, stage_secs)
-            entry.stage_time_max = max(entry.stage_time_max or 0, stage_secs)
-            entry.stage_time_avg = entry.stage_time_sum / entry.completed_count
-        return entry
-
     @transaction.atomic
     def _replace_entries(self, date, entries):
         """Replaces all the existing metric entries for the given date with new ones.
@@ -827,3 +1058,165 @@ class MetricsJobType(models.Model):
     class Meta(object):
         """meta information for the db"""
         db_table = 'metrics_job_type'
+
+
+class MetricsJobTypeRollupManager(models.Manager):
+    """Provides additional methods for computing intra-day job type metrics."""
+
+    def get_metrics_type(self, include_choices=False):
+        """See :meth:`metrics.registry.MetricsTypeProvider.get_metrics_type`."""
+
+        # Create the metrics type definition
+        metrics_type = MetricsType('job-types-rollup', 'Job Types (Intra-day)',
+                                   'Metrics for job executions grouped by job type within each part of a day.')
+        metrics_type.filters = [MetricsTypeFilter('name', 'string'), MetricsTypeFilter('version', 'string')]
+        metrics_type.groups = MetricsJobTypeRollup.GROUPS
+        _set_rollup_columns(metrics_type, MetricsJobTypeRollup)
+
+        # Optionally include all the possible job type choices
+        if include_choices:
+            metrics_type.choices = JobType.objects.all()
+
+        return metrics_type
+
+    def get_plot_data(self, started=None, ended=None, choice_ids=None, columns=None):
+        """See :meth:`metrics.registry.MetricsTypeProvider.get_plot_data`."""
+
+        # Fetch all the matching job type rollups based on query filters
+        rollups = MetricsJobTypeRollup.objects.all().order_by('started')
+        if started:
+            rollups = rollups.filter(started__gte=started)
+        if ended:
+            rollups = rollups.filter(started__lte=ended)
+        if choice_ids:
+            rollups = rollups.filter(job_type_id__in=choice_ids)
+        if not columns:
+            columns = self.get_metrics_type().columns
+
+        # Convert the database models to plot models
+        return _create_rollup_plot_data(rollups, 'job_type_id', choice_ids, columns)
+
+    def update_rollups(self, job_exe_ends):
+        """Records the given job executions, which just ended, in the rollups of their job types. This must be called in
+        the same atomic transaction that creates the job_exe_end models, so that each job execution is recorded exactly
+        once.
+
+        :param job_exe_ends: The new job_exe_end models
+        :type job_exe_ends: list[:class:`job.models.JobExecutionEnd`]
+        """
+
+        job_exe_end_map = {}  # {(Bucket started, job type ID): [JobExecutionEnd]}
+        for job_exe_end in job_exe_ends:
+            key = (_get_rollup_started(job_exe_end.ended), job_exe_end.job_type_id)
+            job_exe_end_map.setdefault(key, []).append(job_exe_end)
+
+        # Lock the rollups in a consistent order to prevent deadlocks
+        for started, job_type_id in sorted(job_exe_end_map.keys()):
+            rollup = _lock_rollup(MetricsJobTypeRollup, started, job_type_id=job_type_id)
+            histograms = {}
+            for name, _title, _description in MetricsJobTypeRollup.HISTOGRAMS:
+                histograms[name] = Histogram.from_dict(getattr(rollup, name))
+            for job_exe_end in job_exe_end_map[(started, job_type_id)]:
+                if job_exe_end.status == 'COMPLETED':
+                    rollup.completed_count += 1
+                elif job_exe_end.status == 'FAILED':
+                    rollup.failed_count += 1
+                elif job_exe_end.status == 'CANCELED':
+                    rollup.canceled_count += 1
+                rollup.total_count += 1
+
+                # As with the daily metrics, only completed job executions contribute times
+                if job_exe_end.status != 'COMPLETED':
+                    continue
+                if job_exe_end.started:
+                    histograms['queue_time'].record((job_exe_end.started - job_exe_end.queued).total_seconds())
+                task_results = job_exe_end.get_task_results()
+                for name, task_type in [('pre_time', 'pre'), ('job_time', 'main'), ('post_time', 'post')]:
+                    task_length = task_results.get_task_run_length(task_type)
+                    if task_length:
+                        histograms[name].record(task_length.total_seconds())
+            for name, histogram in histograms.items():
+                setattr(rollup, name, histogram.get_dict())
+            rollup.save()
+
+
+class MetricsJobTypeRollup(models.Model):
+    """Tracks the metrics of the job executions of a job type that ended within a bucket of time shorter than a day. The
+    rollups are updated incrementally as job executions end, with the queue and task times recorded in histograms that
+    can be merged to plot their percentiles.
+
+    :keyword job_type: The type of job associated with these metrics.
+    :type job_type: :class:`django.db.models.ForeignKey`
+    :keyword started: When the bucket of the job executions included in this model started.
+    :type started: :class:`django.db.models.DateTimeField`
+
+    :keyword completed_count: The number of completed job executions.
+    :type completed_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword failed_count: The number of failed job executions.
+    :type failed_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword canceled_count: The number of canceled job executions.
+    :type canceled_count: :class:`metrics.models.PlotBigIntegerField`
+    :keyword total_count: The number of ended job executions (completed, failed, canceled).
+    :type total_count: :class:`metrics.models.PlotBigIntegerField`
+
+    :keyword queue_time: The histogram of the times completed job executions were queued in seconds.
+    :type queue_time: :class:`django.contrib.postgres.fields.JSONField`
+    :keyword pre_time: The histogram of the times completed job executions were executing pre-task steps in seconds.
+    :type pre_time: :class:`django.contrib.postgres.fields.JSONField`
+    :keyword job_time: The histogram of the times completed job executions were executing the actual job task in
+        seconds.
+    :type job_time: :class:`django.contrib.postgres.fields.JSONField`
+    :keyword post_time: The histogram of the times completed job executions were executing post-task steps in seconds.
+    :type post_time: :class:`django.contrib.postgres.fields.JSONField`
+
+    :keyword created: When the model was first created.
+    :type created: :class:`django.db.models.DateTimeField`
+    :keyword last_modified: When the model was last modified.
+    :type last_modified: :class:`django.db.models.DateTimeField`
+    """
+    GROUPS = [
+        MetricsTypeGroup('overview', 'Overview', 'Overall counts based on job execution status.'),
+        MetricsTypeGroup('queue_time', 'Queue Time', 'When jobs were in the queue.'),
+        MetricsTypeGroup('pre_time', 'Pre-task Time', 'When jobs were being prepared.'),
+        MetricsTypeGroup('job_time', 'Job Task Time', 'When jobs were executing their actual goal.'),
+        MetricsTypeGroup('post_time', 'Post-task Time', 'When jobs were being cleaned up.'),
+    ]
+
+    # The histogram fields, each the name, title, and description of the recorded times
+    HISTOGRAMS = [
+        ('queue_time', 'Queue Time', 'time the job waited in the queue'),
+        ('pre_time', 'Pre-task Time', 'time spent preparing the job task'),
+        ('job_time', 'Job Task Time', 'time spent running the job task'),
+        ('post_time', 'Post-task Time', 'time spent finalizing the job task'),
+    ]
+
+    job_type = models.ForeignKey('job.JobType', on_delete=models.PROTECT)
+    started = models.DateTimeField(db_index=True)
+
+    completed_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                          help_text='Number of completed job executions.', units='count',
+                                          verbose_name='Completed Count')
+    failed_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                       help_text='Number of failed job executions.', units='count',
+                                       verbose_name='Failed Count')
+    canceled_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                         help_text='Number of canceled job executions.', units='count',
+                                         verbose_name='Canceled Count')
+    total_count = PlotBigIntegerField(aggregate='sum', default=0, group='overview',
+                                      help_text='Number of completed, failed, and canceled job executions.',
+                                      units='count', verbose_name='Total Count')
+
+    queue_time = django.contrib.postgres.fields.JSONField(default=dict)
+    pre_time = django.contrib.postgres.fields.JSONField(default=dict)
+    job_time = django.contrib.postgres.fields.JSONField(default=dict)
+    post_time = django.contrib.postgres.fields.JSONField(default=dict)
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    objects = MetricsJobTypeRollupManager()
+
+    class Meta(object):
+        """meta information for the db"""
+        db_table = 'metrics_job_type_rollup'
+        unique_together = ('job_type', 'started')
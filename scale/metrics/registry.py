@@ -187,8 +187,8 @@ class MetricsPlotValue(object):
 
     :keyword choice_id: The unique identifier of the choice model associated with the value.
     :type choice_id: string
-    :keyword date: The date when the plot value occurred.
-    :type date: datetime.date
+    :keyword date: The date when the plot value occurred, or when its bucket started for intra-day metrics rollups.
+    :type date: datetime.date or datetime.datetime
     :keyword value: The actual plot value that was recorded.
     :type value: int
     :keyword count: The number of records contributing to this plot value.
@@ -1,8 +1,24 @@
 """Defines the serializers for metrics"""
 from __future__ import unicode_literals
 
+import datetime
+
 import rest_framework.serializers as serializers
 
+from util.parse import datetime_to_string
+
+
+class MetricsPlotDateField(serializers.Field):
+    """Converts the x-axis values of metrics plot data to REST output, which are dates for daily metrics and the start
+    times of the buckets for intra-day metrics rollups"""
+
+    def to_representation(self, value):
+        """See :meth:`rest_framework.fields.Field.to_representation`"""
+
+        if isinstance(value, datetime.datetime):
+            return datetime_to_string(value)
+        return value.isoformat()
+
 
 class MetricsTypeBaseSerializer(serializers.Serializer):
     """Converts metrics type model fields to REST output"""
@@ -51,7 +67,7 @@ class MetricsTypeDetailsSerializer(MetricsTypeSerializer):
 
 class MetricsPlotValueSerializer(serializers.Serializer):
     """Converts metrics plot values to REST output"""
-    date = serializers.DateField()
+    date = MetricsPlotDateField()
     value = serializers.IntegerField()
 
 
@@ -63,8 +79,8 @@ class MetricsPlotMultiValueSerializer(MetricsPlotValueSerializer):
 class MetricsPlotSerializer(serializers.Serializer):
     """Converts metrics plot values to REST output"""
     column = MetricsTypeColumnSerializer()
-    min_x = serializers.DateField()
-    max_x = serializers.DateField()
+    min_x = MetricsPlotDateField()
+    max_x = MetricsPlotDateField()
     min_y = serializers.IntegerField()
     max_y = serializers.IntegerField()
     values = MetricsPlotValueSerializer(many=True)
@@ -12,8 +12,11 @@ import job.test.utils as job_test_utils
 import source.test.utils as source_test_utils
 import metrics.test.utils as metrics_test_utils
 from job.execution.tasks.json.results.task_results import TaskResults
-from metrics.models import MetricsError, MetricsIngest, MetricsJobType
+from job.models import JobExecutionEnd
+from metrics.models import (MetricsError, MetricsIngest, MetricsIngestRollup, MetricsJobType,
+                            MetricsJobTypeRollup)
 from metrics.registry import MetricsTypeColumn
+from util.histogram import Histogram
 from util.parse import datetime_to_string
 
 
@@ -63,6 +66,26 @@ class TestMetricsError(TestCase):
 
         self.assertEqual(len(entries), 1)
 
+    def test_calculate_day_boundaries(self):
+        """Tests generating metrics for job executions that ended at the boundaries of the day and its chunks."""
+        error = error_test_utils.create_error(is_builtin=True)
+        for ended in [datetime.datetime(2014, 12, 31, 23, 59, 59, 999999, tzinfo=utc),
+                      datetime.datetime(2015, 1, 1, tzinfo=utc),
+                      datetime.datetime(2015, 1, 1, 3, 59, 59, 999999, tzinfo=utc),
+                      datetime.datetime(2015, 1, 1, 4, tzinfo=utc),
+                      datetime.datetime(2015, 1, 1, 23, 59, 59, 999999, tzinfo=utc),
+                      datetime.datetime(2015, 1, 2, tzinfo=utc)]:
+            job = job_test_utils.create_job(error=error, status='FAILED', ended=ended)
+            job_test_utils.create_job_exe(job=job, error=error, status=job.status,
+                                          queued=ended - datetime.timedelta(seconds=2),
+                                          started=ended - datetime.timedelta(seconds=1), ended=ended)
+
+        MetricsError.objects.calculate(datetime.date(2015, 1, 1))
+        entries = MetricsError.objects.filter(occurred=datetime.date(2015, 1, 1))
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries.first().total_count, 4)
+
     def test_calculate_stats(self):
         """Tests calculating individual statistics for a metrics entry."""
         error = error_test_utils.create_error(is_builtin=True)
@@ -627,3 +650,175 @@ class TestMetricsJobType(TestCase):
 
         self.assertEqual(len(plot_data), 1)
         self.assertEqual(len(plot_data[0].values), 1)
+
+
+class TestMetricsIngestRollup(TestCase):
+    """Tests the MetricsIngestRollup model logic."""
+
+    fixtures = ['ingest_job_types.json']
+
+    def setUp(self):
+        django.setup()
+
+    def test_update_rollups(self):
+        """Tests recording completed ingests in the rollup of their bucket."""
+        strike = ingest_test_utils.create_strike()
+        ingest1 = ingest_test_utils.create_ingest(strike=strike, status='INGESTED',
+                                                  transfer_started=datetime.datetime(2015, 1, 1, tzinfo=utc),
+                                                  transfer_ended=datetime.datetime(2015, 1, 1, 0, 10, tzinfo=utc),
+                                                  ingest_started=datetime.datetime(2015, 1, 1, 0, 20, tzinfo=utc),
+                                                  ingest_ended=datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc))
+        ingest2 = ingest_test_utils.create_ingest(strike=strike, status='ERRORED',
+                                                  transfer_started=datetime.datetime(2015, 1, 1, tzinfo=utc),
+                                                  transfer_ended=datetime.datetime(2015, 1, 1, 0, 20, tzinfo=utc))
+        ingest3 = ingest_test_utils.create_ingest(scan=ingest_test_utils.create_scan(), status='INGESTED')
+
+        MetricsIngestRollup.objects.update_rollups([ingest1, ingest2, ingest3],
+                                                   datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc))
+
+        rollups = MetricsIngestRollup.objects.all()
+        self.assertEqual(len(rollups), 1)
+
+        rollup = rollups.first()
+        self.assertEqual(rollup.strike_id, strike.id)
+        self.assertEqual(rollup.started, datetime.datetime(2015, 1, 1, 1, tzinfo=utc))
+        self.assertEqual(rollup.ingested_count, 1)
+        self.assertEqual(rollup.errored_count, 1)
+        self.assertEqual(rollup.duplicate_count, 0)
+        self.assertEqual(rollup.total_count, 2)
+        self.assertEqual(Histogram.from_dict(rollup.transfer_time).count, 2)
+        self.assertEqual(Histogram.from_dict(rollup.transfer_time).max, 1200)
+        self.assertEqual(Histogram.from_dict(rollup.ingest_time).count, 1)
+        self.assertEqual(Histogram.from_dict(rollup.ingest_time).max, 3600)
+
+    def test_get_plot_data(self):
+        """Tests getting the metrics plot data."""
+        strike = ingest_test_utils.create_strike()
+        ingest = ingest_test_utils.create_ingest(strike=strike, status='INGESTED')
+        MetricsIngestRollup.objects.update_rollups([ingest], ingest.ingest_ended)
+
+        plot_data = MetricsIngestRollup.objects.get_plot_data()
+
+        self.assertGreater(len(plot_data), 1)
+
+
+class TestMetricsJobTypeRollup(TestCase):
+    """Tests the MetricsJobTypeRollup model logic."""
+
+    def setUp(self):
+        django.setup()
+
+    def _create_job_exe_end(self, job_type, status, started, ended):
+        """Creates a job_exe_end model that was queued at the start of 2015"""
+        job_exe = job_test_utils.create_job_exe(job_type=job_type, status=status,
+                                                queued=datetime.datetime(2015, 1, 1, tzinfo=utc), started=started,
+                                                ended=ended)
+        return JobExecutionEnd.objects.get(job_exe_id=job_exe.id)
+
+    def test_update_rollups(self):
+        """Tests recording ended job executions in the rollups of their buckets."""
+        job_type = job_test_utils.create_job_type()
+        job_exe_ends = [
+            self._create_job_exe_end(job_type, 'COMPLETED', datetime.datetime(2015, 1, 1, 0, 0, 10, tzinfo=utc),
+                                     datetime.datetime(2015, 1, 1, 1, 10, tzinfo=utc)),
+            self._create_job_exe_end(job_type, 'COMPLETED', datetime.datetime(2015, 1, 1, 0, 0, 30, tzinfo=utc),
+                                     datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc)),
+            self._create_job_exe_end(job_type, 'FAILED', datetime.datetime(2015, 1, 1, 0, 1, tzinfo=utc),
+                                     datetime.datetime(2015, 1, 1, 1, 30, tzinfo=utc)),
+            self._create_job_exe_end(job_type, 'CANCELED', datetime.datetime(2015, 1, 1, 0, 2, tzinfo=utc),
+                                     datetime.datetime(2015, 1, 1, 2, 5, tzinfo=utc)),
+        ]
+
+        MetricsJobTypeRollup.objects.update_rollups(job_exe_ends)
+
+        rollups = MetricsJobTypeRollup.objects.filter(job_type=job_type).order_by('started')
+        self.assertEqual(len(rollups), 2)
+
+        rollup = rollups[0]
+        self.assertEqual(rollup.started, datetime.datetime(2015, 1, 1, 1, tzinfo=utc))
+        self.assertEqual(rollup.completed_count, 2)
+        self.assertEqual(rollup.failed_count, 1)
+        self.assertEqual(rollup.canceled_count, 0)
+        self.assertEqual(rollup.total_count, 3)
+        queue_time = Histogram.from_dict(rollup.queue_time)
+        self.assertEqual(queue_time.count, 2)
+        self.assertEqual(queue_time.min, 10)
+        self.assertEqual(queue_time.max, 30)
+
+        rollup = rollups[1]
+        self.assertEqual(rollup.started, datetime.datetime(2015, 1, 1, 2, tzinfo=utc))
+        self.assertEqual(rollup.canceled_count, 1)
+        self.assertEqual(rollup.total_count, 1)
+        self.assertEqual(Histogram.from_dict(rollup.queue_time).count, 0)
+
+    def test_update_rollups_repeated(self):
+        """Tests recording job executions in a rollup that already exists."""
+        job_type = job_test_utils.create_job_type()
+        job_exe_end1 = self._create_job_exe_end(job_type, 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 10, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 10, tzinfo=utc))
+        job_exe_end2 = self._create_job_exe_end(job_type, 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 30, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc))
+
+        MetricsJobTypeRollup.objects.update_rollups([job_exe_end1])
+        MetricsJobTypeRollup.objects.update_rollups([job_exe_end2])
+
+        rollups = MetricsJobTypeRollup.objects.filter(job_type=job_type)
+        self.assertEqual(len(rollups), 1)
+        self.assertEqual(rollups[0].completed_count, 2)
+        self.assertEqual(Histogram.from_dict(rollups[0].queue_time).count, 2)
+
+    def test_get_metrics_type(self):
+        """Tests getting the metrics type."""
+        metrics_type = MetricsJobTypeRollup.objects.get_metrics_type()
+
+        self.assertEqual(metrics_type.name, 'job-types-rollup')
+        self.assertEqual(len(metrics_type.filters), 2)
+        self.assertEqual(metrics_type.get_column('queue_time_p95').aggregate, 'p95')
+        self.assertListEqual(metrics_type.choices, [])
+
+    def test_get_plot_data(self):
+        """Tests that the plotted percentiles merge the rollups of all job types within a bucket."""
+        job_exe_end1 = self._create_job_exe_end(job_test_utils.create_job_type(), 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 10, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 10, tzinfo=utc))
+        job_exe_end2 = self._create_job_exe_end(job_test_utils.create_job_type(), 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 30, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc))
+        MetricsJobTypeRollup.objects.update_rollups([job_exe_end1, job_exe_end2])
+
+        metrics_type = MetricsJobTypeRollup.objects.get_metrics_type()
+        columns = [metrics_type.get_column('total_count'), metrics_type.get_column('queue_time_p99')]
+        plot_data = MetricsJobTypeRollup.objects.get_plot_data(columns=columns)
+
+        self.assertEqual(len(plot_data), 2)
+        for entry in plot_data:
+            self.assertEqual(len(entry.values), 1)
+            self.assertEqual(entry.values[0].date, datetime.datetime(2015, 1, 1, 1, tzinfo=utc))
+            if entry.column.name == 'total_count':
+                self.assertEqual(entry.values[0].value, 2)
+            else:
+                self.assertEqual(entry.values[0].value, 30)
+
+    def test_get_plot_data_filtered(self):
+        """Tests getting the metrics plot data with filters."""
+        job_type = job_test_utils.create_job_type()
+        job_exe_end1 = self._create_job_exe_end(job_type, 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 10, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 10, tzinfo=utc))
+        job_exe_end2 = self._create_job_exe_end(job_test_utils.create_job_type(), 'COMPLETED',
+                                                datetime.datetime(2015, 1, 1, 0, 0, 30, tzinfo=utc),
+                                                datetime.datetime(2015, 1, 1, 1, 20, tzinfo=utc))
+        MetricsJobTypeRollup.objects.update_rollups([job_exe_end1, job_exe_end2])
+
+        plot_data = MetricsJobTypeRollup.objects.get_plot_data(started=datetime.datetime(2015, 1, 1, tzinfo=utc),
+                                                               ended=datetime.datetime(2015, 1, 2, tzinfo=utc),
+                                                               choice_ids=[job_type.id],
+                                                               columns=[MetricsTypeColumn('total_count',
+                                                                                          aggregate='sum')])
+
+        self.assertEqual(len(plot_data), 1)
+        self.assertEqual(len(plot_data[0].values), 1)
+        self.assertEqual(plot_data[0].values[0].id, job_type.id)
+        self.assertEqual(plot_data[0].values[0].value, 1)
@@ -1,14 +1,18 @@
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import datetime
 import json
 
 import django
 from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import utc
 from rest_framework import status
 
 import job.test.utils as job_test_utils
 import metrics.test.utils as metrics_test_utils
+from metrics.models import MetricsJobTypeRollup
+from util.histogram import Histogram
 
 
 class TestMetricsViewV5(TestCase):
@@ -332,4 +336,28 @@ class TestMetricPlotViewV6(TransactionTestCase):
 
         result = json.loads(response.content)
         self.assertEqual(len(result['results']), 1)
-        self.assertEqual(result['results'][0]['values'][0]['value'], 330)
\ No newline at end of file
+        self.assertEqual(result['results'][0]['values'][0]['value'], 330)
+
+    def test_rollup(self):
+        """Tests successfully calling the metric plot view for intra-day rollups."""
+
+        queue_time = Histogram()
+        for value in range(1, 101):
+            queue_time.record(value)
+        MetricsJobTypeRollup.objects.create(job_type=self.job_type1,
+                                            started=datetime.datetime(2015, 1, 1, 1, tzinfo=utc),
+                                            completed_count=100, total_count=100, queue_time=queue_time.get_dict())
+
+        url = '/v6/metrics/job-types-rollup/plot-data/?column=completed_count&column=queue_time_p50'
+        response = self.client.generic('GET', url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        result = json.loads(response.content)
+        self.assertEqual(len(result['results']), 2)
+        for entry in result['results']:
+            self.assertEqual(entry['min_x'], '2015-01-01T01:00:00Z')
+            self.assertEqual(entry['values'][0]['date'], '2015-01-01T01:00:00Z')
+            if entry['column']['title'] == 'Completed Count':
+                self.assertEqual(entry['values'][0]['value'], 100)
+            else:
+                self.assertAlmostEqual(entry['values'][0]['value'], 50, delta=1)
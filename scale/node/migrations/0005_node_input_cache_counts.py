@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('node', '0004_auto_20170524_1639'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='input_cache_hits',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='input_cache_hit_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='input_cache_misses',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='input_cache_miss_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 import logging
 
 from django.db import models, transaction
+from django.db.models import F
 from django.utils.timezone import now
 
 logger = logging.getLogger(__name__)
@@ -146,6 +147,20 @@ class NodeManager(models.Manager):
 
         return Node.objects.filter(models.Q(hostname__in=hostnames) | models.Q(is_active=True))
 
+    def update_input_file_cache_counts(self, node_id, counts):
+        """Adds the given input file cache counts from a job execution to the totals of the given node
+
+        :param node_id: The ID of the node
+        :type node_id: int
+        :param counts: The input file cache counts stored by name (hits, hit_bytes, misses, and miss_bytes)
+        :type counts: dict
+        """
+
+        self.filter(id=node_id).update(input_cache_hits=F('input_cache_hits') + counts['hits'],
+                                       input_cache_hit_bytes=F('input_cache_hit_bytes') + counts['hit_bytes'],
+                                       input_cache_misses=F('input_cache_misses') + counts['misses'],
+                                       input_cache_miss_bytes=F('input_cache_miss_bytes') + counts['miss_bytes'])
+
     @transaction.atomic
     def update_node(self, new_data, node_id=None):
         """Update the data for a node.
@@ -280,6 +295,16 @@ class Node(models.Model):
     :keyword is_active: True if the node is currently active or is deprecated for historical purposes
     :type is_active: :class:`django.db.models.BooleanField()`
 
+    :keyword input_cache_hits: The number of input files linked from the node's input file cache
+    :type input_cache_hits: :class:`django.db.models.BigIntegerField`
+    :keyword input_cache_hit_bytes: The total size in bytes of the input files linked from the node's input file cache
+    :type input_cache_hit_bytes: :class:`django.db.models.BigIntegerField`
+    :keyword input_cache_misses: The number of input files downloaded into the node's input file cache
+    :type input_cache_misses: :class:`django.db.models.BigIntegerField`
+    :keyword input_cache_miss_bytes: The total size in bytes of the input files downloaded into the node's input file
+        cache
+    :type input_cache_miss_bytes: :class:`django.db.models.BigIntegerField`
+
     :keyword created: When the node model was created
     :type created: :class:`django.db.models.DateTimeField`
     :keyword deprecated: When the node was deprecated (no longer active)
@@ -299,6 +324,11 @@ class Node(models.Model):
     is_paused_errors = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
 
+    input_cache_hits = models.BigIntegerField(default=0)
+    input_cache_hit_bytes = models.BigIntegerField(default=0)
+    input_cache_misses = models.BigIntegerField(default=0)
+    input_cache_miss_bytes = models.BigIntegerField(default=0)
+
     created = models.DateTimeField(auto_now_add=True)
     deprecated = models.DateTimeField(blank=True, null=True)
     last_offer = models.DateTimeField(null=True)
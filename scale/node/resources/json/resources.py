@@ -3,12 +3,12 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from node.resources.exceptions import InvalidResources
 from node.resources.node_resources import NodeResources
 from node.resources.resource import ScalarResource
+from util.validation import validate_json
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,7 @@ class Resources(object):
 
         try:
             if do_validate:
-                validate(resources, RESOURCES_SCHEMA)
+                validate_json(resources, RESOURCES_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidResources(validation_error)
 
@@ -10,6 +10,8 @@ class NodeResources(object):
     """This class encapsulates a set of node resources
     """
 
+    __slots__ = ('_resources',)
+
     def __init__(self, resources=None):
         """Constructor
 
@@ -138,6 +140,18 @@ class NodeResources(object):
             resources_dict[resource.name] = resource.value  # Assumes SCALAR type
         return Resources({'resources': resources_dict}, do_validate=False)
 
+    def get_values(self, names):
+        """Returns the values of the resources with the given names in the same order, using 0.0 for any missing
+        resource
+
+        :param names: The resource names
+        :type names: list
+        :returns: The list of resource values
+        :rtype: list
+        """
+
+        return [self._resources[name].value if name in self._resources else 0.0 for name in names]
+
     def increase_up_to(self, node_resources):
         """Increases each resource up to the value in the given node resources
 
@@ -0,0 +1,62 @@
+"""Defines the class that represents a fixed collection of resource requirements"""
+from __future__ import unicode_literals
+
+import bisect
+
+
+class ResourceRequirements(tuple):
+    """This class is an immutable sequence of resource requirements, each a
+    :class:`node.resources.node_resources.NodeResources`. The requirements are compiled into rows of resource values
+    laid out over a fixed index of resource names, with identical requirements combined into a single row, so that
+    counting the requirements met by a set of resources is a single pass of value comparisons rather than a dict
+    lookup per resource of each requirement.
+    """
+
+    def __new__(cls, requirements=()):
+        """Creates the requirements
+
+        :param requirements: The resource requirements
+        :type requirements: list
+        """
+
+        self = super(ResourceRequirements, cls).__new__(cls, requirements)
+
+        names = set()
+        for requirement in self:
+            for resource in requirement.resources:
+                names.add(resource.name)
+        self._names = sorted(names)
+
+        # A requirement without a resource of a given name never fails on that resource, so it requires -infinity
+        row_counts = {}  # {Tuple of values: Number of requirements}
+        for requirement in self:
+            values = {resource.name: resource.value for resource in requirement.resources}  # Assumes SCALAR type
+            row = tuple(values[name] if name in values else float('-inf') for name in self._names)
+            row_counts[row] = row_counts.get(row, 0) + 1
+        self._rows = sorted(row_counts.items())
+        self._first_values = [row[0] for row, _count in self._rows]
+
+        return self
+
+    def count_met_by(self, node_resources):
+        """Returns the number of these requirements that the given resources are sufficient to meet. This is the same
+        as counting the requirements for which :meth:`node.resources.node_resources.NodeResources.is_sufficient_to_meet`
+        returns True.
+
+        :param node_resources: The resources
+        :type node_resources: :class:`node.resources.node_resources.NodeResources`
+        :returns: The number of requirements met
+        :rtype: int
+        """
+
+        if not self._rows:
+            return 0
+
+        available = node_resources.get_values(self._names)
+        # Rows are sorted, so no row past those whose first value is within the available amount can be met
+        end = bisect.bisect_right(self._first_values, available[0])
+        count = 0
+        for row, row_count in self._rows[:end]:
+            if all(value <= available_value for value, available_value in zip(row, available)):
+                count += row_count
+        return count
@@ -9,6 +9,7 @@ class Resource(object):
     """
 
     __metaclass__ = ABCMeta
+    __slots__ = ('name', 'resource_type')
 
     def __init__(self, name, resource_type):
         """Constructor
@@ -35,6 +36,8 @@ class ScalarResource(Resource):
     """A type of resource represented by a scalar floating point value
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, name, value):
         """Constructor
 
@@ -58,6 +61,8 @@ class Cpus(ScalarResource):
     """A scalar resource representing the number of CPUs
     """
 
+    __slots__ = ()
+
     def __init__(self, value):
         """Constructor
 
@@ -72,6 +77,8 @@ class Mem(ScalarResource):
     """A scalar resource representing the amount of memory in MiB
     """
 
+    __slots__ = ()
+
     def __init__(self, value):
         """Constructor
 
@@ -86,6 +93,8 @@ class Disk(ScalarResource):
     """A scalar resource representing the amount of disk space in MiB
     """
 
+    __slots__ = ()
+
     def __init__(self, value):
         """Constructor
 
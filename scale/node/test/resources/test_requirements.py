@@ -0,0 +1,41 @@
+from __future__ import unicode_literals
+
+import django
+from django.test import TestCase
+
+from node.resources.node_resources import NodeResources
+from node.resources.requirements import ResourceRequirements
+from node.resources.resource import Cpus, Disk, Mem, ScalarResource
+
+
+class TestResourceRequirements(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+    def test_count_met_by(self):
+        """Tests calling count_met_by() successfully"""
+
+        requirements = ResourceRequirements([NodeResources([Cpus(1.0), Mem(64.0)]),
+                                             NodeResources([Cpus(1.0), Mem(64.0)]),
+                                             NodeResources([Cpus(4.0), Mem(1024.0), Disk(10.0)]),
+                                             NodeResources([Cpus(1.0), ScalarResource('gpus', 1.0)])])
+
+        self.assertEqual(len(requirements), 4)
+        self.assertEqual(requirements.count_met_by(NodeResources()), 0)
+        self.assertEqual(requirements.count_met_by(NodeResources([Cpus(2.0), Mem(128.0)])), 2)
+        self.assertEqual(requirements.count_met_by(NodeResources([Cpus(4.0), Mem(1024.0), Disk(10.0)])), 3)
+        resources = NodeResources([Cpus(4.0), Mem(1024.0), Disk(10.0), ScalarResource('gpus', 1.0)])
+        self.assertEqual(requirements.count_met_by(resources), 4)
+        self.assertEqual(ResourceRequirements().count_met_by(resources), 0)
+
+    def test_count_met_by_negative_resources(self):
+        """Tests that count_met_by() matches is_sufficient_to_meet() for resources that have gone negative"""
+
+        requirements = ResourceRequirements([NodeResources([Cpus(1.0)]), NodeResources([Cpus(0.0)]),
+                                             NodeResources([Cpus(0.0), ScalarResource('gpus', 0.0)])])
+        resources = NodeResources([Cpus(2.0), ScalarResource('gpus', -1.0)])
+
+        expected = len([r for r in requirements if resources.is_sufficient_to_meet(r)])
+        self.assertEqual(expected, 2)
+        self.assertEqual(requirements.count_met_by(resources), expected)
@@ -1,9 +1,10 @@
 """Defines the class for managing a configuration export."""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
+from util.validation import validate_json
+
 
 class InvalidConfiguration(Exception):
     """Exception indicating that the provided configuration was invalid."""
@@ -83,7 +84,7 @@ class Configuration(object):
         self._configuration = configuration
 
         try:
-            validate(configuration, CONFIGURATION_SCHEMA)
+            validate_json(configuration, CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidConfiguration('Invalid export configuration: %s' % unicode(ex))
 
@@ -3,9 +3,11 @@ from __future__ import unicode_literals
 
 import logging
 import os
+from multiprocessing.pool import ThreadPool
 
 import django.contrib.gis.db.models as models
 import django.utils.timezone as timezone
+from django.conf import settings
 from django.db import transaction
 
 import storage.geospatial_utils as geo_utils
@@ -552,13 +554,29 @@ class ProductFileManager(models.GeoManager):
             if end_times:
                 source_ended = end_times[0]
 
-        products_to_save = []
-        for entry in file_entries:
+        # Related models are read before starting the thread pool so that the threads never query the database
+        job = job_exe.job
+        job_type = job.job_type
+        is_operational = input_products_operational and job_type.is_operational
+
+        # Look up the recipe and batch info once, since every product of the job shares them
+        job_recipe = Recipe.objects.get_recipe_for_job(job_exe.job_id)
+        recipe = None
+        batch_id = None
+        if job_recipe:
+            recipe = job_recipe.recipe
+            try:
+                from batch.models import BatchJob
+                batch_id = BatchJob.objects.get(job_id=job_exe.job_id).batch_id
+            except BatchJob.DoesNotExist:
+                batch_id = None
+
+        def create_product(entry):
             product = ProductFile.create()
             product.job_exe = job_exe
-            product.job = job_exe.job
-            product.job_type = job_exe.job.job_type
-            product.is_operational = input_products_operational and job_exe.job.job_type.is_operational
+            product.job = job
+            product.job_type = job_type
+            product.is_operational = is_operational
             file_name = os.path.basename(entry.local_path)
             file_size = os.path.getsize(entry.local_path)
             product.set_basic_fields(file_name, file_size, entry.media_type)
@@ -567,7 +585,7 @@ class ProductFileManager(models.GeoManager):
 
             # Add a stable identifier based on the job type, input files, input properties, and file name
             # This is designed to remain stable across re-processing the same type of job on the same inputs
-            product.update_uuid(job_exe.job.job_type.id, file_name, *input_strings)
+            product.update_uuid(job_type.id, file_name, *input_strings)
 
             # Add temporal info to product if available
             if entry.data_start:
@@ -582,24 +600,29 @@ class ProductFileManager(models.GeoManager):
                     product.meta_data = props
                 product.center_point = geo_utils.get_center_point(geom)
 
-            # Add recipe info to product if available.
-            job_recipe = Recipe.objects.get_recipe_for_job(job_exe.job_id)
+            # Add recipe and batch info to product if available.
             if job_recipe:
-                product.recipe_id = job_recipe.recipe.id
-                product.recipe_type = job_recipe.recipe.recipe_type
+                product.recipe_id = recipe.id
+                product.recipe_type = recipe.recipe_type
                 product.recipe_node = job_recipe.node_name
-
-                # Add batch info to product if available.
-                try:
-                    from batch.models import BatchJob
-                    product.batch_id = BatchJob.objects.get(job_id=job_exe.job_id).batch_id
-                except BatchJob.DoesNotExist:
-                    product.batch_id = None
+                product.batch_id = batch_id
 
             product.source_started = source_started
             product.source_ended = source_ended
 
-            products_to_save.append(FileUpload(product, entry.local_path))
+            return FileUpload(product, entry.local_path)
+
+        # Read the file sizes and parse the geometries of the products in a pool of threads
+        thread_count = min(settings.POST_STEPS_THREADS, len(file_entries))
+        if thread_count > 1:
+            pool = ThreadPool(thread_count)
+            try:
+                products_to_save = pool.map(create_product, file_entries)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            products_to_save = [create_product(entry) for entry in file_entries]
 
         return ScaleFile.objects.upload_files(workspace, products_to_save)
 
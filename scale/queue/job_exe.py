@@ -1,6 +1,8 @@
 """Defines the class that represents queued job executions being considered for scheduling"""
 from __future__ import unicode_literals
 
+import copy
+
 from job.models import JobExecution
 from node.resources.node_resources import NodeResources
 
@@ -19,7 +21,9 @@ class QueuedJobExecution(object):
         self.is_canceled = queue.is_canceled
         self.configuration = queue.get_execution_configuration()
         self.interface = queue.get_job_interface()
+        self.job_type_id = queue.job_type_id
         self.priority = queue.priority
+        self.queued = queue.queued
         self.required_resources = queue.get_resources()
         self.scheduled_agent_id = None
 
@@ -27,6 +31,16 @@ class QueuedJobExecution(object):
         self._scheduled_node_id = None
         self._scheduled_resources = None
 
+    @property
+    def scheduled_node_id(self):
+        """The ID of the node that this job execution has been scheduled on, possibly None
+
+        :returns: The node ID
+        :rtype: int
+        """
+
+        return self._scheduled_node_id
+
     def create_job_exe_model(self, framework_id, when):
         """Creates and returns a scheduled job execution model
 
@@ -46,7 +60,9 @@ class QueuedJobExecution(object):
         job_exe.exe_num = self._queue.exe_num
         job_exe.timeout = self._queue.timeout
         job_exe.input_file_size = self._queue.input_file_size
-        job_exe.configuration = self.configuration.get_dict()
+        # Copy the configuration since it gets modified while the execution is configured, and this queued job
+        # execution may be scheduled again if the execution is not created
+        job_exe.configuration = copy.deepcopy(self.configuration.get_dict())
         job_exe.queued = self._queue.queued
 
         if self.is_canceled:
@@ -89,6 +89,15 @@ class QueuedJobs(CommandMessage):
 
         return len(self._queued_jobs) < MAX_NUM
 
+    def merge(self, message, size_factor=1):
+        """See :meth:`messaging.messages.message.CommandMessage.merge`
+        """
+
+        if self.requeue != message.requeue or self.priority != message.priority:
+            return False
+
+        return self._merge_ids(message, '_queued_jobs', MAX_NUM, size_factor, self._queued_jobs.append)
+
     def to_json(self):
         """See :meth:`messaging.messages.message.CommandMessage.to_json`
         """
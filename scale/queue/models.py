@@ -421,6 +421,28 @@ class QueueManager(models.Manager):
         job_id = self.queue_new_job(job_type, job_data, event).id
         return job_id
 
+    @transaction.atomic
+    def queue_new_jobs(self, job_type, data_list, events):
+        """Creates a new job of the given type for each of the given job data and events, in bulk. The new jobs are
+        immediately placed on the queue. The new job and queue models are saved in the database in an atomic
+        transaction.
+
+        :param job_type: The type of the new jobs to create and queue
+        :type job_type: :class:`job.models.JobType`
+        :param data_list: The job data for each new job
+        :type data_list: [:class:`job.configuration.data.job_data.JobData`]
+        :param events: The event that triggered the creation of each new job, in the same order as the job data
+        :type events: [:class:`trigger.models.TriggerEvent`]
+        :returns: The new jobs, in the same order as the job data
+        :rtype: [:class:`job.models.Job`]
+
+        :raises job.configuration.data.exceptions.InvalidData: If any of the job data is invalid
+        """
+
+        jobs = Job.objects.create_jobs(job_type, [event.id for event in events], data_list)
+        self.queue_jobs(jobs)
+        return jobs
+
     @transaction.atomic
     def queue_new_recipe(self, recipe_type, data, event, batch_id=None, superseded_recipe=None, delta=None,
                          superseded_jobs=None, priority=None):
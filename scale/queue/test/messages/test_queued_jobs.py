@@ -6,7 +6,7 @@ from django.test import TransactionTestCase
 from job.configuration.data.job_data import JobData
 from job.models import Job
 from job.test import utils as job_test_utils
-from queue.messages.queued_jobs import QueuedJobs
+from queue.messages.queued_jobs import QueuedJob, QueuedJobs
 from queue.models import Queue
 
 
@@ -15,6 +15,30 @@ class TestQueuedJobs(TransactionTestCase):
     def setUp(self):
         django.setup()
 
+    def test_merge(self):
+        """Tests merging QueuedJobs messages together"""
+
+        message_1 = QueuedJobs()
+        message_1.add_job(1, 0)
+        message_2 = QueuedJobs()
+        message_2.add_job(1, 0)
+        message_2.add_job(1, 1)
+        message_2.add_job(2, 0)
+
+        self.assertTrue(message_1.merge(message_2))
+        self.assertListEqual(message_1._queued_jobs, [QueuedJob(1, 0), QueuedJob(1, 1), QueuedJob(2, 0)])
+
+        # Messages with a different priority or requeue flag cannot be merged
+        message_3 = QueuedJobs()
+        message_3.priority = 1
+        message_3.add_job(3, 0)
+        self.assertFalse(message_1.merge(message_3))
+        message_4 = QueuedJobs()
+        message_4.requeue = True
+        message_4.add_job(4, 0)
+        self.assertFalse(message_1.merge(message_4))
+        self.assertEqual(len(message_1._queued_jobs), 3)
+
     def test_json(self):
         """Tests coverting a QueuedJobs message to and from JSON"""
 
@@ -1,13 +1,13 @@
 """Defines the class for managing a recipe definition"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from data.interface.parameter import FileParameter, JsonParameter
 from recipe.definition.connection import DependencyInputConnection, RecipeInputConnection
 from recipe.definition.exceptions import InvalidDefinition
 from recipe.definition.node import JobNodeDefinition
+from util.validation import validate_json
 
 
 DEFAULT_VERSION = '1.0'
@@ -256,7 +256,7 @@ class RecipeDefinitionV1(object):
 
         try:
             if do_validate:
-                validate(definition, RECIPE_DEFINITION_SCHEMA)
+                validate_json(definition, RECIPE_DEFINITION_SCHEMA)
         except ValidationError as ex:
             raise InvalidDefinition('INVALID_DEFINITION', 'Invalid recipe definition: %s' % unicode(ex))
 
@@ -1,7 +1,6 @@
 """Manages the v6 recipe definition schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from data.interface.json.interface_v6 import INTERFACE_SCHEMA, convert_interface_to_v6_json, InterfaceV6
@@ -11,6 +10,7 @@ from recipe.definition.exceptions import InvalidDefinition
 from recipe.definition.json.definition_v1 import RecipeDefinitionV1
 from recipe.definition.node import JobNodeDefinition, RecipeNodeDefinition
 from util.rest import strip_schema_version
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -238,7 +238,7 @@ class RecipeDefinitionV6(object):
 
         try:
             if do_validate:
-                validate(self._definition, RECIPE_DEFINITION_SCHEMA)
+                validate_json(self._definition, RECIPE_DEFINITION_SCHEMA)
         except ValidationError as ex:
             raise InvalidDefinition('INVALID_DEFINITION', 'Invalid recipe definition: %s' % unicode(ex))
 
@@ -1,10 +1,10 @@
 """Manages the v6 recipe diff schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from recipe.diff.exceptions import InvalidDiff
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -331,7 +331,7 @@ class RecipeDiffV6(object):
 
         try:
             if do_validate:
-                validate(self._diff, RECIPE_DIFF_SCHEMA)
+                validate_json(self._diff, RECIPE_DIFF_SCHEMA)
         except ValidationError as ex:
             raise InvalidDiff('Invalid recipe graph diff: %s' % unicode(ex))
 
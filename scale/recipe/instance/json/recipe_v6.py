@@ -1,11 +1,11 @@
 """Manages the v6 recipe instance schema"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from recipe.definition.node import JobNodeDefinition, RecipeNodeDefinition
 from recipe.instance.exceptions import InvalidRecipe
+from util.validation import validate_json
 
 
 SCHEMA_VERSION = '6'
@@ -240,7 +240,7 @@ class RecipeInstanceV6(object):
 
         try:
             if do_validate:
-                validate(self._json, RECIPE_INSTANCE_SCHEMA)
+                validate_json(self._json, RECIPE_INSTANCE_SCHEMA)
         except ValidationError as ex:
             raise InvalidRecipe('Invalid recipe instance: %s' % unicode(ex))
 
@@ -94,6 +94,12 @@ class UpdateRecipes(CommandMessage):
 
         return self._count < MAX_NUM
 
+    def merge(self, message, size_factor=1):
+        """See :meth:`messaging.messages.message.CommandMessage.merge`
+        """
+
+        return self._merge_ids(message, '_recipe_ids', MAX_NUM, size_factor, self.add_recipe)
+
     def to_json(self):
         """See :meth:`messaging.messages.message.CommandMessage.to_json`
         """
@@ -13,11 +13,11 @@ from job.handlers.inputs.files import FilesInput
 from job.handlers.inputs.property import PropertyInput
 from job.models import JobType
 from job.seed.types import SeedInputFiles, SeedInputJson
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 from recipe.configuration.data.exceptions import InvalidRecipeConnection
 from recipe.configuration.definition.exceptions import InvalidDefinition
 from recipe.handlers.graph import RecipeGraph
+from util.validation import validate_json
 
 
 DEFAULT_VERSION = '2.0'
@@ -50,7 +50,7 @@ class RecipeDefinition(object):
         self._input_file_validation_dict = {}  # File Input name -> (required, multiple, file description)
 
         try:
-            validate(definition, RECIPE_DEFINITION_SCHEMA)
+            validate_json(definition, RECIPE_DEFINITION_SCHEMA)
         except ValidationError as ex:
             raise InvalidDefinition('Invalid recipe definition: %s' % unicode(ex))
 
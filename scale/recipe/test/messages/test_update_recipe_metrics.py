@@ -6,7 +6,7 @@ from django.test import TestCase
 from batch.test import utils as batch_test_utils
 from job.models import Job
 from job.test import utils as job_test_utils
-from recipe.messages.update_recipe_metrics import UpdateRecipeMetrics
+from recipe.messages.update_recipe_metrics import MAX_NUM, UpdateRecipeMetrics
 from recipe.models import Recipe, RecipeNode
 from recipe.test import utils as recipe_test_utils
 
@@ -16,6 +16,25 @@ class TestUpdateRecipes(TestCase):
     def setUp(self):
         django.setup()
 
+    def test_merge(self):
+        """Tests merging UpdateRecipeMetrics messages together"""
+
+        message_1 = UpdateRecipeMetrics()
+        message_1.add_recipe(1)
+        message_2 = UpdateRecipeMetrics()
+        message_2.add_recipe(1)
+        message_2.add_recipe(2)
+
+        self.assertTrue(message_1.merge(message_2))
+        self.assertListEqual(message_1._recipe_ids, [1, 2])
+
+        # Merged message must not exceed the maximum size
+        message_3 = UpdateRecipeMetrics()
+        for recipe_id in range(3, MAX_NUM + 2):
+            message_3.add_recipe(recipe_id)
+        self.assertFalse(message_1.merge(message_3))
+        self.assertListEqual(message_1._recipe_ids, [1, 2])
+
     def test_json(self):
         """Tests coverting a UpdateRecipeMetrics message to and from JSON"""
 
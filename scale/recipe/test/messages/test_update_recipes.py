@@ -9,7 +9,7 @@ from batch.test import utils as batch_test_utils
 from job.configuration.results.job_results import JobResults
 from job.models import Job
 from job.test import utils as job_test_utils
-from recipe.messages.update_recipes import UpdateRecipes
+from recipe.messages.update_recipes import MAX_NUM, UpdateRecipes
 from recipe.models import RecipeNode
 from recipe.test import utils as recipe_test_utils
 from storage.test import utils as storage_test_utils
@@ -20,6 +20,28 @@ class TestUpdateRecipes(TestCase):
     def setUp(self):
         django.setup()
 
+    def test_merge(self):
+        """Tests merging UpdateRecipes messages together"""
+
+        message_1 = UpdateRecipes()
+        message_1.add_recipe(1)
+        message_1.add_recipe(2)
+        message_2 = UpdateRecipes()
+        message_2.add_recipe(2)
+        message_2.add_recipe(3)
+
+        self.assertTrue(message_1.merge(message_2))
+        self.assertListEqual(message_1._recipe_ids, [1, 2, 3])
+
+        # Merged message must not exceed the maximum size
+        message_3 = UpdateRecipes()
+        for recipe_id in range(4, MAX_NUM + 2):
+            message_3.add_recipe(recipe_id)
+        self.assertFalse(message_1.merge(message_3))
+        self.assertListEqual(message_1._recipe_ids, [1, 2, 3])
+        self.assertTrue(message_1.merge(message_3, size_factor=2))
+        self.assertEqual(len(message_1._recipe_ids), MAX_NUM + 1)
+
     def test_json(self):
         """Tests coverting a UpdateRecipes message to and from JSON"""
 
@@ -53,6 +53,26 @@ if ELASTICSEARCH_URLS:
 BROKER_URL = os.environ.get('SCALE_BROKER_URL', BROKER_URL)
 QUEUE_NAME = os.environ.get('SCALE_QUEUE_NAME', QUEUE_NAME)
 
+# Message handler worker counts per message type, formatted as 'default:4,update_recipes:8'
+MESSAGE_HANDLER_WORKERS_ENV = os.environ.get('SCALE_MESSAGE_HANDLER_WORKERS', '')
+if MESSAGE_HANDLER_WORKERS_ENV:
+    MESSAGE_HANDLER_WORKERS = {'default': 1}
+    for entry in MESSAGE_HANDLER_WORKERS_ENV.split(','):
+        message_type, worker_count = entry.split(':')
+        MESSAGE_HANDLER_WORKERS[message_type.strip()] = int(worker_count)
+MESSAGE_HANDLER_BATCH_SIZE = int(os.environ.get('SCALE_MESSAGE_HANDLER_BATCH_SIZE', MESSAGE_HANDLER_BATCH_SIZE))
+MESSAGE_HANDLER_COALESCE_FACTOR = int(os.environ.get('SCALE_MESSAGE_HANDLER_COALESCE_FACTOR',
+                                                     MESSAGE_HANDLER_COALESCE_FACTOR))
+METRICS_ROLLUP_MINUTES = int(os.environ.get('SCALE_METRICS_ROLLUP_MINUTES', METRICS_ROLLUP_MINUTES))
+INGEST_JOB_BATCH_SIZE = int(os.environ.get('SCALE_INGEST_JOB_BATCH_SIZE', INGEST_JOB_BATCH_SIZE))
+INGEST_SKIP_DUPLICATE_CONTENT = os.environ.get('SCALE_INGEST_SKIP_DUPLICATE_CONTENT',
+                                               str(INGEST_SKIP_DUPLICATE_CONTENT)).lower() in ('true', '1', 't')
+INPUT_FILE_CACHE_DIR = os.environ.get('SCALE_INPUT_FILE_CACHE_DIR', INPUT_FILE_CACHE_DIR)
+INPUT_FILE_CACHE_MAX_SIZE = int(os.environ.get('SCALE_INPUT_FILE_CACHE_MAX_SIZE', INPUT_FILE_CACHE_MAX_SIZE))
+INPUT_FILE_CACHE_MIN_FREE = int(os.environ.get('SCALE_INPUT_FILE_CACHE_MIN_FREE', INPUT_FILE_CACHE_MIN_FREE))
+VERIFY_FILE_CHECKSUMS = os.environ.get('SCALE_VERIFY_FILE_CHECKSUMS',
+                                       str(VERIFY_FILE_CHECKSUMS)).lower() in ('true', '1', 't')
+
 DB_HOST = os.environ.get('SCALE_DB_HOST', '')
 if DB_HOST == '':
         DB_HOST = os.environ.get('DB_PORT_5432_TCP_ADDR', '')
@@ -0,0 +1,106 @@
+"""Defines the command line method for benchmarking the Scale scheduler with an offline simulation"""
+from __future__ import unicode_literals
+
+import itertools
+import json
+import logging
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from node.resources.node_resources import NodeResources
+from node.resources.resource import Cpus, Disk, Mem
+from scheduler.simulation.simulation import SchedulingSimulation
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Command that benchmarks the Scale scheduler by simulating synthetic clusters without a Mesos master
+    """
+
+    help = 'Benchmarks the Scale scheduler by simulating synthetic clusters in a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agents', action='store', type=int, nargs='+', default=[10],
+                            help='The number of agents in each simulated cluster, multiple values are swept')
+        parser.add_argument('--job-types', action='store', type=int, nargs='+', default=[10],
+                            help='The number of job types, multiple values are swept')
+        parser.add_argument('--jobs', action='store', type=int, nargs='+', default=[1000],
+                            help='The number of queued jobs, multiple values are swept')
+        parser.add_argument('--agent-cpus', action='store', type=float, default=32.0,
+                            help='The number of CPUs on each agent')
+        parser.add_argument('--agent-mem', action='store', type=float, default=131072.0,
+                            help='The memory in MiB on each agent')
+        parser.add_argument('--agent-disk', action='store', type=float, default=1048576.0,
+                            help='The disk space in MiB on each agent')
+        parser.add_argument('--max-job-generations', action='store', type=int, default=10,
+                            help='The maximum number of scheduling generations that each job runs')
+        parser.add_argument('--max-generations', action='store', type=int, default=1000,
+                            help='The maximum number of scheduling generations in each simulation')
+        parser.add_argument('--pipeline-commits', action='store_true', default=False,
+                            help='Pipeline the database commits of scheduled jobs, as the scheduler does')
+        parser.add_argument('--seed', action='store', type=int, default=1,
+                            help='The random seed for the synthetic job types and jobs')
+        parser.add_argument('--keepdb', action='store_true', default=False,
+                            help='Keep the throwaway database between runs of this command')
+        parser.add_argument('--json', action='store_true', default=False,
+                            help='Write the results of each simulation as a line of JSON')
+
+    def handle(self, *args, **options):
+        """See :meth:`django.core.management.base.BaseCommand.handle`.
+
+        This method runs a scheduling simulation for each combination of the swept parameters.
+        """
+
+        agent_resources = NodeResources([Cpus(options['agent_cpus']), Mem(options['agent_mem']),
+                                         Disk(options['agent_disk'])])
+        sweep = list(itertools.product(options['agents'], options['job_types'], options['jobs']))
+        keepdb = options['keepdb']
+
+        logger.info('Command starting: scale_scheduler_benchmark')
+        logger.info(' - Simulations: %i', len(sweep))
+
+        # The simulation creates synthetic jobs and nodes, so never run it against the configured database
+        old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            for agent_count, job_type_count, job_count in sweep:
+                call_command('flush', interactive=False, verbosity=0)
+                simulation = SchedulingSimulation(agent_count, job_type_count, job_count, agent_resources,
+                                                  max_job_generations=options['max_job_generations'],
+                                                  max_generations=options['max_generations'],
+                                                  pipeline_commits=options['pipeline_commits'],
+                                                  seed=options['seed'])
+                results = simulation.run()
+                if options['json']:
+                    self.stdout.write(json.dumps(results, sort_keys=True))
+                else:
+                    self._write_results(results)
+        finally:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=keepdb)
+
+        logger.info('Command completed: scale_scheduler_benchmark')
+
+    def _write_results(self, results):
+        """Writes a readable summary of the given simulation results
+
+        :param results: The simulation results
+        :type results: dict
+        """
+
+        loop_ms = results['loop_ms']
+        self.stdout.write('Agents: %i, job types: %i, jobs: %i' % (results['agents'], results['job_types'],
+                                                                  results['jobs']))
+        self.stdout.write('  Generations: %i, queue drained in generation: %s' %
+                          (results['generations'], results['queue_drained_generation']))
+        self.stdout.write('  Jobs scheduled: %i, jobs completed: %i, jobs scheduled/sec: %s' %
+                          (results['jobs_scheduled'], results['jobs_completed'], results['jobs_per_sec']))
+        self.stdout.write('  Scheduling loop ms: p50 %s, p90 %s, p99 %s, max %s' %
+                          (loop_ms['p50'], loop_ms['p90'], loop_ms['p99'], loop_ms['max']))
+        for name in sorted(results['phases_ms']):
+            self.stdout.write('    %s ms: p50 %s, p99 %s' % (name, results['phases_ms'][name]['p50'],
+                                                             results['phases_ms'][name]['p99']))
+        self.stdout.write('  Utilization while jobs were queued: CPU %s, memory %s' %
+                          (results['cpu_utilization'], results['mem_utilization']))
@@ -6,6 +6,7 @@ import logging
 import threading
 from collections import namedtuple
 
+from django.conf import settings
 from django.utils.timezone import now
 
 from job.tasks.health_task import HealthTask
@@ -69,6 +70,7 @@ class Node(object):
         self._cleanup_task = None
         self._conditions = NodeConditions(self._hostname)
         self._health_task = None
+        self._input_file_cache_counts = Node._get_input_file_cache_counts(node)
         self._is_active = node.is_active
         self._is_image_pulled = False
         self._is_initial_cleanup_completed = False
@@ -144,6 +146,8 @@ class Node(object):
             state_dict = {'name': self._state.state, 'title': self._state.title, 'description': self._state.description}
             node_dict = {'id': self._id, 'hostname': self._hostname, 'agent_id': self._agent_id,
                          'is_active': self._is_active, 'state': state_dict}
+            if settings.INPUT_FILE_CACHE_DIR:
+                node_dict['input_file_cache'] = dict(self._input_file_cache_counts)
             self._conditions.generate_status_json(node_dict)
         nodes_list.append(node_dict)
 
@@ -291,6 +295,7 @@ class Node(object):
             raise Exception('Trying to update node from incorrect database model')
 
         with self._lock:
+            self._input_file_cache_counts = Node._get_input_file_cache_counts(node)
             self._is_active = node.is_active
             self._is_paused = node.is_paused
             self._is_scheduler_paused = scheduler_config.is_paused
@@ -329,6 +334,19 @@ class Node(object):
         if not self._pull_task and self._is_ready_for_pull_task(when):
             self._pull_task = PullTask(scheduler_mgr.framework_id, self._agent_id)
 
+    @staticmethod
+    def _get_input_file_cache_counts(node):
+        """Returns the input file cache counts from the given node model
+
+        :param node: The node model
+        :type node: :class:`node.models.Node`
+        :returns: The input file cache counts stored by name
+        :rtype: dict
+        """
+
+        return {'hits': node.input_cache_hits, 'hit_bytes': node.input_cache_hit_bytes,
+                'misses': node.input_cache_misses, 'miss_bytes': node.input_cache_miss_bytes}
+
     def _image_pull_completed(self):
         """Tells this node that its image pull task has succeeded. Caller must have obtained the thread lock.
         """
@@ -4,8 +4,9 @@ from __future__ import unicode_literals
 
 import datetime
 import logging
+from multiprocessing.pool import ThreadPool
 
-from django.db import transaction
+from django.db import close_old_connections, connections, transaction
 from django.db.utils import DatabaseError
 from django.utils.timezone import now
 from mesos.interface import mesos_pb2
@@ -18,13 +19,16 @@ from job.models import Job, JobExecution, JobExecutionEnd
 from job.tasks.manager import task_mgr
 from mesos_api.tasks import create_mesos_task
 from node.resources.node_resources import NodeResources
-from queue.job_exe import QueuedJobExecution
 from queue.models import Queue
 from scheduler.cleanup.manager import cleanup_mgr
 from scheduler.manager import scheduler_mgr
 from scheduler.node.manager import node_mgr
 from scheduler.resources.agent import ResourceSet
 from scheduler.resources.manager import resource_mgr
+from scheduler.scheduling import metrics
+from scheduler.scheduling.metrics import scheduling_metrics
+from scheduler.scheduling.node_index import SchedulingNodeIndex
+from scheduler.scheduling.queue_index import QueueIndex
 from scheduler.scheduling.scheduling_node import SchedulingNode
 from scheduler.sync.job_type_manager import job_type_mgr
 from scheduler.sync.workspace_manager import workspace_mgr
@@ -51,10 +55,19 @@ class SchedulingManager(object):
     thread.
     """
 
-    def __init__(self):
+    def __init__(self, pipeline_commits=False):
         """Constructor
+
+        :param pipeline_commits: Whether the job executions scheduled in a generation are committed to the database on
+            a dedicated worker thread while the scheduling thread moves on, in which case they are launched in the
+            first generation after their commit finishes. If False, they are committed and launched within the same
+            generation. A manager that pipelines its commits must be shut down with shutdown() when it is done.
+        :type pipeline_commits: bool
         """
 
+        self._commit_pool = ThreadPool(1) if pipeline_commits else None
+        self._pending_commits = []  # [(Result of the commit, list of queued job executions being committed)]
+        self._queue_index = QueueIndex()
         self._waiting_tasks = {}  # {Task ID: int}
 
     def perform_scheduling(self, driver, when):
@@ -74,23 +87,29 @@ class SchedulingManager(object):
             # Don't schedule anything until the scheduler has connected to Mesos
             return 0
 
+        # Job executions committed since the last generation are now running and get their first task launched below
+        committed_job_exe_count = self._complete_pending_commits()
+
         job_types = job_type_mgr.get_job_types()
         job_type_resources = job_type_mgr.get_job_type_resources()
         tasks = task_mgr.get_all_tasks()
         running_job_exes = job_exe_mgr.get_running_job_exes()
         workspaces = workspace_mgr.get_workspaces()
 
-        nodes = self._prepare_nodes(tasks, running_job_exes, when)
-        fulfilled_nodes = self._schedule_waiting_tasks(nodes, running_job_exes, when)
+        with scheduling_metrics.time_phase('prepare_nodes'):
+            nodes = self._prepare_nodes(tasks, running_job_exes, when)
+        with scheduling_metrics.time_phase('schedule_waiting_tasks'):
+            fulfilled_nodes = self._schedule_waiting_tasks(nodes, running_job_exes, when)
 
-        sys_tasks_scheduled = self._schedule_system_tasks(fulfilled_nodes, job_type_resources, when)
+        with scheduling_metrics.time_phase('schedule_system_tasks'):
+            sys_tasks_scheduled = self._schedule_system_tasks(fulfilled_nodes, job_type_resources, when)
 
-        job_exe_count = 0
+        job_exe_count = committed_job_exe_count
         if sys_tasks_scheduled:
             # Only schedule new job executions if all needed system tasks have been scheduled
             job_type_limits = self._calculate_job_type_limits(job_types, running_job_exes)
-            job_exe_count = self._schedule_new_job_exes(framework_id, fulfilled_nodes, job_types, job_type_limits,
-                                                        job_type_resources, workspaces)
+            job_exe_count += self._schedule_new_job_exes(framework_id, fulfilled_nodes, job_types, job_type_limits,
+                                                         job_type_resources, workspaces)
         else:
             # TODO: this is a good place for a scheduler warning in the status JSON
             logger.warning('No new jobs scheduled due to waiting system tasks')
@@ -99,11 +118,26 @@ class SchedulingManager(object):
             logger.warning('Scheduler framework ID changed, skipping task launch')
             return 0
 
-        self._allocate_offers(nodes)
+        with scheduling_metrics.time_phase('allocate_offers'):
+            self._allocate_offers(nodes)
         task_count, offer_count = self._launch_tasks(driver, nodes)
         scheduler_mgr.add_scheduling_counts(job_exe_count, task_count, offer_count)
         return task_count
 
+    def shutdown(self):
+        """Shuts down the commit worker thread, if commits are pipelined. Any pending commits are allowed to finish
+        and are handed to the job execution manager, and then the database connection of the worker thread is closed.
+        """
+
+        if not self._commit_pool:
+            return
+
+        self._commit_pool.apply(connections.close_all)  # Runs after any pending commits on the worker thread
+        self._commit_pool.close()
+        self._commit_pool.join()
+        self._commit_pool = None
+        self._complete_pending_commits()
+
     def _allocate_offers(self, nodes):
         """Allocates resource offers to the node
 
@@ -142,6 +176,11 @@ class SchedulingManager(object):
         for running_job_exe in running_job_exes:
             if running_job_exe.job_type_id in job_type_limits:
                 job_type_limits[running_job_exe.job_type_id] -= 1
+        # Job executions that are still being committed will be running soon, so they count against the limits too
+        for _result, queued_job_exes in self._pending_commits:
+            for queued_job_exe in queued_job_exes:
+                if not queued_job_exe.is_canceled and queued_job_exe.job_type_id in job_type_limits:
+                    job_type_limits[queued_job_exe.job_type_id] -= 1
 
         return job_type_limits
 
@@ -170,6 +209,83 @@ class SchedulingManager(object):
 
         return ignore_job_type_ids
 
+    def _commit_scheduled_job_executions(self, framework_id, queued_job_executions, job_types, workspaces):
+        """Runs on the commit worker thread to process the given queued job executions that have been scheduled
+
+        :param framework_id: The scheduling framework ID
+        :type framework_id: string
+        :param queued_job_executions: A list of queued job executions that have been scheduled
+        :type queued_job_executions: list
+        :param job_types: A dict of all job types stored by ID
+        :type job_types: dict
+        :param workspaces: A dict of all workspaces stored by name
+        :type workspaces: dict
+        :returns: The running job executions stored in lists by node ID
+        :rtype: dict
+        """
+
+        # The worker thread holds its own database connection, replace it if it has become unusable
+        close_old_connections()
+        return self._process_scheduled_job_executions(framework_id, queued_job_executions, job_types, workspaces)
+
+    def _complete_pending_commits(self):
+        """Hands the new running job executions of the pending commits that have finished to the job execution
+        manager, without waiting for the commits that are still in progress. If a commit failed, its queued job
+        executions remain in the queue index and will be scheduled again.
+
+        :returns: The number of new job executions that were committed
+        :rtype: int
+        """
+
+        committed_job_exe_count = 0
+        pending_commits = []
+        for result, queued_job_exes in self._pending_commits:
+            if not result.ready():
+                pending_commits.append((result, queued_job_exes))
+                continue
+            try:
+                running_job_exes = result.get()
+            except Exception:
+                logger.exception('Error occurred while committing scheduled jobs, they will be scheduled again')
+                continue
+            committed_job_exe_count += len(self._handle_committed_job_exes(queued_job_exes, running_job_exes))
+        self._pending_commits = pending_commits
+
+        if committed_job_exe_count:
+            logger.info('Committed %d new job(s)', committed_job_exe_count)
+        return committed_job_exe_count
+
+    @staticmethod
+    def _count_skipped(skipped_counts, reason):
+        """Counts a queued job execution that was skipped for the given reason
+
+        :param skipped_counts: The number of skipped queued job executions stored by reason
+        :type skipped_counts: dict
+        :param reason: The reason the queued job execution was skipped
+        :type reason: string
+        """
+
+        skipped_counts[reason] = skipped_counts.get(reason, 0) + 1
+
+    def _handle_committed_job_exes(self, queued_job_exes, running_job_exes):
+        """Removes the given committed job executions from the queue index and hands the new running job executions to
+        the job execution manager
+
+        :param queued_job_exes: The queued job executions that were committed
+        :type queued_job_exes: list
+        :param running_job_exes: The running job executions stored in lists by node ID
+        :type running_job_exes: dict
+        :returns: The list of all new running job executions
+        :rtype: list
+        """
+
+        self._queue_index.remove([queued_job_exe.id for queued_job_exe in queued_job_exes])
+        all_running_job_exes = []
+        for node_id in running_job_exes:
+            all_running_job_exes.extend(running_job_exes[node_id])
+        job_exe_mgr.schedule_job_exes(all_running_job_exes, create_running_job_messages(all_running_job_exes))
+        return all_running_job_exes
+
     def _launch_tasks(self, driver, nodes):
         """Launches all of the tasks that have been scheduled on the given nodes
 
@@ -223,6 +339,7 @@ class SchedulingManager(object):
                     logger.exception('Error occurred while launching tasks on node %s', node.hostname)
 
         duration = now() - started
+        scheduling_metrics.record_phase('launch_tasks', duration)
         msg = 'Launching tasks took %.3f seconds'
         if duration > LAUNCH_TASK_WARN_THRESHOLD:
             logger.warning(msg, duration.total_seconds())
@@ -290,11 +407,22 @@ class SchedulingManager(object):
 
             scheduling_node = SchedulingNode(agent_id, node, node_tasks, node_exes, resource_set)
             scheduling_nodes[scheduling_node.node_id] = scheduling_node
+
+        # Job executions that are still being committed keep the resources they were placed on until the commit
+        # finishes and they claim them as running job executions, or the commit fails and they are scheduled again
+        committing_exes_by_node_id = {}  # {Node ID: List of committing job exes}
+        for _result, queued_job_exes in self._pending_commits:
+            for queued_job_exe in queued_job_exes:
+                if not queued_job_exe.is_canceled and queued_job_exe.scheduled_node_id in scheduling_nodes:
+                    committing_exes_by_node_id.setdefault(queued_job_exe.scheduled_node_id, []).append(queued_job_exe)
+        for node_id, committing_exes in committing_exes_by_node_id.items():
+            scheduling_nodes[node_id].reserve_committing_job_exes(committing_exes)
+
         return scheduling_nodes
 
     def _process_queue(self, nodes, job_types, job_type_limits, job_type_resources, workspaces):
-        """Retrieves the top of the queue and schedules new job executions on available nodes as resources and limits
-        allow
+        """Syncs the queue index, retrieves the top of the queue, and schedules new job executions on available nodes
+        as resources and limits allow
 
         :param nodes: The dict of scheduling nodes stored by node ID for all nodes ready to accept new job executions
         :type nodes: dict
@@ -313,10 +441,18 @@ class SchedulingManager(object):
         scheduled_job_executions = []
         ignore_job_type_ids = self._calculate_job_types_to_ignore(job_types, job_type_limits)
         started = now()
-
-        for queue in Queue.objects.get_queue(scheduler_mgr.config.queue_mode, ignore_job_type_ids)[:QUEUE_LIMIT]:
-            job_exe = QueuedJobExecution(queue)
-
+        node_index = SchedulingNodeIndex(nodes, job_type_resources)
+
+        self._queue_index.sync_with_database(started)
+        queue_mode = scheduler_mgr.config.queue_mode
+        # Job executions that are still being committed stay in the queue index until their commit finishes
+        committing_queue_ids = set()
+        for _result, queued_job_exes in self._pending_commits:
+            committing_queue_ids.update(queued_job_exe.id for queued_job_exe in queued_job_exes)
+        queued_job_exes = self._queue_index.get_queue(queue_mode, ignore_job_type_ids, QUEUE_LIMIT,
+                                                      ignore_queue_ids=committing_queue_ids)
+        skipped_counts = {}  # {Reason: count}
+        for i, job_exe in enumerate(queued_job_exes):
             # Canceled job executions get processed as scheduled executions
             if job_exe.is_canceled:
                 scheduled_job_executions.append(job_exe)
@@ -324,11 +460,13 @@ class SchedulingManager(object):
 
             # If there are no longer any available nodes, break
             if not nodes:
+                skipped_counts[metrics.SKIP_NO_AVAILABLE_NODES] = len(queued_job_exes) - i
                 break
 
             # Make sure execution's job type and workspaces have been synced to the scheduler
-            job_type_id = queue.job_type_id
+            job_type_id = job_exe.job_type_id
             if job_type_id not in job_types:
+                self._count_skipped(skipped_counts, metrics.SKIP_JOB_TYPE_NOT_SYNCED)
                 continue
             workspace_names = job_exe.configuration.get_input_workspace_names()
             workspace_names.extend(job_exe.configuration.get_output_workspace_names())
@@ -336,19 +474,25 @@ class SchedulingManager(object):
             for name in workspace_names:
                 missing_workspace = missing_workspace or name not in workspaces
             if missing_workspace:
+                self._count_skipped(skipped_counts, metrics.SKIP_WORKSPACE_NOT_SYNCED)
                 continue
 
             # Check limit for this execution's job type
             if job_type_id in job_type_limits and job_type_limits[job_type_id] < 1:
+                self._count_skipped(skipped_counts, metrics.SKIP_JOB_TYPE_LIMIT)
                 continue
 
             # Try to schedule job execution and adjust job type limit if needed
-            if self._schedule_new_job_exe(job_exe, nodes, job_type_resources):
+            if self._schedule_new_job_exe(job_exe, nodes, node_index, job_type_resources):
                 scheduled_job_executions.append(job_exe)
                 if job_type_id in job_type_limits:
                     job_type_limits[job_type_id] -= 1
+            else:
+                self._count_skipped(skipped_counts, metrics.SKIP_INSUFFICIENT_RESOURCES)
+        scheduling_metrics.add_job_counts(len(queued_job_exes), skipped_counts)
 
         duration = now() - started
+        scheduling_metrics.record_phase('process_queue', duration)
         msg = 'Processing queue took %.3f seconds'
         if duration > PROCESS_QUEUE_WARN_THRESHOLD:
             logger.warning(msg, duration.total_seconds())
@@ -424,6 +568,7 @@ class SchedulingManager(object):
             Queue.objects.filter(id__in=queue_ids).delete()
 
         duration = now() - started
+        scheduling_metrics.record_phase('db_commit', duration)
         msg = 'Queries to process scheduled jobs took %.3f seconds'
         if duration > SCHEDULE_QUERY_WARN_THRESHOLD:
             logger.warning(msg, duration.total_seconds())
@@ -432,53 +577,45 @@ class SchedulingManager(object):
 
         return running_job_exes
 
-    def _schedule_new_job_exe(self, job_exe, nodes, job_type_resources):
+    def _schedule_new_job_exe(self, job_exe, nodes, node_index, job_type_resources):
         """Schedules the given job execution on the queue on one of the available nodes, if possible
 
         :param job_exe: The job execution to schedule
         :type job_exe: :class:`queue.job_exe.QueuedJobExecution`
         :param nodes: The dict of available scheduling nodes stored by node ID
         :type nodes: dict
+        :param node_index: The index of the available scheduling nodes
+        :type node_index: :class:`scheduler.scheduling.node_index.SchedulingNodeIndex`
         :param job_type_resources: The list of all of the job type resource requirements
         :type job_type_resources: list
         :returns: True if scheduled, False otherwise
         :rtype: bool
         """
 
-        best_scheduling_node = None
-        best_scheduling_score = None
-        best_reservation_node = None
-        best_reservation_score = None
-
-        for node in nodes.values():
-            # Check node for scheduling this job execution
-            score = node.score_job_exe_for_scheduling(job_exe, job_type_resources)
-            if score is not None:
-                # Job execution could be scheduled on this node, check its score
-                if best_scheduling_node is None or score < best_scheduling_score:
-                    # This is the best node for scheduling so far
-                    best_scheduling_node = node
-                    best_scheduling_score = score
-                    best_reservation_node = None  # No need to reserve a node if we can schedule the job execution
-                    best_reservation_score = None  # No need to reserve a node if we can schedule the job execution
-            if best_scheduling_node is None:
-                # No nodes yet to schedule this job execution on, check whether we should reserve this node
-                score = node.score_job_exe_for_reservation(job_exe, job_type_resources)
-                if score is not None:
-                    # Job execution could reserve this node, check its score
-                    if best_reservation_node is None or score < best_reservation_score:
-                        # This is the best node to reserve so far
-                        best_reservation_node = node
-                        best_reservation_score = score
-
         # Schedule the job execution on the best node
+        best_scheduling_node = node_index.get_best_node(job_exe.required_resources)
         if best_scheduling_node:
             if best_scheduling_node.accept_new_job_exe(job_exe):
+                node_index.update(best_scheduling_node.node_id)
                 return True
+            return False
 
-        # Could not schedule job execution, reserve a node to run this execution if possible
+        # No node can schedule this job execution, check whether we should reserve a node to run it
+        best_reservation_node = None
+        best_reservation_score = None
+        for node in nodes.values():
+            score = node.score_job_exe_for_reservation(job_exe, job_type_resources)
+            if score is not None:
+                # Job execution could reserve this node, check its score
+                if best_reservation_node is None or score < best_reservation_score:
+                    # This is the best node to reserve so far
+                    best_reservation_node = node
+                    best_reservation_score = score
+
+        # Reserve the best node to block lower priority jobs
         if best_reservation_node:
             del nodes[best_reservation_node.node_id]
+            node_index.remove(best_reservation_node.node_id)
 
         return False
 
@@ -497,7 +634,8 @@ class SchedulingManager(object):
         :type job_type_resources: list
         :param workspaces: A dict of all workspaces stored by name
         :type workspaces: dict
-        :returns: The number of new job executions that were scheduled
+        :returns: The number of new job executions that were scheduled in this generation, always zero when commits are
+            pipelined
         :rtype: int
         """
 
@@ -510,12 +648,21 @@ class SchedulingManager(object):
         try:
             scheduled_job_exes = self._process_queue(available_nodes, job_types, job_type_limits, job_type_resources,
                                                      workspaces)
+            if self._commit_pool:
+                # Commit on the worker thread and release the placements so their offers are held until the commit
+                # finishes, when the committed job executions claim them as running job executions. Until then, the
+                # resources stay reserved on their nodes by _prepare_nodes().
+                for node in available_nodes.values():
+                    node.reset_new_job_exes()
+                if scheduled_job_exes:
+                    args = (framework_id, scheduled_job_exes, job_types, workspaces)
+                    result = self._commit_pool.apply_async(self._commit_scheduled_job_executions, args)
+                    self._pending_commits.append((result, scheduled_job_exes))
+                return 0
+
             running_job_exes = self._process_scheduled_job_executions(framework_id, scheduled_job_exes, job_types,
                                                                       workspaces)
-            all_running_job_exes = []
-            for node_id in running_job_exes:
-                all_running_job_exes.extend(running_job_exes[node_id])
-            job_exe_mgr.schedule_job_exes(all_running_job_exes, create_running_job_messages(all_running_job_exes))
+            self._handle_committed_job_exes(scheduled_job_exes, running_job_exes)
             node_ids = set()
             job_exe_count = 0
             scheduled_resources = NodeResources()
@@ -561,25 +708,17 @@ class SchedulingManager(object):
         waiting_tasks = 0
         waiting_resources = NodeResources()
 
+        node_index = SchedulingNodeIndex(nodes, job_type_resources)
         for task in system_task_mgr.get_tasks_to_schedule(when):
             task_scheduled = False
-            best_scheduling_node = None
-            best_scheduling_score = None
-            for node in nodes.values():
-                # Check node for scheduling this system task
-                score = node.score_system_task_for_scheduling(task, job_type_resources)
-                if score is not None:
-                    # System task could be scheduled on this node, check its score
-                    if best_scheduling_node is None or score < best_scheduling_score:
-                        # This is the best node for scheduling so far
-                        best_scheduling_node = node
-                        best_scheduling_score = score
 
             # Schedule the system task on the best node
+            best_scheduling_node = node_index.get_best_node(task.get_resources())
             if best_scheduling_node:
                 if best_scheduling_node.accept_system_task(task):
                     task_scheduled = True
                     node_ids.add(best_scheduling_node.node_id)
+                    node_index.update(best_scheduling_node.node_id)
 
             if task_scheduled:
                 scheduled_tasks += 1
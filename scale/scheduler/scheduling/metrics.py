@@ -0,0 +1,126 @@
+"""Defines the class that records metrics describing the performance of scheduling"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+from contextlib import contextmanager
+
+from django.utils.timezone import now
+
+from util.histogram import RollingHistogram
+
+# Latency histograms describe this many of the most recent seconds
+HISTOGRAM_WINDOW = 300.0
+
+# Reasons that a queued job execution was considered but not scheduled
+SKIP_INSUFFICIENT_RESOURCES = 'insufficient_resources'
+SKIP_JOB_TYPE_LIMIT = 'job_type_limit'
+SKIP_JOB_TYPE_NOT_SYNCED = 'job_type_not_synced'
+SKIP_NO_AVAILABLE_NODES = 'no_available_nodes'
+SKIP_WORKSPACE_NOT_SYNCED = 'workspace_not_synced'
+
+
+class SchedulingMetrics(object):
+    """This class records the latency of each phase of scheduling and of each scheduler thread loop, along with counts of
+    the queued job executions that were considered and the reasons they were skipped. This class is thread-safe.
+    """
+
+    def __init__(self):
+        """Constructor
+        """
+
+        self._jobs_considered = 0  # Number of queued job executions considered since last status JSON
+        self._jobs_skipped = {}  # {Reason: Number of queued job executions skipped since last status JSON}
+        self._lock = threading.Lock()
+        self._phases = {}  # {Phase name: RollingHistogram of durations in seconds}
+        self._thread_loops = {}  # {Thread name: RollingHistogram of durations in seconds}
+
+    def add_job_counts(self, considered_count, skipped_counts):
+        """Adds the counts from one pass over the queue
+
+        :param considered_count: The number of queued job executions that were considered
+        :type considered_count: int
+        :param skipped_counts: The number of queued job executions skipped, stored by reason
+        :type skipped_counts: dict
+        """
+
+        with self._lock:
+            self._jobs_considered += considered_count
+            for reason, count in skipped_counts.items():
+                self._jobs_skipped[reason] = self._jobs_skipped.get(reason, 0) + count
+
+    def clear(self):
+        """Clears all metrics. This method is intended for testing only.
+        """
+
+        with self._lock:
+            self._jobs_considered = 0
+            self._jobs_skipped = {}
+            self._phases = {}
+            self._thread_loops = {}
+
+    def generate_status_json(self, status_dict):
+        """Generates the portion of the status JSON that describes the scheduling metrics
+
+        :param status_dict: The status JSON dict
+        :type status_dict: dict
+        """
+
+        with self._lock:
+            phases_dict = {}
+            for name, histogram in self._phases.items():
+                phases_dict[name] = histogram.get_histogram().get_summary(scale=1000.0)
+            threads_dict = {}
+            for name, histogram in self._thread_loops.items():
+                threads_dict[name] = histogram.get_histogram().get_summary(scale=1000.0)
+            jobs_dict = {'considered': self._jobs_considered, 'skipped': dict(self._jobs_skipped)}
+            self._jobs_considered = 0
+            self._jobs_skipped = {}
+
+        status_dict['scheduling'] = {'window_secs': HISTOGRAM_WINDOW, 'phases_ms': phases_dict,
+                                     'thread_loops_ms': threads_dict, 'jobs': jobs_dict}
+
+    def record_phase(self, name, duration):
+        """Records the duration of a phase of scheduling
+
+        :param name: The name of the phase
+        :type name: string
+        :param duration: The duration of the phase
+        :type duration: :class:`datetime.timedelta`
+        """
+
+        with self._lock:
+            if name not in self._phases:
+                self._phases[name] = RollingHistogram(HISTOGRAM_WINDOW)
+            self._phases[name].record(duration.total_seconds())
+
+    def record_thread_loop(self, name, duration):
+        """Records the duration of one loop of a scheduler background thread
+
+        :param name: The name of the thread
+        :type name: string
+        :param duration: The duration of the loop
+        :type duration: :class:`datetime.timedelta`
+        """
+
+        with self._lock:
+            if name not in self._thread_loops:
+                self._thread_loops[name] = RollingHistogram(HISTOGRAM_WINDOW)
+            self._thread_loops[name].record(duration.total_seconds())
+
+    @contextmanager
+    def time_phase(self, name):
+        """Context manager that records the duration of the enclosed phase of scheduling
+
+        :param name: The name of the phase
+        :type name: string
+        """
+
+        started = now()
+        try:
+            yield
+        finally:
+            self.record_phase(name, now() - started)
+
+
+scheduling_metrics = SchedulingMetrics()
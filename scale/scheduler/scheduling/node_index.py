@@ -0,0 +1,124 @@
+"""Defines the class that indexes scheduling nodes for finding the best fit for a set of resources"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import heapq
+
+
+class SchedulingNodeIndex(object):
+    """This class indexes scheduling nodes so that the best node for scheduling a set of resources can be found without
+    scoring every node each time. The first request for a distinct set of resources scores every node once and keeps
+    the fitting nodes in a heap ordered by score. Whenever a node's allocation changes, only that node is re-scored.
+    Nodes that cannot fit a set of resources are left out of its heap, so they are not considered again for that set of
+    resources unless their allocation changes. The selected node is always the same node that scoring all nodes in
+    order would select, including how ties are broken.
+
+    The index must be told about every change to a node's allocation (update) and every node that is no longer
+    available (remove). This class is NOT thread-safe and should only be used within the scheduling thread.
+    """
+
+    def __init__(self, nodes, job_type_resources):
+        """Constructor
+
+        :param nodes: The dict of scheduling nodes stored by node ID
+        :type nodes: dict
+        :param job_type_resources: The list of all of the job type resource requirements
+        :type job_type_resources: list
+        """
+
+        self._job_type_resources = job_type_resources
+
+        self._heaps = {}  # {Resources key: heap of (score, node order, node ID)}
+        self._nodes = {}  # {Node ID: SchedulingNode}
+        self._order = {}  # {Node ID: position of node in the original iteration order}
+        self._resources = {}  # {Resources key: NodeResources}
+        self._scores = {}  # {Resources key: {Node ID: current score, possibly None}}
+
+        for order, node in enumerate(nodes.values()):
+            self._nodes[node.node_id] = node
+            self._order[node.node_id] = order
+
+    def get_best_node(self, resources):
+        """Returns the scheduling node with the best (lowest) score for the given resources, possibly None if no node
+        can fit them
+
+        :param resources: The resources to schedule
+        :type resources: :class:`node.resources.node_resources.NodeResources`
+        :returns: The best scheduling node, possibly None
+        :rtype: :class:`scheduler.scheduling.scheduling_node.SchedulingNode`
+        """
+
+        key = self._get_resources_key(resources)
+        if key not in self._heaps:
+            self._build_heap(key, resources)
+
+        heap = self._heaps[key]
+        scores = self._scores[key]
+        while heap:
+            score, _order, node_id = heap[0]
+            if node_id in self._nodes and scores[node_id] == score:
+                return self._nodes[node_id]
+            heapq.heappop(heap)  # Node is no longer available or this score is out of date
+        return None
+
+    def remove(self, node_id):
+        """Removes the given node from the index
+
+        :param node_id: The ID of the node to remove
+        :type node_id: int
+        """
+
+        self._nodes.pop(node_id, None)
+
+    def update(self, node_id):
+        """Re-scores the given node after its allocation has changed
+
+        :param node_id: The ID of the node that changed
+        :type node_id: int
+        """
+
+        if node_id not in self._nodes:
+            return
+
+        node = self._nodes[node_id]
+        for key, heap in self._heaps.items():
+            score = node.score_resources_for_scheduling(self._resources[key], self._job_type_resources)
+            scores = self._scores[key]
+            if score != scores[node_id]:
+                scores[node_id] = score
+                if score is not None:
+                    heapq.heappush(heap, (score, self._order[node_id], node_id))
+
+    def _build_heap(self, key, resources):
+        """Scores every node for the given resources and builds the heap of fitting nodes
+
+        :param key: The key for the resources
+        :type key: tuple
+        :param resources: The resources to score
+        :type resources: :class:`node.resources.node_resources.NodeResources`
+        """
+
+        heap = []
+        scores = {}
+        for node_id, node in self._nodes.items():
+            score = node.score_resources_for_scheduling(resources, self._job_type_resources)
+            scores[node_id] = score
+            if score is not None:
+                heap.append((score, self._order[node_id], node_id))
+        heapq.heapify(heap)
+
+        self._heaps[key] = heap
+        self._resources[key] = resources
+        self._scores[key] = scores
+
+    @staticmethod
+    def _get_resources_key(resources):
+        """Returns a hashable key that is equal for equal sets of resources
+
+        :param resources: The resources
+        :type resources: :class:`node.resources.node_resources.NodeResources`
+        :returns: The key
+        :rtype: tuple
+        """
+
+        return tuple(sorted((resource.name, resource.value) for resource in resources.resources))
@@ -0,0 +1,193 @@
+"""Defines the class that maintains an in-memory index of the queue for scheduling"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import bisect
+import datetime
+import heapq
+import logging
+
+from django.utils.timezone import utc
+
+from queue.job_exe import QueuedJobExecution
+from queue.models import Queue, QUEUE_ORDER_FIFO, QUEUE_ORDER_LIFO
+
+# Maximum number of queue models to retrieve in a single query when filling gaps in the index
+LOAD_CHUNK_SIZE = 1000
+# The full set of queue IDs is reconciled against the database this often to pick up models that were committed out of
+# ID order and to drop models that were removed by something other than the scheduler
+RECONCILIATION_PERIOD = datetime.timedelta(seconds=30)
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=utc)
+
+logger = logging.getLogger(__name__)
+
+
+class QueueIndex(object):
+    """This class maintains an in-memory index of the queued job executions, bucketed by job type and kept sorted by
+    priority and queue time. The index is synced incrementally with the database so that each queue model is only
+    retrieved and parsed once. This class is NOT thread-safe and should only be used within the scheduling thread.
+    """
+
+    def __init__(self):
+        """Constructor
+        """
+
+        self._buckets = {}  # {Job type ID: sorted list of (sort key, queue ID)}
+        self._high_water_id = 0  # Highest queue ID that has been loaded
+        self._job_exes = {}  # {Queue ID: QueuedJobExecution}
+        self._last_reconciliation = None
+        self._order_mode = QUEUE_ORDER_FIFO
+
+    @property
+    def count(self):
+        """The number of queued job executions in the index
+
+        :returns: The number of queued job executions
+        :rtype: int
+        """
+
+        return len(self._job_exes)
+
+    def get_queue(self, order_mode, ignore_job_type_ids=None, limit=None, ignore_queue_ids=None):
+        """Returns the queued job executions sorted according to their priority first, and then according to the
+        provided mode
+
+        :param order_mode: The mode determining how to order the queue (FIFO or LIFO)
+        :type order_mode: string
+        :param ignore_job_type_ids: The set of job type IDs to ignore
+        :type ignore_job_type_ids: set
+        :param limit: The maximum number of queued job executions to return, None for all of them
+        :type limit: int
+        :param ignore_queue_ids: The set of queue IDs to ignore
+        :type ignore_queue_ids: set
+        :returns: The list of queued job executions
+        :rtype: list[:class:`queue.job_exe.QueuedJobExecution`]
+        """
+
+        if order_mode != self._order_mode:
+            self._resort(order_mode)
+
+        buckets = []
+        for job_type_id, bucket in self._buckets.items():
+            if not ignore_job_type_ids or job_type_id not in ignore_job_type_ids:
+                buckets.append(bucket)
+
+        job_exes = []
+        for _sort_key, queue_id in heapq.merge(*buckets):
+            if limit is not None and len(job_exes) >= limit:
+                break
+            if ignore_queue_ids and queue_id in ignore_queue_ids:
+                continue
+            job_exes.append(self._job_exes[queue_id])
+        return job_exes
+
+    def remove(self, queue_ids):
+        """Removes the queued job executions with the given queue IDs from the index, typically after their queue
+        models have been deleted
+
+        :param queue_ids: The queue IDs to remove
+        :type queue_ids: list
+        """
+
+        for queue_id in queue_ids:
+            job_exe = self._job_exes.pop(queue_id, None)
+            if job_exe is None:
+                continue
+            bucket = self._buckets[job_exe.job_type_id]
+            entry = (self._get_sort_key(job_exe), queue_id)
+            del bucket[bisect.bisect_left(bucket, entry)]
+            if not bucket:
+                del self._buckets[job_exe.job_type_id]
+
+    def sync_with_database(self, when):
+        """Syncs with the database, loading queue models created since the last sync and applying cancellations. The
+        full set of queue IDs is periodically reconciled as well.
+
+        :param when: The current time
+        :type when: :class:`datetime.datetime`
+        """
+
+        count = self.count
+        for queue in Queue.objects.filter(id__gt=self._high_water_id).order_by('id').iterator():
+            self._add(queue)
+
+        for queue_id in Queue.objects.filter(is_canceled=True).values_list('id', flat=True):
+            if queue_id in self._job_exes:
+                self._job_exes[queue_id].is_canceled = True
+
+        if self._last_reconciliation is None:
+            # The initial load is already complete
+            self._last_reconciliation = when
+        elif when - self._last_reconciliation >= RECONCILIATION_PERIOD:
+            self._reconcile()
+            self._last_reconciliation = when
+
+        if self.count != count:
+            logger.debug('Queue index holds %d queued job execution(s)', self.count)
+
+    def _add(self, queue):
+        """Parses the given queue model and adds it to the index
+
+        :param queue: The queue model
+        :type queue: :class:`queue.models.Queue`
+        """
+
+        if queue.id in self._job_exes:
+            return
+
+        job_exe = QueuedJobExecution(queue)
+        self._job_exes[queue.id] = job_exe
+        if job_exe.job_type_id not in self._buckets:
+            self._buckets[job_exe.job_type_id] = []
+        bisect.insort(self._buckets[job_exe.job_type_id], (self._get_sort_key(job_exe), queue.id))
+        self._high_water_id = max(self._high_water_id, queue.id)
+
+    def _get_sort_key(self, job_exe):
+        """Returns the key for sorting the given queued job execution according to the current order mode
+
+        :param job_exe: The queued job execution
+        :type job_exe: :class:`queue.job_exe.QueuedJobExecution`
+        :returns: The sort key
+        :rtype: tuple
+        """
+
+        if self._order_mode == QUEUE_ORDER_FIFO:
+            return job_exe.priority, job_exe.queued, job_exe.id
+        elif self._order_mode == QUEUE_ORDER_LIFO:
+            delta = job_exe.queued - EPOCH
+            microseconds = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+            return job_exe.priority, -microseconds, job_exe.id
+        return job_exe.priority, job_exe.id
+
+    def _reconcile(self):
+        """Reconciles the indexed queue IDs with the queue IDs in the database
+        """
+
+        queue_ids = set(Queue.objects.values_list('id', flat=True))
+
+        removed_ids = [queue_id for queue_id in self._job_exes if queue_id not in queue_ids]
+        if removed_ids:
+            logger.info('Removing %d queued job execution(s) that left the queue outside of scheduling',
+                        len(removed_ids))
+            self.remove(removed_ids)
+
+        missing_ids = sorted(queue_ids.difference(self._job_exes))
+        if missing_ids:
+            logger.info('Loading %d queued job execution(s) that were missed by the incremental sync',
+                        len(missing_ids))
+        for i in range(0, len(missing_ids), LOAD_CHUNK_SIZE):
+            for queue in Queue.objects.filter(id__in=missing_ids[i:i + LOAD_CHUNK_SIZE]).iterator():
+                self._add(queue)
+
+    def _resort(self, order_mode):
+        """Sorts every job type bucket according to the given order mode
+
+        :param order_mode: The mode determining how to order the queue (FIFO or LIFO)
+        :type order_mode: string
+        """
+
+        self._order_mode = order_mode
+        for job_type_id, bucket in self._buckets.items():
+            self._buckets[job_type_id] = sorted((self._get_sort_key(self._job_exes[queue_id]), queue_id)
+                                                for _sort_key, queue_id in bucket)
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 
 from job.execution.tasks.exe_task import JobExecutionTask
 from node.resources.node_resources import NodeResources
+from node.resources.requirements import ResourceRequirements
 
 
 class SchedulingNode(object):
@@ -188,6 +189,19 @@ class SchedulingNode(object):
         self._allocated_queued_job_exes = []
         self._allocated_running_job_exes.extend(job_exes)
 
+    def reserve_committing_job_exes(self, job_exes):
+        """Reserves the resources of the given new job executions that were scheduled on this node in an earlier
+        generation and are still being committed to the database, so that no other job executions are placed on those
+        resources. The reserved resources are not allocated, their offers are held for when the committed job executions
+        launch their first tasks.
+
+        :param job_exes: The new job executions that are being committed
+        :type job_exes: [:class:`queue.job_exe.QueuedJobExecution`]
+        """
+
+        for job_exe in job_exes:
+            self._remaining_resources.subtract(job_exe.required_resources)
+
     def reset_new_job_exes(self):
         """Resets the allocated new job executions and deallocates any resources associated with them
         """
@@ -242,12 +256,7 @@ class SchedulingNode(object):
         available_resources.subtract(job_exe.required_resources)
         # Score is the number of job types that can fit within the estimated remaining resources. A better (lower) score
         # indicates a higher utilization of this node, reducing resource fragmentation.
-        score = 0
-        for job_type_resource in job_type_resources:
-            if available_resources.is_sufficient_to_meet(job_type_resource):
-                score += 1
-
-        return score
+        return SchedulingNode._count_job_types_that_fit(available_resources, job_type_resources)
 
     def score_job_exe_for_scheduling(self, job_exe, job_type_resources):
         """Returns an integer score (lower is better) indicating how well the given job execution fits on this node for
@@ -261,7 +270,34 @@ class SchedulingNode(object):
         :rtype: int
         """
 
-        return self._score_resources_for_scheduling(job_exe.required_resources, job_type_resources)
+        return self.score_resources_for_scheduling(job_exe.required_resources, job_type_resources)
+
+    def score_resources_for_scheduling(self, resources, job_type_resources):
+        """Returns an integer score (lower is better) indicating how well the given resources fit on this node for
+        scheduling. If the resources cannot be scheduled on this node, None is returned.
+
+        :param resources: The resources to score
+        :type resources: :class:`node.resources.node_resources.NodeResources`
+        :param job_type_resources: The list of all of the job type resource requirements
+        :type job_type_resources: list
+        :returns: The integer score indicating how good of a fit these resources are for this node, possibly None
+        :rtype: int
+        """
+
+        if not self._remaining_resources.is_sufficient_to_meet(resources):
+            return None
+
+        # Calculate our best guess of the total resources still available to Scale on this node by starting with the
+        # watermark resource level and subtracting resources for currently running and allocated tasks
+        total_resources_available = NodeResources()
+        total_resources_available.add(self._watermark_resources)
+        total_resources_available.subtract(self._task_resources)
+        total_resources_available.subtract(self.allocated_resources)
+        total_resources_available.subtract(resources)
+
+        # Score is the number of job types that can fit within the estimated resources on this node still available to
+        # Scale. A better (lower) score indicates a higher utilization of this node, reducing resource fragmentation.
+        return SchedulingNode._count_job_types_that_fit(total_resources_available, job_type_resources)
 
     def score_system_task_for_scheduling(self, system_task, job_type_resources):
         """Returns an integer score (lower is better) indicating how well the given system task fits on this node for
@@ -275,7 +311,7 @@ class SchedulingNode(object):
         :rtype: int
         """
 
-        return self._score_resources_for_scheduling(system_task.get_resources(), job_type_resources)
+        return self.score_resources_for_scheduling(system_task.get_resources(), job_type_resources)
 
     def start_job_exe_tasks(self):
         """Tells the node to start the next task on all scheduled job executions
@@ -287,34 +323,19 @@ class SchedulingNode(object):
                 self.allocated_tasks.append(task)
         self._allocated_running_job_exes = []
 
-    def _score_resources_for_scheduling(self, resources, job_type_resources):
-        """Returns an integer score (lower is better) indicating how well the given resources fit on this node for
-        scheduling. If the resources cannot be scheduled on this node, None is returned.
+    @staticmethod
+    def _count_job_types_that_fit(resources, job_type_resources):
+        """Returns the number of job types whose resource requirements fit within the given resources
 
-        :param resources: The resources to score
+        :param resources: The resources
         :type resources: :class:`node.resources.node_resources.NodeResources`
-        :param job_type_resources: The list of all of the job type resource requirements
+        :param job_type_resources: The list of all of the job type resource requirements, ideally already compiled as
+            :class:`node.resources.requirements.ResourceRequirements`
         :type job_type_resources: list
-        :returns: The integer score indicating how good of a fit these resources are for this node, possibly None
+        :returns: The number of job types that fit
         :rtype: int
         """
 
-        if not self._remaining_resources.is_sufficient_to_meet(resources):
-            return None
-
-        # Calculate our best guess of the total resources still available to Scale on this node by starting with the
-        # watermark resource level and subtracting resources for currently running and allocated tasks
-        total_resources_available = NodeResources()
-        total_resources_available.add(self._watermark_resources)
-        total_resources_available.subtract(self._task_resources)
-        total_resources_available.subtract(self.allocated_resources)
-        total_resources_available.subtract(resources)
-
-        # Score is the number of job types that can fit within the estimated resources on this node still available to
-        # Scale. A better (lower) score indicates a higher utilization of this node, reducing resource fragmentation.
-        score = 0
-        for job_type_resource in job_type_resources:
-            if total_resources_available.is_sufficient_to_meet(job_type_resource):
-                score += 1
-
-        return score
+        if not isinstance(job_type_resources, ResourceRequirements):
+            job_type_resources = ResourceRequirements(job_type_resources)
+        return job_type_resources.count_met_by(resources)
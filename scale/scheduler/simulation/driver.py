@@ -0,0 +1,139 @@
+"""Defines the class that stands in for the Mesos scheduler driver and master during a scheduling simulation"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import logging
+
+from node.resources.node_resources import NodeResources
+from node.resources.resource import ScalarResource
+from scheduler.resources.offer import ResourceOffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedDriver(object):
+    """This class stands in for both the Mesos scheduler driver and the Mesos master. It tracks the total resources of
+    each simulated agent, creates resource offers from the resources that are neither offered nor in use, and accepts
+    the tasks launched against those offers. Launched tasks hold their resources until they are finished. This class
+    is NOT thread-safe and should only be used within a scheduling simulation.
+    """
+
+    def __init__(self, framework_id):
+        """Constructor
+
+        :param framework_id: The framework ID of the simulated scheduler
+        :type framework_id: string
+        """
+
+        self.framework_id = framework_id
+
+        self._free_resources = {}  # {Agent ID: NodeResources that are neither offered nor in use}
+        self._launched_task_ids = []  # IDs of tasks launched since they were last retrieved
+        self._next_offer_number = 1
+        self._offers = {}  # {Offer ID: ResourceOffer}
+        self._tasks = {}  # {Task ID: (Agent ID, NodeResources)}
+        self._total_resources = {}  # {Agent ID: NodeResources}
+
+    def add_agent(self, agent_id, resources):
+        """Adds a simulated agent with the given total resources
+
+        :param agent_id: The agent ID
+        :type agent_id: string
+        :param resources: The total resources of the agent
+        :type resources: :class:`node.resources.node_resources.NodeResources`
+        """
+
+        self._free_resources[agent_id] = resources.copy()
+        self._total_resources[agent_id] = resources.copy()
+
+    def create_offers(self, when):
+        """Creates and returns new offers for all agent resources that are neither offered nor in use
+
+        :param when: The current time
+        :type when: :class:`datetime.datetime`
+        :returns: The list of new offers
+        :rtype: [:class:`scheduler.resources.offer.ResourceOffer`]
+        """
+
+        offers = []
+        for agent_id, free_resources in self._free_resources.items():
+            if not any(resource.value > 0.0 for resource in free_resources.resources):
+                continue
+            offer_id = 'offer_%d' % self._next_offer_number
+            self._next_offer_number += 1
+            offer = ResourceOffer(offer_id, agent_id, self.framework_id, free_resources, when)
+            self._offers[offer_id] = offer
+            self._free_resources[agent_id] = NodeResources()
+            offers.append(offer)
+        return offers
+
+    def finish_task(self, task_id):
+        """Finishes the launched task with the given ID, returning its resources to its agent
+
+        :param task_id: The ID of the task
+        :type task_id: string
+        """
+
+        if task_id in self._tasks:
+            agent_id, resources = self._tasks.pop(task_id)
+            self._free_resources[agent_id].add(resources)
+
+    def get_resource_totals(self):
+        """Returns the total resources of all agents and the resources used by all launched tasks
+
+        :returns: The total resources and the used resources
+        :rtype: tuple
+        """
+
+        total_resources = NodeResources()
+        for resources in self._total_resources.values():
+            total_resources.add(resources)
+        used_resources = NodeResources()
+        for _agent_id, resources in self._tasks.values():
+            used_resources.add(resources)
+        return total_resources, used_resources
+
+    def get_task_agent_id(self, task_id):
+        """Returns the agent ID of the launched task with the given ID, possibly None
+
+        :param task_id: The ID of the task
+        :type task_id: string
+        :returns: The agent ID of the task
+        :rtype: string
+        """
+
+        return self._tasks[task_id][0] if task_id in self._tasks else None
+
+    def launchTasks(self, offer_ids, tasks):
+        """Accepts the given offers and launches the given tasks with their resources. Resources of the accepted offers
+        that are not used by the tasks are returned to their agents.
+
+        See :meth:`mesos_api.mesos.SchedulerDriver.launchTasks`.
+        """
+
+        for offer_id in offer_ids:
+            offer = self._offers.pop(offer_id.value, None)
+            if offer:
+                self._free_resources[offer.agent_id].add(offer.resources)
+            else:
+                logger.error('Simulated tasks were launched with unknown offer %s', offer_id.value)
+
+        for task in tasks:
+            agent_id = task.slave_id.value
+            resources = NodeResources([ScalarResource(resource.name, resource.scalar.value)
+                                       for resource in task.resources])
+            self._free_resources[agent_id].subtract(resources)
+            self._tasks[task.task_id.value] = (agent_id, resources)
+            self._launched_task_ids.append(task.task_id.value)
+
+    def pop_launched_task_ids(self):
+        """Returns the IDs of the tasks launched since this method was last called
+
+        :returns: The list of launched task IDs
+        :rtype: list
+        """
+
+        launched_task_ids = self._launched_task_ids
+        self._launched_task_ids = []
+        return launched_task_ids
@@ -0,0 +1,308 @@
+"""Defines the class that simulates scheduling against a synthetic cluster"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import logging
+import random
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from job.execution.manager import job_exe_mgr
+from job.execution.tasks.exe_task import JOB_TASK_ID_PREFIX
+from job.models import Job, JobExecution, JobType, JobTypeRevision, TaskUpdate
+from job.tasks.manager import task_mgr
+from job.tasks.update import TaskStatusUpdate
+from queue.models import Queue
+from scheduler.cleanup.manager import cleanup_mgr
+from scheduler.manager import scheduler_mgr
+from scheduler.models import Scheduler
+from scheduler.node.agent import Agent
+from scheduler.node.manager import node_mgr
+from scheduler.resources.manager import resource_mgr
+from scheduler.scheduling.manager import SchedulingManager
+from scheduler.scheduling.metrics import scheduling_metrics
+from scheduler.simulation.driver import SimulatedDriver
+from scheduler.sync.job_type_manager import job_type_mgr
+from scheduler.sync.workspace_manager import workspace_mgr
+from scheduler.tasks.manager import system_task_mgr
+from trigger.models import TriggerEvent
+from util.histogram import Histogram
+
+# Resource shapes for the synthetic job types, shapes that do not fit on an agent are left out
+JOB_TYPE_CPUS = [0.5, 1.0, 2.0, 4.0, 8.0]
+JOB_TYPE_MEM = [256.0, 1024.0, 4096.0, 16384.0]
+JOB_TYPE_PRIORITIES = [50, 100, 200]
+# Number of jobs created and queued in each database transaction
+QUEUE_BATCH_SIZE = 1000
+# The background sync with the database is performed once every this many scheduling generations
+SYNC_GENERATIONS = 10
+
+FRAMEWORK_ID = 'scale-simulation'
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulingSimulation(object):
+    """This class runs the real scheduling manager against a synthetic cluster of agents, job types, and queued jobs.
+    A simulated driver stands in for Mesos: it offers the free resources of each agent every generation and finishes
+    each launched task after a simulated number of generations, sending the same task updates that Mesos would. The
+    synthetic jobs are created in the database, so a simulation should only be run against a throwaway database.
+    """
+
+    def __init__(self, agent_count, job_type_count, job_count, agent_resources, max_job_generations=10,
+                 max_generations=1000, pipeline_commits=False, seed=None):
+        """Constructor
+
+        :param agent_count: The number of agents in the cluster
+        :type agent_count: int
+        :param job_type_count: The number of job types
+        :type job_type_count: int
+        :param job_count: The number of jobs to queue
+        :type job_count: int
+        :param agent_resources: The total resources of each agent
+        :type agent_resources: :class:`node.resources.node_resources.NodeResources`
+        :param max_job_generations: The maximum number of generations that the main task of a job runs
+        :type max_job_generations: int
+        :param max_generations: The maximum number of scheduling generations to run
+        :type max_generations: int
+        :param pipeline_commits: Whether the scheduling manager pipelines its database commits
+        :type pipeline_commits: bool
+        :param seed: The seed for generating the synthetic job types and jobs
+        :type seed: int
+        """
+
+        self._agent_count = agent_count
+        self._agent_resources = agent_resources
+        self._job_count = job_count
+        self._job_type_count = job_type_count
+        self._max_generations = max_generations
+        self._max_job_generations = max_job_generations
+        self._pipeline_commits = pipeline_commits
+        self._random = random.Random(seed)
+
+        self._driver = SimulatedDriver(FRAMEWORK_ID)
+        self._job_type_durations = {}  # {Job type ID: Number of generations the main task runs}
+        self._jobs_completed = 0
+        self._task_finish_generations = {}  # {Task ID: Generation when the task finishes}
+
+    def run(self):
+        """Runs the simulation until every queued job has completed or the maximum number of generations is reached
+
+        :returns: The results of the simulation
+        :rtype: dict
+        """
+
+        self._prepare_cluster()
+        scheduling_manager = SchedulingManager(pipeline_commits=self._pipeline_commits)
+
+        cpu_utilization = []
+        mem_utilization = []
+        loop_histogram = Histogram()
+        queue_drained_generation = None
+        generation = 0
+        # The manager's commit worker thread and its database connection must not outlive the simulation
+        try:
+            while generation < self._max_generations and self._jobs_completed < self._job_count:
+                when = now()
+                if generation % SYNC_GENERATIONS == 0:
+                    self._sync_with_database()
+                self._finish_tasks(generation, when)
+                resource_mgr.add_new_offers(self._driver.create_offers(when))
+
+                started = now()
+                scheduling_manager.perform_scheduling(self._driver, when)
+                loop_histogram.record((now() - started).total_seconds())
+
+                self._start_launched_tasks(generation, now())
+                if queue_drained_generation is None:
+                    if Queue.objects.exists():
+                        total_resources, used_resources = self._driver.get_resource_totals()
+                        cpu_utilization.append(used_resources.cpus / total_resources.cpus)
+                        mem_utilization.append(used_resources.mem / total_resources.mem)
+                    else:
+                        queue_drained_generation = generation
+                generation += 1
+        finally:
+            scheduling_manager.shutdown()
+
+        jobs_scheduled = self._job_count - Queue.objects.count()
+        scheduling_secs = loop_histogram.total
+        status_dict = {}
+        scheduling_metrics.generate_status_json(status_dict)
+
+        return {'agents': self._agent_count, 'job_types': self._job_type_count, 'jobs': self._job_count,
+                'generations': generation, 'jobs_scheduled': jobs_scheduled, 'jobs_completed': self._jobs_completed,
+                'queue_drained_generation': queue_drained_generation,
+                'scheduling_secs': round(scheduling_secs, 3),
+                'jobs_per_sec': round(jobs_scheduled / scheduling_secs, 1) if scheduling_secs else None,
+                'loop_ms': loop_histogram.get_summary(scale=1000.0),
+                'phases_ms': status_dict['scheduling']['phases_ms'],
+                'cpu_utilization': SchedulingSimulation._get_mean(cpu_utilization),
+                'mem_utilization': SchedulingSimulation._get_mean(mem_utilization)}
+
+    def _create_job_types(self):
+        """Creates the synthetic job types with random resource requirements and durations
+
+        :returns: The list of job type models
+        :rtype: list
+        """
+
+        cpus_choices = [cpus for cpus in JOB_TYPE_CPUS if cpus <= self._agent_resources.cpus] or [JOB_TYPE_CPUS[0]]
+        mem_choices = [mem for mem in JOB_TYPE_MEM if mem <= self._agent_resources.mem] or [JOB_TYPE_MEM[0]]
+        interface = {'version': '1.4', 'command': 'simulated_cmd', 'command_arguments': '', 'env_vars': [],
+                     'mounts': [], 'settings': [], 'input_data': [], 'output_data': [], 'shared_resources': []}
+
+        job_types = []
+        for i in range(self._job_type_count):
+            job_type = JobType.objects.create(name='simulated-job-type-%d' % (i + 1), version='1.0.0',
+                                              title='Simulated Job Type %d' % (i + 1), docker_image='scale-simulated',
+                                              manifest=interface, priority=self._random.choice(JOB_TYPE_PRIORITIES),
+                                              cpus_required=self._random.choice(cpus_choices),
+                                              mem_const_required=self._random.choice(mem_choices),
+                                              disk_out_const_required=64.0,
+                                              error_mapping={'version': '1.0', 'exit_codes': {}},
+                                              configuration={'version': '1.0', 'default_settings': {}})
+            JobTypeRevision.objects.create_job_type_revision(job_type)
+            self._job_type_durations[job_type.id] = self._random.randint(1, self._max_job_generations)
+            job_types.append(job_type)
+        return job_types
+
+    def _finish_tasks(self, generation, when):
+        """Finishes every launched task whose simulated duration has passed
+
+        :param generation: The current generation
+        :type generation: int
+        :param when: The current time
+        :type when: :class:`datetime.datetime`
+        """
+
+        for task_id, finish_generation in list(self._task_finish_generations.items()):
+            if finish_generation <= generation:
+                del self._task_finish_generations[task_id]
+                self._send_task_update(task_id, 'TASK_FINISHED', when)
+                self._driver.finish_task(task_id)
+
+    @staticmethod
+    def _get_mean(values):
+        """Returns the mean of the given values rounded to three digits, possibly None
+
+        :param values: The values
+        :type values: list
+        :returns: The mean
+        :rtype: float
+        """
+
+        return round(sum(values) / len(values), 3) if values else None
+
+    def _get_task_duration(self, task_id):
+        """Returns the number of generations that the launched task with the given ID runs
+
+        :param task_id: The ID of the task
+        :type task_id: string
+        :returns: The number of generations
+        :rtype: int
+        """
+
+        task = task_mgr.get_task(task_id)
+        if task and task.task_type == 'main':
+            job_exe = job_exe_mgr.get_running_job_exe(JobExecution.parse_cluster_id(task_id))
+            if job_exe:
+                return self._job_type_durations.get(job_exe.job_type_id, 1)
+        return 1
+
+    def _prepare_cluster(self):
+        """Resets the scheduler state and creates the synthetic agents, job types, and queued jobs
+        """
+
+        Scheduler.objects.initialize_scheduler()
+        Scheduler.objects.update(num_message_handlers=0)  # Message handlers would never finish in a simulation
+
+        job_exe_mgr.clear()
+        node_mgr.clear()
+        resource_mgr.clear()
+        scheduling_metrics.clear()
+        task_mgr.clear()
+        scheduler_mgr.sync_with_database()
+        scheduler_mgr.update_from_mesos(framework_id=FRAMEWORK_ID)
+
+        agents = []
+        for i in range(self._agent_count):
+            agent = Agent('simulated-agent-%d' % (i + 1), 'simulated-host-%d' % (i + 1))
+            self._driver.add_agent(agent.agent_id, self._agent_resources)
+            agents.append(agent)
+        node_mgr.register_agents(agents)
+
+        self._queue_jobs(self._create_job_types())
+
+    def _queue_jobs(self, job_types):
+        """Creates and queues the synthetic jobs, choosing a random job type for each
+
+        :param job_types: The list of job type models
+        :type job_types: list
+        """
+
+        event = TriggerEvent.objects.create_trigger_event('SIMULATION', None, {}, now())
+        job_input = {'version': '1.0', 'input_data': [], 'output_data': []}
+
+        queued_count = 0
+        while queued_count < self._job_count:
+            batch_size = min(QUEUE_BATCH_SIZE, self._job_count - queued_count)
+            with transaction.atomic():
+                jobs = []
+                for _ in range(batch_size):
+                    job = Job.objects.create_job(self._random.choice(job_types), event.id)
+                    job.input = job_input
+                    job.input_file_size = 0.0
+                    jobs.append(job)
+                Job.objects.bulk_create(jobs)
+                Queue.objects.queue_jobs(jobs)
+            queued_count += batch_size
+
+    def _send_task_update(self, task_id, status, when):
+        """Sends a task update to the scheduler's managers the same way that the scheduler handles an update from Mesos
+
+        :param task_id: The ID of the task
+        :type task_id: string
+        :param status: The Mesos task status
+        :type status: string
+        :param when: The time of the update
+        :type when: :class:`datetime.datetime`
+        """
+
+        model = TaskUpdate(task_id=task_id, status=status, timestamp=when)
+        task_update = TaskStatusUpdate(model, self._driver.get_task_agent_id(task_id), {})
+
+        task_mgr.handle_task_update(task_update)
+        if task_id.startswith(JOB_TASK_ID_PREFIX):
+            job_exe = job_exe_mgr.handle_task_update(task_update)
+            if job_exe and job_exe.is_finished():
+                self._jobs_completed += 1
+                cleanup_mgr.add_job_execution(job_exe)
+        else:
+            node_mgr.handle_task_update(task_update)
+            system_task_mgr.handle_task_update(task_update)
+
+    def _start_launched_tasks(self, generation, when):
+        """Starts running the tasks launched in the current generation and determines when each will finish
+
+        :param generation: The current generation
+        :type generation: int
+        :param when: The current time
+        :type when: :class:`datetime.datetime`
+        """
+
+        for task_id in self._driver.pop_launched_task_ids():
+            self._task_finish_generations[task_id] = generation + self._get_task_duration(task_id)
+            self._send_task_update(task_id, 'TASK_RUNNING', when)
+
+    def _sync_with_database(self):
+        """Performs the same sync with the database as the scheduler's background sync thread
+        """
+
+        scheduler_mgr.sync_with_database()
+        job_type_mgr.sync_with_database()
+        workspace_mgr.sync_with_database()
+        node_mgr.sync_with_database(scheduler_mgr.config)
+        cleanup_mgr.update_nodes(node_mgr.get_nodes())
@@ -4,6 +4,7 @@ from __future__ import unicode_literals
 import threading
 
 from job.models import JobType
+from node.resources.requirements import ResourceRequirements
 
 
 # TODO: when we calculate duration averages for job types, create a new job type class that contains model, resources,
@@ -15,7 +16,7 @@ class JobTypeManager(object):
         """Constructor
         """
 
-        self._job_type_resources = []
+        self._job_type_resources = ResourceRequirements()
         self._job_types = {}  # {Job Type ID: Job Type}
         self._lock = threading.Lock()
 
@@ -50,14 +51,15 @@ class JobTypeManager(object):
             return None
 
     def get_job_type_resources(self):
-        """Returns a list of all of the job type resource requirements
+        """Returns all of the job type resource requirements, compiled for efficiently counting the job types that fit
+        within a set of resources
 
-        :returns: The list of all of the job type resource requirements
-        :rtype: list
+        :returns: All of the job type resource requirements
+        :rtype: :class:`node.resources.requirements.ResourceRequirements`
         """
 
         with self._lock:
-            return list(self._job_type_resources)
+            return self._job_type_resources
 
     def get_job_types(self):
         """Returns a dict of all job types, stored by ID
@@ -78,6 +80,7 @@ class JobTypeManager(object):
         for job_type in JobType.objects.all().iterator():
             updated_job_types[job_type.id] = job_type
             update_job_type_resources.append(job_type.get_resources())
+        update_job_type_resources = ResourceRequirements(update_job_type_resources)
 
         with self._lock:
             self._job_type_resources = update_job_type_resources
@@ -65,4 +65,13 @@ class SystemTask(Task):
         if queue_name:
             messaging_params.append(DockerParameter('env', 'SCALE_QUEUE_NAME=%s' % queue_name))
 
+        handler_workers = getattr(settings, 'MESSAGE_HANDLER_WORKERS', None)
+        if handler_workers:
+            workers = ','.join('%s:%d' % (message_type, count) for message_type, count in handler_workers.items())
+            messaging_params.append(DockerParameter('env', 'SCALE_MESSAGE_HANDLER_WORKERS=%s' % workers))
+        for name in ('MESSAGE_HANDLER_BATCH_SIZE', 'MESSAGE_HANDLER_COALESCE_FACTOR'):
+            value = getattr(settings, name, None)
+            if value is not None:
+                messaging_params.append(DockerParameter('env', 'SCALE_%s=%d' % (name, value)))
+
         self._docker_params.extend(messaging_params)
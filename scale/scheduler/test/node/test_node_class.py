@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import datetime
 
 import django
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 from mock import patch
 
@@ -61,6 +61,21 @@ class TestNode(TestCase):
                                            'last_updated': datetime_to_string(right_now)}]}]
         self.assertListEqual(nodes_list, expected_results)
 
+    @override_settings(INPUT_FILE_CACHE_DIR='/scale/cache')
+    def test_generate_status_json_input_file_cache(self):
+        """Tests calling generate_status_json() with the input file cache counts of the node"""
+
+        self.node.input_cache_hits = 2
+        self.node.input_cache_hit_bytes = 200
+        self.node.input_cache_misses = 1
+        self.node.input_cache_miss_bytes = 100
+        node = Node(self.node_agent, self.node, self.scheduler)
+        nodes_list = []
+        node.generate_status_json(nodes_list)
+
+        self.assertDictEqual(nodes_list[0]['input_file_cache'],
+                             {'hits': 2, 'hit_bytes': 200, 'misses': 1, 'miss_bytes': 100})
+
     def test_handle_failed_cleanup_task(self):
         """Tests handling failed cleanup task"""
 
@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import django
+from django.db import connections
+from django.db.utils import DatabaseError
 from django.test import TestCase
 from django.utils.timezone import now
 from mock import MagicMock, patch
@@ -115,6 +117,201 @@ class TestSchedulingManager(TestCase):
         for mesos_task in mesos_tasks:
             self.assertEqual(self.agent_3.agent_id, mesos_task.slave_id.value)
 
+    @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
+    def test_queue_changes_between_generations(self, mock_taskinfo):
+        """Tests calling perform_scheduling() when the queue changes after the queue index has been synced"""
+        mock_taskinfo.return_value = MagicMock()
+
+        scheduling_manager = SchedulingManager()
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)  # No offers yet
+
+        queue_3 = queue_test_utils.create_queue()
+        self.queue_1.is_canceled = True
+        self.queue_1.save()
+        job_type_mgr.sync_with_database()
+        offer = ResourceOffer('offer', self.agent_2.agent_id, self.framework_id,
+                              NodeResources([Cpus(25.0), Mem(2048.0), Disk(2048.0)]), now())
+        resource_mgr.add_new_offers([offer])
+
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 2)  # Scheduled both non-canceled queued job executions
+        self.assertEqual(JobExecution.objects.filter(job_id=queue_3.job_id).count(), 1)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id, queue_3.id]).count(), 0)
+        self.assertEqual(scheduling_manager._queue_index.count, 0)
+
+    def _run_commits_inline(self, scheduling_manager):
+        """Makes the given scheduling manager perform its pipelined commits synchronously on the test thread"""
+
+        def apply_async(func, args):
+            result = MagicMock()
+            result.ready.return_value = True
+            try:
+                result.get.return_value = func(*args)
+            except Exception as ex:
+                result.get.side_effect = ex
+            return result
+
+        scheduling_manager._commit_pool = MagicMock()
+        scheduling_manager._commit_pool.apply_async.side_effect = apply_async
+
+    @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
+    def test_pipelined_commits(self, mock_taskinfo):
+        """Tests calling perform_scheduling() when commits are pipelined, so new job executions are launched in the
+        following generation
+        """
+        mock_taskinfo.return_value = MagicMock()
+
+        offer_1 = ResourceOffer('offer_1', self.agent_1.agent_id, self.framework_id,
+                                NodeResources([Cpus(2.0), Mem(1024.0), Disk(1024.0)]), now())
+        offer_2 = ResourceOffer('offer_2', self.agent_2.agent_id, self.framework_id,
+                                NodeResources([Cpus(25.0), Mem(2048.0), Disk(2048.0)]), now())
+        resource_mgr.add_new_offers([offer_1, offer_2])
+
+        scheduling_manager = SchedulingManager(pipeline_commits=True)
+        self._run_commits_inline(scheduling_manager)
+
+        # First generation places and commits both queued job executions, but holds the offers
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(JobExecution.objects.filter(job_id=self.queue_1.job_id).count(), 1)
+        self.assertEqual(JobExecution.objects.filter(job_id=self.queue_2.job_id).count(), 1)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id]).count(), 0)
+
+        # Second generation launches the first tasks of the committed job executions
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 2)
+        self.assertEqual(len(job_exe_mgr.get_running_job_exes()), 2)
+
+    @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
+    def test_pipelined_commit_failure(self, mock_taskinfo):
+        """Tests calling perform_scheduling() when a pipelined commit fails, so the job executions are scheduled again
+        """
+        mock_taskinfo.return_value = MagicMock()
+
+        offer = ResourceOffer('offer', self.agent_2.agent_id, self.framework_id,
+                              NodeResources([Cpus(25.0), Mem(2048.0), Disk(2048.0)]), now())
+        resource_mgr.add_new_offers([offer])
+
+        scheduling_manager = SchedulingManager(pipeline_commits=True)
+        self._run_commits_inline(scheduling_manager)
+
+        with patch('scheduler.scheduling.manager.JobExecution.objects.bulk_create') as mock_bulk_create:
+            mock_bulk_create.side_effect = DatabaseError()
+            num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id]).count(), 2)
+
+        # Failed commit is discovered, placements are made again and committed
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(scheduling_manager._queue_index.count, 2)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id]).count(), 0)
+
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 2)
+        self.assertEqual(scheduling_manager._queue_index.count, 0)
+
+    @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
+    def test_pipelined_commit_in_progress(self, mock_taskinfo):
+        """Tests calling perform_scheduling() while a pipelined commit is still in progress, so scheduling does not
+        wait for it and does not schedule its job executions again
+        """
+        mock_taskinfo.return_value = MagicMock()
+
+        offer = ResourceOffer('offer', self.agent_2.agent_id, self.framework_id,
+                              NodeResources([Cpus(25.0), Mem(2048.0), Disk(2048.0)]), now())
+        resource_mgr.add_new_offers([offer])
+
+        scheduling_manager = SchedulingManager(pipeline_commits=True)
+        results = []
+
+        def apply_async(func, args):
+            result = MagicMock()
+            result.ready.return_value = False
+            result.get.return_value = func(*args)
+            results.append(result)
+            return result
+
+        scheduling_manager._commit_pool = MagicMock()
+        scheduling_manager._commit_pool.apply_async.side_effect = apply_async
+
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(len(results), 1)
+
+        # Commit has not finished, so its job executions are neither launched nor committed again
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(len(results), 1)
+        results[0].get.assert_not_called()
+        self.assertEqual(scheduling_manager._queue_index.count, 2)
+
+        # Commit has finished, so its job executions are launched
+        results[0].ready.return_value = True
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 2)
+        self.assertEqual(scheduling_manager._queue_index.count, 0)
+        self.assertEqual(len(job_exe_mgr.get_running_job_exes()), 2)
+
+    @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
+    def test_pipelined_commit_holds_resources(self, mock_taskinfo):
+        """Tests calling perform_scheduling() while a pipelined commit is still in progress, so the resources of its
+        job executions are not used to place other queued job executions
+        """
+        mock_taskinfo.return_value = MagicMock()
+
+        # Either queued job execution fits on the offer, but not both
+        offer = ResourceOffer('offer', self.agent_2.agent_id, self.framework_id,
+                              NodeResources([Cpus(8.5), Mem(2048.0), Disk(2048.0)]), now())
+        resource_mgr.add_new_offers([offer])
+
+        scheduling_manager = SchedulingManager(pipeline_commits=True)
+        results = []
+
+        def apply_async(func, args):
+            result = MagicMock()
+            result.ready.return_value = False
+            result.get.return_value = func(*args)
+            results.append(result)
+            return result
+
+        scheduling_manager._commit_pool = MagicMock()
+        scheduling_manager._commit_pool.apply_async.side_effect = apply_async
+
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id]).count(), 1)
+
+        # The other queued job execution competes for the same offer while the commit is in progress
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 0)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(Queue.objects.filter(id__in=[self.queue_1.id, self.queue_2.id]).count(), 1)
+
+        # Commit has finished, so its job execution launches on the resources that were held for it
+        results[0].ready.return_value = True
+        num_tasks = scheduling_manager.perform_scheduling(self._driver, now())
+        self.assertEqual(num_tasks, 1)
+        self.assertEqual(len(job_exe_mgr.get_running_job_exes()), 1)
+
+    def test_shutdown(self):
+        """Tests calling shutdown() on a manager that pipelines its commits"""
+
+        scheduling_manager = SchedulingManager(pipeline_commits=True)
+        scheduling_manager._commit_pool.close()
+        scheduling_manager._commit_pool.join()
+        commit_pool = MagicMock()
+        scheduling_manager._commit_pool = commit_pool
+
+        scheduling_manager.shutdown()
+
+        commit_pool.apply.assert_called_once_with(connections.close_all)
+        commit_pool.close.assert_called_once_with()
+        commit_pool.join.assert_called_once_with()
+        self.assertIsNone(scheduling_manager._commit_pool)
+
     @patch('mesos_api.tasks.mesos_pb2.TaskInfo')
     def test_paused_scheduler(self, mock_taskinfo):
         """Tests calling perform_scheduling() with a paused scheduler"""
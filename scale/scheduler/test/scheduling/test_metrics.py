@@ -0,0 +1,47 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import datetime
+
+import django
+from django.test import TestCase
+
+from scheduler.scheduling.metrics import SchedulingMetrics
+
+
+class TestSchedulingMetrics(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+    def test_generate_status_json(self):
+        """Tests calling generate_status_json() successfully"""
+
+        metrics = SchedulingMetrics()
+        for milliseconds in range(1, 101):
+            metrics.record_phase('process_queue', datetime.timedelta(milliseconds=milliseconds))
+        with metrics.time_phase('allocate_offers'):
+            pass
+        metrics.record_thread_loop('Scheduling', datetime.timedelta(seconds=1))
+        metrics.add_job_counts(20, {'job_type_limit': 5})
+        metrics.add_job_counts(10, {'job_type_limit': 1, 'insufficient_resources': 9})
+
+        status_dict = {}
+        metrics.generate_status_json(status_dict)
+
+        scheduling_dict = status_dict['scheduling']
+        process_queue_dict = scheduling_dict['phases_ms']['process_queue']
+        self.assertEqual(process_queue_dict['count'], 100)
+        self.assertAlmostEqual(process_queue_dict['p50'], 50.0, delta=1.0)
+        self.assertAlmostEqual(process_queue_dict['p99'], 99.0, delta=2.0)
+        self.assertEqual(process_queue_dict['max'], 100.0)
+        self.assertEqual(scheduling_dict['phases_ms']['allocate_offers']['count'], 1)
+        self.assertEqual(scheduling_dict['thread_loops_ms']['Scheduling']['max'], 1000.0)
+        self.assertDictEqual(scheduling_dict['jobs'], {'considered': 30,
+                                                       'skipped': {'job_type_limit': 6, 'insufficient_resources': 9}})
+
+        # Job counts are reset after each status JSON, latency histograms are rolling
+        status_dict = {}
+        metrics.generate_status_json(status_dict)
+        self.assertDictEqual(status_dict['scheduling']['jobs'], {'considered': 0, 'skipped': {}})
+        self.assertEqual(status_dict['scheduling']['phases_ms']['process_queue']['count'], 100)
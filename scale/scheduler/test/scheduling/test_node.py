@@ -483,6 +483,33 @@ class TestSchedulingNode(TestCase):
         self.assertTrue(scheduling_node.allocated_resources.is_equal(NodeResources()))
         self.assertTrue(scheduling_node._remaining_resources.is_equal(offered_resources))
 
+    def test_reserve_committing_job_exes(self):
+        """Tests calling reserve_committing_job_exes() successfully"""
+
+        node = MagicMock()
+        node.hostname = 'host_1'
+        node.id = 1
+        node.is_ready_for_new_job = MagicMock()
+        node.is_ready_for_new_job.return_value = True
+        node.is_ready_for_next_job_task = MagicMock()
+        node.is_ready_for_next_job_task.return_value = True
+        offered_resources = NodeResources([Cpus(10.0), Mem(500.0)])
+        watermark_resources = NodeResources([Cpus(100.0), Mem(500.0)])
+        resource_set = ResourceSet(offered_resources, NodeResources(), watermark_resources)
+        scheduling_node = SchedulingNode('agent_1', node, [], [], resource_set)
+        queue_model_1 = queue_test_utils.create_queue(cpus_required=6.0, mem_required=100.0, disk_in_required=0.0,
+                                                      disk_out_required=0.0, disk_total_required=0.0)
+        job_exe_1 = QueuedJobExecution(queue_model_1)
+        queue_model_2 = queue_test_utils.create_queue(cpus_required=6.0, mem_required=100.0, disk_in_required=0.0,
+                                                      disk_out_required=0.0, disk_total_required=0.0)
+        job_exe_2 = QueuedJobExecution(queue_model_2)
+
+        scheduling_node.reserve_committing_job_exes([job_exe_1])
+
+        # Reserved resources are not allocated, but other job exes can no longer be placed on them
+        self.assertTrue(scheduling_node.allocated_resources.is_equal(NodeResources()))
+        self.assertFalse(scheduling_node.accept_new_job_exe(job_exe_2))
+
     def test_score_job_exe_for_reservation(self):
         """Tests calling score_job_exe_for_reservation() successfully"""
 
@@ -0,0 +1,116 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import random
+
+import django
+from django.test import TestCase
+from mock import MagicMock
+
+from node.resources.node_resources import NodeResources
+from node.resources.resource import Cpus, Disk, Mem
+from scheduler.resources.agent import ResourceSet
+from scheduler.scheduling.node_index import SchedulingNodeIndex
+from scheduler.scheduling.scheduling_node import SchedulingNode
+
+
+class TestSchedulingNodeIndex(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+        self.job_type_resources = [NodeResources([Cpus(1.0), Mem(64.0)]), NodeResources([Cpus(4.0), Mem(1024.0)]),
+                                   NodeResources([Cpus(16.0), Mem(4096.0), Disk(100.0)])]
+
+    def _create_node(self, node_id, cpus, mem, disk=1000.0):
+        """Creates a scheduling node with the given offered resources"""
+
+        node = MagicMock()
+        node.hostname = 'host_%d' % node_id
+        node.id = node_id
+        node.is_ready_for_new_job = MagicMock()
+        node.is_ready_for_new_job.return_value = True
+        node.is_ready_for_next_job_task = MagicMock()
+        node.is_ready_for_next_job_task.return_value = True
+        offered_resources = NodeResources([Cpus(cpus), Mem(mem), Disk(disk)])
+        watermark_resources = NodeResources([Cpus(cpus), Mem(mem), Disk(disk)])
+        resource_set = ResourceSet(offered_resources, NodeResources(), watermark_resources)
+        return SchedulingNode('agent_%d' % node_id, node, [], [], resource_set)
+
+    def _create_job_exe(self, cpus, mem):
+        """Creates a queued job execution mock requiring the given resources"""
+
+        job_exe = MagicMock()
+        job_exe.required_resources = NodeResources([Cpus(cpus), Mem(mem)])
+        return job_exe
+
+    def _get_best_node_by_scanning(self, nodes, resources):
+        """Returns the best node by scoring every node in order, the same way the scheduler did without an index"""
+
+        best_node = None
+        best_score = None
+        for node in nodes.values():
+            score = node.score_resources_for_scheduling(resources, self.job_type_resources)
+            if score is not None and (best_node is None or score < best_score):
+                best_node = node
+                best_score = score
+        return best_node
+
+    def test_get_best_node(self):
+        """Tests calling get_best_node() successfully"""
+
+        node_1 = self._create_node(1, 32.0, 8192.0)
+        node_2 = self._create_node(2, 2.0, 128.0)
+        node_3 = self._create_node(3, 8.0, 2048.0)
+        nodes = {node_1.node_id: node_1, node_2.node_id: node_2, node_3.node_id: node_3}
+        index = SchedulingNodeIndex(nodes, self.job_type_resources)
+
+        # Smallest node leaves the fewest job types able to fit
+        self.assertEqual(index.get_best_node(NodeResources([Cpus(1.0), Mem(64.0)])), node_2)
+        self.assertEqual(index.get_best_node(NodeResources([Cpus(6.0), Mem(1024.0)])), node_3)
+        self.assertIsNone(index.get_best_node(NodeResources([Cpus(64.0), Mem(64.0)])))
+
+    def test_update_and_remove(self):
+        """Tests that get_best_node() reflects updated and removed nodes"""
+
+        node_1 = self._create_node(1, 32.0, 8192.0)
+        node_2 = self._create_node(2, 2.0, 128.0)
+        nodes = {node_1.node_id: node_1, node_2.node_id: node_2}
+        index = SchedulingNodeIndex(nodes, self.job_type_resources)
+        resources = NodeResources([Cpus(2.0), Mem(128.0)])
+
+        self.assertEqual(index.get_best_node(resources), node_2)
+
+        # Fill up node 2, so only node 1 can fit
+        self.assertTrue(node_2.accept_new_job_exe(self._create_job_exe(2.0, 128.0)))
+        index.update(node_2.node_id)
+        self.assertEqual(index.get_best_node(resources), node_1)
+
+        index.remove(node_1.node_id)
+        self.assertIsNone(index.get_best_node(resources))
+
+    def test_same_placements_as_scanning(self):
+        """Tests that the index places job executions on the same nodes as scoring every node"""
+
+        rand = random.Random(1234)
+        sizes = [(1.0, 64.0), (2.0, 512.0), (4.0, 1024.0), (8.0, 4096.0)]
+        indexed_nodes = {}
+        scanned_nodes = {}
+        for node_id in range(1, 51):
+            cpus = rand.choice([4.0, 8.0, 16.0, 32.0])
+            mem = rand.choice([2048.0, 8192.0, 16384.0])
+            indexed_nodes[node_id] = self._create_node(node_id, cpus, mem)
+            scanned_nodes[node_id] = self._create_node(node_id, cpus, mem)
+        index = SchedulingNodeIndex(indexed_nodes, self.job_type_resources)
+
+        for _ in range(300):
+            cpus, mem = rand.choice(sizes)
+            indexed_node = index.get_best_node(NodeResources([Cpus(cpus), Mem(mem)]))
+            scanned_node = self._get_best_node_by_scanning(scanned_nodes, NodeResources([Cpus(cpus), Mem(mem)]))
+            if scanned_node is None:
+                self.assertIsNone(indexed_node)
+                continue
+            self.assertEqual(indexed_node.node_id, scanned_node.node_id)
+            indexed_node.accept_new_job_exe(self._create_job_exe(cpus, mem))
+            index.update(indexed_node.node_id)
+            scanned_node.accept_new_job_exe(self._create_job_exe(cpus, mem))
@@ -0,0 +1,122 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import datetime
+
+import django
+from django.test import TestCase
+from django.utils.timezone import now
+
+from job.test import utils as job_test_utils
+from queue.models import Queue, QUEUE_ORDER_FIFO, QUEUE_ORDER_LIFO
+from queue.test import utils as queue_test_utils
+from scheduler.scheduling.queue_index import QueueIndex, RECONCILIATION_PERIOD
+
+
+class TestQueueIndex(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+        self.job_type_1 = job_test_utils.create_job_type()
+        self.job_type_2 = job_test_utils.create_job_type()
+        when = now()
+        self.queue_1 = queue_test_utils.create_queue(job_type=self.job_type_1, priority=100,
+                                                     queued=when - datetime.timedelta(minutes=3))
+        self.queue_2 = queue_test_utils.create_queue(job_type=self.job_type_2, priority=100,
+                                                     queued=when - datetime.timedelta(minutes=2))
+        self.queue_3 = queue_test_utils.create_queue(job_type=self.job_type_1, priority=1,
+                                                     queued=when - datetime.timedelta(minutes=1))
+
+    def test_get_queue_fifo(self):
+        """Tests calling get_queue() in FIFO mode"""
+
+        index = QueueIndex()
+        index.sync_with_database(now())
+
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO)]
+        self.assertListEqual(queue_ids, [self.queue_3.id, self.queue_1.id, self.queue_2.id])
+
+    def test_get_queue_lifo(self):
+        """Tests calling get_queue() in LIFO mode, including switching from FIFO"""
+
+        index = QueueIndex()
+        index.sync_with_database(now())
+        index.get_queue(QUEUE_ORDER_FIFO)
+
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_LIFO)]
+        self.assertListEqual(queue_ids, [self.queue_3.id, self.queue_2.id, self.queue_1.id])
+
+    def test_get_queue_ignore_and_limit(self):
+        """Tests calling get_queue() with ignored job types and a limit"""
+
+        index = QueueIndex()
+        index.sync_with_database(now())
+
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO, {self.job_type_1.id})]
+        self.assertListEqual(queue_ids, [self.queue_2.id])
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO, limit=2)]
+        self.assertListEqual(queue_ids, [self.queue_3.id, self.queue_1.id])
+
+    def test_get_queue_ignore_queue_ids(self):
+        """Tests calling get_queue() with ignored queue IDs, which do not count against the limit"""
+
+        index = QueueIndex()
+        index.sync_with_database(now())
+
+        job_exes = index.get_queue(QUEUE_ORDER_FIFO, limit=2, ignore_queue_ids={self.queue_3.id})
+        queue_ids = [job_exe.id for job_exe in job_exes]
+        self.assertListEqual(queue_ids, [self.queue_1.id, self.queue_2.id])
+        self.assertEqual(index.count, 3)
+
+    def test_incremental_sync(self):
+        """Tests that sync_with_database() loads new queue models, applies cancellations, and keeps parsed queued job
+        executions
+        """
+
+        index = QueueIndex()
+        when = now()
+        index.sync_with_database(when)
+        job_exe_1 = index.get_queue(QUEUE_ORDER_FIFO)[1]
+
+        queue_4 = queue_test_utils.create_queue(job_type=self.job_type_2, priority=50)
+        Queue.objects.cancel_queued_jobs([self.queue_1.job_id])
+        index.sync_with_database(when)
+
+        job_exes = index.get_queue(QUEUE_ORDER_FIFO)
+        self.assertListEqual([job_exe.id for job_exe in job_exes],
+                             [self.queue_3.id, queue_4.id, self.queue_1.id, self.queue_2.id])
+        self.assertIs(job_exes[2], job_exe_1)
+        self.assertTrue(job_exe_1.is_canceled)
+        self.assertFalse(job_exes[1].is_canceled)
+
+    def test_remove(self):
+        """Tests calling remove()"""
+
+        index = QueueIndex()
+        index.sync_with_database(now())
+
+        index.remove([self.queue_1.id, self.queue_3.id, 999999])
+
+        self.assertEqual(index.count, 1)
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO)]
+        self.assertListEqual(queue_ids, [self.queue_2.id])
+
+    def test_reconciliation(self):
+        """Tests that sync_with_database() periodically picks up missed queue models and drops deleted ones"""
+
+        index = QueueIndex()
+        when = now()
+        index.sync_with_database(when)
+
+        # Simulate a model committed below the high-water mark and a model deleted outside of scheduling
+        index.remove([self.queue_1.id])
+        Queue.objects.filter(id=self.queue_2.id).delete()
+
+        index.sync_with_database(when)
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO)]
+        self.assertListEqual(queue_ids, [self.queue_3.id, self.queue_2.id])
+
+        index.sync_with_database(when + RECONCILIATION_PERIOD)
+        queue_ids = [job_exe.id for job_exe in index.get_queue(QUEUE_ORDER_FIFO)]
+        self.assertListEqual(queue_ids, [self.queue_3.id, self.queue_1.id])
@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import django
+from django.test import TestCase
+from django.utils.timezone import now
+from mock import MagicMock
+
+from node.resources.node_resources import NodeResources
+from node.resources.resource import Cpus, Disk, Mem
+from scheduler.simulation.driver import SimulatedDriver
+
+
+class TestSimulatedDriver(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+        self.driver = SimulatedDriver('framework_1')
+        self.driver.add_agent('agent_1', NodeResources([Cpus(10.0), Mem(1024.0), Disk(1024.0)]))
+        self.driver.add_agent('agent_2', NodeResources([Cpus(5.0), Mem(512.0), Disk(512.0)]))
+
+    def _create_mesos_task(self, task_id, agent_id, cpus, mem):
+        """Creates a Mesos task mock using the given resources"""
+
+        cpus_resource = MagicMock()
+        cpus_resource.name = 'cpus'
+        cpus_resource.scalar.value = cpus
+        mem_resource = MagicMock()
+        mem_resource.name = 'mem'
+        mem_resource.scalar.value = mem
+        mesos_task = MagicMock()
+        mesos_task.task_id.value = task_id
+        mesos_task.slave_id.value = agent_id
+        mesos_task.resources = [cpus_resource, mem_resource]
+        return mesos_task
+
+    def test_launch_and_finish_tasks(self):
+        """Tests that launched tasks hold their resources until they are finished"""
+
+        offers = {offer.agent_id: offer for offer in self.driver.create_offers(now())}
+        self.assertEqual(len(offers), 2)
+        self.assertEqual(offers['agent_1'].resources.cpus, 10.0)
+        self.assertListEqual(self.driver.create_offers(now()), [])  # All resources are already offered
+
+        offer_id = MagicMock()
+        offer_id.value = offers['agent_1'].id
+        self.driver.launchTasks([offer_id], [self._create_mesos_task('task_1', 'agent_1', 4.0, 256.0)])
+        self.assertListEqual(self.driver.pop_launched_task_ids(), ['task_1'])
+        self.assertListEqual(self.driver.pop_launched_task_ids(), [])
+        self.assertEqual(self.driver.get_task_agent_id('task_1'), 'agent_1')
+
+        # Only the unused resources of the accepted offer are offered again
+        offers = self.driver.create_offers(now())
+        self.assertEqual(len(offers), 1)
+        self.assertEqual(offers[0].resources.cpus, 6.0)
+        self.assertEqual(offers[0].resources.mem, 768.0)
+        total_resources, used_resources = self.driver.get_resource_totals()
+        self.assertEqual(total_resources.cpus, 15.0)
+        self.assertEqual(used_resources.cpus, 4.0)
+
+        self.driver.finish_task('task_1')
+        self.assertIsNone(self.driver.get_task_agent_id('task_1'))
+        offers = self.driver.create_offers(now())
+        self.assertEqual(len(offers), 1)
+        self.assertEqual(offers[0].resources.cpus, 4.0)
+        self.assertEqual(offers[0].resources.mem, 256.0)
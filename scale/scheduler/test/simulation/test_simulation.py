@@ -0,0 +1,46 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import django
+from django.test import TransactionTestCase
+from mock import patch
+
+from node.resources.node_resources import NodeResources
+from node.resources.resource import Cpus, Disk, Mem
+from scheduler.scheduling.manager import SchedulingManager
+from scheduler.simulation.simulation import SchedulingSimulation
+
+
+class TestSchedulingSimulation(TransactionTestCase):
+
+    def setUp(self):
+        django.setup()
+
+        self.agent_resources = NodeResources([Cpus(16.0), Mem(32768.0), Disk(65536.0)])
+
+    def _run_simulation(self, pipeline_commits):
+        """Runs a small simulation and checks that its results are consistent"""
+
+        simulation = SchedulingSimulation(2, 2, 10, self.agent_resources, max_job_generations=2, max_generations=50,
+                                          pipeline_commits=pipeline_commits, seed=1)
+        with patch.object(SchedulingManager, 'shutdown', autospec=True,
+                          side_effect=SchedulingManager.shutdown) as mock_shutdown:
+            results = simulation.run()
+
+        self.assertEqual(mock_shutdown.call_count, 1)
+        self.assertEqual(results['agents'], 2)
+        self.assertEqual(results['jobs'], 10)
+        self.assertLessEqual(results['generations'], 50)
+        self.assertLessEqual(results['jobs_completed'], results['jobs_scheduled'])
+        self.assertLessEqual(results['jobs_scheduled'], 10)
+        return results
+
+    def test_run(self):
+        """Tests running a simulation that commits within each generation"""
+
+        self._run_simulation(False)
+
+    def test_run_pipelined_commits(self):
+        """Tests running a simulation that pipelines its commits, which shuts down the commit worker thread"""
+
+        self._run_simulation(True)
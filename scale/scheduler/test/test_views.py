@@ -12,6 +12,7 @@ from rest_framework import status
 import util.rest as rest_util
 from mesos_api.api import HardwareResources, MesosError, SchedulerInfo
 from scheduler.models import Scheduler
+from scheduler.scheduling.metrics import scheduling_metrics
 from scheduler.threads.scheduler_status import SchedulerStatusThread
 from util.parse import datetime_to_string
 
@@ -265,6 +266,43 @@ class TestStatusView(TestCase):
         self.assertFalse(result['master']['is_online'])
 
 
+class TestSchedulingMetricsView(TestCase):
+
+    def setUp(self):
+        django.setup()
+        Scheduler.objects.create(id=1, master_hostname='master', master_port=5050)
+        scheduling_metrics.clear()
+
+    def test_invalid_version(self):
+        """Tests getting the scheduling metrics with an unsupported REST API version"""
+
+        response = self.client.generic('GET', '/v5/scheduler/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.content)
+
+    def test_empty_dict(self):
+        """Tests getting the scheduling metrics with empty initialization"""
+
+        response = self.client.generic('GET', '/v6/scheduler/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, response.content)
+
+    def test_successful(self):
+        """Tests getting the scheduling metrics successfully"""
+
+        scheduling_metrics.record_phase('process_queue', datetime.timedelta(milliseconds=20))
+        scheduling_metrics.add_job_counts(10, {'job_type_limit': 4})
+        when = now()
+        status_thread = SchedulerStatusThread()
+        status_thread._generate_status_json(when)
+
+        response = self.client.generic('GET', '/v6/scheduler/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        result = json.loads(response.content)
+        self.assertEqual(result['timestamp'], datetime_to_string(when))
+        self.assertEqual(result['phases_ms']['process_queue']['count'], 1)
+        self.assertEqual(result['jobs']['considered'], 10)
+        self.assertEqual(result['jobs']['skipped']['job_type_limit'], 4)
+
+
 class TestVersionView(TestCase):
 
     def setUp(self):
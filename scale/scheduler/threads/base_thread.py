@@ -9,6 +9,7 @@ from abc import ABCMeta
 from django.db.utils import InterfaceError
 from django.utils.timezone import now
 
+from scheduler.scheduling.metrics import scheduling_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,7 @@ class BaseSchedulerThread(object):
                 logger.exception('%s thread had a critical error', self._name)
 
             duration = now() - started
+            scheduling_metrics.record_thread_loop(self._name, duration)
 
             msg = '%s thread loop took %.3f seconds'
             if duration > self._warning_threshold:
@@ -25,7 +25,7 @@ class SchedulingThread(BaseSchedulerThread):
 
         super(SchedulingThread, self).__init__('Scheduling', THROTTLE, WARN_THRESHOLD)
         self._driver = driver
-        self._manager = SchedulingManager()
+        self._manager = SchedulingManager(pipeline_commits=True)
 
     @property
     def driver(self):
@@ -47,6 +47,13 @@ class SchedulingThread(BaseSchedulerThread):
 
         self._driver = value
 
+    def run(self):
+        """See :meth:`scheduler.threads.base_thread.BaseSchedulerThread.run`
+        """
+
+        super(SchedulingThread, self).run()
+        self._manager.shutdown()
+
     def _execute(self):
         """See :meth:`scheduler.threads.base_thread.BaseSchedulerThread._execute`
         """
@@ -11,6 +11,7 @@ from scheduler.manager import scheduler_mgr
 from scheduler.models import Scheduler
 from scheduler.node.manager import node_mgr
 from scheduler.resources.manager import resource_mgr
+from scheduler.scheduling.metrics import scheduling_metrics
 from scheduler.sync.job_type_manager import job_type_mgr
 from scheduler.tasks.manager import system_task_mgr
 from scheduler.threads.base_thread import BaseSchedulerThread
@@ -51,4 +52,5 @@ class SchedulerStatusThread(BaseSchedulerThread):
         job_exe_mgr.generate_status_json(status_dict['nodes'], when)
         task_mgr.generate_status_json(status_dict['nodes'])
         job_type_mgr.generate_status_json(status_dict)
+        scheduling_metrics.generate_status_json(status_dict)
         Scheduler.objects.all().update(status=status_dict)
@@ -7,6 +7,7 @@ import views
 
 urlpatterns = [
     url(r'^scheduler/$', views.SchedulerView.as_view(), name='scheduler_view'),
+    url(r'^scheduler/metrics/$', views.SchedulingMetricsView.as_view(), name='scheduling_metrics_view'),
     url(r'^status/$', views.StatusView.as_view(), name='status_view'),
     url(r'^version/$', views.VersionView.as_view(), name='version_view'),
 ]
@@ -268,6 +268,47 @@ class StatusView(GenericAPIView):
         return Response(status_dict)
 
 
+class SchedulingMetricsView(GenericAPIView):
+    """This view is the endpoint for viewing the scheduling performance metrics"""
+
+    def get(self, request):
+        """Gets the scheduling performance metrics
+
+        :param request: the HTTP GET request
+        :type request: :class:`rest_framework.request.Request`
+        :rtype: :class:`rest_framework.response.Response`
+        :returns: the HTTP response to send back to the user
+        """
+
+        if request.version == 'v6':
+            return self.get_v6(request)
+
+        raise Http404()
+
+    def get_v6(self, request):
+        """The v6 version to get the scheduling performance metrics
+
+        :param request: the HTTP GET request
+        :type request: :class:`rest_framework.request.Request`
+        :rtype: :class:`rest_framework.response.Response`
+        :returns: the HTTP response to send back to the user
+        """
+
+        status_dict = Scheduler.objects.get_master().status
+
+        if not status_dict or 'scheduling' not in status_dict:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        # If status dict has not been updated recently, assume scheduler is down
+        status_timestamp = parse_datetime(status_dict['timestamp'])
+        if (now() - status_timestamp).total_seconds() > StatusView.STATUS_FRESHNESS_THRESHOLD:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        metrics_dict = {'timestamp': status_dict['timestamp']}
+        metrics_dict.update(status_dict['scheduling'])
+        return Response(metrics_dict)
+
+
 class VersionView(GenericAPIView):
     """This view is the endpoint for viewing version/build information"""
 
@@ -11,7 +11,7 @@ from storage.test import utils as storage_utils
 
 def create_source(file_name='my_test_file.txt', file_size=100, media_type='text/plain',
                   file_path='/file/path/my_test_file.txt', data_started=None, data_ended=None, is_parsed=True,
-                  parsed=None, workspace=None, countries=None):
+                  parsed=None, workspace=None, countries=None, checksum=None):
     """Creates a source file model for unit testing
 
     :returns: The source file model
@@ -30,7 +30,8 @@ def create_source(file_name='my_test_file.txt', file_size=100, media_type='text/
     source_file = ScaleFile.objects.create(file_name=file_name, file_type='SOURCE', media_type=media_type,
                                            file_size=file_size, file_path=file_path, data_started=data_started,
                                            data_ended=data_ended, is_parsed=is_parsed, parsed=parsed,
-                                           workspace=workspace, uuid=hashlib.md5(file_name).hexdigest())
+                                           workspace=workspace, uuid=hashlib.md5(file_name).hexdigest(),
+                                           checksum=checksum)
     if countries:
         source_file.countries = countries
         source_file.save()
@@ -7,7 +7,6 @@ from job.configuration.data.job_connection import JobConnection
 from job.data.job_connection import SeedJobConnection
 from job.deprecation import JobConnectionSunset
 from job.seed.manifest import SeedManifest
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 from recipe.configuration.data.recipe_connection import LegacyRecipeConnection
 from recipe.triggers.configuration.trigger_rule import RecipeTriggerRuleConfiguration
@@ -15,6 +14,7 @@ from source.triggers.configuration import parse_trigger_rule_1_0 as previous_par
 from source.triggers.parse_trigger_condition import ParseTriggerCondition
 from storage.models import Workspace
 from trigger.configuration.exceptions import InvalidTriggerRule
+from util.validation import validate_json
 
 
 logger = logging.getLogger(__name__)
@@ -103,7 +103,7 @@ class ParseTriggerRuleConfiguration(RecipeTriggerRuleConfiguration):
         super(ParseTriggerRuleConfiguration, self).__init__(trigger_rule_type, configuration)
 
         try:
-            validate(configuration, PARSE_TRIGGER_SCHEMA)
+            validate_json(configuration, PARSE_TRIGGER_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidTriggerRule(validation_error)
 
@@ -3,7 +3,6 @@ from __future__ import unicode_literals
 
 import logging
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from job.configuration.data.job_connection import JobConnection
@@ -12,6 +11,7 @@ from recipe.triggers.configuration.trigger_rule import RecipeTriggerRuleConfigur
 from source.triggers.parse_trigger_condition import ParseTriggerCondition
 from storage.models import Workspace
 from trigger.configuration.exceptions import InvalidTriggerRule
+from util.validation import validate_json
 
 
 logger = logging.getLogger(__name__)
@@ -86,7 +86,7 @@ class ParseTriggerRuleConfiguration(RecipeTriggerRuleConfiguration):
         super(ParseTriggerRuleConfiguration, self).__init__(trigger_rule_type, configuration)
 
         try:
-            validate(configuration, PARSE_TRIGGER_SCHEMA)
+            validate_json(configuration, PARSE_TRIGGER_SCHEMA)
         except ValidationError as validation_error:
             raise InvalidTriggerRule(validation_error)
 
@@ -1,6 +1,13 @@
 """Defines the base broker class"""
+import sys
 from abc import ABCMeta
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+from six import reraise
+
+from storage.brokers.exceptions import PartialTransfer
+from storage.brokers.metrics import transfer_metrics
 
 """
 FileDownload tuple contains an additional partial flag for defining whether the file
@@ -52,7 +59,7 @@ class Broker(object):
 
         return self._volume
 
-    def delete_files(self, volume_path, files, update_model=True):
+    def delete_files(self, volume_path, files):
         """Deletes the given files.
 
         If this broker uses a container volume, volume_path will contain the absolute local container location where
@@ -61,16 +68,19 @@ class Broker(object):
         given for volume_path.
 
         The files list contains the ScaleFile models representing the files to be deleted. The broker should only delete
-        each file itself and not any parent directories. If the update model flag is set each file model should be
-        updated and saved when a delete is successful, including fields such as is_deleted and deleted.
+        each file itself and not any parent directories. The broker should not update or save the file models, instead
+        it returns the files that were successfully deleted so that the caller can update their models in bulk. If the
+        delete fails after some files were deleted, raise a PartialTransfer exception containing those files.
 
         :param volume_path: Absolute path to the local container location onto which the volume file system was mounted,
             None if this broker does not use a container volume
         :type volume_path: string
         :param files: List of files to delete
         :type files: [:class:`storage.models.ScaleFile`]
-        :param update_model: Flag to determine if ScaleFile model should be updated after delete
-        :type update_model: bool
+        :returns: The list of files that were deleted
+        :rtype: [:class:`storage.models.ScaleFile`]
+
+        :raises :class:`storage.brokers.exceptions.PartialTransfer`: If the delete fails after some files were deleted
         """
 
         raise NotImplementedError
@@ -121,13 +131,16 @@ class Broker(object):
 
         return None
 
-    def list_files(self, volume_path, recursive):
+    def list_files(self, volume_path, recursive, start_after=None):
         """List the files under the given file system paths.
 
         If this broker uses a container volume, volume_path will contain the absolute local container location where
         that volume file system is mounted. If this broker does not use a container volume, None will be given for
         volume_path.
 
+        If start_after is given, listing resumes with the files that follow that path. Brokers that cannot list their
+        files in a stable order ignore start_after and list every file.
+
         Retrieval of objects is provided by the boto3 paginator over 
         list_objects. This allows for simple paging support with unbounded
         object counts. As a result of the time that may be required for the full
@@ -139,6 +152,8 @@ class Broker(object):
         :type volume_path: string
         :param recursive: Flag to indicate whether file searching should be done recursively
         :type recursive: boolean
+        :param start_after: The path of the file after which to start listing, None to list every file
+        :type start_after: string
         :return: Generator of files matching given expression
         :rtype: Generator[:class:`storage.brokers.broker.FileDetails`]
         """
@@ -165,19 +180,24 @@ class Broker(object):
 
         The file_moves list contains named tuples that each contain a ScaleFile model to be moved and the new relative
         file_path field for the new location of the file. The broker is expected to set the file_path field of each
-        ScaleFile model to its new location (which the broker may alter) and is free to alter any additional fields as
-        necessary. The broker is responsible for saving any changes to models when a move is successful The directories
-        in the new file_path may not exist, so it is the responsibility of the broker to create them if necessary.
+        ScaleFile model to its new location (which the broker may alter), but should not save the models. Instead it
+        returns the files that were successfully moved so that the caller can save their new file_path fields in bulk.
+        The directories in the new file_path may not exist, so it is the responsibility of the broker to create them if
+        necessary.
 
-        If a file does not exist in its expected location, raise a MissingFile exception.
+        If a file does not exist in its expected location, raise a MissingFile exception. If the move fails after some
+        files were moved, raise a PartialTransfer exception containing those files instead.
 
         :param volume_path: Absolute path to the local container location onto which the volume file system was mounted,
             None if this broker does not use a container volume
         :type volume_path: string
         :param file_moves: List of files to move
         :type file_moves: [:class:`storage.brokers.broker.FileMove`]
+        :returns: The list of files that were moved
+        :rtype: [:class:`storage.models.ScaleFile`]
 
         :raises :class:`storage.exceptions.MissingFile`: If a file to move does not exist at the expected path
+        :raises :class:`storage.brokers.exceptions.PartialTransfer`: If the move fails after some files were moved
         """
 
         raise NotImplementedError
@@ -194,15 +214,21 @@ class Broker(object):
         local container path where the file currently exists. The broker is free to alter the ScaleFile fields of the
         uploaded files, including the final file_path (the given file_path is a recommendation by Scale that guarantees
         path uniqueness). The ScaleFile models may not have been saved to the database yet and so may not have their id
-        field populated. The broker should perform a model save/update to the database for any files that are
-        successfully uploaded. The directories in the remote file_path may not exist, so it is the responsibility of the
-        broker to create them if necessary.
+        field populated. The broker should not save the models, instead it returns the files that were successfully
+        uploaded so that the caller can save them in bulk. The directories in the remote file_path may not exist, so it
+        is the responsibility of the broker to create them if necessary.
+
+        If the upload fails after some files were uploaded, raise a PartialTransfer exception containing those files.
 
         :param volume_path: Absolute path to the local container location onto which the volume file system was mounted,
             None if this broker does not use a container volume
         :type volume_path: string
         :param file_uploads: List of files to upload
         :type file_uploads: [:class:`storage.brokers.broker.FileUpload`]
+        :returns: The list of files that were uploaded
+        :rtype: [:class:`storage.models.ScaleFile`]
+
+        :raises :class:`storage.brokers.exceptions.PartialTransfer`: If the upload fails after some files were uploaded
         """
 
         raise NotImplementedError
@@ -220,6 +246,59 @@ class Broker(object):
 
         raise NotImplementedError
 
+    def _run_transfers(self, operation, transfer, transfer_args, thread_count, files=None):
+        """Calls the given transfer method once for each of the given argument tuples. Multiple transfers are performed
+        concurrently by a bounded pool of threads. If any transfer fails, the first error is raised once every transfer
+        has finished. If the models of the transferred files are given and some of the transfers succeeded, a
+        PartialTransfer exception containing the files of the successful transfers is raised instead.
+
+        :param operation: The broker operation that the transfers perform
+        :type operation: string
+        :param transfer: The transfer method
+        :type transfer: function
+        :param transfer_args: The arguments for each transfer
+        :type transfer_args: [tuple]
+        :param thread_count: The maximum number of concurrent transfers
+        :type thread_count: int
+        :param files: The model of the file that each transfer handles, possibly None
+        :type files: [:class:`storage.models.ScaleFile`]
+
+        :raises :class:`storage.brokers.exceptions.PartialTransfer`: If the files are given and some, but not all, of
+            the transfers failed
+        """
+
+        completed_files = []
+        error = None
+        if len(transfer_args) <= 1 or thread_count <= 1:
+            try:
+                for i, args in enumerate(transfer_args):
+                    transfer(*args)
+                    if files:
+                        completed_files.append(files[i])
+            except Exception:
+                error = sys.exc_info()
+        else:
+            thread_count = min(thread_count, len(transfer_args))
+            transfer_metrics.record_concurrency(self.broker_type, operation, thread_count)
+            pool = ThreadPool(thread_count)
+            results = [pool.apply_async(transfer, args) for args in transfer_args]
+            pool.close()
+            pool.join()
+
+            for i, result in enumerate(results):
+                try:
+                    result.get()
+                    if files:
+                        completed_files.append(files[i])
+                except Exception:
+                    if not error:
+                        error = sys.exc_info()
+
+        if error:
+            if completed_files:
+                raise PartialTransfer(completed_files, error[1], error[2])
+            reraise(*error)
+
 
 class BrokerVolume(object):
     """Represents the properties of a container volume that must be mounted into the container for a broker to work
@@ -1,5 +1,7 @@
 """Defines the exceptions related to workspace brokers"""
 
+from six import reraise
+
 from storage.configuration.exceptions import InvalidWorkspaceConfiguration
 
 
@@ -8,3 +10,31 @@ class InvalidBrokerConfiguration(InvalidWorkspaceConfiguration):
     """
 
     pass
+
+
+class PartialTransfer(Exception):
+    """Exception indicating that a broker operation failed after it had already handled some of its files. The caller
+    should save the changes to the models of the handled files and then raise the original error with reraise().
+    """
+
+    def __init__(self, files, error, traceback=None):
+        """Constructor
+
+        :param files: The files that were handled before the operation failed
+        :type files: [:class:`storage.models.ScaleFile`]
+        :param error: The error that caused the operation to fail
+        :type error: :class:`Exception`
+        :param traceback: The traceback of the error, possibly None
+        :type traceback: traceback
+        """
+
+        super(PartialTransfer, self).__init__(error)
+        self.files = files
+        self.error = error
+        self.traceback = traceback
+
+    def reraise(self):
+        """Raises the original error that caused the operation to fail
+        """
+
+        reraise(type(self.error), self.error, self.traceback)
@@ -0,0 +1,190 @@
+"""Defines the class that records metrics describing the throughput of broker file transfers"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import threading
+import time
+from functools import wraps
+
+from util.histogram import Histogram
+
+# Broker operations that are recorded
+OPERATION_DELETE = 'delete'
+OPERATION_DOWNLOAD = 'download'
+OPERATION_MOVE = 'move'
+OPERATION_UPLOAD = 'upload'
+
+
+def record_transfer(operation):
+    """Decorates a broker method that performs the given operation on a list of files so that the number of files and
+    bytes, duration, and any failure of each call are recorded in the transfer metrics. The decorated method must take
+    the volume path and the list of files, file downloads, file moves, or file uploads, which may be passed as either
+    positional or keyword arguments.
+
+    :param operation: The operation performed by the method
+    :type operation: string
+    :returns: The decorator
+    :rtype: function
+    """
+
+    def decorator(func):
+        # Name of the argument that takes the list of files, so it can also be passed as a keyword
+        items_arg = func.__code__.co_varnames[2]
+
+        @wraps(func)
+        def wrapper(broker, *args, **kwargs):
+            items = args[1] if len(args) > 1 else kwargs[items_arg]
+            # Files to delete may be named tuples without a size, such as those given to the delete files job
+            files = items if operation == OPERATION_DELETE else [item.file for item in items]
+            file_sizes = [getattr(scale_file, 'file_size', None) or 0 for scale_file in files]
+            started = time.time()
+            failed = True
+            try:
+                result = func(broker, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                transfer_metrics.record_call(broker.broker_type, operation, len(file_sizes), sum(file_sizes),
+                                             time.time() - started, failed)
+        return wrapper
+    return decorator
+
+
+class OperationMetrics(object):
+    """This class records the metrics for one operation of one type of broker. This class is NOT thread-safe.
+    """
+
+    def __init__(self):
+        """Constructor
+        """
+
+        self.byte_count = 0
+        self.call_count = 0
+        self.durations = Histogram()  # Durations of each call in seconds
+        self.error_count = 0
+        self.file_count = 0
+        self.max_concurrency = 1
+        self.retry_count = 0
+
+    def get_summary(self):
+        """Returns a summary dict of these metrics, including the throughput in MiB and files per second of calls
+
+        :returns: The summary dict
+        :rtype: dict
+        """
+
+        seconds = self.durations.total
+        mib_per_sec = round(self.byte_count / 1048576.0 / seconds, 3) if seconds else None
+        files_per_sec = round(self.file_count / seconds, 3) if seconds else None
+        return {'calls': self.call_count, 'errors': self.error_count, 'files': self.file_count,
+                'bytes': self.byte_count, 'seconds': round(seconds, 3), 'retries': self.retry_count,
+                'max_concurrency': self.max_concurrency, 'mib_per_sec': mib_per_sec, 'files_per_sec': files_per_sec,
+                'call_ms': self.durations.get_summary(scale=1000.0)}
+
+
+class TransferMetrics(object):
+    """This class records the number of files and bytes, durations, retries, and concurrency of the calls made to
+    brokers in this process, grouped by broker type and operation. This class is thread-safe.
+    """
+
+    def __init__(self):
+        """Constructor
+        """
+
+        self._lock = threading.Lock()
+        self._operations = {}  # {(Broker type, operation): OperationMetrics}
+
+    def clear(self):
+        """Clears all metrics
+        """
+
+        with self._lock:
+            self._operations = {}
+
+    def get_summary(self):
+        """Returns a summary dict of all metrics, stored by broker type and then by operation
+
+        :returns: The summary dict
+        :rtype: dict
+        """
+
+        summary = {}
+        with self._lock:
+            for (broker_type, operation), metrics in self._operations.items():
+                summary.setdefault(broker_type, {})[operation] = metrics.get_summary()
+        return summary
+
+    def record_call(self, broker_type, operation, file_count, byte_count, duration, failed=False):
+        """Records a call to a broker
+
+        :param broker_type: The broker type
+        :type broker_type: string
+        :param operation: The operation performed by the call
+        :type operation: string
+        :param file_count: The number of files in the call
+        :type file_count: int
+        :param byte_count: The total size in bytes of the files in the call
+        :type byte_count: int
+        :param duration: The duration of the call in seconds
+        :type duration: float
+        :param failed: Whether the call failed
+        :type failed: bool
+        """
+
+        with self._lock:
+            metrics = self._get_operation(broker_type, operation)
+            metrics.call_count += 1
+            metrics.durations.record(duration)
+            if failed:
+                metrics.error_count += 1
+            else:
+                metrics.file_count += file_count
+                metrics.byte_count += byte_count
+
+    def record_concurrency(self, broker_type, operation, concurrency):
+        """Records the number of concurrent transfers used by a broker call
+
+        :param broker_type: The broker type
+        :type broker_type: string
+        :param operation: The operation performed by the call
+        :type operation: string
+        :param concurrency: The number of concurrent transfers
+        :type concurrency: int
+        """
+
+        with self._lock:
+            metrics = self._get_operation(broker_type, operation)
+            metrics.max_concurrency = max(metrics.max_concurrency, concurrency)
+
+    def record_retry(self, broker_type, operation):
+        """Records a retried transfer
+
+        :param broker_type: The broker type
+        :type broker_type: string
+        :param operation: The operation performed by the transfer
+        :type operation: string
+        """
+
+        with self._lock:
+            self._get_operation(broker_type, operation).retry_count += 1
+
+    def _get_operation(self, broker_type, operation):
+        """Returns the metrics for the given broker type and operation, creating them if needed. Caller must have
+        obtained the thread lock.
+
+        :param broker_type: The broker type
+        :type broker_type: string
+        :param operation: The operation
+        :type operation: string
+        :returns: The operation metrics
+        :rtype: :class:`storage.brokers.metrics.OperationMetrics`
+        """
+
+        key = (broker_type, operation)
+        if key not in self._operations:
+            self._operations[key] = OperationMetrics()
+        return self._operations[key]
+
+
+transfer_metrics = TransferMetrics()
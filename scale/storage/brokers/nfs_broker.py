@@ -4,9 +4,14 @@ from __future__ import unicode_literals
 import logging
 import os
 import shutil
+import sys
 
+import storage.settings as settings
 from storage.brokers.broker import Broker, BrokerVolume
-from storage.brokers.exceptions import InvalidBrokerConfiguration
+from storage.brokers.exceptions import InvalidBrokerConfiguration, PartialTransfer
+from storage.brokers.metrics import record_transfer, OPERATION_DELETE, OPERATION_DOWNLOAD, OPERATION_MOVE, \
+    OPERATION_UPLOAD
+from storage.checksum import copy_file
 from storage.exceptions import MissingFile
 from util.command import execute_command_line
 
@@ -24,21 +29,26 @@ class NfsBroker(Broker):
 
         super(NfsBroker, self).__init__('nfs')
 
-    def delete_files(self, volume_path, files, update_model=True):
+    @record_transfer(OPERATION_DELETE)
+    def delete_files(self, volume_path, files):
         """See :meth:`storage.brokers.broker.Broker.delete_files`
         """
 
-        for scale_file in files:
-            path_to_delete = os.path.join(volume_path, scale_file.file_path)
-            if os.path.exists(path_to_delete):
-                logger.info('Deleting %s', path_to_delete)
-                os.remove(path_to_delete)
-
-                if update_model:
-                    # Update model attributes
-                    scale_file.set_deleted()
-                    scale_file.save()
-
+        deleted_files = []
+        try:
+            for scale_file in files:
+                path_to_delete = os.path.join(volume_path, scale_file.file_path)
+                if os.path.exists(path_to_delete):
+                    logger.info('Deleting %s', path_to_delete)
+                    os.remove(path_to_delete)
+                    deleted_files.append(scale_file)
+        except Exception as ex:
+            if deleted_files:
+                raise PartialTransfer(deleted_files, ex, sys.exc_info()[2])
+            raise
+        return deleted_files
+
+    @record_transfer(OPERATION_DOWNLOAD)
     def download_files(self, volume_path, file_downloads):
         """See :meth:`storage.brokers.broker.Broker.download_files`
         """
@@ -69,51 +79,61 @@ class NfsBroker(Broker):
 
         self._volume = BrokerVolume('nfs', config['nfs_path'])
 
+    @record_transfer(OPERATION_MOVE)
     def move_files(self, volume_path, file_moves):
         """See :meth:`storage.brokers.broker.Broker.move_files`
         """
 
-        for file_move in file_moves:
-            full_old_path = os.path.join(volume_path, file_move.file.file_path)
-            full_new_path = os.path.join(volume_path, file_move.new_path)
-            full_new_path_dir = os.path.dirname(full_new_path)
-
-            logger.info('Checking path %s', full_old_path)
-            if not os.path.exists(full_old_path):
-                raise MissingFile(file_move.file.file_name)
-
-            if not os.path.exists(full_new_path_dir):
-                logger.info('Creating %s', full_new_path_dir)
-                os.makedirs(full_new_path_dir, mode=0755)
-
-            logger.info('Moving %s to %s', full_old_path, full_new_path)
-            shutil.move(full_old_path, full_new_path)
-            logger.info('Setting file permissions for %s', full_new_path)
-            os.chmod(full_new_path, 0644)
-
-            # Update model attributes
-            file_move.file.file_path = file_move.new_path
-            file_move.file.save()
-
+        moved_files = []
+        try:
+            for file_move in file_moves:
+                full_old_path = os.path.join(volume_path, file_move.file.file_path)
+                full_new_path = os.path.join(volume_path, file_move.new_path)
+                full_new_path_dir = os.path.dirname(full_new_path)
+
+                logger.info('Checking path %s', full_old_path)
+                if not os.path.exists(full_old_path):
+                    raise MissingFile(file_move.file.file_name)
+
+                if not os.path.exists(full_new_path_dir):
+                    logger.info('Creating %s', full_new_path_dir)
+                    os.makedirs(full_new_path_dir, mode=0755)
+
+                logger.info('Moving %s to %s', full_old_path, full_new_path)
+                shutil.move(full_old_path, full_new_path)
+                logger.info('Setting file permissions for %s', full_new_path)
+                os.chmod(full_new_path, 0644)
+
+                # Update model attributes
+                file_move.file.file_path = file_move.new_path
+                moved_files.append(file_move.file)
+        except Exception as ex:
+            # Return the files that were already moved, so that their new paths are saved
+            if moved_files:
+                raise PartialTransfer(moved_files, ex, sys.exc_info()[2])
+            raise
+        return moved_files
+
+    @record_transfer(OPERATION_UPLOAD)
     def upload_files(self, volume_path, file_uploads):
         """See :meth:`storage.brokers.broker.Broker.upload_files`
         """
 
-        for file_upload in file_uploads:
-            path_to_upload = os.path.join(volume_path, file_upload.file.file_path)
-            path_to_upload_dir = os.path.dirname(path_to_upload)
+        paths_to_upload = [os.path.join(volume_path, file_upload.file.file_path) for file_upload in file_uploads]
 
+        # Create the directories before copying so that concurrent copies never race to create the same directory
+        for path_to_upload_dir in sorted({os.path.dirname(path_to_upload) for path_to_upload in paths_to_upload}):
             if not os.path.exists(path_to_upload_dir):
                 logger.info('Creating %s', path_to_upload_dir)
                 os.makedirs(path_to_upload_dir, mode=0755)
 
-            logger.info('Copying %s to %s', file_upload.local_path, path_to_upload)
-            self._copy_file(file_upload.local_path, path_to_upload)
-            logger.info('Setting file permissions for %s', path_to_upload)
-            os.chmod(path_to_upload, 0644)
-
-            # Create new model
-            file_upload.file.save()
+        uploads = [(file_upload.file, file_upload.local_path, path_to_upload)
+                   for file_upload, path_to_upload in zip(file_uploads, paths_to_upload)]
+        uploaded_files = [file_upload.file for file_upload in file_uploads]
+        # Return the files that were already uploaded if some uploads fail, so that they are saved
+        self._run_transfers(OPERATION_UPLOAD, self._upload_file, uploads, settings.VOLUME_TRANSFER_THREADS,
+                            uploaded_files)
+        return uploaded_files
 
     def validate_configuration(self, config):
         """See :meth:`storage.brokers.broker.Broker.validate_configuration`
@@ -124,12 +144,16 @@ class NfsBroker(Broker):
         return []
 
     def _copy_file(self, src_path, dest_path):
-        """Performs a copy from the src_path to the dest_path
+        """Performs a copy from the src_path to the dest_path, returning the checksum of the file if it was copied
+        locally. A bbcp copy verifies the file itself and does not stream the file through this process, so its checksum
+        is not available.
 
         :param src_path: The absolute path to the source file
         :type src_path: str
         :param dest_path: The absolute path to the destination
         :type dest_path: str
+        :returns: The hex digest checksum of the file, possibly None
+        :rtype: str
         """
 
         if os.path.islink(src_path):
@@ -148,7 +172,7 @@ class NfsBroker(Broker):
                         apply(os.path.join, srv_src_path) if srv_src_path[0] is not None else srv_src_path[1],
                         apply(os.path.join, srv_dest_path) if srv_dest_path[0] is not None else srv_dest_path[1]]
             execute_command_line(cmd_list)
-            return
+            return None
         except OSError as e:
             # errno 2 is No such file or directory..bbcp not installed. We'll be quiet about it but fallback
             if e.errno != 2:
@@ -156,7 +180,7 @@ class NfsBroker(Broker):
         except:
             logger.exception("NFS Broker bbcp copy_file")  # Ignore the error and attempt a regular cp
         logger.info('Fall back to cp for %s', src_path)
-        shutil.copy(src_path, dest_path)
+        return copy_file(src_path, dest_path)
 
     def _get_mount_info(self, *args):
         """Determine what filesystem contains a path and if it's an nfs filesystem return the mount spec and server.
@@ -204,3 +228,20 @@ class NfsBroker(Broker):
             if not found:
                 rval.append((None, pth))
         return rval
+
+    def _upload_file(self, scale_file, local_path, path_to_upload):
+        """Copies the given local file to the given path in the volume and sets its permissions. If the file is copied
+        locally its checksum is computed while it is copied and set on its model.
+
+        :param scale_file: The model associated with the file to upload
+        :type scale_file: :class:`storage.models.ScaleFile`
+        :param local_path: The absolute local path of the file to upload
+        :type local_path: string
+        :param path_to_upload: The absolute path in the volume to upload the file to
+        :type path_to_upload: string
+        """
+
+        logger.info('Copying %s to %s', local_path, path_to_upload)
+        scale_file.checksum = self._copy_file(local_path, path_to_upload)
+        logger.info('Setting file permissions for %s', path_to_upload)
+        os.chmod(path_to_upload, 0644)
@@ -6,16 +6,19 @@ import os
 import ssl
 import time
 
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 
 import storage.settings as settings
 from storage.brokers.broker import Broker, BrokerVolume
-from storage.brokers.exceptions import InvalidBrokerConfiguration
+from storage.brokers.exceptions import InvalidBrokerConfiguration, PartialTransfer
+from storage.brokers.metrics import record_transfer, transfer_metrics, OPERATION_DELETE, OPERATION_DOWNLOAD, \
+    OPERATION_MOVE, OPERATION_UPLOAD
+from storage.checksum import ChecksumReader, ChecksumWriter
 from storage.configuration.workspace_configuration import ValidationWarning
-from storage.exceptions import MissingFile
+from storage.exceptions import ChecksumMismatch, MissingFile
 from util.aws import S3Client, AWSClient
 from util.command import execute_command_line
-from util.exceptions import FileDoesNotExist
 
 logger = logging.getLogger(__name__)
 
@@ -31,25 +34,30 @@ class S3Broker(Broker):
         self._credentials = None
         self._bucket_name = None
         self._region_name = None
+        self._transfer_config = TransferConfig(multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+                                               multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+                                               max_concurrency=settings.S3_MULTIPART_CONCURRENCY)
 
-    def delete_files(self, volume_path, files, update_model=True):
+    @record_transfer(OPERATION_DELETE)
+    def delete_files(self, volume_path, files):
         """See :meth:`storage.brokers.broker.Broker.delete_files`"""
 
         with S3Client(self._credentials, self._region_name) as client:
-            for scale_file in files:
-                s3_object = client.get_object(self._bucket_name, scale_file.file_path)
+            failed_paths = self._delete_objects(client, files)
 
-                self._delete_file(s3_object, scale_file)
-
-                if update_model:
-                    # Update model attributes
-                    scale_file.set_deleted()
-                    scale_file.save()
+        deleted_files = [scale_file for scale_file in files if scale_file.file_path not in failed_paths]
+        if failed_paths:
+            # Return the files that were deleted, so that they are marked as deleted
+            error = Exception('Failed to delete %i file(s) from S3' % len(failed_paths))
+            raise PartialTransfer(deleted_files, error)
+        return deleted_files
 
+    @record_transfer(OPERATION_DOWNLOAD)
     def download_files(self, volume_path, file_downloads):
         """See :meth:`storage.brokers.broker.Broker.download_files`"""
 
         with S3Client(self._credentials, self._region_name) as client:
+            downloads = []
             for file_download in file_downloads:
                 # If file supports partial mount and volume is configured attempt sym-link
                 if file_download.partial and self._volume:
@@ -65,19 +73,20 @@ class S3Broker(Broker):
                     execute_command_line(['ln', '-s', path_to_download, file_download.local_path])
                 # Fall-back to default S3 file download
                 else:
-                    try:
-                        s3_object = client.get_object(self._bucket_name, file_download.file.file_path)
-                    except FileDoesNotExist:
-                        raise MissingFile(file_download.file.file_name)
+                    # Existence is checked by the download itself, rather than an extra request
+                    s3_object = client.get_object(self._bucket_name, file_download.file.file_path, False)
+                    downloads.append((s3_object, file_download.file, file_download.local_path))
 
-                    self._download_file(s3_object, file_download.file, file_download.local_path)
+            self._run_transfers(OPERATION_DOWNLOAD, self._download_file, downloads, settings.S3_TRANSFER_THREADS)
 
-    def list_files(self, volume_path, recursive):
+    def list_files(self, volume_path, recursive, start_after=None):
         """See :meth:`storage.brokers.broker.Broker.list_files`
+
+        S3 lists object keys in ascending order, so listing resumes with the key that follows start_after.
         """
 
         with S3Client(self._credentials, self._region_name) as client:
-            return client.list_objects(self._bucket_name, recursive, volume_path)
+            return client.list_objects(self._bucket_name, recursive, volume_path, start_after)
 
     def load_configuration(self, config):
         """See :meth:`storage.brokers.broker.Broker.load_configuration`"""
@@ -94,34 +103,49 @@ class S3Broker(Broker):
             volume.host = True
             self._volume = volume
 
+    @record_transfer(OPERATION_MOVE)
     def move_files(self, volume_path, file_moves):
         """See :meth:`storage.brokers.broker.Broker.move_files`"""
 
         with S3Client(self._credentials, self._region_name) as client:
+            copies = []
             for file_move in file_moves:
-                try:
-                    s3_object_src = client.get_object(self._bucket_name, file_move.file.file_path)
-                except FileDoesNotExist:
-                    raise MissingFile(file_move.file.file_name)
+                # Existence of the source is checked by the copy itself, rather than an extra request
+                s3_object_src = client.get_object(self._bucket_name, file_move.file.file_path, False)
                 s3_object_dest = client.get_object(self._bucket_name, file_move.new_path, False)
+                copies.append((s3_object_src, s3_object_dest, file_move.file, file_move.new_path))
 
-                self._move_file(s3_object_src, s3_object_dest, file_move.file, file_move.new_path)
+            # S3 does not support an atomic move, so the sources are deleted in bulk once every copy has succeeded
+            self._run_transfers(OPERATION_MOVE, self._copy_file, copies, settings.S3_TRANSFER_THREADS)
+            failed_paths = self._delete_objects(client, [file_move.file for file_move in file_moves])
 
-                # Update model attributes
-                file_move.file.file_path = file_move.new_path
-                file_move.file.save()
+        moved_files = []
+        for file_move in file_moves:
+            # Update model attributes
+            file_move.file.file_path = file_move.new_path
+            moved_files.append(file_move.file)
 
+        if failed_paths:
+            # Every file was copied to its new path, so the moved files are returned so that their new paths are saved
+            error = Exception('Failed to delete %i moved source file(s) from S3' % len(failed_paths))
+            raise PartialTransfer(moved_files, error)
+        return moved_files
+
+    @record_transfer(OPERATION_UPLOAD)
     def upload_files(self, volume_path, file_uploads):
         """See :meth:`storage.brokers.broker.Broker.upload_files`"""
 
         with S3Client(self._credentials, self._region_name) as client:
+            uploads = []
             for file_upload in file_uploads:
                 s3_object = client.get_object(self._bucket_name, file_upload.file.file_path, False)
+                uploads.append((s3_object, file_upload.file, file_upload.local_path))
 
-                self._upload_file(s3_object, file_upload.file, file_upload.local_path)
-
-                # Create new model
-                file_upload.file.save()
+            uploaded_files = [file_upload.file for file_upload in file_uploads]
+            # Return the files that were already uploaded if some uploads fail, so that they are saved
+            self._run_transfers(OPERATION_UPLOAD, self._upload_file, uploads, settings.S3_TRANSFER_THREADS,
+                                uploaded_files)
+            return uploaded_files
 
     def validate_configuration(self, config):
         """See :meth:`storage.brokers.broker.Broker.validate_configuration`"""
@@ -143,97 +167,133 @@ class S3Broker(Broker):
 
         return warnings
 
-    def _delete_file(self, s3_object, scale_file, retries=settings.S3_RETRY_COUNT):
-        """Deletes a file from the S3 file system.
+    def _copy_file(self, s3_object_src, s3_object_dest, scale_file, path, retries=settings.S3_RETRY_COUNT):
+        """Copies a file within the S3 file system. The copy is performed server side, so the file content is never
+        transferred through this host. Files at least the multipart threshold in size are copied in concurrent parts.
 
-        This method will attempt to retry the delete if :class:`ssl.SSLError` is raised up to a number of retries given.
+        This method will attempt to retry the copy if :class:`ssl.SSLError` is raised up to a number of retries given.
 
-        :param s3_object: The S3 object representing the file to delete.
-        :type s3_object: :class:`boto3.s3.Object`
-        :param scale_file: The model associated with the file to delete.
+        :param s3_object_src: The S3 object representing the source of the file to copy.
+        :type s3_object_src: :class:`boto3.s3.Object`
+        :param s3_object_dest: The S3 object representing the destination of the file to copy.
+        :type s3_object_dest: :class:`boto3.s3.Object`
+        :param scale_file: The model associated with the file to copy.
         :type scale_file: :class:`storage.models.ScaleFile`
+        :param path: The destination path for the file copy.
+        :type path: string
+
+        :raises :class:`storage.exceptions.MissingFile`: If the source file does not exist in the bucket.
         """
 
-        logger.info('Deleting %s', scale_file.file_path)
+        logger.info('Copying %s -> %s', scale_file.file_path, path)
+        copy_source = {
+            'Bucket': s3_object_src.bucket_name,
+            'Key': s3_object_src.key,
+        }
+        options = dict()
+        options['StorageClass'] = settings.S3_STORAGE_CLASS
+        if settings.S3_SERVER_SIDE_ENCRYPTION:
+            options['ServerSideEncryption'] = settings.S3_SERVER_SIDE_ENCRYPTION
+        if scale_file.media_type:
+            options['ContentType'] = scale_file.media_type
+
         for attempt in range(retries):
             try:
-                s3_object.delete()
+                if scale_file.file_size and scale_file.file_size >= settings.S3_MULTIPART_THRESHOLD:
+                    s3_object_dest.copy(copy_source, options, Config=self._transfer_config)
+                else:
+                    s3_object_dest.copy_from(CopySource=copy_source, **options)
                 return
+            except ClientError as err:
+                if err.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                    raise MissingFile(scale_file.file_name)
+                raise
             except ssl.SSLError:
-                if attempt >= retries:
+                if attempt + 1 >= retries:
                     raise
                 time.sleep(settings.S3_RETRY_DELAY * attempt)
-                logger.exception('Retrying S3 delete attempt: %i', attempt + 1)
+                logger.exception('Retrying S3 copy attempt: %i', attempt + 1)
+                transfer_metrics.record_retry(self.broker_type, OPERATION_MOVE)
 
-    def _download_file(self, s3_object, scale_file, path, retries=settings.S3_RETRY_COUNT):
-        """Downloads a file in S3 storage to the local file system.
+    def _delete_objects(self, client, scale_files, retries=settings.S3_RETRY_COUNT):
+        """Deletes the given files from the S3 file system with bulk delete requests.
 
         This method will attempt to retry the delete if :class:`ssl.SSLError` is raised up to a number of retries given.
 
-        :param s3_object: The S3 object representing the file to download.
-        :type s3_object: :class:`boto3.s3.Object`
-        :param scale_file: The model associated with the file to download.
-        :type scale_file: :class:`storage.models.ScaleFile`
-        :param path: The destination path for the file download.
-        :type path: string
+        :param client: The S3 client
+        :type client: :class:`util.aws.S3Client`
+        :param scale_files: The models associated with the files to delete.
+        :type scale_files: [:class:`storage.models.ScaleFile`]
+        :returns: The paths of the files that failed to be deleted
+        :rtype: set
         """
 
-        logger.info('Downloading %s -> %s', scale_file.file_path, path)
+        file_paths = [scale_file.file_path for scale_file in scale_files]
+        for file_path in file_paths:
+            logger.info('Deleting %s', file_path)
+
         for attempt in range(retries):
             try:
-                s3_object.download_file(path)
-                return
+                errors = client.delete_objects(self._bucket_name, file_paths)
+                break
             except ssl.SSLError:
-                if attempt >= retries:
+                if attempt + 1 >= retries:
                     raise
                 time.sleep(settings.S3_RETRY_DELAY * attempt)
-                logger.exception('Retrying S3 download attempt: %i', attempt + 1)
+                logger.exception('Retrying S3 delete attempt: %i', attempt + 1)
+                transfer_metrics.record_retry(self.broker_type, OPERATION_DELETE)
 
-    def _move_file(self, s3_object_src, s3_object_dest, scale_file, path, retries=settings.S3_RETRY_COUNT):
-        """Moves a file within the S3 file system.
+        for error in errors:
+            logger.error('Failed to delete %s: %s', error.get('Key'), error.get('Message'))
+        return {error.get('Key') for error in errors}
 
-        Note that S3 does not support an atomic move, so this operation is implemented as a copy and delete.
+    def _download_file(self, s3_object, scale_file, path, retries=settings.S3_RETRY_COUNT):
+        """Downloads a file in S3 storage to the local file system. If checksum verification is enabled and the file
+        has a recorded checksum, the file is streamed in order so that its checksum is computed while it is written.
 
-        This method will attempt to retry the move if :class:`ssl.SSLError` is raised up to a number of retries given.
-        Note that since S3 does not support an atomic move, this method copies the file to the new destination and then
-        attempts to delete the original file content.
+        This method will attempt to retry the delete if :class:`ssl.SSLError` is raised up to a number of retries given.
 
-        :param s3_object_src: The S3 object representing the source of the file to move.
-        :type s3_object_src: :class:`boto3.s3.Object`
-        :param s3_object_dest: The S3 object representing the destination of the file to move.
-        :type s3_object_dest: :class:`boto3.s3.Object`
-        :param scale_file: The model associated with the file to move.
+        :param s3_object: The S3 object representing the file to download.
+        :type s3_object: :class:`boto3.s3.Object`
+        :param scale_file: The model associated with the file to download.
         :type scale_file: :class:`storage.models.ScaleFile`
-        :param path: The destination path for the file move.
+        :param path: The destination path for the file download.
         :type path: string
-        """
 
-        logger.info('Copying %s -> %s', scale_file.file_path, path)
-        options = dict()
-        options['CopySource'] = {
-            'Bucket': s3_object_src.bucket_name,
-            'Key': s3_object_src.key,
-        }
-        options['StorageClass'] = settings.S3_STORAGE_CLASS
-        if settings.S3_SERVER_SIDE_ENCRYPTION:
-            options['ServerSideEncryption'] = settings.S3_SERVER_SIDE_ENCRYPTION
-        if scale_file.media_type:
-            options['ContentType'] = scale_file.media_type
+        :raises :class:`storage.exceptions.MissingFile`: If the file does not exist in the bucket.
+        :raises :class:`storage.exceptions.ChecksumMismatch`: If the checksum of the downloaded file does not match
+            the recorded checksum.
+        """
 
+        logger.info('Downloading %s -> %s', scale_file.file_path, path)
+        verify = settings.VERIFY_FILE_CHECKSUMS and scale_file.checksum
         for attempt in range(retries):
             try:
-                s3_object_dest.copy_from(**options)
-                break
+                if verify:
+                    with open(path, 'wb') as local_file:
+                        writer = ChecksumWriter(local_file)
+                        s3_object.download_fileobj(writer, Config=self._transfer_config)
+                    checksum = writer.hexdigest()
+                    if checksum != scale_file.checksum:
+                        raise ChecksumMismatch('Checksum of downloaded file %s is %s, expected %s' %
+                                               (scale_file.file_path, checksum, scale_file.checksum))
+                else:
+                    s3_object.download_file(path, Config=self._transfer_config)
+                return
+            except ClientError as err:
+                if err.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                    raise MissingFile(scale_file.file_name)
+                raise
             except ssl.SSLError:
-                if attempt >= retries:
+                if attempt + 1 >= retries:
                     raise
                 time.sleep(settings.S3_RETRY_DELAY * attempt)
-                logger.exception('Retrying S3 copy attempt: %i', attempt + 1)
-
-        self._delete_file(s3_object_src, scale_file)
+                logger.exception('Retrying S3 download attempt: %i', attempt + 1)
+                transfer_metrics.record_retry(self.broker_type, OPERATION_DOWNLOAD)
 
     def _upload_file(self, s3_object, scale_file, path, retries=settings.S3_RETRY_COUNT):
-        """Uploads a file in local storage to the S3 remote file system.
+        """Uploads a file in local storage to the S3 remote file system. The file is streamed in order so that its
+        checksum is computed while it is read, and the checksum is set on its model.
 
         This method will attempt to retry the delete if :class:`ssl.SSLError` is raised up to a number of retries given.
 
@@ -255,10 +315,14 @@ class S3Broker(Broker):
         logger.info('Uploading %s -> %s', path, scale_file.file_path)
         for attempt in range(retries):
             try:
-                s3_object.upload_file(path, options)
+                with open(path, 'rb') as local_file:
+                    reader = ChecksumReader(local_file)
+                    s3_object.upload_fileobj(reader, options, Config=self._transfer_config)
+                scale_file.checksum = reader.hexdigest()
                 return
             except ssl.SSLError:
-                if attempt >= retries:
+                if attempt + 1 >= retries:
                     raise
                 time.sleep(settings.S3_RETRY_DELAY * attempt)
                 logger.exception('Retrying S3 upload attempt: %i', attempt + 1)
+                transfer_metrics.record_retry(self.broker_type, OPERATION_UPLOAD)
@@ -0,0 +1,333 @@
+"""Defines the node-local cache of input files that is shared by the job executions on a node"""
+from __future__ import unicode_literals
+
+import errno
+import fcntl
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from storage.brokers.broker import FileDownload
+from storage.models import ScaleFile
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sub-directories of the cache directory for the cached files, the leases held on them, and downloads in progress
+FILES_DIR = 'files'
+LEASES_DIR = 'leases'
+TEMP_DIR = 'tmp'
+
+# Leases older than this were left behind by job executions that were never cleaned up, so they are ignored
+LEASE_MAX_AGE = 7 * 24 * 60 * 60  # 7 days in seconds
+
+
+def get_lease_name(job_id, exe_num):
+    """Returns the name of the input file cache lease held by the given job execution
+
+    :param job_id: The job ID
+    :type job_id: int
+    :param exe_num: The execution number
+    :type exe_num: int
+    :returns: The lease name
+    :rtype: string
+    """
+
+    return '%d_%d' % (job_id, exe_num)
+
+
+class InputFileCache(object):
+    """This class manages a size-bounded cache of input files in a directory on a node. Downloaded files are added to
+    the cache and repeat downloads of a file become links to the cached copy, with the least recently used files
+    evicted to stay within the maximum size and minimum free disk space. Each job execution holds a lease on the files
+    it links so that they are never evicted while it is running; the lease is released when the execution is cleaned
+    up. The cache directory is shared by processes on the node, so changes to its contents are made under a file lock.
+    """
+
+    def __init__(self, cache_dir, max_size, min_free):
+        """Constructor
+
+        :param cache_dir: The cache directory, None if the cache is disabled
+        :type cache_dir: string
+        :param max_size: The maximum size of the cache in bytes
+        :type max_size: int
+        :param min_free: The minimum free disk space in bytes to leave on the cache's file system
+        :type min_free: int
+        """
+
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._min_free = min_free
+        self._lease_name = None
+
+        self.hits = 0
+        self.hit_bytes = 0
+        self.misses = 0
+        self.miss_bytes = 0
+
+        if cache_dir:
+            self._files_dir = os.path.join(cache_dir, FILES_DIR)
+            self._leases_dir = os.path.join(cache_dir, LEASES_DIR)
+            self._lock_path = os.path.join(cache_dir, '.lock')
+            self._temp_dir = os.path.join(cache_dir, TEMP_DIR)
+
+    @property
+    def is_enabled(self):
+        """Indicates whether the cache is enabled (True) or not (False)
+
+        :returns: Whether the cache is enabled
+        :rtype: bool
+        """
+
+        return bool(self._cache_dir)
+
+    def download_files(self, file_downloads):
+        """Downloads the given files, linking to the cached copy of each file that is in the cache and adding each
+        downloaded file to the cache. Partial file downloads are never cached. If the cache is disabled or no lease has
+        been started, the files are downloaded directly.
+
+        :param file_downloads: List of files to download
+        :type file_downloads: [:class:`storage.brokers.broker.FileDownload`]
+
+        :raises :class:`storage.exceptions.ArchivedWorkspace`: If any of the files has an archived workspace (no longer
+            active)
+        :raises :class:`storage.exceptions.DeletedFile`: If any of the files has been deleted
+        """
+
+        if not self.is_enabled or not self._lease_name:
+            ScaleFile.objects.download_files(file_downloads)
+            return
+
+        cacheable = [file_download for file_download in file_downloads if not file_download.partial]
+        direct_downloads = [file_download for file_download in file_downloads if file_download.partial]
+
+        # Lease the files before looking for them so that they cannot be evicted once found
+        with self._cache_lock():
+            self._add_to_lease([InputFileCache._get_key(file_download.file) for file_download in cacheable])
+
+        hits = []
+        misses = []
+        for file_download in cacheable:
+            if os.path.exists(self._get_cache_path(file_download.file)):
+                hits.append(file_download)
+            else:
+                misses.append(file_download)
+
+        # Evict files to make room for the misses, any misses that still do not fit are downloaded directly
+        miss_downloads = []
+        if misses:
+            with self._cache_lock():
+                room = self._make_room(sum(file_download.file.file_size or 0 for file_download in misses))
+            for file_download in misses:
+                file_size = file_download.file.file_size or 0
+                if file_size <= room:
+                    room -= file_size
+                    miss_downloads.append(file_download)
+                else:
+                    direct_downloads.append(file_download)
+        temp_downloads = [FileDownload(file_download.file, self._get_temp_path(file_download.file), False)
+                          for file_download in miss_downloads]
+
+        ScaleFile.objects.download_files(direct_downloads + temp_downloads)
+
+        for file_download, temp_download in zip(miss_downloads, temp_downloads):
+            if os.path.islink(temp_download.local_path):
+                # The broker linked to the file instead of copying it, so there is nothing to cache
+                os.symlink(os.readlink(temp_download.local_path), file_download.local_path)
+                os.remove(temp_download.local_path)
+                continue
+            cache_path = self._get_cache_path(file_download.file)
+            os.rename(temp_download.local_path, cache_path)  # Atomic, so other processes never see a partial file
+            self._link(cache_path, file_download.local_path)
+            self.misses += 1
+            self.miss_bytes += file_download.file.file_size or 0
+
+        for file_download in hits:
+            cache_path = self._get_cache_path(file_download.file)
+            os.utime(cache_path, None)  # Mark the file as recently used
+            self._link(cache_path, file_download.local_path)
+            self.hits += 1
+            self.hit_bytes += file_download.file.file_size or 0
+        logger.info('Input file cache: %d hit(s), %d miss(es), %d direct download(s)', len(hits), len(miss_downloads),
+                    len(direct_downloads))
+
+    def get_counts(self):
+        """Returns the hit and miss counts of this cache since it was created
+
+        :returns: The counts stored by name
+        :rtype: dict
+        """
+
+        return {'hits': self.hits, 'hit_bytes': self.hit_bytes, 'misses': self.misses, 'miss_bytes': self.miss_bytes}
+
+    def start_lease(self, lease_name):
+        """Starts the lease that holds the files downloaded through this cache until the lease is released. Leases are
+        released by removing their file from the cache's lease directory.
+
+        :param lease_name: The name of the lease
+        :type lease_name: string
+        """
+
+        self._lease_name = lease_name
+        if self.is_enabled:
+            for dir_path in [self._files_dir, self._leases_dir, self._temp_dir]:
+                try:
+                    os.makedirs(dir_path)
+                except OSError as ex:
+                    if ex.errno != errno.EEXIST:
+                        raise
+
+    def _add_to_lease(self, keys):
+        """Adds the given cache keys to this cache's lease. Caller must have obtained the cache lock.
+
+        :param keys: The cache keys
+        :type keys: [string]
+        """
+
+        with open(os.path.join(self._leases_dir, self._lease_name), 'a') as lease_file:
+            for key in keys:
+                lease_file.write('%s\n' % key)
+
+    @contextmanager
+    def _cache_lock(self):
+        """Obtains the file lock that guards the contents of the cache directory across processes
+        """
+
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _get_cache_path(self, scale_file):
+        """Returns the path of the given file within the cache
+
+        :param scale_file: The file
+        :type scale_file: :class:`storage.models.ScaleFile`
+        :returns: The cache path
+        :rtype: string
+        """
+
+        return os.path.join(self._files_dir, InputFileCache._get_key(scale_file))
+
+    def _get_free_size(self):
+        """Returns the free disk space in bytes on the cache's file system
+
+        :returns: The free disk space in bytes
+        :rtype: int
+        """
+
+        stats = os.statvfs(self._cache_dir)
+        return stats.f_bavail * stats.f_frsize
+
+    @staticmethod
+    def _get_key(scale_file):
+        """Returns the cache key for the given file. The key changes whenever the file's model is modified so that a
+        changed file is never served from the cache.
+
+        :param scale_file: The file
+        :type scale_file: :class:`storage.models.ScaleFile`
+        :returns: The cache key
+        :rtype: string
+        """
+
+        modified = scale_file.last_modified.strftime('%Y%m%d%H%M%S%f') if scale_file.last_modified else '0'
+        return '%d_%d_%s' % (scale_file.id, scale_file.file_size or 0, modified)
+
+    def _get_leased_keys(self):
+        """Returns the cache keys held by the leases of all job executions, removing any expired leases. Caller must
+        have obtained the cache lock.
+
+        :returns: The leased cache keys
+        :rtype: set
+        """
+
+        keys = set()
+        expired = time.time() - LEASE_MAX_AGE
+        for lease_name in os.listdir(self._leases_dir):
+            lease_path = os.path.join(self._leases_dir, lease_name)
+            try:
+                if os.path.getmtime(lease_path) < expired:
+                    logger.warning('Removing expired input file cache lease %s', lease_name)
+                    os.remove(lease_path)
+                    continue
+                with open(lease_path, 'r') as lease_file:
+                    keys.update(line.strip() for line in lease_file)
+            except (IOError, OSError) as ex:
+                if ex.errno != errno.ENOENT:  # Lease was released while reading it
+                    raise
+        return keys
+
+    def _get_temp_path(self, scale_file):
+        """Returns the path that the given file is downloaded to before it is added to the cache
+
+        :param scale_file: The file
+        :type scale_file: :class:`storage.models.ScaleFile`
+        :returns: The temporary path
+        :rtype: string
+        """
+
+        return os.path.join(self._temp_dir, '%s_%s' % (self._lease_name, InputFileCache._get_key(scale_file)))
+
+    def _link(self, cache_path, local_path):
+        """Links the given local path to the given cached file, using a hard link if possible and a symbolic link
+        otherwise (such as when the paths are on different mounts)
+
+        :param cache_path: The path of the cached file
+        :type cache_path: string
+        :param local_path: The local path to link
+        :type local_path: string
+        """
+
+        try:
+            os.link(cache_path, local_path)
+        except OSError as ex:
+            if ex.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+            os.symlink(cache_path, local_path)
+
+    def _make_room(self, size):
+        """Evicts the least recently used files that are not leased until there is room in the cache for the given
+        number of bytes, or no more files can be evicted. Caller must have obtained the cache lock.
+
+        :param size: The number of bytes to make room for
+        :type size: int
+        :returns: The number of bytes there is room for in the cache
+        :rtype: int
+        """
+
+        leased_keys = self._get_leased_keys()
+        cache_size = 0
+        unleased = []  # (Last used, size, path) of each file that can be evicted
+        for key in os.listdir(self._files_dir):
+            path = os.path.join(self._files_dir, key)
+            stats = os.stat(path)
+            cache_size += stats.st_size
+            if key not in leased_keys:
+                unleased.append((stats.st_mtime, stats.st_size, path))
+        unleased.sort()
+
+        free_size = self._get_free_size()
+        evicted = 0
+        evicted_size = 0
+        for _last_used, file_size, path in unleased:
+            if cache_size + size <= self._max_size and free_size - size >= self._min_free:
+                break
+            os.remove(path)
+            cache_size -= file_size
+            free_size += file_size
+            evicted += 1
+            evicted_size += file_size
+        if evicted:
+            logger.info('Evicted %d file(s) (%d bytes) from the input file cache', evicted, evicted_size)
+
+        return max(min(self._max_size - cache_size, free_size - self._min_free), 0)
+
+
+input_file_cache = InputFileCache(settings.INPUT_FILE_CACHE_DIR, settings.INPUT_FILE_CACHE_MAX_SIZE * 1024 * 1024,
+                                  settings.INPUT_FILE_CACHE_MIN_FREE * 1024 * 1024)
@@ -0,0 +1,109 @@
+"""Defines the functions and classes that compute the checksums of files in the same pass that streams their content"""
+from __future__ import unicode_literals
+
+import hashlib
+
+# The algorithm of the file checksums, its hex digest is stored in the checksum field of ScaleFile
+CHECKSUM_ALGORITHM = 'sha256'
+
+# Size in bytes of the blocks that files are copied in
+COPY_BLOCK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def copy_file(src_path, dest_path):
+    """Copies the content of the given source file to the given destination path and returns the checksum of the
+    content, which is computed while the content is copied
+
+    :param src_path: The absolute path of the file to copy
+    :type src_path: string
+    :param dest_path: The absolute path to copy the file to
+    :type dest_path: string
+    :returns: The hex digest checksum of the file content
+    :rtype: string
+    """
+
+    checksum = hashlib.new(CHECKSUM_ALGORITHM)
+    with open(src_path, 'rb') as src_file:
+        with open(dest_path, 'wb') as dest_file:
+            while True:
+                block = src_file.read(COPY_BLOCK_SIZE)
+                if not block:
+                    break
+                checksum.update(block)
+                dest_file.write(block)
+    return checksum.hexdigest()
+
+
+class ChecksumReader(object):
+    """Wraps a file object that is read from, computing the checksum of the content as it is read. The content must be
+    read in order, so this class deliberately does not provide seek() or tell(), which makes readers like the S3
+    transfer manager treat it as a stream.
+    """
+
+    def __init__(self, file_obj):
+        """Constructor
+
+        :param file_obj: The file object to read from
+        :type file_obj: file
+        """
+
+        self._checksum = hashlib.new(CHECKSUM_ALGORITHM)
+        self._file_obj = file_obj
+
+    def hexdigest(self):
+        """Returns the checksum of the content read so far
+
+        :returns: The hex digest checksum
+        :rtype: string
+        """
+
+        return self._checksum.hexdigest()
+
+    def read(self, size=-1):
+        """Reads up to the given number of bytes from the file
+
+        :param size: The maximum number of bytes to read, a negative number reads the rest of the file
+        :type size: int
+        :returns: The bytes read
+        :rtype: bytes
+        """
+
+        data = self._file_obj.read(size)
+        self._checksum.update(data)
+        return data
+
+
+class ChecksumWriter(object):
+    """Wraps a file object that is written to, computing the checksum of the content as it is written. The content
+    must be written in order, so this class deliberately does not provide seek() or tell(), which makes writers like
+    the S3 transfer manager write to it as a stream.
+    """
+
+    def __init__(self, file_obj):
+        """Constructor
+
+        :param file_obj: The file object to write to
+        :type file_obj: file
+        """
+
+        self._checksum = hashlib.new(CHECKSUM_ALGORITHM)
+        self._file_obj = file_obj
+
+    def hexdigest(self):
+        """Returns the checksum of the content written so far
+
+        :returns: The hex digest checksum
+        :rtype: string
+        """
+
+        return self._checksum.hexdigest()
+
+    def write(self, data):
+        """Writes the given bytes to the file
+
+        :param data: The bytes to write
+        :type data: bytes
+        """
+
+        self._checksum.update(data)
+        self._file_obj.write(data)
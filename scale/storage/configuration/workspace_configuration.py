@@ -1,11 +1,11 @@
 """Defines the configuration for a storage Workspace"""
 from __future__ import unicode_literals
 
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 import storage.brokers.factory as broker_factory
 from storage.configuration.exceptions import InvalidWorkspaceConfiguration
+from util.validation import validate_json
 
 DEFAULT_VERSION = '1.0'
 
@@ -72,7 +72,7 @@ class WorkspaceConfiguration(object):
 
         # Valid the overall JSON schema
         try:
-            validate(configuration, WORKSPACE_CONFIGURATION_SCHEMA)
+            validate_json(configuration, WORKSPACE_CONFIGURATION_SCHEMA)
         except ValidationError as ex:
             raise InvalidWorkspaceConfiguration('Invalid Workspace configuration: %s' % unicode(ex))
 
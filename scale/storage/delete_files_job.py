@@ -28,7 +28,7 @@ def delete_files(files, volume_path, broker):
 
     logger.info('Deleting %i files', len(files))
     try:
-        broker.delete_files(volume_path=volume_path, files=files, update_model=False)
+        broker.delete_files(volume_path=volume_path, files=files)
     except ScaleError as err:
         err.log()
         sys.exit(err.exit_code)
@@ -12,6 +12,13 @@ class ArchivedWorkspace(Exception):
     pass
 
 
+class ChecksumMismatch(Exception):
+    """Exception indicating that the checksum of a transferred file does not match the checksum recorded for the file
+    """
+
+    pass
+
+
 class DeletedFile(ScaleError):
     """Error class indicating an attempt was made to retrieve a deleted file (a file whose is_deleted flag is true in
     the database)
@@ -0,0 +1,215 @@
+"""Defines the command line method for benchmarking the throughput of a storage broker"""
+from __future__ import division
+from __future__ import unicode_literals
+
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from storage.brokers.broker import FileDownload, FileMove, FileUpload
+from storage.brokers.host_broker import HostBroker
+from storage.brokers.metrics import transfer_metrics, OPERATION_DELETE, OPERATION_DOWNLOAD, OPERATION_MOVE, \
+    OPERATION_UPLOAD
+from storage.models import ScaleFile, Workspace
+
+
+logger = logging.getLogger(__name__)
+
+
+# File size distributions, each a minimum size in bytes, a maximum size in bytes, and whether sizes are log-uniform
+DISTRIBUTIONS = {'small': (4 * 1024, 256 * 1024, False),
+                 'medium': (1024 * 1024, 16 * 1024 * 1024, False),
+                 'large': (64 * 1024 * 1024, 256 * 1024 * 1024, False),
+                 'mixed': (4 * 1024, 256 * 1024 * 1024, True)}
+
+# The operations of each workload, in the order they are run
+OPERATIONS = [OPERATION_UPLOAD, OPERATION_DOWNLOAD, OPERATION_MOVE, OPERATION_DELETE]
+
+# Size of the block of random data that is repeated to fill each synthetic file
+BLOCK_SIZE = 1024 * 1024
+
+
+class Command(BaseCommand):
+    """Command that benchmarks a storage broker by running synthetic workloads of uploads, downloads, moves, and deletes
+    """
+
+    help = 'Benchmarks a storage broker with synthetic workloads against a workspace or a local directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-w', '--workspace', action='store',
+                            help='The name of the workspace to benchmark')
+        parser.add_argument('--host-path', action='store',
+                            help='A local directory to benchmark with a host broker, instead of a workspace')
+        parser.add_argument('--volume-path', action='store',
+                            help='The local path where the workspace volume is mounted, if it uses one')
+        parser.add_argument('--distributions', action='store', nargs='+', default=['small', 'mixed'],
+                            choices=sorted(DISTRIBUTIONS.keys()), help='The file size distributions to run')
+        parser.add_argument('--files', action='store', type=int, default=100,
+                            help='The number of files in each workload')
+        parser.add_argument('--batch-size', action='store', type=int, default=10,
+                            help='The number of files passed to each broker call')
+        parser.add_argument('--seed', action='store', type=int, default=1,
+                            help='The random seed for the synthetic file sizes')
+        parser.add_argument('--json', action='store_true', default=False,
+                            help='Write the results of each workload as a line of JSON')
+
+    def handle(self, *args, **options):
+        """See :meth:`django.core.management.base.BaseCommand.handle`.
+
+        This method runs a workload for each of the file size distributions.
+        """
+
+        logger.info('Command starting: scale_storage_benchmark')
+
+        if options['host_path']:
+            broker = HostBroker()
+            broker.load_configuration({'type': 'host', 'host_path': options['host_path']})
+            volume_path = options['host_path']
+        elif options['workspace']:
+            try:
+                workspace = Workspace.objects.get(name=options['workspace'])
+            except Workspace.DoesNotExist:
+                logger.error('Workspace does not exist: %s', options['workspace'])
+                sys.exit(1)
+            broker = workspace.get_broker()
+            volume_path = options['volume_path']
+            if not volume_path and broker.volume:
+                volume_path = broker.volume.remote_path if broker.volume.host else workspace.workspace_volume_path
+        else:
+            logger.error('Either a workspace or a host path is required')
+            sys.exit(1)
+
+        logger.info(' - Broker: %s', broker.broker_type)
+        logger.info(' - Volume path: %s', volume_path)
+
+        rand = random.Random(options['seed'])
+        for name in options['distributions']:
+            results = self._run_workload(broker, volume_path, name, options['files'], options['batch_size'], rand)
+            if options['json']:
+                self.stdout.write(json.dumps(results, sort_keys=True))
+            else:
+                self._write_results(results)
+
+        logger.info('Command completed: scale_storage_benchmark')
+
+    def _create_files(self, local_dir, remote_dir, distribution, file_count, rand):
+        """Creates the synthetic local files and their (unsaved) file models for a workload
+
+        :param local_dir: The local directory for the files
+        :type local_dir: string
+        :param remote_dir: The workspace relative directory for the files
+        :type remote_dir: string
+        :param distribution: The name of the file size distribution
+        :type distribution: string
+        :param file_count: The number of files
+        :type file_count: int
+        :param rand: The random number generator
+        :type rand: :class:`random.Random`
+        :returns: The list of file uploads
+        :rtype: [:class:`storage.brokers.broker.FileUpload`]
+        """
+
+        min_size, max_size, is_log = DISTRIBUTIONS[distribution]
+        block = bytearray(rand.getrandbits(8) for _ in range(BLOCK_SIZE))
+
+        file_uploads = []
+        for i in range(file_count):
+            if is_log:
+                file_size = int(math.exp(rand.uniform(math.log(min_size), math.log(max_size))))
+            else:
+                file_size = rand.randint(min_size, max_size)
+            file_name = 'file_%i.dat' % i
+            local_path = os.path.join(local_dir, file_name)
+            with open(local_path, 'wb') as local_file:
+                remaining = file_size
+                while remaining > 0:
+                    local_file.write(block[:min(remaining, BLOCK_SIZE)])
+                    remaining -= BLOCK_SIZE
+
+            scale_file = ScaleFile(file_name=file_name, file_path=os.path.join(remote_dir, file_name),
+                                   file_size=file_size, media_type='application/octet-stream')
+            file_uploads.append(FileUpload(scale_file, local_path))
+        return file_uploads
+
+    def _run_workload(self, broker, volume_path, distribution, file_count, batch_size, rand):
+        """Runs a workload that uploads, downloads, moves, and then deletes synthetic files with the given size
+        distribution, returning the results of each operation
+
+        :param broker: The broker
+        :type broker: :class:`storage.brokers.broker.Broker`
+        :param volume_path: The path where the broker's volume is mounted, possibly None
+        :type volume_path: string
+        :param distribution: The name of the file size distribution
+        :type distribution: string
+        :param file_count: The number of files
+        :type file_count: int
+        :param batch_size: The number of files passed to each broker call
+        :type batch_size: int
+        :param rand: The random number generator
+        :type rand: :class:`random.Random`
+        :returns: The workload results
+        :rtype: dict
+        """
+
+        remote_dir = os.path.join('scale_storage_benchmark', uuid.uuid4().hex, distribution)
+        local_dir = tempfile.mkdtemp()
+        download_dir = tempfile.mkdtemp()
+        file_uploads = self._create_files(local_dir, remote_dir, distribution, file_count, rand)
+        batches = [file_uploads[i:i + batch_size] for i in range(0, len(file_uploads), max(batch_size, 1))]
+        logger.info('Running %s workload with %i files', distribution, file_count)
+
+        transfer_metrics.clear()
+        try:
+            for batch in batches:
+                broker.upload_files(volume_path, batch)
+            for batch in batches:
+                file_downloads = [FileDownload(file_upload.file, os.path.join(download_dir, file_upload.file.file_name),
+                                               False) for file_upload in batch]
+                broker.download_files(volume_path, file_downloads)
+            for batch in batches:
+                file_moves = [FileMove(file_upload.file, os.path.join(remote_dir, 'moved', file_upload.file.file_name))
+                              for file_upload in batch]
+                broker.move_files(volume_path, file_moves)
+            for batch in batches:
+                broker.delete_files(volume_path, [file_upload.file for file_upload in batch])
+            # Brokers only delete files, so remove the workload's empty directories from the volume
+            if volume_path:
+                shutil.rmtree(os.path.join(volume_path, os.path.dirname(remote_dir)), ignore_errors=True)
+        finally:
+            shutil.rmtree(local_dir)
+            shutil.rmtree(download_dir)
+
+        operations = transfer_metrics.get_summary().get(broker.broker_type, {})
+        total_bytes = sum(file_upload.file.file_size for file_upload in file_uploads)
+        return {'broker': broker.broker_type, 'distribution': distribution, 'files': file_count,
+                'batch_size': batch_size, 'bytes': total_bytes,
+                'operations': {name: operations[name] for name in OPERATIONS if name in operations}}
+
+    def _write_results(self, results):
+        """Writes a readable summary of the given workload results
+
+        :param results: The workload results
+        :type results: dict
+        """
+
+        self.stdout.write('Broker: %s, distribution: %s, files: %i, batch size: %i, MiB: %.1f' %
+                          (results['broker'], results['distribution'], results['files'], results['batch_size'],
+                           results['bytes'] / 1048576.0))
+        for name in OPERATIONS:
+            if name not in results['operations']:
+                continue
+            metrics = results['operations'][name]
+            self.stdout.write('  %s: MiB/s %s, files/s %s, retries %i, max concurrency %i' %
+                              (name, metrics['mib_per_sec'], metrics['files_per_sec'], metrics['retries'],
+                               metrics['max_concurrency']))
+            self.stdout.write('    Call ms: p50 %s, p90 %s, p99 %s, max %s' %
+                              (metrics['call_ms']['p50'], metrics['call_ms']['p90'], metrics['call_ms']['p99'],
+                               metrics['call_ms']['max']))
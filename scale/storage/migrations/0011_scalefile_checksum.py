@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.12 on 2018-07-02 14:26
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storage', '0010_auto_20180613_1947'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scalefile',
+            name='checksum',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
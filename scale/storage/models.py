@@ -13,6 +13,7 @@ import django.contrib.postgres.fields
 from django.db import transaction
 
 import storage.geospatial_utils as geospatial_utils
+from storage.brokers.exceptions import PartialTransfer
 from storage.brokers.factory import get_broker
 from storage.configuration.workspace_configuration import ValidationWarning, WorkspaceConfiguration
 from storage.container import get_workspace_volume_path
@@ -24,6 +25,9 @@ logger = logging.getLogger(__name__)
 # Allow alphanumerics, dashes, underscores, and spaces
 VALID_TAG_PATTERN = re.compile('^[a-zA-Z0-9\\-_ ]+$')
 
+# Number of file models that are created or updated in each database statement
+FILE_BATCH_SIZE = 1000
+
 
 class CountryDataManager(models.Manager):
     """Provides additional methods for handling country data
@@ -404,8 +408,8 @@ class ScaleFileManager(models.Manager):
 
     def move_files(self, file_moves):
         """Moves the given files to the new file system paths. Each ScaleFile model should have its related workspace
-        field populated. This method will update the file_path field in each ScaleFile model to the new path (it may
-        also change other ScaleFile fields) and save the changes in the database.
+        field populated. This method will update the file_path field in each ScaleFile model to the new path and save
+        the new paths in the database.
 
         :param file_moves: List of files to move
         :type file_moves: [:class:`storage.brokers.broker.FileMove`]
@@ -436,6 +440,94 @@ class ScaleFileManager(models.Manager):
             wp_file_moves = wp_dict[wp_id][1]
             workspace.move_files(wp_file_moves)
 
+    def save_deleted_files(self, files):
+        """Marks the given files as deleted and saves the changes in the database, updating the files in batches
+
+        :param files: List of files that were deleted
+        :type files: [:class:`storage.models.ScaleFile`]
+        """
+
+        when = timezone.now()
+        for scale_file in files:
+            scale_file.set_deleted(when)
+
+        file_ids = [scale_file.id for scale_file in files]
+        for i in range(0, len(file_ids), FILE_BATCH_SIZE):
+            self.filter(id__in=file_ids[i:i + FILE_BATCH_SIZE]).update(is_deleted=True, is_published=False,
+                                                                        deleted=when, unpublished=when,
+                                                                        last_modified=when)
+
+    def save_moved_files(self, files):
+        """Saves the new file_path fields of the given files in the database, updating the files in batches. Only the
+        file_path field is saved and files that are not yet in the database are skipped, so the caller is responsible
+        for saving any other changes to the files.
+
+        :param files: List of files that were moved
+        :type files: [:class:`storage.models.ScaleFile`]
+        """
+
+        files = [scale_file for scale_file in files if scale_file.pk]
+        when = timezone.now()
+        for i in range(0, len(files), FILE_BATCH_SIZE):
+            batch = files[i:i + FILE_BATCH_SIZE]
+            file_paths = [models.When(id=scale_file.id, then=models.Value(scale_file.file_path))
+                          for scale_file in batch]
+            file_path = models.Case(*file_paths, output_field=models.CharField())
+            self.filter(id__in=[scale_file.id for scale_file in batch]).update(file_path=file_path, last_modified=when)
+
+    def save_registered_files(self, files):
+        """Saves the given files that were registered in their workspaces in the database. New file models are created
+        in batches, while the fields of existing file models that describe the registered file are updated in batches.
+        Fields with the same value for every file in a batch are set directly, the others with a CASE expression.
+
+        :param files: List of files that were registered
+        :type files: [:class:`storage.models.ScaleFile`]
+        """
+
+        new_files = [scale_file for scale_file in files if not scale_file.pk]
+        files = [scale_file for scale_file in files if scale_file.pk]
+
+        # Primary keys are populated by bulk_create() on PostgreSQL
+        self.bulk_create(new_files, batch_size=FILE_BATCH_SIZE)
+
+        field_names = ['file_name', 'file_size', 'media_type', 'data_type', 'uuid', 'workspace', 'file_path',
+                       'is_deleted', 'deleted', 'is_parsed', 'parsed', 'checksum']
+        when = timezone.now()
+        for i in range(0, len(files), FILE_BATCH_SIZE):
+            batch = files[i:i + FILE_BATCH_SIZE]
+            updates = {'last_modified': when}
+            for field_name in field_names:
+                field = self.model._meta.get_field(field_name)
+                values = [getattr(scale_file, field.attname) for scale_file in batch]
+                if all(value == values[0] for value in values):
+                    updates[field.attname] = values[0]
+                else:
+                    cases = [models.When(id=scale_file.id, then=models.Value(value))
+                             for scale_file, value in zip(batch, values)]
+                    output_field = field.target_field if field.is_relation else field
+                    updates[field.attname] = models.Case(*cases, output_field=output_field)
+            self.filter(id__in=[scale_file.id for scale_file in batch]).update(**updates)
+            for scale_file in batch:
+                scale_file.last_modified = when
+
+    def save_uploaded_files(self, files):
+        """Saves the given files in the database. New file models are created in batches, while existing file models
+        (files that were copied to a new workspace) are saved individually.
+
+        :param files: List of files that were uploaded
+        :type files: [:class:`storage.models.ScaleFile`]
+        """
+
+        new_files = []
+        for scale_file in files:
+            if scale_file.pk:
+                scale_file.save()
+            else:
+                new_files.append(scale_file)
+
+        # Primary keys are populated by bulk_create() on PostgreSQL
+        self.bulk_create(new_files, batch_size=FILE_BATCH_SIZE)
+
     def upload_files(self, workspace, file_uploads):
         """Uploads the given files from the given local file system paths into the given workspace. Each ScaleFile model
         should have its file_path field populated with the relative location where the file should be stored within the
@@ -467,12 +559,10 @@ class ScaleFileManager(models.Manager):
         # Store files in workspace
         workspace.upload_files(file_uploads)
 
-        # Populate the country list for all files that were saved
-        for file_upload in file_uploads:
-            scale_file = file_upload.file
-            if scale_file.pk:
+        # Populate the country list for all files that were saved, only files with a geometry can have countries
+        for scale_file in file_list:
+            if scale_file.pk and scale_file.geometry is not None:
                 scale_file.set_countries()
-                scale_file.save()
 
         return file_list
 
@@ -499,6 +589,8 @@ class ScaleFile(models.Model):
     :keyword uuid: A universally unique identifier for the source record. It ensures that subsequent updates of the
         record will result in the same UUID, which can then be used as a stable permanent link in applications.
     :type uuid: :class:`django.db.models.CharField`
+    :keyword checksum: The SHA-256 hex digest checksum of the file content, computed when the file was uploaded
+    :type checksum: :class:`django.db.models.CharField`
 
     :keyword created: When the file model was created
     :type created: :class:`django.db.models.DateTimeField`
@@ -583,6 +675,7 @@ class ScaleFile(models.Model):
     workspace = models.ForeignKey('storage.Workspace', on_delete=models.PROTECT)
     is_deleted = models.BooleanField(default=False)
     uuid = models.CharField(db_index=True, max_length=32)
+    checksum = models.CharField(blank=True, null=True, db_index=True, max_length=64)
 
     created = models.DateTimeField(auto_now_add=True, db_index=True)
     deleted = models.DateTimeField(blank=True, null=True)
@@ -711,11 +804,16 @@ class ScaleFile(models.Model):
             target_date = self.data_ended
         apply(self.countries.add, CountryData.objects.get_intersects(self.geometry, target_date).values())
 
-    def set_deleted(self):
-        """Marks the current file as deleted and updates the corresponding fields."""
+    def set_deleted(self, when=None):
+        """Marks the current file as deleted and updates the corresponding fields.
+
+        :param when: When the file was deleted, defaults to now
+        :type when: :class:`datetime.datetime`
+        """
         self.is_deleted = True
         self.is_published = False
-        when = timezone.now()
+        if not when:
+            when = timezone.now()
         self.deleted = when
         self.unpublished = when
 
@@ -1012,7 +1110,13 @@ class Workspace(models.Model):
         """
 
         volume_path = self._get_volume_path()
-        self.get_broker().delete_files(volume_path, files)
+        try:
+            deleted_files = self.get_broker().delete_files(volume_path, files)
+        except PartialTransfer as ex:
+            # Mark the files that were deleted before the failure
+            ScaleFile.objects.save_deleted_files(ex.files)
+            ex.reraise()
+        ScaleFile.objects.save_deleted_files(deleted_files)
 
     def download_files(self, file_downloads):
         """Downloads the given files to the given local file system paths using the workspace's broker. If this
@@ -1068,11 +1172,13 @@ class Workspace(models.Model):
         volume_path = self._get_volume_path()
         return self.get_broker().get_file_system_paths(volume_path, files)
 
-    def list_files(self, recursive):
+    def list_files(self, recursive, start_after=None):
         """Lists files within a workspace, with optional full tree recursion.
 
         :param recursive: Flag to indicate whether file searching should be done recursively
         :type recursive: boolean
+        :param start_after: The path of the file after which to resume listing, if supported by the workspace's broker
+        :type start_after: string
         :return: Generator of files matching given expression
         :rtype: Generator[:class:`storage.brokers.broker.FileDetails`]
         """
@@ -1080,10 +1186,10 @@ class Workspace(models.Model):
 
         logger.info('Beginning%s file list for workspace: %s' % (' recursive' if recursive else '',
                                                                    self.name))
-        return self.get_broker().list_files(volume_path, recursive)
+        return self.get_broker().list_files(volume_path, recursive, start_after)
 
     def move_files(self, file_moves):
-        """Moves the given files to the new file system paths and saves the ScaleFile model changes in the database. If
+        """Moves the given files to the new file system paths and saves the new file paths in the database. If
         this workspace's broker uses a container volume, the workspace expects this volume file system to already be
         mounted at workspace_volume_path or an exception will be raised.
 
@@ -1094,7 +1200,13 @@ class Workspace(models.Model):
         """
 
         volume_path = self._get_volume_path()
-        self.get_broker().move_files(volume_path, file_moves)
+        try:
+            moved_files = self.get_broker().move_files(volume_path, file_moves)
+        except PartialTransfer as ex:
+            # Save the new paths of the files that were moved before the failure
+            ScaleFile.objects.save_moved_files(ex.files)
+            ex.reraise()
+        ScaleFile.objects.save_moved_files(moved_files)
 
     def upload_files(self, file_uploads):
         """Uploads the given files from the given local file system paths and saves the ScaleFile models in the
@@ -1108,7 +1220,13 @@ class Workspace(models.Model):
         """
 
         volume_path = self._get_volume_path()
-        self.get_broker().upload_files(volume_path, file_uploads)
+        try:
+            uploaded_files = self.get_broker().upload_files(volume_path, file_uploads)
+        except PartialTransfer as ex:
+            # Save the files that were uploaded before the failure
+            ScaleFile.objects.save_uploaded_files(ex.files)
+            ex.reraise()
+        ScaleFile.objects.save_uploaded_files(uploaded_files)
 
     def _get_volume_path(self):
         """Returns the local container location for this workspace's container volume if it uses one, otherwise returns
@@ -11,3 +11,18 @@ S3_RETRY_COUNT = getattr(settings, 'S3_RETRY_COUNT', 3)
 
 # The delay between retry attempts
 S3_RETRY_DELAY = getattr(settings, 'S3_RETRY_DELAY', 60)  # 1 minute
+
+# Max number of files transferred concurrently by a single S3 broker call
+S3_TRANSFER_THREADS = getattr(settings, 'S3_TRANSFER_THREADS', 8)
+
+# Max number of files copied concurrently by a single upload call of a broker that uses a mounted volume (host, NFS)
+VOLUME_TRANSFER_THREADS = getattr(settings, 'VOLUME_TRANSFER_THREADS', 4)
+
+# Files at least this size (bytes) are transferred in parts of the given chunk size, with the given number of parts of
+# each file transferred concurrently
+S3_MULTIPART_THRESHOLD = getattr(settings, 'S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024)  # 8 MiB
+S3_MULTIPART_CHUNKSIZE = getattr(settings, 'S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024)  # 8 MiB
+S3_MULTIPART_CONCURRENCY = getattr(settings, 'S3_MULTIPART_CONCURRENCY', 4)
+
+# Whether files downloaded by brokers that stream their content are verified against their recorded checksums
+VERIFY_FILE_CHECKSUMS = getattr(settings, 'VERIFY_FILE_CHECKSUMS', False)
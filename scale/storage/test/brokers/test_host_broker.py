@@ -6,13 +6,14 @@ import tempfile
 import uuid
 
 import django
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from mock import call, patch
 
 import storage.test.utils as storage_test_utils
 from storage.brokers.broker import FileDownload, FileMove, FileUpload
-from storage.brokers.exceptions import InvalidBrokerConfiguration
+from storage.brokers.exceptions import InvalidBrokerConfiguration, PartialTransfer
 from storage.brokers.host_broker import HostBroker
+from storage.exceptions import MissingFile
 
 
 class TestHostBrokerDeleteFiles(TestCase):
@@ -42,16 +43,13 @@ class TestHostBrokerDeleteFiles(TestCase):
         file_2 = storage_test_utils.create_file(file_path=file_path_2)
 
         # Call method to test
-        self.broker.delete_files(volume_path, [file_1, file_2])
+        deleted_files = self.broker.delete_files(volume_path, [file_1, file_2])
 
         # Check results
         two_calls = [call(full_path_file_1), call(full_path_file_2)]
         mock_remove.assert_has_calls(two_calls)
 
-        self.assertTrue(file_1.is_deleted)
-        self.assertIsNotNone(file_1.deleted)
-        self.assertTrue(file_2.is_deleted)
-        self.assertIsNotNone(file_2.deleted)
+        self.assertListEqual(deleted_files, [file_1, file_2])
 
 
 class TestHostBrokerDownloadFiles(TestCase):
@@ -263,9 +261,10 @@ class TestHostBrokerMoveFiles(TestCase):
         file_2_mv = FileMove(file_2, new_workspace_path_2)
 
         # Call method to test
-        self.broker.move_files(volume_path, [file_1_mv, file_2_mv])
+        moved_files = self.broker.move_files(volume_path, [file_1_mv, file_2_mv])
 
         # Check results
+        self.assertListEqual(moved_files, [file_1, file_2])
         two_calls = [call(os.path.dirname(full_new_workspace_path_1), mode=0755),
                      call(os.path.dirname(full_new_workspace_path_2), mode=0755)]
         mock_makedirs.assert_has_calls(two_calls)
@@ -278,6 +277,39 @@ class TestHostBrokerMoveFiles(TestCase):
         self.assertEqual(file_1.file_path, new_workspace_path_1)
         self.assertEqual(file_2.file_path, new_workspace_path_2)
 
+    @patch('storage.brokers.host_broker.os.makedirs')
+    @patch('storage.brokers.host_broker.os.path.exists')
+    @patch('storage.brokers.host_broker.os.chmod')
+    @patch('storage.brokers.host_broker.shutil.move')
+    def test_partial_failure(self, mock_move, mock_chmod, mock_exists, mock_makedirs):
+        """Tests calling HostBroker.move_files() when a file is missing after another file was already moved"""
+
+        def new_exists(path):
+            return path.count('new') == 0 and path.count('missing') == 0
+        mock_exists.side_effect = new_exists
+
+        volume_path = os.path.join('the', 'volume', 'path')
+        old_workspace_path_1 = os.path.join('my_dir_1', 'my_file.txt')
+        old_workspace_path_2 = os.path.join('my_missing_dir_2', 'my_file.json')
+        new_workspace_path_1 = os.path.join('my_new_dir_1', 'my_file.txt')
+        new_workspace_path_2 = os.path.join('my_new_dir_2', 'my_file.json')
+
+        file_1 = storage_test_utils.create_file(file_path=old_workspace_path_1)
+        file_2 = storage_test_utils.create_file(file_path=old_workspace_path_2)
+        file_1_mv = FileMove(file_1, new_workspace_path_1)
+        file_2_mv = FileMove(file_2, new_workspace_path_2)
+
+        # Call method to test
+        with self.assertRaises(PartialTransfer) as context:
+            self.broker.move_files(volume_path, [file_1_mv, file_2_mv])
+
+        # Check results
+        self.assertListEqual(context.exception.files, [file_1])
+        self.assertIsInstance(context.exception.error, MissingFile)
+        self.assertEqual(mock_move.call_count, 1)
+        self.assertEqual(file_1.file_path, new_workspace_path_1)
+        self.assertEqual(file_2.file_path, old_workspace_path_2)
+
 
 class TestHostBrokerUploadFiles(TestCase):
 
@@ -290,13 +322,14 @@ class TestHostBrokerUploadFiles(TestCase):
     @patch('storage.brokers.host_broker.os.makedirs')
     @patch('storage.brokers.host_broker.os.path.exists')
     @patch('storage.brokers.host_broker.os.chmod')
-    @patch('storage.brokers.host_broker.shutil.copy')
+    @patch('storage.brokers.host_broker.copy_file')
     def test_successfully(self, mock_copy, mock_chmod, mock_exists, mock_makedirs):
         """Tests calling HostBroker.upload_files() successfully"""
 
         def new_exists(path):
             return False
         mock_exists.side_effect = new_exists
+        mock_copy.return_value = 'checksum'
 
         volume_path = os.path.join('the', 'volume', 'path')
         file_name_1 = 'my_file.txt'
@@ -314,17 +347,46 @@ class TestHostBrokerUploadFiles(TestCase):
         file_2_up = FileUpload(file_2, local_path_file_2)
 
         # Call method to test
-        self.broker.upload_files(volume_path, [file_1_up, file_2_up])
+        uploaded_files = self.broker.upload_files(volume_path, [file_1_up, file_2_up])
 
         # Check results
+        self.assertListEqual(uploaded_files, [file_1, file_2])
         two_calls = [call(os.path.dirname(full_workspace_path_file_1), mode=0755),
                      call(os.path.dirname(full_workspace_path_file_2), mode=0755)]
         mock_makedirs.assert_has_calls(two_calls)
         two_calls = [call(local_path_file_1, full_workspace_path_file_1),
                      call(local_path_file_2, full_workspace_path_file_2)]
-        mock_copy.assert_has_calls(two_calls)
+        mock_copy.assert_has_calls(two_calls, any_order=True)
         two_calls = [call(full_workspace_path_file_1, 0644), call(full_workspace_path_file_2, 0644)]
-        mock_chmod.assert_has_calls(two_calls)
+        mock_chmod.assert_has_calls(two_calls, any_order=True)
+        self.assertEqual(file_1.checksum, 'checksum')
+        self.assertEqual(file_2.checksum, 'checksum')
+
+    @override_settings(VOLUME_TRANSFER_THREADS=1)
+    @patch('storage.brokers.host_broker.os.makedirs')
+    @patch('storage.brokers.host_broker.os.path.exists')
+    @patch('storage.brokers.host_broker.os.chmod')
+    @patch('storage.brokers.host_broker.copy_file')
+    def test_partial_failure(self, mock_copy, mock_chmod, mock_exists, mock_makedirs):
+        """Tests calling HostBroker.upload_files() when a copy fails after another file was already uploaded"""
+
+        mock_exists.return_value = True
+        mock_copy.side_effect = ['checksum', IOError('Copy failed')]
+
+        volume_path = os.path.join('the', 'volume', 'path')
+        file_1 = storage_test_utils.create_file(file_path=os.path.join('my_wrk_dir_1', 'my_file.txt'))
+        file_2 = storage_test_utils.create_file(file_path=os.path.join('my_wrk_dir_2', 'my_file.json'))
+        file_1_up = FileUpload(file_1, os.path.join('my_dir_1', 'my_file.txt'))
+        file_2_up = FileUpload(file_2, os.path.join('my_dir_2', 'my_file.json'))
+
+        # Call method to test
+        with self.assertRaises(PartialTransfer) as context:
+            self.broker.upload_files(volume_path, [file_1_up, file_2_up])
+
+        # Check results
+        self.assertListEqual(context.exception.files, [file_1])
+        self.assertIsInstance(context.exception.error, IOError)
+        self.assertEqual(mock_copy.call_count, 2)
 
 
 class TestHostBrokerValidateConfiguration(TestCase):
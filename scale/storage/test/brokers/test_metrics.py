@@ -0,0 +1,89 @@
+from __future__ import unicode_literals
+
+import os
+from collections import namedtuple
+
+import django
+from django.test import TestCase
+from mock import MagicMock, patch
+
+from storage.brokers.broker import FileDownload
+from storage.brokers.host_broker import HostBroker
+from storage.brokers.metrics import record_transfer, transfer_metrics, OPERATION_DELETE, OPERATION_DOWNLOAD
+
+
+class TestRecordTransfer(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+        transfer_metrics.clear()
+
+    def tearDown(self):
+        transfer_metrics.clear()
+
+    def test_successful_call(self):
+        """Tests recording a successful broker call"""
+
+        class Broker(object):
+            broker_type = 'test'
+
+            @record_transfer(OPERATION_DOWNLOAD)
+            def download_files(self, volume_path, file_downloads):
+                return len(file_downloads)
+
+        file_1 = MagicMock(file_size=100)
+        file_2 = MagicMock(file_size=None)
+        file_downloads = [FileDownload(file_1, 'path_1', False), FileDownload(file_2, 'path_2', False)]
+        transfer_metrics.record_concurrency('test', OPERATION_DOWNLOAD, 2)
+        transfer_metrics.record_retry('test', OPERATION_DOWNLOAD)
+
+        result = Broker().download_files(None, file_downloads)
+
+        self.assertEqual(result, 2)
+        metrics = transfer_metrics.get_summary()['test'][OPERATION_DOWNLOAD]
+        self.assertEqual(metrics['calls'], 1)
+        self.assertEqual(metrics['errors'], 0)
+        self.assertEqual(metrics['files'], 2)
+        self.assertEqual(metrics['bytes'], 100)
+        self.assertEqual(metrics['retries'], 1)
+        self.assertEqual(metrics['max_concurrency'], 2)
+        self.assertEqual(metrics['call_ms']['count'], 1)
+
+    def test_failed_call(self):
+        """Tests recording a broker call that raises an error"""
+
+        class Broker(object):
+            broker_type = 'test'
+
+            @record_transfer(OPERATION_DELETE)
+            def delete_files(self, volume_path, files):
+                raise Exception('Delete failed')
+
+        self.assertRaises(Exception, Broker().delete_files, None, [MagicMock(file_size=100)])
+
+        metrics = transfer_metrics.get_summary()['test'][OPERATION_DELETE]
+        self.assertEqual(metrics['calls'], 1)
+        self.assertEqual(metrics['errors'], 1)
+        self.assertEqual(metrics['files'], 0)
+        self.assertEqual(metrics['bytes'], 0)
+
+    @patch('storage.brokers.host_broker.os.path.exists')
+    @patch('storage.brokers.host_broker.os.remove')
+    def test_keyword_arguments(self, mock_remove, mock_exists):
+        """Tests recording a call to a real broker that passes its arguments by keyword, as the delete files job does"""
+
+        mock_exists.return_value = True
+        broker = HostBroker()
+        broker.load_configuration({'type': HostBroker().broker_type, 'host_path': '/host/path'})
+        scale_file = namedtuple('ScaleFile', ['id', 'file_path', 'workspace'])
+        files = [scale_file(id=1, file_path='my_dir/my_file.txt', workspace='my_workspace')]
+
+        broker.delete_files(volume_path=os.path.join('the', 'volume', 'path'), files=files)
+
+        self.assertEqual(mock_remove.call_count, 1)
+        metrics = transfer_metrics.get_summary()[broker.broker_type][OPERATION_DELETE]
+        self.assertEqual(metrics['calls'], 1)
+        self.assertEqual(metrics['errors'], 0)
+        self.assertEqual(metrics['files'], 1)
+        self.assertEqual(metrics['bytes'], 0)
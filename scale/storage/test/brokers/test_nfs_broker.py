@@ -39,16 +39,13 @@ class TestNfsBrokerDeleteFiles(TestCase):
         file_2 = storage_test_utils.create_file(file_path=file_path_2)
 
         # Call method to test
-        self.broker.delete_files(volume_path, [file_1, file_2])
+        deleted_files = self.broker.delete_files(volume_path, [file_1, file_2])
 
         # Check results
         two_calls = [call(full_path_file_1), call(full_path_file_2)]
         mock_remove.assert_has_calls(two_calls)
 
-        self.assertTrue(file_1.is_deleted)
-        self.assertIsNotNone(file_1.deleted)
-        self.assertTrue(file_2.is_deleted)
-        self.assertIsNotNone(file_2.deleted)
+        self.assertListEqual(deleted_files, [file_1, file_2])
 
 
 class TestNfsBrokerDownloadFiles(TestCase):
@@ -147,9 +144,10 @@ class TestNfsBrokerMoveFiles(TestCase):
         file_2_mv = FileMove(file_2, new_workspace_path_2)
 
         # Call method to test
-        self.broker.move_files(volume_path, [file_1_mv, file_2_mv])
+        moved_files = self.broker.move_files(volume_path, [file_1_mv, file_2_mv])
 
         # Check results
+        self.assertListEqual(moved_files, [file_1, file_2])
         two_calls = [call(os.path.dirname(full_new_workspace_path_1), mode=0755),
                      call(os.path.dirname(full_new_workspace_path_2), mode=0755)]
         mock_makedirs.assert_has_calls(two_calls)
@@ -174,13 +172,14 @@ class TestNfsBrokerUploadFiles(TestCase):
     @patch('storage.brokers.nfs_broker.os.makedirs')
     @patch('storage.brokers.nfs_broker.os.path.exists')
     @patch('storage.brokers.nfs_broker.os.chmod')
-    @patch('storage.brokers.nfs_broker.shutil.copy')
+    @patch('storage.brokers.nfs_broker.copy_file')
     def test_successfully(self, mock_copy, mock_chmod, mock_exists, mock_makedirs):
         """Tests calling NfsBroker.upload_files() successfully"""
 
         def new_exists(path):
             return False
         mock_exists.side_effect = new_exists
+        mock_copy.return_value = 'checksum'
 
         volume_path = os.path.join('the', 'volume', 'path')
         file_name_1 = 'my_file.txt'
@@ -233,17 +232,20 @@ class TestNfsBrokerUploadFiles(TestCase):
 """ % (os.path.abspath(volume_path),)
         mo = mock_open(read_data=mountstats_data)
         with patch('__builtin__.open', mo, create=True) as pmo:
-            self.broker.upload_files(volume_path, [file_1_up, file_2_up])
+            uploaded_files = self.broker.upload_files(volume_path, [file_1_up, file_2_up])
 
         # Check results
+        self.assertListEqual(uploaded_files, [file_1, file_2])
         two_calls = [call(os.path.dirname(full_workspace_path_file_1), mode=0755),
                      call(os.path.dirname(full_workspace_path_file_2), mode=0755)]
         mock_makedirs.assert_has_calls(two_calls)
         two_calls = [call(local_path_file_1, full_workspace_path_file_1),
                      call(local_path_file_2, full_workspace_path_file_2)]
-        mock_copy.assert_has_calls(two_calls)
+        mock_copy.assert_has_calls(two_calls, any_order=True)
         two_calls = [call(full_workspace_path_file_1, 0644), call(full_workspace_path_file_2, 0644)]
-        mock_chmod.assert_has_calls(two_calls)
+        mock_chmod.assert_has_calls(two_calls, any_order=True)
+        self.assertEqual(file_1.checksum, 'checksum')
+        self.assertEqual(file_2.checksum, 'checksum')
 
 
 class TestNfsBrokerValidateConfiguration(TestCase):
@@ -1,15 +1,19 @@
 from __future__ import unicode_literals
 
+import hashlib
 import os
+import ssl
 
 import django
+from botocore.exceptions import ClientError
 from django.test import TestCase
 from mock import MagicMock, Mock, call, mock_open, patch
 
 import storage.test.utils as storage_test_utils
 from storage.brokers.broker import FileDownload, FileMove, FileUpload
-from storage.brokers.exceptions import InvalidBrokerConfiguration
+from storage.brokers.exceptions import InvalidBrokerConfiguration, PartialTransfer
 from storage.brokers.s3_broker import S3Broker
+from storage.exceptions import ChecksumMismatch, MissingFile
 from util.aws import S3Client
 
 
@@ -33,10 +37,8 @@ class TestS3Broker(TestCase):
     def test_delete_files(self, mock_client_class):
         """Tests deleting files successfully"""
 
-        s3_object_1 = MagicMock()
-        s3_object_2 = MagicMock()
         mock_client = MagicMock(S3Client)
-        mock_client.get_object.side_effect = [s3_object_1, s3_object_2]
+        mock_client.delete_objects.return_value = []
         mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
 
         file_path_1 = os.path.join('my_dir', 'my_file.txt')
@@ -46,15 +48,44 @@ class TestS3Broker(TestCase):
         file_2 = storage_test_utils.create_file(file_path=file_path_2)
 
         # Call method to test
-        self.broker.delete_files(None, [file_1, file_2])
+        deleted_files = self.broker.delete_files(None, [file_1, file_2])
 
         # Check results
-        self.assertTrue(s3_object_1.delete.called)
-        self.assertTrue(s3_object_2.delete.called)
-        self.assertTrue(file_1.is_deleted)
-        self.assertIsNotNone(file_1.deleted)
-        self.assertTrue(file_2.is_deleted)
-        self.assertIsNotNone(file_2.deleted)
+        mock_client.delete_objects.assert_called_once_with('my_bucket.domain.com', [file_path_1, file_path_2])
+        self.assertListEqual(deleted_files, [file_1, file_2])
+
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_delete_files_failed(self, mock_client_class):
+        """Tests deleting files when one of the files fails to be deleted"""
+
+        mock_client = MagicMock(S3Client)
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        file_path_1 = os.path.join('my_dir', 'my_file.txt')
+        file_path_2 = os.path.join('my_dir', 'my_file.json')
+        mock_client.delete_objects.return_value = [{'Key': file_path_2, 'Code': 'AccessDenied', 'Message': 'Denied'}]
+
+        file_1 = storage_test_utils.create_file(file_path=file_path_1)
+        file_2 = storage_test_utils.create_file(file_path=file_path_2)
+
+        # Call method to test
+        with self.assertRaises(PartialTransfer) as context:
+            self.broker.delete_files(None, [file_1, file_2])
+
+        # Check results
+        self.assertListEqual(context.exception.files, [file_1])
+
+    @patch('storage.brokers.s3_broker.time.sleep')
+    def test_delete_files_retries_exhausted(self, mock_sleep):
+        """Tests that the SSL error is raised when every attempt to delete files fails"""
+
+        mock_client = MagicMock(S3Client)
+        mock_client.delete_objects.side_effect = ssl.SSLError('Connection reset')
+        file_1 = storage_test_utils.create_file(file_path=os.path.join('my_dir', 'my_file.txt'))
+
+        # Call method to test
+        self.assertRaises(ssl.SSLError, self.broker._delete_objects, mock_client, [file_1], retries=3)
+        self.assertEqual(mock_client.delete_objects.call_count, 3)
 
     @patch('os.path.exists')
     @patch('storage.brokers.s3_broker.S3Client')
@@ -88,6 +119,80 @@ class TestS3Broker(TestCase):
         # Check results
         self.assertTrue(s3_object_1.download_file.called)
         self.assertTrue(s3_object_2.download_file.called)
+        self.assertFalse(s3_object_1.get.called)
+        self.assertFalse(s3_object_2.get.called)
+
+    @patch('storage.brokers.s3_broker.settings.VERIFY_FILE_CHECKSUMS', True)
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_download_files_verify_checksum(self, mock_client_class):
+        """Tests downloading files whose checksums are verified"""
+
+        s3_object_1 = MagicMock()
+        s3_object_2 = MagicMock()
+        mock_client = MagicMock(S3Client)
+        mock_client.get_object.side_effect = [s3_object_1, s3_object_2]
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        def new_download_fileobj(file_obj, Config):
+            file_obj.write(b'my content')
+        s3_object_1.download_fileobj.side_effect = new_download_fileobj
+
+        file_1 = storage_test_utils.create_file(file_path='my_wrk_dir_1/my_file.txt',
+                                                checksum=hashlib.sha256(b'my content').hexdigest())
+        file_2 = storage_test_utils.create_file(file_path='my_wrk_dir_2/my_file.json')
+        file_1_dl = FileDownload(file_1, 'my_dir_1/my_file.txt', False)
+        file_2_dl = FileDownload(file_2, 'my_dir_2/my_file.json', False)
+
+        # Call method to test
+        mo = mock_open()
+        with patch('__builtin__.open', mo, create=True):
+            self.broker.download_files(None, [file_1_dl, file_2_dl])
+
+        # Check results, a file without a recorded checksum is not verified
+        self.assertTrue(s3_object_1.download_fileobj.called)
+        self.assertFalse(s3_object_1.download_file.called)
+        self.assertTrue(s3_object_2.download_file.called)
+        mo.return_value.write.assert_called_once_with(b'my content')
+
+    @patch('storage.brokers.s3_broker.settings.VERIFY_FILE_CHECKSUMS', True)
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_download_files_checksum_mismatch(self, mock_client_class):
+        """Tests downloading a file whose content does not match its recorded checksum"""
+
+        s3_object = MagicMock()
+        mock_client = MagicMock(S3Client)
+        mock_client.get_object.return_value = s3_object
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        def new_download_fileobj(file_obj, Config):
+            file_obj.write(b'corrupted content')
+        s3_object.download_fileobj.side_effect = new_download_fileobj
+
+        file_1 = storage_test_utils.create_file(file_path='my_wrk_dir_1/my_file.txt',
+                                                checksum=hashlib.sha256(b'my content').hexdigest())
+        file_1_dl = FileDownload(file_1, 'my_dir_1/my_file.txt', False)
+
+        # Call method to test
+        mo = mock_open()
+        with patch('__builtin__.open', mo, create=True):
+            self.assertRaises(ChecksumMismatch, self.broker.download_files, None, [file_1_dl])
+
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_download_files_missing(self, mock_client_class):
+        """Tests downloading a file that does not exist in the bucket"""
+
+        s3_object = MagicMock()
+        error_response = {'Error': {'Code': '404', 'Message': 'Not Found'}, 'ResponseMetadata': {'HTTPStatusCode': 404}}
+        s3_object.download_file.side_effect = ClientError(error_response, 'HeadObject')
+        mock_client = MagicMock(S3Client)
+        mock_client.get_object.return_value = s3_object
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        file_1 = storage_test_utils.create_file(file_path=os.path.join('my_wrk_dir_1', 'my_file.txt'))
+        file_1_dl = FileDownload(file_1, os.path.join('my_dir_1', 'my_file.txt'), False)
+
+        # Call method to test
+        self.assertRaises(MissingFile, self.broker.download_files, None, [file_1_dl])
 
     # Patching in storage.brokers.s3_broker as opposed to util.aws / util.command because patch must be applied where
     # import is made, not on source
@@ -173,6 +278,7 @@ class TestS3Broker(TestCase):
         s3_object_2b = MagicMock()
         mock_client = MagicMock(S3Client)
         mock_client.get_object.side_effect = [s3_object_1a, s3_object_1b, s3_object_2a, s3_object_2b]
+        mock_client.delete_objects.return_value = []
         mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
 
         file_name_1 = 'my_file.txt'
@@ -188,16 +294,64 @@ class TestS3Broker(TestCase):
         file_2_mv = FileMove(file_2, new_workspace_path_2)
 
         # Call method to test
-        self.broker.move_files(None, [file_1_mv, file_2_mv])
+        moved_files = self.broker.move_files(None, [file_1_mv, file_2_mv])
 
         # Check results
+        self.assertListEqual(moved_files, [file_1, file_2])
         self.assertTrue(s3_object_1b.copy_from.called)
-        self.assertTrue(s3_object_1a.delete.called)
         self.assertTrue(s3_object_2b.copy_from.called)
-        self.assertTrue(s3_object_2a.delete.called)
+        mock_client.delete_objects.assert_called_once_with('my_bucket.domain.com', [old_workspace_path_1,
+                                                                                   old_workspace_path_2])
         self.assertEqual(file_1.file_path, new_workspace_path_1)
         self.assertEqual(file_2.file_path, new_workspace_path_2)
 
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_move_files_delete_failed(self, mock_client_class):
+        """Tests moving files when one of the sources fails to be deleted after it was copied"""
+
+        mock_client = MagicMock(S3Client)
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        old_workspace_path_1 = os.path.join('my_dir_1', 'my_file.txt')
+        old_workspace_path_2 = os.path.join('my_dir_2', 'my_file.json')
+        mock_client.delete_objects.return_value = [{'Key': old_workspace_path_2, 'Code': 'AccessDenied',
+                                                    'Message': 'Denied'}]
+
+        file_1 = storage_test_utils.create_file(file_path=old_workspace_path_1)
+        file_2 = storage_test_utils.create_file(file_path=old_workspace_path_2)
+        file_1_mv = FileMove(file_1, os.path.join('my_new_dir_1', 'my_file.txt'))
+        file_2_mv = FileMove(file_2, os.path.join('my_new_dir_2', 'my_file.json'))
+
+        # Call method to test
+        with self.assertRaises(PartialTransfer) as context:
+            self.broker.move_files(None, [file_1_mv, file_2_mv])
+
+        # Check results, both files were copied to their new paths
+        self.assertListEqual(context.exception.files, [file_1, file_2])
+        self.assertEqual(file_2.file_path, os.path.join('my_new_dir_2', 'my_file.json'))
+
+    @patch('storage.brokers.s3_broker.S3Client')
+    def test_move_files_multipart(self, mock_client_class):
+        """Tests moving a large file with a multipart server side copy"""
+
+        s3_object_src = MagicMock()
+        s3_object_dest = MagicMock()
+        mock_client = MagicMock(S3Client)
+        mock_client.get_object.side_effect = [s3_object_src, s3_object_dest]
+        mock_client.delete_objects.return_value = []
+        mock_client_class.return_value.__enter__ = Mock(return_value=mock_client)
+
+        file_1 = storage_test_utils.create_file(file_path=os.path.join('my_dir_1', 'my_file.txt'),
+                                               file_size=1024 * 1024 * 1024)
+        file_1_mv = FileMove(file_1, os.path.join('my_new_dir_1', 'my_file.txt'))
+
+        # Call method to test
+        self.broker.move_files(None, [file_1_mv])
+
+        # Check results
+        self.assertTrue(s3_object_dest.copy.called)
+        self.assertFalse(s3_object_dest.copy_from.called)
+
     @patch('storage.brokers.s3_broker.S3Client')
     def test_upload_files(self, mock_client_class):
         """Tests uploading files successfully"""
@@ -220,16 +374,24 @@ class TestS3Broker(TestCase):
         file_1_up = FileUpload(file_1, local_path_file_1)
         file_2_up = FileUpload(file_2, local_path_file_2)
 
+        def new_upload_fileobj(file_obj, options, Config):
+            file_obj.read()
+        s3_object_1.upload_fileobj.side_effect = new_upload_fileobj
+        s3_object_2.upload_fileobj.side_effect = new_upload_fileobj
+
         # Call method to test
-        mo = mock_open()
+        mo = mock_open(read_data=b'my content')
         with patch('__builtin__.open', mo, create=True):
-            self.broker.upload_files(None, [file_1_up, file_2_up])
+            uploaded_files = self.broker.upload_files(None, [file_1_up, file_2_up])
 
         # Check results
-        self.assertTrue(s3_object_1.upload_file.called)
-        self.assertTrue(s3_object_2.upload_file.called)
-        self.assertEqual(s3_object_1.upload_file.call_args[0][1]['ContentType'], 'text/plain')
-        self.assertEqual(s3_object_2.upload_file.call_args[0][1]['ContentType'], 'application/json')
+        self.assertListEqual(uploaded_files, [file_1, file_2])
+        self.assertTrue(s3_object_1.upload_fileobj.called)
+        self.assertTrue(s3_object_2.upload_fileobj.called)
+        self.assertEqual(s3_object_1.upload_fileobj.call_args[0][1]['ContentType'], 'text/plain')
+        self.assertEqual(s3_object_2.upload_fileobj.call_args[0][1]['ContentType'], 'application/json')
+        self.assertEqual(file_1.checksum, hashlib.sha256(b'my content').hexdigest())
+        self.assertEqual(file_2.checksum, hashlib.sha256(b'my content').hexdigest())
 
     def test_validate_configuration_roles(self):
         """Tests validating a configuration based on IAM roles successfully"""
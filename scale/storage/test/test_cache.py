@@ -0,0 +1,122 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+
+import django
+from django.test import TestCase
+from django.utils.timezone import now
+from mock import MagicMock, patch
+
+from storage.brokers.broker import FileDownload
+from storage.cache import InputFileCache
+
+
+class TestInputFileCache(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.input_dir = tempfile.mkdtemp()
+        self.cache = InputFileCache(self.cache_dir, 100, 0)
+        self.cache.start_lease('1_1')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.input_dir)
+
+    def _create_file(self, file_id, file_size):
+        scale_file = MagicMock()
+        scale_file.id = file_id
+        scale_file.file_size = file_size
+        scale_file.last_modified = now()
+        return scale_file
+
+    @staticmethod
+    def _download_files(file_downloads):
+        for file_download in file_downloads:
+            with open(file_download.local_path, 'w') as downloaded_file:
+                downloaded_file.write('x' * file_download.file.file_size)
+
+    @patch('storage.cache.ScaleFile.objects.download_files')
+    def test_download_files_hit(self, mock_download_files):
+        """Tests downloading a file a second time links the cached copy instead of downloading it"""
+
+        mock_download_files.side_effect = TestInputFileCache._download_files
+        scale_file = self._create_file(1, 10)
+        path_1 = os.path.join(self.input_dir, 'file_1')
+        path_2 = os.path.join(self.input_dir, 'file_2')
+
+        self.cache.download_files([FileDownload(scale_file, path_1, False)])
+        self.cache.download_files([FileDownload(scale_file, path_2, False)])
+
+        self.assertEqual(mock_download_files.call_count, 2)
+        self.assertListEqual(mock_download_files.call_args[0][0], [])
+        self.assertTrue(os.path.samefile(path_2, path_1))
+        self.assertDictEqual(self.cache.get_counts(), {'hits': 1, 'hit_bytes': 10, 'misses': 1, 'miss_bytes': 10})
+
+    @patch('storage.cache.ScaleFile.objects.download_files')
+    def test_download_files_evict(self, mock_download_files):
+        """Tests that the least recently used files that are not leased are evicted to stay within the maximum size"""
+
+        mock_download_files.side_effect = TestInputFileCache._download_files
+        file_1 = self._create_file(1, 40)
+        file_2 = self._create_file(2, 40)
+        file_3 = self._create_file(3, 40)
+        self.cache.download_files([FileDownload(file_1, os.path.join(self.input_dir, 'file_1'), False),
+                                   FileDownload(file_2, os.path.join(self.input_dir, 'file_2'), False)])
+        # Release the lease and make file 1 the least recently used
+        self.cache.start_lease('1_2')
+        os.remove(os.path.join(self.cache_dir, 'leases', '1_1'))
+        old = time.time() - 60
+        os.utime(self.cache._get_cache_path(file_1), (old, old))
+
+        self.cache.download_files([FileDownload(file_3, os.path.join(self.input_dir, 'file_3'), False)])
+
+        self.assertFalse(os.path.exists(self.cache._get_cache_path(file_1)))
+        self.assertTrue(os.path.exists(self.cache._get_cache_path(file_2)))
+        self.assertTrue(os.path.exists(self.cache._get_cache_path(file_3)))
+
+    @patch('storage.cache.ScaleFile.objects.download_files')
+    def test_download_files_leased(self, mock_download_files):
+        """Tests that leased files are never evicted and that a file without room is downloaded directly"""
+
+        mock_download_files.side_effect = TestInputFileCache._download_files
+        file_1 = self._create_file(1, 60)
+        file_2 = self._create_file(2, 60)
+        path_2 = os.path.join(self.input_dir, 'file_2')
+        self.cache.download_files([FileDownload(file_1, os.path.join(self.input_dir, 'file_1'), False)])
+
+        self.cache.download_files([FileDownload(file_2, path_2, False)])
+
+        self.assertTrue(os.path.exists(self.cache._get_cache_path(file_1)))
+        self.assertFalse(os.path.exists(self.cache._get_cache_path(file_2)))
+        self.assertTrue(os.path.isfile(path_2))
+        self.assertEqual(self.cache.misses, 1)
+
+    @patch('storage.cache.ScaleFile.objects.download_files')
+    def test_download_files_partial(self, mock_download_files):
+        """Tests that partial file downloads are never cached"""
+
+        scale_file = self._create_file(1, 10)
+        file_download = FileDownload(scale_file, os.path.join(self.input_dir, 'file_1'), True)
+
+        self.cache.download_files([file_download])
+
+        mock_download_files.assert_called_once_with([file_download])
+        self.assertListEqual(os.listdir(os.path.join(self.cache_dir, 'files')), [])
+
+    @patch('storage.cache.ScaleFile.objects.download_files')
+    def test_download_files_disabled(self, mock_download_files):
+        """Tests that files are downloaded directly when the cache is disabled"""
+
+        cache = InputFileCache(None, 100, 0)
+        cache.start_lease('1_1')
+        file_download = FileDownload(self._create_file(1, 10), os.path.join(self.input_dir, 'file_1'), False)
+
+        cache.download_files([file_download])
+
+        mock_download_files.assert_called_once_with([file_download])
@@ -0,0 +1,65 @@
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+
+from storage.checksum import copy_file, ChecksumReader, ChecksumWriter
+
+
+class TestCopyFile(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_successfully(self):
+        """Tests calling copy_file() successfully"""
+
+        content = os.urandom(3 * 1024 * 1024 + 17)
+        src_path = os.path.join(self.temp_dir, 'src.dat')
+        dest_path = os.path.join(self.temp_dir, 'dest.dat')
+        with open(src_path, 'wb') as src_file:
+            src_file.write(content)
+
+        checksum = copy_file(src_path, dest_path)
+
+        self.assertEqual(checksum, hashlib.sha256(content).hexdigest())
+        with open(dest_path, 'rb') as dest_file:
+            self.assertEqual(dest_file.read(), content)
+
+
+class TestChecksumReader(TestCase):
+
+    def test_read(self):
+        """Tests computing a checksum while reading in blocks"""
+
+        reader = ChecksumReader(io.BytesIO(b'my file content'))
+
+        self.assertEqual(reader.read(4), b'my f')
+        self.assertEqual(reader.read(), b'ile content')
+        self.assertEqual(reader.read(4), b'')
+        self.assertEqual(reader.hexdigest(), hashlib.sha256(b'my file content').hexdigest())
+        self.assertFalse(hasattr(reader, 'seek'))
+
+
+class TestChecksumWriter(TestCase):
+
+    def test_write(self):
+        """Tests computing a checksum while writing in blocks"""
+
+        file_obj = io.BytesIO()
+        writer = ChecksumWriter(file_obj)
+
+        writer.write(b'my f')
+        writer.write(b'ile content')
+
+        self.assertEqual(file_obj.getvalue(), b'my file content')
+        self.assertEqual(writer.hexdigest(), hashlib.sha256(b'my file content').hexdigest())
+        self.assertFalse(hasattr(writer, 'seek'))
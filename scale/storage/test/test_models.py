@@ -13,7 +13,8 @@ from mock import MagicMock, patch
 
 import storage.test.utils as storage_test_utils
 from storage.brokers.broker import FileDownload, FileMove, FileUpload
-from storage.exceptions import ArchivedWorkspace, DeletedFile, InvalidDataTypeTag
+from storage.brokers.exceptions import PartialTransfer
+from storage.exceptions import ArchivedWorkspace, DeletedFile, InvalidDataTypeTag, MissingFile
 from storage.models import CountryData, ScaleFile, Workspace
 from storage.brokers.exceptions import InvalidBrokerConfiguration
 
@@ -177,6 +178,22 @@ class TestScaleFileManagerDeleteFiles(TestCase):
         workspace_2.delete_files.assert_called_once_with([file_2])
 
 
+    @patch('storage.models.os.path.exists')
+    def test_partial_failure(self, mock_exists):
+        """Tests that the files deleted before a delete fails are marked as deleted"""
+
+        mock_exists.return_value = True
+        workspace = storage_test_utils.create_workspace()
+        file_1 = storage_test_utils.create_file(workspace=workspace)
+        file_2 = storage_test_utils.create_file(workspace=workspace)
+        workspace.get_broker = MagicMock()
+        workspace.get_broker.return_value.delete_files.side_effect = PartialTransfer([file_1], Exception('Failed'))
+
+        self.assertRaises(Exception, ScaleFile.objects.delete_files, [file_1, file_2])
+
+        self.assertTrue(ScaleFile.objects.get(id=file_1.id).is_deleted)
+        self.assertFalse(ScaleFile.objects.get(id=file_2.id).is_deleted)
+
 class TestScaleFileManagerDownloadFiles(TestCase):
 
     def setUp(self):
@@ -346,6 +363,116 @@ class TestScaleFileManagerMoveFiles(TestCase):
         self.assertRaises(DeletedFile, ScaleFile.objects.move_files, files)
 
 
+    @patch('storage.models.os.path.exists')
+    def test_partial_failure(self, mock_exists):
+        """Tests that the files moved before a move fails have their new paths saved"""
+
+        mock_exists.return_value = True
+        workspace = storage_test_utils.create_workspace()
+        file_1 = storage_test_utils.create_file(file_path='old/path/file_1.txt', workspace=workspace)
+        file_2 = storage_test_utils.create_file(file_path='old/path/file_2.txt', workspace=workspace)
+
+        def move_files(volume_path, file_moves):
+            file_1.file_path = file_moves[0].new_path
+            raise PartialTransfer([file_1], MissingFile(file_2.file_name))
+        workspace.get_broker = MagicMock()
+        workspace.get_broker.return_value.move_files.side_effect = move_files
+
+        files = [FileMove(file_1, 'new/path/file_1.txt'), FileMove(file_2, 'new/path/file_2.txt')]
+        self.assertRaises(MissingFile, ScaleFile.objects.move_files, files)
+
+        self.assertEqual(ScaleFile.objects.get(id=file_1.id).file_path, 'new/path/file_1.txt')
+        self.assertEqual(ScaleFile.objects.get(id=file_2.id).file_path, 'old/path/file_2.txt')
+
+class TestScaleFileManagerSaveFiles(TestCase):
+
+    def setUp(self):
+        django.setup()
+
+    def test_save_deleted_files(self):
+        """Tests calling ScaleFileManager.save_deleted_files() successfully"""
+
+        file_1 = storage_test_utils.create_file()
+        file_2 = storage_test_utils.create_file()
+        file_3 = storage_test_utils.create_file()
+
+        ScaleFile.objects.save_deleted_files([file_1, file_2])
+
+        self.assertTrue(file_1.is_deleted)
+        self.assertIsNotNone(file_1.deleted)
+        file_1 = ScaleFile.objects.get(id=file_1.id)
+        self.assertTrue(file_1.is_deleted)
+        self.assertEqual(file_1.deleted, file_1.unpublished)
+        self.assertTrue(ScaleFile.objects.get(id=file_2.id).is_deleted)
+        self.assertFalse(ScaleFile.objects.get(id=file_3.id).is_deleted)
+
+    def test_save_moved_files(self):
+        """Tests calling ScaleFileManager.save_moved_files() successfully"""
+
+        file_1 = storage_test_utils.create_file(file_path='old/path/file_1.txt')
+        file_2 = storage_test_utils.create_file(file_path='old/path/file_2.txt')
+        file_1.file_path = 'new/path/file_1.txt'
+        file_2.file_path = 'new/path/file_2.txt'
+        file_2.file_name = 'not_saved.txt'
+        file_3 = ScaleFile(file_path='new/path/file_3.txt')
+
+        ScaleFile.objects.save_moved_files([file_1, file_2, file_3])
+
+        file_1 = ScaleFile.objects.get(id=file_1.id)
+        file_2 = ScaleFile.objects.get(id=file_2.id)
+        self.assertEqual(file_1.file_path, 'new/path/file_1.txt')
+        self.assertEqual(file_2.file_path, 'new/path/file_2.txt')
+        self.assertNotEqual(file_2.file_name, 'not_saved.txt')
+        self.assertIsNone(file_3.pk)
+
+    def test_save_registered_files(self):
+        """Tests calling ScaleFileManager.save_registered_files() with new and existing files"""
+
+        workspace_1 = storage_test_utils.create_workspace()
+        workspace_2 = storage_test_utils.create_workspace()
+        file_1 = ScaleFile(workspace=workspace_1, file_path='path/file_1.txt')
+        file_1.set_basic_fields('file_1.txt', 100)
+        file_2 = storage_test_utils.create_file(file_path='old/path/file_2.txt', is_deleted=True)
+        file_2.workspace = workspace_1
+        file_2.file_path = 'path/file_2.txt'
+        file_2.checksum = 'abc'
+        file_2.is_deleted = False
+        file_3 = storage_test_utils.create_file(file_path='old/path/file_3.txt', is_deleted=True)
+        file_3.workspace = workspace_2
+        file_3.file_path = 'path/file_3.txt'
+        file_3.is_deleted = False
+
+        ScaleFile.objects.save_registered_files([file_1, file_2, file_3])
+
+        self.assertIsNotNone(file_1.pk)
+        self.assertEqual(ScaleFile.objects.get(id=file_1.id).file_path, 'path/file_1.txt')
+        file_2 = ScaleFile.objects.get(id=file_2.id)
+        self.assertEqual(file_2.workspace_id, workspace_1.id)
+        self.assertEqual(file_2.file_path, 'path/file_2.txt')
+        self.assertEqual(file_2.checksum, 'abc')
+        self.assertFalse(file_2.is_deleted)
+        file_3 = ScaleFile.objects.get(id=file_3.id)
+        self.assertEqual(file_3.workspace_id, workspace_2.id)
+        self.assertEqual(file_3.file_path, 'path/file_3.txt')
+        self.assertIsNone(file_3.checksum)
+        self.assertFalse(file_3.is_deleted)
+
+    def test_save_uploaded_files(self):
+        """Tests calling ScaleFileManager.save_uploaded_files() with new and existing files"""
+
+        workspace = storage_test_utils.create_workspace()
+        file_1 = ScaleFile(workspace=workspace, file_path='path/file_1.txt')
+        file_1.set_basic_fields('file_1.txt', 100)
+        file_2 = storage_test_utils.create_file(file_path='path/file_2.txt')
+        file_2.workspace = workspace
+
+        ScaleFile.objects.save_uploaded_files([file_1, file_2])
+
+        self.assertIsNotNone(file_1.pk)
+        self.assertEqual(ScaleFile.objects.get(id=file_1.id).file_path, 'path/file_1.txt')
+        self.assertEqual(ScaleFile.objects.get(id=file_2.id).workspace_id, workspace.id)
+
+
 class TestScaleFileManagerUploadFiles(TestCase):
 
     def setUp(self):
@@ -414,6 +541,25 @@ class TestScaleFileManagerUploadFiles(TestCase):
         files = [(file_1, local_path_1, remote_path_1), (file_2, local_path_2, remote_path_2)]
         self.assertRaises(Exception, ScaleFile.objects.upload_files, upload_dir, work_dir, workspace, files)
 
+    @patch('storage.models.os.path.exists')
+    def test_partial_failure(self, mock_exists):
+        """Tests that the files uploaded before an upload fails are saved"""
+
+        mock_exists.return_value = True
+        workspace = storage_test_utils.create_workspace()
+        file_1 = ScaleFile(file_path='my/remote/path/file_1.txt')
+        file_1.set_basic_fields('file_1.txt', 100)
+        file_2 = ScaleFile(file_path='my/remote/path/file_2.txt')
+        file_2.set_basic_fields('file_2.txt', 100)
+        workspace.get_broker = MagicMock()
+        workspace.get_broker.return_value.upload_files.side_effect = PartialTransfer([file_1], Exception('Failed'))
+
+        files = [FileUpload(file_1, 'my/local/path/file_1.txt'), FileUpload(file_2, 'my/local/path/file_2.txt')]
+        self.assertRaises(Exception, ScaleFile.objects.upload_files, workspace, files)
+
+        self.assertEqual(ScaleFile.objects.get(id=file_1.id).workspace_id, workspace.id)
+        self.assertIsNone(file_2.pk)
+
 
 class TestScaleFile(TestCase):
 
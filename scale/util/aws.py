@@ -8,6 +8,7 @@ from botocore.exceptions import ClientError
 from django.conf import settings
 
 from storage.brokers.broker import FileDetails
+from storage.settings import S3_MULTIPART_CONCURRENCY, S3_TRANSFER_THREADS
 from util.exceptions import InvalidAWSCredentials, FileDoesNotExist
 
 logger = logging.getLogger(__name__)
@@ -103,8 +104,11 @@ class SQSClient(AWSClient):
         """
         AWSClient.__init__(self, 'sqs', None, credentials, region_name)
 
+        # Queue resources cached by name so repeated calls on a long-lived client skip the GetQueueUrl lookup
+        self._queues = {}
+
     def get_queue_by_name(self, queue_name):
-        """Gets a SQS queue by the given name
+        """Gets a SQS queue by the given name. The queue URL lookup is cached for the life of the client.
 
         :param queue_name: The unique name of the SQS queue
         :type queue_name: string
@@ -112,7 +116,28 @@ class SQSClient(AWSClient):
         :rtype: :class:`boto3.sqs.Queue`
         """
 
-        return self._resource.get_queue_by_name(QueueName=queue_name)
+        if queue_name not in self._queues:
+            self._queues[queue_name] = self._resource.get_queue_by_name(QueueName=queue_name)
+        return self._queues[queue_name]
+
+    def delete_messages(self, queue_name, entries):
+        """Delete a batch of messages from SQS queue.
+
+        :param queue_name: The unique name of the SQS queue
+        :type queue_name: string
+        :param entries: Receipt handles of the messages to delete
+        :type entries: [`DeleteMessageBatchRequestEntry`]
+        :return: Entries that failed to be deleted
+        :rtype: [`BatchResultErrorEntry`]
+        """
+
+        queue = self.get_queue_by_name(queue_name)
+
+        failed = []
+        for i in xrange(0, len(entries), 10):
+            response = queue.delete_messages(Entries=entries[i:i + 10])
+            failed.extend(response.get('Failed', []))
+        return failed
 
     def send_message(self, queue_name, message):
         """Send a message to SQS queue.
@@ -143,6 +168,25 @@ class SQSClient(AWSClient):
         for batch in batches:
             queue.send_messages(Entries=batch)
 
+    def change_message_visibility_batch(self, queue_name, entries):
+        """Change the visibility timeout of a batch of messages in an SQS queue.
+
+        :param queue_name: The unique name of the SQS queue
+        :type queue_name: string
+        :param entries: Receipt handles and new visibility timeouts of the messages
+        :type entries: [`ChangeMessageVisibilityBatchRequestEntry`]
+        :return: Entries that failed to be changed
+        :rtype: [`BatchResultErrorEntry`]
+        """
+
+        queue = self.get_queue_by_name(queue_name)
+
+        failed = []
+        for i in xrange(0, len(entries), 10):
+            response = queue.change_message_visibility_batch(Entries=entries[i:i + 10])
+            failed.extend(response.get('Failed', []))
+        return failed
+
     def receive_messages(self,
                          queue_name,
                          batch_size=100,
@@ -150,10 +194,15 @@ class SQSClient(AWSClient):
                          visibility_timeout_seconds=30):
         """Receive a batch of messages from an SQS queue
 
+        Messages are requested 10 at a time, the SQS maximum, until the batch size is reached or a request returns less
+        than it asked for, indicating the queue is drained. Only the first request long-polls, the requests after it
+        return immediately so that a caller reading the whole batch is not held up by a nearly drained queue.
+
         :param queue_name:
         :param batch_size: Number of messages to retrieve in a single pass
         :type batch_size: int
-        :param wait_time_seconds: Long-poll duration of request (max of 20). Ends immediately when message published.
+        :param wait_time_seconds: Long-poll duration of the first request (max of 20). Ends immediately when message
+            published.
         :type wait_time_seconds: int
         :param visibility_timeout_seconds: Duration for a message to be hidden after retrieved from the queue.
         :type visibility_timeout_seconds: int
@@ -162,20 +211,21 @@ class SQSClient(AWSClient):
         """
         queue = self.get_queue_by_name(queue_name)
 
-        # Set max_messages to lesser of 10 or batch_size
-        max_messages = batch_size if batch_size < 10 else 10
-
-        # Generate individual batch sizes up to given size, capped at 10
         count = 0
         while count < batch_size:
+            # Request the lesser of 10 or the remaining batch size
+            max_messages = min(batch_size - count, 10)
+
+            received = 0
             for message in queue.receive_messages(MaxNumberOfMessages=max_messages,
-                                                  WaitTimeSeconds=wait_time_seconds,
+                                                  WaitTimeSeconds=wait_time_seconds if not count else 0,
                                                   VisibilityTimeout=visibility_timeout_seconds):
-                count += 1
+                received += 1
                 yield message
+            count += received
 
-            # If count isn't evenly divisible by ten or nothing came back, we're done
-            if count % 10 != 0 or not count:
+            # If fewer messages came back than were requested, we're done
+            if received < max_messages:
                 break
 
 
@@ -189,9 +239,32 @@ class S3Client(AWSClient):
         :param region_name: The AWS region the resource resides in.
         :type region_name: string
         """
-        config = Config(s3={'addressing_style': getattr(settings, 'S3_ADDRESSING_STYLE', 'auto')})
+        # Enough pooled connections for every concurrent part of every concurrent file transfer
+        config = Config(s3={'addressing_style': getattr(settings, 'S3_ADDRESSING_STYLE', 'auto')},
+                        max_pool_connections=S3_TRANSFER_THREADS * S3_MULTIPART_CONCURRENCY)
         AWSClient.__init__(self, 's3', config, credentials, region_name)
 
+    def delete_objects(self, bucket_name, key_names):
+        """Deletes the S3 objects with the given identifiers in batches of up to 1,000 keys per request. Keys that do not
+        exist in the bucket are treated as deleted.
+
+        :param bucket_name: The unique name of the bucket containing the objects.
+        :type bucket_name: string
+        :param key_names: The unique names of the objects to delete.
+        :type key_names: [string]
+        :returns: The errors for the objects that failed to be deleted, each with Key, Code and Message
+        :rtype: [dict]
+
+        :raises :class:`botocore.exceptions.ClientError`: If the request is invalid.
+        """
+
+        errors = []
+        for i in xrange(0, len(key_names), 1000):
+            objects = [{'Key': key_name} for key_name in key_names[i:i + 1000]]
+            response = self._client.delete_objects(Bucket=bucket_name, Delete={'Objects': objects, 'Quiet': True})
+            errors.extend(response.get('Errors', []))
+        return errors
+
     def get_bucket(self, bucket_name, validate=True):
         """Gets a reference to an S3 bucket with the given identifier.
 
@@ -229,7 +302,8 @@ class S3Client(AWSClient):
 
         try:
             if validate:
-                s3_object.get()
+                # Only a HEAD request is needed to verify the object, so the content is never opened
+                s3_object.load()
         except ClientError as err:
             error_code = err.response['ResponseMetadata']['HTTPStatusCode']
             if error_code == 404:
@@ -237,7 +311,7 @@ class S3Client(AWSClient):
             raise
         return s3_object
 
-    def list_objects(self, bucket_name, recursive=False, prefix=None):
+    def list_objects(self, bucket_name, recursive=False, prefix=None, start_after=None):
         """Generator function to retrieve list of objects within an S3 bucket
 
         Retrieval of objects is provided by the boto3 paginator over 
@@ -252,6 +326,8 @@ class S3Client(AWSClient):
         :type recursive: bool
         :param prefix: The parent key from which to search bucket. Trailing slash is optional
         :type prefix: string
+        :param start_after: The key after which to start listing, None to start with the first key
+        :type start_after: string
         :return: Generator of S3 objects that were found.
         :rtype: Generator[:class:`storage.brokers.broker.FileDetails`]
         """
@@ -261,6 +337,8 @@ class S3Client(AWSClient):
             params['Prefix'] = prefix
         if not recursive:
             params['Delimiter'] = '/'
+        if start_after:
+            params['Marker'] = start_after
 
         paginator = self._client.get_paginator('list_objects')
         iterator = paginator.paginate(**params)
@@ -0,0 +1,241 @@
+"""Defines classes for recording the distribution of latency values"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import math
+import time
+from collections import deque
+
+# Number of buckets per power of two, giving a worst case relative error of 1 / (2 * SUB_BUCKET_COUNT)
+SUB_BUCKET_COUNT = 32
+# Bucket key for zero, sorts before the key of every positive float
+ZERO_BUCKET_KEY = (-2000, 0)
+
+
+class Histogram(object):
+    """This class records the distribution of non-negative values in logarithmic buckets of bounded relative error, in
+    the style of an HDR histogram. Memory use depends only on the range of recorded values, not on how many are
+    recorded. This class is NOT thread-safe.
+    """
+
+    def __init__(self):
+        """Constructor
+        """
+
+        self.count = 0
+        self.max = None
+        self.min = None
+        self.total = 0.0
+
+        self._buckets = {}  # {Bucket key: count}
+
+    def add(self, histogram):
+        """Adds all values recorded in the given histogram to this histogram
+
+        :param histogram: The histogram to add
+        :type histogram: :class:`util.histogram.Histogram`
+        """
+
+        if not histogram.count:
+            return
+
+        for key, count in histogram._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self.count += histogram.count
+        self.total += histogram.total
+        self.max = histogram.max if self.max is None else max(self.max, histogram.max)
+        self.min = histogram.min if self.min is None else min(self.min, histogram.min)
+
+    @staticmethod
+    def from_dict(histogram_dict):
+        """Returns the histogram represented by the given dict, which was created by get_dict(). An empty dict returns
+        an empty histogram.
+
+        :param histogram_dict: The histogram dict
+        :type histogram_dict: dict
+        :returns: The histogram
+        :rtype: :class:`util.histogram.Histogram`
+        """
+
+        histogram = Histogram()
+        if histogram_dict:
+            histogram.count = histogram_dict['count']
+            histogram.max = histogram_dict['max']
+            histogram.min = histogram_dict['min']
+            histogram.total = histogram_dict['total']
+            for exponent, sub_bucket, count in histogram_dict['buckets']:
+                histogram._buckets[(exponent, sub_bucket)] = count
+        return histogram
+
+    def get_dict(self):
+        """Returns a dict representing this histogram that can be stored as JSON
+
+        :returns: The histogram dict
+        :rtype: dict
+        """
+
+        buckets = [[key[0], key[1], count] for key, count in sorted(self._buckets.items())]
+        return {'count': self.count, 'max': self.max, 'min': self.min, 'total': self.total, 'buckets': buckets}
+
+    def get_percentile(self, percentile):
+        """Returns the value at the given percentile, accurate to within the bucket precision, possibly None if no values
+        have been recorded
+
+        :param percentile: The percentile between 0 and 100
+        :type percentile: float
+        :returns: The value at the percentile
+        :rtype: float
+        """
+
+        if not self.count:
+            return None
+
+        threshold = max(1, int(math.ceil(self.count * percentile / 100.0)))
+        seen = 0
+        for key in sorted(self._buckets.keys()):
+            seen += self._buckets[key]
+            if seen >= threshold:
+                # Report the middle of the bucket, but never outside of the recorded range
+                value = Histogram._get_bucket_midpoint(key)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def get_summary(self, scale=1.0, ndigits=3):
+        """Returns a summary dict of the count, mean, maximum, and 50th, 90th, and 99th percentiles of the recorded
+        values
+
+        :param scale: Multiplier applied to each reported value, such as 1000 to report seconds as milliseconds
+        :type scale: float
+        :param ndigits: The number of decimal digits for rounding reported values
+        :type ndigits: int
+        :returns: The summary dict
+        :rtype: dict
+        """
+
+        summary = {'count': self.count, 'mean': None, 'p50': None, 'p90': None, 'p99': None, 'max': None}
+        if self.count:
+            summary['mean'] = round(self.total / self.count * scale, ndigits)
+            summary['p50'] = round(self.get_percentile(50.0) * scale, ndigits)
+            summary['p90'] = round(self.get_percentile(90.0) * scale, ndigits)
+            summary['p99'] = round(self.get_percentile(99.0) * scale, ndigits)
+            summary['max'] = round(self.max * scale, ndigits)
+        return summary
+
+    def record(self, value):
+        """Records the given value
+
+        :param value: The value, negative values are recorded as zero
+        :type value: float
+        """
+
+        value = max(float(value), 0.0)
+        key = Histogram._get_bucket_key(value)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    @staticmethod
+    def _get_bucket_key(value):
+        """Returns the key of the bucket for the given value, keys sort in the same order as their buckets
+
+        :param value: The non-negative value
+        :type value: float
+        :returns: The bucket key
+        :rtype: tuple
+        """
+
+        if value == 0.0:
+            return ZERO_BUCKET_KEY
+        mantissa, exponent = math.frexp(value)  # value = mantissa * 2 ** exponent, 0.5 <= mantissa < 1
+        return exponent, int((mantissa - 0.5) * 2 * SUB_BUCKET_COUNT)
+
+    @staticmethod
+    def _get_bucket_midpoint(key):
+        """Returns the middle value of the bucket with the given key
+
+        :param key: The bucket key
+        :type key: tuple
+        :returns: The middle value of the bucket
+        :rtype: float
+        """
+
+        if key == ZERO_BUCKET_KEY:
+            return 0.0
+        exponent, sub_bucket = key
+        mantissa = 0.5 + (sub_bucket + 0.5) / (2.0 * SUB_BUCKET_COUNT)
+        return math.ldexp(mantissa, exponent)
+
+
+class RollingHistogram(object):
+    """This class records values into a histogram covering only a recent window of time. The window is divided into
+    slots, and the oldest slot is dropped as each new slot begins. This class is NOT thread-safe.
+    """
+
+    def __init__(self, window, slot_count=6):
+        """Constructor
+
+        :param window: The length of the window in seconds
+        :type window: float
+        :param slot_count: The number of slots the window is divided into
+        :type slot_count: int
+        """
+
+        self._slot_duration = float(window) / slot_count
+        self._slot_count = slot_count
+        self._slots = deque()  # (Slot number, Histogram), newest on the right
+
+    def get_histogram(self, when=None):
+        """Returns a histogram of all values recorded within the window
+
+        :param when: The current time in seconds since the epoch, defaults to now
+        :type when: float
+        :returns: The histogram of the window
+        :rtype: :class:`util.histogram.Histogram`
+        """
+
+        self._expire(self._get_slot_number(when))
+        histogram = Histogram()
+        for _slot_number, slot_histogram in self._slots:
+            histogram.add(slot_histogram)
+        return histogram
+
+    def record(self, value, when=None):
+        """Records the given value
+
+        :param value: The value
+        :type value: float
+        :param when: The current time in seconds since the epoch, defaults to now
+        :type when: float
+        """
+
+        slot_number = self._get_slot_number(when)
+        self._expire(slot_number)
+        if not self._slots or self._slots[-1][0] != slot_number:
+            self._slots.append((slot_number, Histogram()))
+        self._slots[-1][1].record(value)
+
+    def _expire(self, slot_number):
+        """Drops the slots that have fallen out of the window ending with the given slot
+
+        :param slot_number: The current slot number
+        :type slot_number: int
+        """
+
+        while self._slots and self._slots[0][0] <= slot_number - self._slot_count:
+            self._slots.popleft()
+
+    def _get_slot_number(self, when):
+        """Returns the number of the slot containing the given time
+
+        :param when: The time in seconds since the epoch, None for now
+        :type when: float
+        :returns: The slot number
+        :rtype: int
+        """
+
+        if when is None:
+            when = time.time()
+        return int(when // self._slot_duration)
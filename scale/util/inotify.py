@@ -0,0 +1,118 @@
+"""Defines a minimal wrapper around the Linux inotify API for watching directories for file events"""
+from __future__ import unicode_literals
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+from collections import namedtuple
+
+# Event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# Flags for inotify_init1()
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# The fixed size header of each event (wd, mask, cookie, len) followed by a null padded name of len bytes
+EVENT_HEADER = struct.Struct(str('iIII'))
+# Number of bytes read at a time, enough for several thousand events
+READ_SIZE = 65536
+
+# Named tuple represents an inotify event
+INotifyEvent = namedtuple('INotifyEvent', ['wd', 'mask', 'cookie', 'name'])
+
+
+class INotify(object):
+    """This class watches directories for file events using the Linux inotify API. It is implemented with ctypes so
+    that it has no extra dependencies. An OSError is raised on creation if inotify is not supported on this system.
+    """
+
+    def __init__(self):
+        """Constructor
+
+        :raises OSError: If inotify is not supported on this system
+        """
+
+        libc_name = ctypes.util.find_library('c')
+        libc = ctypes.CDLL(libc_name, use_errno=True) if libc_name else None
+        if not libc or not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not supported on this system')
+
+        self._libc = libc
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self._fd < 0:
+            INotify._raise_errno()
+
+    def add_watch(self, path, mask):
+        """Starts watching the given path for the events in the given mask
+
+        :param path: The path to watch
+        :type path: string
+        :param mask: The mask of events to watch for
+        :type mask: int
+        :returns: The watch descriptor
+        :rtype: int
+
+        :raises OSError: If the watch cannot be added
+        """
+
+        if isinstance(path, unicode):
+            path = path.encode(sys.getfilesystemencoding())
+        wd = self._libc.inotify_add_watch(self._fd, path, ctypes.c_uint32(mask))
+        if wd < 0:
+            INotify._raise_errno()
+        return wd
+
+    def close(self):
+        """Closes the inotify instance, removing all of its watches
+        """
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def read_events(self, timeout):
+        """Waits up to the given timeout for events and returns the events that are ready
+
+        :param timeout: The maximum number of seconds to wait for events
+        :type timeout: float
+        :returns: The list of events, possibly empty
+        :rtype: [:class:`util.inotify.INotifyEvent`]
+        """
+
+        readable = select.select([self._fd], [], [], timeout)[0]
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except OSError as ex:
+            if ex.errno == errno.EAGAIN:
+                return []
+            raise
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(sys.getfilesystemencoding(), 'replace')
+            offset += length
+            events.append(INotifyEvent(wd, mask, cookie, name))
+        return events
+
+    @staticmethod
+    def _raise_errno():
+        """Raises an OSError for the current C errno value
+        """
+
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
@@ -105,6 +105,16 @@ class TestS3Client(TestCase):
 
         self.assertEqual(len(list(results)), 2)
 
+    @patch('botocore.paginate.Paginator.paginate')
+    def test_list_objects_start_after(self, mock_func):
+        mock_func.return_value = [self.sample_response]
+
+        with S3Client(self.credentials) as client:
+            results = client.list_objects('sample-bucket', True, start_after='test/file_1.txt')
+            self.assertEqual(len(list(results)), 1)
+
+        self.assertDictEqual(mock_func.call_args[1], {'Bucket': 'sample-bucket', 'Marker': 'test/file_1.txt'})
+
     @patch('botocore.paginate.PageIterator._make_request')
     def test_list_objects_empty_bucket(self, mock_func):
         response = self.sample_response
@@ -143,6 +153,29 @@ class TestS3Client(TestCase):
 
         self.assertEqual(len(list(results)), 2)
 
+    def test_delete_objects(self):
+        keys = ['file_%i' % i for i in range(1500)]
+
+        with S3Client(self.credentials) as client:
+            client._client = MagicMock()
+            client._client.delete_objects.side_effect = [{'Errors': [{'Key': 'file_1'}]}, {}]
+            errors = client.delete_objects('sample-bucket', keys)
+
+        self.assertListEqual(errors, [{'Key': 'file_1'}])
+        self.assertEqual(client._client.delete_objects.call_count, 2)
+        second_call = client._client.delete_objects.call_args[1]
+        self.assertEqual(second_call['Bucket'], 'sample-bucket')
+        self.assertListEqual(second_call['Delete']['Objects'], [{'Key': key} for key in keys[1000:]])
+
+    def test_get_object_validate(self):
+        with S3Client(self.credentials) as client:
+            client._resource = MagicMock()
+            client.get_object('sample-bucket', 'test/file_1.txt')
+
+        # Validation must not download the object
+        s3_object = client._resource.Object.return_value
+        self.assertTrue(s3_object.load.called)
+        self.assertFalse(s3_object.get.called)
 
 
 class TestSQSClient(TestCase):
@@ -152,6 +185,13 @@ class TestSQSClient(TestCase):
 
         django.setup()
 
+    def test_get_queue_by_name_cached(self):
+        with SQSClient(self.credentials, self.region_name) as client:
+            client._resource = MagicMock()
+            queue = client.get_queue_by_name('queue')
+            self.assertEquals(client.get_queue_by_name('queue'), queue)
+            client._resource.get_queue_by_name.assert_called_once_with(QueueName='queue')
+
     @patch('util.aws.SQSClient.get_queue_by_name')
     def test_send_messages(self, get_queue_by_name):
         inputs = [x for x in range(0,25)]
@@ -221,4 +261,50 @@ class TestSQSClient(TestCase):
             results = list(client.receive_messages('queue'))
             self.assertEquals(results, outputs)
 
-        self.assertEquals(receive_messages.call_count, 2)
\ No newline at end of file
+        self.assertEquals(receive_messages.call_count, 2)
+    @patch('util.aws.SQSClient.get_queue_by_name')
+    def test_receive_messages_25(self, get_queue_by_name):
+        inputs = [[x for x in range(0, 10)],
+                  [x for x in range(10, 20)],
+                  [x for x in range(20, 25)]]
+        outputs = [x for x in range(0, 25)]
+
+        receive_messages = MagicMock(side_effect=inputs)
+        get_queue_by_name.return_value.receive_messages = receive_messages
+
+        with SQSClient(self.credentials, self.region_name) as client:
+            results = list(client.receive_messages('queue', batch_size=25))
+            self.assertEquals(results, outputs)
+
+        # Only the first request long-polls
+        receive_messages.assert_has_calls([call(MaxNumberOfMessages=10, VisibilityTimeout=30, WaitTimeSeconds=20),
+                                           call(MaxNumberOfMessages=10, VisibilityTimeout=30, WaitTimeSeconds=0),
+                                           call(MaxNumberOfMessages=5, VisibilityTimeout=30, WaitTimeSeconds=0)])
+        self.assertEquals(receive_messages.call_count, 3)
+
+    @patch('util.aws.SQSClient.get_queue_by_name')
+    def test_change_message_visibility_batch(self, get_queue_by_name):
+        inputs = [x for x in range(0, 15)]
+        change_message_visibility_batch = MagicMock(side_effect=[{'Successful': []}, {'Failed': ['failure']}])
+        get_queue_by_name.return_value.change_message_visibility_batch = change_message_visibility_batch
+
+        with SQSClient(self.credentials, self.region_name) as client:
+            failed = client.change_message_visibility_batch('queue', inputs)
+
+        self.assertEquals(failed, ['failure'])
+        change_message_visibility_batch.assert_has_calls([call(Entries=[x for x in range(0, 10)]),
+                                                          call(Entries=[x for x in range(10, 15)])])
+
+    @patch('util.aws.SQSClient.get_queue_by_name')
+    def test_delete_messages(self, get_queue_by_name):
+        inputs = [x for x in range(0, 25)]
+        delete_messages = MagicMock(side_effect=[{'Successful': []}, {'Failed': ['failure']}, {}])
+        get_queue_by_name.return_value.delete_messages = delete_messages
+
+        with SQSClient(self.credentials, self.region_name) as client:
+            failed = client.delete_messages('queue', inputs)
+
+        self.assertEquals(failed, ['failure'])
+        delete_messages.assert_has_calls([call(Entries=[x for x in range(0, 10)]),
+                                          call(Entries=[x for x in range(10, 20)]),
+                                          call(Entries=[x for x in range(20, 25)])])
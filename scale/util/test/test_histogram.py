@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import json
+
+from django.test import SimpleTestCase
+
+from util.histogram import Histogram, RollingHistogram, SUB_BUCKET_COUNT
+
+
+class TestHistogram(SimpleTestCase):
+    """Tests the Histogram class"""
+
+    def test_empty(self):
+        """Tests an empty histogram"""
+
+        histogram = Histogram()
+
+        self.assertIsNone(histogram.get_percentile(50.0))
+        self.assertDictEqual(histogram.get_summary(),
+                             {'count': 0, 'mean': None, 'p50': None, 'p90': None, 'p99': None, 'max': None})
+
+    def test_percentiles(self):
+        """Tests that percentiles are accurate to within the bucket precision"""
+
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.record(value / 1000.0)
+
+        tolerance = 1.0 / SUB_BUCKET_COUNT
+        for percentile in (1.0, 50.0, 90.0, 99.0):
+            expected = percentile / 100.0
+            self.assertAlmostEqual(histogram.get_percentile(percentile), expected, delta=expected * tolerance)
+        self.assertEqual(histogram.get_percentile(100.0), 1.0)
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.min, 0.001)
+        self.assertEqual(histogram.max, 1.0)
+
+    def test_zero_and_negative(self):
+        """Tests recording zero and negative values"""
+
+        histogram = Histogram()
+        histogram.record(0.0)
+        histogram.record(-1.0)
+        histogram.record(2.0)
+
+        self.assertEqual(histogram.get_percentile(50.0), 0.0)
+        self.assertEqual(histogram.get_percentile(99.0), 2.0)
+
+    def test_add(self):
+        """Tests adding one histogram to another"""
+
+        histogram_1 = Histogram()
+        histogram_1.record(1.0)
+        histogram_2 = Histogram()
+        histogram_2.record(3.0)
+        histogram_2.record(5.0)
+
+        histogram_1.add(histogram_2)
+        histogram_1.add(Histogram())
+
+        summary = histogram_1.get_summary(scale=1000.0)
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['mean'], 3000.0)
+        self.assertEqual(summary['max'], 5000.0)
+        self.assertEqual(histogram_1.min, 1.0)
+
+    def test_dict(self):
+        """Tests converting a histogram to and from a JSON dict"""
+
+        histogram = Histogram()
+        for value in (0.0, 0.5, 2.0, 2.0, 300.0):
+            histogram.record(value)
+
+        histogram_dict = json.loads(json.dumps(histogram.get_dict()))
+        new_histogram = Histogram.from_dict(histogram_dict)
+
+        self.assertDictEqual(new_histogram.get_summary(), histogram.get_summary())
+        self.assertEqual(new_histogram.min, 0.0)
+        self.assertEqual(Histogram.from_dict({}).count, 0)
+
+
+class TestRollingHistogram(SimpleTestCase):
+    """Tests the RollingHistogram class"""
+
+    def test_window(self):
+        """Tests that values older than the window are dropped"""
+
+        histogram = RollingHistogram(60.0, slot_count=6)
+        histogram.record(1.0, when=1000.0)
+        histogram.record(2.0, when=1035.0)
+        histogram.record(3.0, when=1059.0)
+
+        self.assertEqual(histogram.get_histogram(when=1059.0).count, 3)
+        # Slot containing the first value has left the window
+        self.assertEqual(histogram.get_histogram(when=1061.0).count, 2)
+        self.assertEqual(histogram.get_histogram(when=1200.0).count, 0)
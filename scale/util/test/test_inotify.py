@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from util.inotify import INotify, IN_CLOSE_WRITE, IN_MOVED_TO
+
+
+class TestINotify(SimpleTestCase):
+    """Tests the INotify class"""
+
+    def setUp(self):
+        try:
+            self.inotify = INotify()
+        except OSError:
+            self.skipTest('inotify is not supported on this system')
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.inotify.close()
+        shutil.rmtree(self.dir)
+
+    def test_read_events(self):
+        """Tests reading the events for files written and moved into a watched directory"""
+
+        wd = self.inotify.add_watch(self.dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+        with open(os.path.join(self.dir, 'file_1.txt'), 'w') as file_1:
+            file_1.write('data')
+        other_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(other_dir, 'file_2.txt'), 'w') as file_2:
+                file_2.write('data')
+            os.rename(os.path.join(other_dir, 'file_2.txt'), os.path.join(self.dir, 'file_2.txt'))
+        finally:
+            shutil.rmtree(other_dir)
+
+        events = self.inotify.read_events(1.0)
+
+        self.assertListEqual([(event.wd, event.name) for event in events], [(wd, 'file_1.txt'), (wd, 'file_2.txt')])
+        self.assertTrue(events[0].mask & IN_CLOSE_WRITE)
+        self.assertTrue(events[1].mask & IN_MOVED_TO)
+
+    def test_read_events_timeout(self):
+        """Tests reading events when none occur before the timeout"""
+
+        self.inotify.add_watch(self.dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+
+        self.assertListEqual(self.inotify.read_events(0.01), [])
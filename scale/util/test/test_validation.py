@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+from jsonschema.exceptions import SchemaError, ValidationError
+from mock import patch
+
+from util.validation import validate_json
+
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['name'],
+    'properties': {
+        'name': {'type': 'string'},
+    },
+}
+
+
+class TestValidateJson(SimpleTestCase):
+    """Tests the validate_json function"""
+
+    def test_valid(self):
+        """Tests validating a valid instance"""
+
+        validate_json({'name': 'test'}, SCHEMA)
+
+    def test_invalid(self):
+        """Tests validating an invalid instance"""
+
+        self.assertRaises(ValidationError, validate_json, {'name': 1}, SCHEMA)
+        self.assertRaises(ValidationError, validate_json, {}, SCHEMA)
+
+    def test_invalid_schema(self):
+        """Tests validating against an invalid schema"""
+
+        self.assertRaises(SchemaError, validate_json, {}, {'type': 'bad'})
+
+    @patch('util.validation.validator_for')
+    def test_compiled_once(self, mock_validator_for):
+        """Tests that a schema is only checked and compiled the first time it is used"""
+
+        schema = {'type': 'object'}
+
+        validate_json({}, schema)
+        validate_json({}, schema)
+
+        self.assertEqual(mock_validator_for.call_count, 1)
+        self.assertEqual(mock_validator_for.return_value.check_schema.call_count, 1)
+        self.assertEqual(mock_validator_for.return_value.return_value.validate.call_count, 2)
@@ -1,4 +1,36 @@
-"""Defines classes related to validating"""
+"""Defines classes and functions related to validating"""
+from __future__ import unicode_literals
+
+from jsonschema.validators import validator_for
+
+
+# Compiled JSON schema validators, stored by schema object ID
+_SCHEMA_VALIDATORS = {}  # {Schema ID: (schema, validator)}
+
+
+def validate_json(instance, schema):
+    """Validates the given JSON instance against the given JSON schema in the same way as
+    :func:`jsonschema.validate`. The schema itself is only checked the first time it is used, after which its compiled
+    validator is reused, so this should only be used with schemas that are never modified, such as module constants.
+
+    :param instance: The JSON instance to validate
+    :type instance: dict
+    :param schema: The JSON schema
+    :type schema: dict
+
+    :raises :class:`jsonschema.exceptions.ValidationError`: If the instance is invalid
+    :raises :class:`jsonschema.exceptions.SchemaError`: If the schema is invalid
+    """
+
+    cached = _SCHEMA_VALIDATORS.get(id(schema))
+    if cached and cached[0] is schema:
+        validator = cached[1]
+    else:
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = cls(schema)
+        _SCHEMA_VALIDATORS[id(schema)] = (schema, validator)
+    validator.validate(instance)
 
 
 class ValidationError(object):